@@ -0,0 +1,85 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+'''
+Usage:
+    ait-sle-benchmark [--stage=<name>]... [--buffers=<n>] [--frames-per-buffer=<n>]
+                      [--frame-type=<type>] [--frame-len=<n>] [--service=<raf|rcf>]
+                      [--warmup=<n>] [--fast-decode=<on|off|verify>] [--output=<path>]
+
+Measure the RAF / RCF receive path on synthetic transfer buffers: TML
+framing, BER and PyASN1 decoding of transfer buffers, frame decoding,
+packet extraction, sink emission and all of them end to end through a
+session. The throughput and per buffer latency percentiles of each stage
+are written as JSON.
+'''
+
+import argparse
+import json
+
+import gevent.monkey
+gevent.monkey.patch_all()
+
+from ait.dsn.sle import benchmark
+
+_FAST_DECODE = {'on': True, 'off': False, 'verify': 'verify'}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--stage', choices=benchmark.STAGES, action='append', default=None,
+                        help='A stage to run. All stages are run by default')
+    parser.add_argument('--buffers', type=int, default=200,
+                        help='Transfer buffers measured in each stage')
+    parser.add_argument('--frames-per-buffer', type=int, default=10,
+                        help='Frames in each transfer buffer')
+    parser.add_argument('--frame-type', choices=['TMTransFrame', 'AOSTransFrame'],
+                        default='TMTransFrame', help='The type of frames')
+    parser.add_argument('--frame-len', type=int, default=1115,
+                        help='The length of each frame in octets')
+    parser.add_argument('--service', choices=['raf', 'rcf'], default='raf',
+                        help='The service whose transfer buffers are measured')
+    parser.add_argument('--warmup', type=int, default=10,
+                        help='Transfer buffers processed before measuring each stage')
+    parser.add_argument('--fast-decode', choices=sorted(_FAST_DECODE), default=None,
+                        help='The end to end session\'s fast_decode setting. '
+                             'Defaults to the configured setting')
+    parser.add_argument('--output', default=None,
+                        help='Write the JSON results to this file instead of stdout')
+    args = parser.parse_args()
+
+    results = benchmark.run(
+        stages=args.stage or benchmark.STAGES,
+        buffers=args.buffers,
+        frames_per_buffer=args.frames_per_buffer,
+        frame_type=args.frame_type,
+        frame_len=args.frame_len,
+        service=args.service,
+        warmup=args.warmup,
+        fast_decode=_FAST_DECODE.get(args.fast_decode)
+    )
+
+    results = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(results + '\n')
+    else:
+        print(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -19,6 +19,7 @@ import socket
 import time
 
 import gevent
+import gevent.queue
 import gevent.socket
 import gevent.monkey; gevent.monkey.patch_all()
 
@@ -34,34 +35,47 @@ from ait.dsn.sle.pdu.raf import *
 
 def process_pdu(raf_mngr):
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    data_queue = raf_mngr._data_queue
+
     while True:
+        # Block until a PDU arrives and then drain the queue in one batch
+        batch = [data_queue.get()]
+        while len(batch) < raf_mngr._max_batch_size:
+            try:
+                batch.append(data_queue.get_nowait())
+            except gevent.queue.Empty:
+                break
+
+        for pdu, received in batch:
+            emit_pdu(raf_mngr, sock, pdu)
+
         gevent.sleep(0)
-        if raf_mngr._data_queue.empty():
-            continue
-
-        log.info('Empty {}'.format(raf_mngr._data_queue.empty()))
-        pdu = raf_mngr._data_queue.get()
-
-        try:
-            decoded_pdu, remainder = raf_mngr.decode(pdu)
-        except pyasn1.error.PyAsn1Error as e:
-            log.error('Unable to decode PDU. Skipping ...')
-            continue
-        except TypeError as e:
-            log.error('Unable to decode PDU due to type error ...')
-            continue
-
-        if ('data' in decoded_pdu['rafTransferBuffer'][0]['annotatedFrame'] and
-            decoded_pdu['rafTransferBuffer'][0]['annotatedFrame']['data'].isValue):
-            # Data is present and initialized. Processing telemetry ...
-            trans_data = decoded_pdu['rafTransferBuffer'][0]['annotatedFrame']['data'].asOctets()
-        else:
-            # Object does not contain data or data is not initalized. Skipping ...
-            continue
-
-        tmf = ait.dsn.sle.frames.TMTransFrame(trans_data)
-        log.info('Emitting {} bytes of telemetry to GUI'.format(len(tmf._data[0])))
-        sock.sendto(tmf._data[0], ('localhost', 3076))
+
+
+def emit_pdu(raf_mngr, sock, pdu):
+    try:
+        decoded_pdu, remainder = raf_mngr.decode(pdu[8:])
+    except pyasn1.error.PyAsn1Error as e:
+        log.error('Unable to decode PDU. Skipping ...')
+        return
+    except TypeError as e:
+        log.error('Unable to decode PDU due to type error ...')
+        return
+
+    if ('data' in decoded_pdu['rafTransferBuffer'][0]['annotatedFrame'] and
+        decoded_pdu['rafTransferBuffer'][0]['annotatedFrame']['data'].isValue):
+        # Data is present and initialized. Processing telemetry ...
+        trans_data = decoded_pdu['rafTransferBuffer'][0]['annotatedFrame']['data'].asOctets()
+    else:
+        # Object does not contain data or data is not initalized. Skipping ...
+        return
+
+    tmf = ait.dsn.sle.frames.TMTransFrame(trans_data)
+    if tmf.is_idle or not tmf._data:
+        return
+
+    log.info('Emitting {} bytes of telemetry to GUI'.format(len(tmf._data[0])))
+    sock.sendto(tmf._data[0], ('localhost', 3076))
 
 
 if __name__ == '__main__':
@@ -78,8 +92,7 @@ if __name__ == '__main__':
     gevent.sleep(0)
     log.info('Processing telemetry. Press <Ctrl-c> to terminate connection ...')
     try:
-        while True:
-            gevent.sleep(0)
+        tlm_monitor.join()
     except:
         pass
     finally:
@@ -0,0 +1,140 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+'''
+Usage:
+    ait-sle-provider-sim [--service=<raf|rcf|cltu>] [--host=<addr>] [--port=<n>]
+                         [--frame-type=<type>] [--frame-len=<n>] [--rate=<n>] [--buffer-size=<n>]
+                         [--duration=<s>] [--inject=<s>:<event>]... [--output=<path>]
+
+Run a local SLE provider that answers RAF, RCF or CLTU sessions and sends
+synthetic TM or AOS frames to started return sessions at a configured
+rate. Provider events are injected at a number of seconds after startup
+with --inject, e.g. ``--inject=10:lossFrameSync``, ``--inject=20:backlog=5000``,
+``--inject=25:skip=3`` or ``--inject=30:abort=otherReason``. The
+simulator's counters are written as JSON when it exits.
+'''
+
+import argparse
+import json
+import sys
+import time
+
+import gevent
+import gevent.monkey
+gevent.monkey.patch_all()
+
+from ait.dsn.sle import simulator
+
+
+def parse_injection(value):
+    ''' Parse an --inject argument into (seconds, event, argument) '''
+    try:
+        delay, event = value.split(':', 1)
+        delay = float(delay)
+    except ValueError:
+        raise argparse.ArgumentTypeError('Expected <seconds>:<event>, got {}'.format(value))
+
+    event, _, arg = event.partition('=')
+    if event in ('backlog', 'skip'):
+        try:
+            arg = int(arg)
+        except ValueError:
+            raise argparse.ArgumentTypeError('{} requires a frame count'.format(event))
+
+    return delay, event, arg or None
+
+
+def inject(sim, event, arg):
+    ''' Inject an event into the simulator's connections '''
+    if event == 'backlog':
+        sim.backlog(arg)
+    elif event == 'skip':
+        sim.skip(arg)
+    elif event == 'abort':
+        sim.abort(arg or 'operationalRequirement')
+    elif event == 'productionStatusChange':
+        sim.notify(event, arg or 'interrupted')
+    else:
+        sim.notify(event)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--service', choices=['raf', 'rcf', 'cltu'], default='raf',
+                        help='The service to provide')
+    parser.add_argument('--host', default='127.0.0.1',
+                        help='The address to listen on')
+    parser.add_argument('--port', type=int, default=5100,
+                        help='The port to listen on')
+    parser.add_argument('--frame-type', choices=['TMTransFrame', 'AOSTransFrame'],
+                        default='TMTransFrame', help='The type of frames to send')
+    parser.add_argument('--frame-len', type=int, default=1115,
+                        help='The length of each frame in octets')
+    parser.add_argument('--rate', type=float, default=100,
+                        help='Frames per second per session, or 0 for as fast as possible')
+    parser.add_argument('--buffer-size', type=int, default=10,
+                        help='Frames per transfer buffer')
+    parser.add_argument('--duration', type=float, default=None,
+                        help='Seconds to run for. Runs until interrupted by default')
+    parser.add_argument('--inject', type=parse_injection, action='append', default=[],
+                        help='An event to inject as <seconds>:<event>[=<value>]')
+    parser.add_argument('--output', default=None,
+                        help='Write the JSON counters to this file instead of stdout')
+    args = parser.parse_args()
+
+    sim = simulator.ProviderSimulator(
+        args.service, host=args.host, port=args.port, frame_type=args.frame_type,
+        frame_len=args.frame_len, frame_rate=args.rate, buffer_size=args.buffer_size
+    )
+    sim.start()
+    started = time.time()
+
+    for delay, event, arg in args.inject:
+        gevent.spawn_later(delay, inject, sim, event, arg)
+
+    try:
+        if args.duration:
+            gevent.sleep(args.duration)
+        else:
+            gevent.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sim.stop()
+
+    results = {
+        'service': args.service,
+        'python': sys.version.split()[0],
+        'duration': time.time() - started,
+        'invocations': sim.invocations,
+        'frames_sent': sim.frames_sent,
+        'buffers_sent': sim.buffers_sent,
+        'notifications_sent': sim.notifications_sent,
+        'aborts_sent': sim.aborts_sent,
+        'cltus_received': sim.cltus_received,
+    }
+    results = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(results + '\n')
+    else:
+        print(results)
+
+
+if __name__ == '__main__':
+    main()
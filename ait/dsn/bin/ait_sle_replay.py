@@ -0,0 +1,76 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+'''
+Usage:
+    ait-sle-replay <capture> [--service=<raf|rcf>] [--speed=<n>] [--discard] [--output=<path>]
+
+Feed a TML capture recorded by a RAF or RCF session with ``capture_path``
+set back through a new session's framing, decoding and frame handling
+path. The messages are replayed at the recorded rate, at a multiple of it
+with --speed, or as fast as possible with --speed=0. Frames are delivered
+to the configured sinks unless --discard is given. Throughput and the
+latency of each stage are written as JSON.
+'''
+
+import argparse
+import json
+import sys
+
+import gevent.monkey
+gevent.monkey.patch_all()
+
+import ait.dsn.sle
+from ait.dsn.sle import capture, sink
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('capture', help='The capture file to replay')
+    parser.add_argument('--service', choices=['raf', 'rcf'], default='raf',
+                        help='The type of session that recorded the capture')
+    parser.add_argument('--speed', type=float, default=0,
+                        help='Multiple of the recorded rate, or 0 for as fast as possible')
+    parser.add_argument('--discard', action='store_true',
+                        help='Discard frames instead of passing them to the configured sinks')
+    parser.add_argument('--output', default=None,
+                        help='Write the JSON results to this file instead of stdout')
+    args = parser.parse_args()
+
+    kwargs = {'hostnames': ['localhost'], 'port': 5100}
+    if args.discard:
+        kwargs['sinks'] = [sink.CallbackSink(lambda frames: None)]
+
+    service = ait.dsn.sle.RAF if args.service == 'raf' else ait.dsn.sle.RCF
+    session = service(**kwargs)
+    try:
+        results = capture.replay(session, args.capture, args.speed)
+    finally:
+        session.disconnect()
+
+    results['service'] = args.service
+    results['python'] = sys.version.split()[0]
+    results = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(results + '\n')
+    else:
+        print(results)
+
+
+if __name__ == '__main__':
+    main()
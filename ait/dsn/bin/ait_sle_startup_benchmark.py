@@ -0,0 +1,206 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+'''
+Usage:
+    ait-sle-startup-benchmark [--runs=<n>] [--output=<path>]
+
+Measure the startup cost of AIT DSN in fresh interpreters: the time to
+import each SLE and CFDP package and the time from the first import until
+a RAF session is bound to a local responder. Results are written as JSON.
+'''
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+IMPORT_TARGETS = [
+    'ait.dsn.sle',
+    'ait.dsn.sle.raf',
+    'ait.dsn.sle.rcf',
+    'ait.dsn.sle.cltu',
+    'ait.dsn.cfdp',
+]
+
+INST_ID = 'sagr=LSE-SSC.spack=Test.rsl-fg=1.raf=onlt1'
+
+_IMPORT_SCRIPT = '''
+import time
+import ait.core
+start = time.time()
+import {}
+print(time.time() - start)
+'''
+
+
+def time_import(module):
+    ''' Return the seconds taken to import module in a new interpreter
+
+    ait.core (and the configuration it loads) is imported first and is not
+    included in the measurement.
+    '''
+    output = subprocess.check_output([sys.executable, '-c', _IMPORT_SCRIPT.format(module)])
+    return float(output.decode().strip().splitlines()[-1])
+
+
+def time_first_bind(port):
+    ''' Return the import and bind times of a RAF session in a new interpreter '''
+    # The responder runs in this process, so wait for the child cooperatively
+    import gevent.subprocess
+    output = gevent.subprocess.check_output([
+        sys.executable, '-m', 'ait.dsn.bin.ait_sle_startup_benchmark',
+        '--bind-port', str(port)
+    ])
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def bind_session(port, timeout=10):
+    ''' Bind a RAF session to the responder on port and print the timings
+
+    This runs in the child interpreter started by :func:`time_first_bind`.
+    '''
+    start = time.time()
+    import ait.dsn.sle
+    import gevent
+    raf = ait.dsn.sle.RAF()
+    imported = time.time()
+
+    # The configured provider is replaced by the local responder
+    raf._hostnames = ['127.0.0.1']
+    raf._port = port
+    raf._inst_id = INST_ID
+    raf.connect()
+    raf.bind()
+
+    deadline = time.time() + timeout
+    while raf._state != 'ready':
+        if time.time() > deadline:
+            raise RuntimeError('RAF session not bound within {} seconds'.format(timeout))
+        gevent.sleep(0.001)
+    bound = time.time()
+
+    raf.disconnect()
+    print(json.dumps({'import': imported - start, 'bound': bound - start}))
+
+
+def serve_binds():
+    ''' Start a responder that answers RAF binds and unbinds
+
+    Returns:
+        The gevent StreamServer. Its ``server_port`` is the port to bind to.
+    '''
+    import gevent.server
+    from pyasn1.codec.ber.encoder import encode
+    from pyasn1.codec.der.decoder import decode
+    from ait.dsn.sle import tml
+    from ait.dsn.sle.pdu.raf import RafProvidertoUserPdu, RafUsertoProviderPdu
+
+    def handle(sock, address):
+        framer = tml.TMLFramer()
+        context = 20
+        while True:
+            data = sock.recv(65536)
+            if not data:
+                return
+
+            if context:
+                skip = min(context, len(data))
+                data, context = data[skip:], context - skip
+
+            framer.feed(data)
+            for msg in framer:
+                invoc = decode(msg[tml.TML_HEADER_LEN:].tobytes(),
+                               asn1Spec=RafUsertoProviderPdu())[0]
+                pdu = RafProvidertoUserPdu()
+                if invoc.getName() == 'rafBindInvocation':
+                    ret = pdu['rafBindReturn']
+                    ret['performerCredentials']['unused'] = None
+                    ret['responderIdentifier'] = 'SSE'
+                    ret['result']['positive'] = 4
+                elif invoc.getName() == 'rafUnbindInvocation':
+                    ret = pdu['rafUnbindReturn']
+                    ret['responderCredentials']['unused'] = None
+                    ret['result']['positive'] = None
+                else:
+                    continue
+                sock.sendall(tml.pack_sle_pdu(encode(pdu)))
+
+    server = gevent.server.StreamServer(('127.0.0.1', 0), handle)
+    server.start()
+    return server
+
+
+def summarize(samples):
+    ''' Return the min, median and max of a list of samples '''
+    samples = sorted(samples)
+    return {
+        'min': samples[0],
+        'median': samples[len(samples) // 2],
+        'max': samples[-1],
+    }
+
+
+def run(runs):
+    ''' Run the startup benchmark and return the results '''
+    results = {
+        'python': sys.version.split()[0],
+        'runs': runs,
+        'import': {},
+    }
+
+    for module in IMPORT_TARGETS:
+        results['import'][module] = summarize([time_import(module) for i in range(runs)])
+
+    server = serve_binds()
+    try:
+        timings = [time_first_bind(server.server_port) for i in range(runs)]
+    finally:
+        server.stop()
+
+    results['first_bound_session'] = {
+        'import': summarize([t['import'] for t in timings]),
+        'bound': summarize([t['bound'] for t in timings]),
+    }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--runs', type=int, default=5,
+                        help='Number of fresh interpreters per measurement')
+    parser.add_argument('--output', default=None,
+                        help='Write the JSON results to this file instead of stdout')
+    parser.add_argument('--bind-port', type=int, default=None,
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.bind_port is not None:
+        bind_session(args.bind_port)
+        return
+
+    results = json.dumps(run(args.runs), indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(results + '\n')
+    else:
+        print(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -21,6 +21,8 @@
 import datetime as dt
 import time
 
+import gevent.monkey; gevent.monkey.patch_all()
+
 import ait.dsn.sle
 
 # CLTU pulls parameters from config file by default
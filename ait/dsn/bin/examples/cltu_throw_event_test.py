@@ -40,6 +40,8 @@
 
 import time
 
+import gevent.monkey; gevent.monkey.patch_all()
+
 import ait.dsn.sle
 
 cltu_mngr = ait.dsn.sle.CLTU(
@@ -54,6 +54,8 @@
 import datetime as dt
 import time
 
+import gevent.monkey; gevent.monkey.patch_all()
+
 import ait.dsn.sle
 
 # runtime parameters will override config file defaults
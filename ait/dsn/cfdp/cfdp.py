@@ -34,15 +34,36 @@ import ait.core
 import ait.core.log
 
 
+class _SharedClassAttribute(object):
+    """Class attribute that is created on first access and then shared by all instances.
+
+    Used for class-level state that is too expensive to build when the module is imported.
+    """
+
+    def __init__(self, name, factory):
+        self._name = name
+        self._factory = factory
+
+    def __get__(self, obj, cls):
+        # Replace the descriptor on the class that defined it
+        for owner in cls.__mro__:
+            if owner.__dict__.get(self._name) is self:
+                break
+
+        value = self._factory()
+        setattr(owner, self._name, value)
+        return value
+
+
 class CFDP(object):
     """CFDP processor class. Handles sending and receiving of PDUs and management of transactions.
     """
 
-    mib = MIB(ait.config.get('dsn.cfdp.mib.path', '/tmp/cfdp/mib'))
+    mib = _SharedClassAttribute('mib', lambda: MIB(ait.config.get('dsn.cfdp.mib.path', '/tmp/cfdp/mib')))
     transaction_counter = 0
     pdu_counter = 1
-    outgoing_pdu_queue = gevent.queue.Queue()
-    incoming_pdu_queue = gevent.queue.Queue()
+    outgoing_pdu_queue = _SharedClassAttribute('outgoing_pdu_queue', gevent.queue.Queue)
+    incoming_pdu_queue = _SharedClassAttribute('incoming_pdu_queue', gevent.queue.Queue)
 
     def __init__(self, entity_id, *args, **kwargs):
         """
@@ -12,6 +12,52 @@
 # or other export authority as may be required before exporting such
 # information to foreign countries or providing access to foreign persons.
 
-from raf import RAF
-from rcf import RCF
-from cltu import CLTU
+''' AIT Space Link Extension (SLE) User Services
+
+The RAF, RCF, CLTU and SessionManager classes are available directly from
+this package. Each is imported from its module the first time it is
+accessed. As a result, importing ait.dsn.sle does not load gevent or the
+PyASN1 PDU specifications of services that are never used.
+
+gevent's monkey patching is not applied by this package. Applications that
+mix SLE sessions with blocking calls from the standard library (e.g.,
+``time.sleep`` or threads) should call ``gevent.monkey.patch_all()``
+before importing anything else or set ``dsn.sle.monkey_patch`` to True in
+the configuration.
+'''
+
+import importlib
+import sys
+import types
+
+_LAZY_ATTRIBUTES = {
+    'RAF': 'ait.dsn.sle.raf',
+    'RCF': 'ait.dsn.sle.rcf',
+    'CLTU': 'ait.dsn.sle.cltu',
+    'SessionManager': 'ait.dsn.sle.manager',
+}
+
+__all__ = sorted(_LAZY_ATTRIBUTES)
+
+
+class _LazyModule(types.ModuleType):
+    ''' Package module that imports its session classes on first access '''
+
+    def __getattr__(self, name):
+        if name not in _LAZY_ATTRIBUTES:
+            raise AttributeError("'module' object has no attribute '{}'".format(name))
+
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+        setattr(self, name, value)
+        return value
+
+    def __dir__(self):
+        return sorted(set(self.__dict__) | set(_LAZY_ATTRIBUTES))
+
+
+_package = _LazyModule(__name__)
+_package.__dict__.update(sys.modules[__name__].__dict__)
+# Keep the original module alive. Python 2 clears the globals of a
+# module when it is collected and the functions above still use them.
+_package._original = sys.modules[__name__]
+sys.modules[__name__] = _package
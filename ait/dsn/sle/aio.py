@@ -0,0 +1,673 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+''' asyncio SLE Client
+
+The ait.dsn.sle.aio module provides an asyncio implementation of the SLE
+transport and session lifecycle for Python 3.7+ applications. It does not
+use gevent. Received TML messages are framed in place by
+:class:`ait.dsn.sle.tml.TMLFramer` through an ``asyncio.BufferedProtocol``
+and PDUs are built and decoded with the PyASN1 classes in
+:mod:`ait.dsn.sle.pdu`.
+
+Every operation returns an ``asyncio.Future`` that can be awaited. The
+returns of bind, unbind, start and stop invocations resolve these futures
+and every other PDU received from the provider is available by iterating
+over the session with ``async for``. The module does not use ``async`` /
+``await`` syntax itself so that the package still byte compiles on Python
+2, where this module cannot be imported.
+
+Classes:
+    OperationError: The exception set on an operation's future when the
+        provider rejects the invocation.
+
+    SLEProtocol: The asyncio protocol connecting a session to its
+        transport.
+
+    AsyncSLE: An asyncio SLE session "base" class providing the
+        interface-agnostic transport and lifecycle.
+
+    AsyncRAF: An asyncio Return All Frames session.
+
+    AsyncRCF: An asyncio Return Channel Frames session.
+'''
+
+import asyncio
+from collections import deque
+import datetime as dt
+import functools
+import random
+import struct
+import time
+
+from pyasn1.codec.ber.encoder import encode
+from pyasn1.codec.der.decoder import decode
+from pyasn1.type import univ
+import pyasn1.error
+
+import ait.core
+import ait.core.log
+
+from ait.dsn.sle import ber, credentials, timecode, tml
+from ait.dsn.sle.pdu import service_instance
+from ait.dsn.sle.pdu.service_instance import (ServiceInstanceAttribute,
+                                              ServiceInstanceAttributeElement,
+                                              ServiceInstanceIdentifier)
+from ait.dsn.sle.pdu.raf import RafProvidertoUserPdu, RafUsertoProviderPdu
+from ait.dsn.sle.pdu.rcf import GvcId, RcfProvidertoUserPdu, RcfUsertoProviderPdu
+
+
+class OperationError(Exception):
+    ''' An SLE invocation was rejected by the provider
+
+    Attributes:
+        operation:
+            The name of the return PDU (e.g., ``'rafStartReturn'``).
+
+        diagnostic:
+            The diagnostic reported by the provider.
+    '''
+    def __init__(self, operation, diagnostic):
+        super(OperationError, self).__init__(
+            '{} failed: {}'.format(operation, diagnostic)
+        )
+        self.operation = operation
+        self.diagnostic = diagnostic
+
+
+class SLEProtocol(asyncio.BufferedProtocol):
+    ''' Receive a TML stream into a session's framer
+
+    Data is received directly into the framer's buffer and every complete
+    SLE PDU message is passed to the session. TML heartbeats are consumed
+    by the framer.
+    '''
+
+    def __init__(self, session):
+        self._session = session
+        self._framer = tml.TMLFramer(session._buffer_size)
+
+    def connection_made(self, transport):
+        self._session._connection_made(transport)
+
+    def get_buffer(self, sizehint):
+        return self._framer.get_buffer()
+
+    def buffer_updated(self, nbytes):
+        self._session._last_recv = time.time()
+        self._framer.buffer_updated(nbytes)
+        for msg in self._framer:
+            self._session._message_received(msg)
+
+    def pause_writing(self):
+        self._session._writable.clear()
+
+    def resume_writing(self):
+        self._session._writable.set()
+
+    def connection_lost(self, exc):
+        self._session._connection_lost(exc)
+
+
+class AsyncSLE(object):
+    ''' An asyncio SLE session "base" class
+
+    AsyncSLE reads the same ``dsn.sle`` configuration as
+    :class:`ait.dsn.sle.common.SLE`. Subclasses provide the service
+    specific PDU classes and the start invocation.
+
+    While connected, a TML heartbeat is sent whenever nothing has been sent
+    for ``heartbeat`` seconds and the connection is aborted if nothing is
+    received for ``heartbeat`` x ``deadfactor`` seconds.
+
+    Received PDUs other than operation returns are queued for iteration.
+    Reading from the provider is paused while more than
+    ``max_queued_pdus`` are waiting. Iteration ends once the connection is
+    closed and the queue is empty, and raises the connection error if the
+    connection failed.
+
+    The session runs on the event loop it is first used from unless a
+    ``loop`` is given. ``fast_decode`` may be ``True`` or ``False``;
+    ``'verify'`` is only supported by the gevent sessions.
+    '''
+    _prefix = None
+    _user_pdu = None
+    _provider_pdu = None
+    _has_quality = True
+
+    def __init__(self, loop=None, **kwargs):
+        self._loop = loop
+        self._state = 'unbound'
+        self._invoke_id = 0
+        self._transport = None
+        self._writable = None
+        self._last_recv = self._last_send = time.time()
+        self._keepalive = None
+
+        self._pending = {}
+        self._received = deque()
+        self._waiter = None
+        self._closed = None
+
+        self._heartbeat = ait.config.get('dsn.sle.heartbeat',
+                                         kwargs.get('heartbeat', 25))
+        self._deadfactor = ait.config.get('dsn.sle.deadfactor',
+                                          kwargs.get('deadfactor', 5))
+        self._buffer_size = ait.config.get('dsn.sle.buffer_size',
+                                           kwargs.get('buffer_size', 256000))
+        self._initiator_id = ait.config.get('dsn.sle.initiator_id',
+                                            kwargs.get('initiator_id', 'LSE'))
+        self._responder_id = ait.config.get('dsn.sle.responder_id',
+                                            kwargs.get('responder_id', 'SSE'))
+        self._password = ait.config.get('dsn.sle.password', None)
+        self._peer_password = ait.config.get('dsn.sle.peer_password',
+                                             kwargs.get('peer_password', None))
+        self._responder_port = ait.config.get('dsn.sle.responder_port',
+                                              kwargs.get('responder_port', 'default'))
+        self._auth_level = ait.config.get('dsn.sle.auth_level',
+                                          kwargs.get('auth_level', 'none'))
+        self._fast_decode = ait.config.get('dsn.sle.fast_decode',
+                                           kwargs.get('fast_decode', False))
+        self._max_queued_pdus = ait.config.get('dsn.sle.max_queued_pdus',
+                                               kwargs.get('max_queued_pdus', 1024))
+
+        if not self._hostnames or not self._port:
+            msg = 'Connection configuration missing hostnames ({}) or port ({})'
+            msg = msg.format(self._hostnames, self._port)
+            ait.core.log.error(msg)
+            raise ValueError(msg)
+
+        if self._auth_level not in ['none', 'bind', 'all']:
+            raise ValueError('Authentication level must be one of: "none", "bind", "all"')
+
+        if self._fast_decode not in [False, True]:
+            raise ValueError('Fast decode must be one of: False, True')
+
+        self._local_credentials = credentials.ISP1Encoder(self._initiator_id,
+                                                          self._password)
+        self._peer_credentials = credentials.ISP1Encoder(self._responder_id,
+                                                         self._peer_password)
+
+    @property
+    def invoke_id(self):
+        ''''''
+        iid = self._invoke_id
+        self._invoke_id = (self._invoke_id + 1) % 65536
+        return iid
+
+    def _get_loop(self):
+        ''' Return the session's event loop, binding it to the running loop
+        on first use
+        '''
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        return self._loop
+
+    def __aiter__(self):
+        return self
+
+    def __anext__(self):
+        ''' Return a future for the next PDU received from the provider '''
+        result = self._get_loop().create_future()
+
+        if self._received:
+            result.set_result(self._received.popleft())
+            if len(self._received) < self._max_queued_pdus // 2 and self._transport:
+                self._transport.resume_reading()
+        elif self._closed is not None:
+            if self._closed is True:
+                result.set_exception(StopAsyncIteration())
+            else:
+                result.set_exception(self._closed)
+        else:
+            self._waiter = result
+
+        return result
+
+    def connect(self):
+        ''' Connect to the provider and send the TML context message
+
+        Each of the configured hostnames is tried in order.
+
+        Returns:
+            A future resolved once the context message has been sent.
+        '''
+        loop = self._get_loop()
+        result = loop.create_future()
+        hostnames = list(self._hostnames)
+
+        def attempt():
+            hostname = hostnames.pop(0)
+            conn = asyncio.ensure_future(
+                loop.create_connection(lambda: SLEProtocol(self), hostname, self._port),
+                loop=loop
+            )
+            conn.add_done_callback(functools.partial(connected, hostname))
+
+        def connected(hostname, conn):
+            if conn.exception() is None:
+                ait.core.log.info('Connection to DSN successful through {}.'.format(hostname))
+                self._send_context_message()
+                result.set_result(None)
+            elif hostnames:
+                ait.core.log.info('Failed to connect to DSN at {}. Trying next hostname.'.format(hostname))
+                attempt()
+            else:
+                ait.core.log.error('Connection failure with DSN. Aborting ...')
+                result.set_exception(ConnectionError(
+                    'Unable to connect to DSN through any provided hostnames.'
+                ))
+
+        attempt()
+        return result
+
+    def close(self):
+        ''' Close the connection to the provider '''
+        if self._transport is not None:
+            self._transport.close()
+
+    def send(self, data):
+        ''' Send supplied data to DSN '''
+        if self._transport is None or self._transport.is_closing():
+            raise ConnectionError('Not connected to DSN')
+
+        self._transport.write(data)
+        self._last_send = time.time()
+
+    def drain(self):
+        ''' Return a future resolved once the transport accepts writes '''
+        loop = self._get_loop()
+        if self._writable is None:
+            result = loop.create_future()
+            result.set_result(True)
+            return result
+
+        return asyncio.ensure_future(self._writable.wait(), loop=loop)
+
+    def encode_pdu(self, pdu):
+        ''' Encode a SLE PDU in a TML PDU message '''
+        return tml.pack_sle_pdu(encode(pdu))
+
+    def decode(self, message):
+        ''' Decode an ASN.1 encoded provider to user PDU
+
+        Transfer buffers are decoded with :func:`ait.dsn.sle.ber.decode_transfer_buffer`
+        if the ``fast_decode`` option is set. They are not cross-checked
+        against PyASN1, so ``'verify'`` is rejected when the session is
+        created.
+        '''
+        if self._fast_decode:
+            result = ber.decode_transfer_buffer(
+                message, self._prefix + 'TransferBuffer', self._has_quality
+            )
+            if result is not None:
+                return result
+
+        return decode(message, asn1Spec=self._provider_pdu())
+
+    def make_credentials(self):
+        '''Makes credentials for the initiator'''
+        return self._local_credentials.encode(dt.datetime.utcnow(), random.getrandbits(31))
+
+    def bind(self, inst_id=None):
+        ''' Bind to the service instance
+
+        Arguments:
+            inst_id:
+                The instance id to bind. Defaults to the configured
+                instance id.
+
+        Returns:
+            A future resolved with the bind return PDU.
+        '''
+        inst_id = inst_id or self._inst_id
+        if not inst_id:
+            raise AttributeError('No instance id provided. Unable to bind.')
+
+        pdu = self._user_pdu()
+        invoc = pdu[self._prefix + 'BindInvocation']
+        self._set_credentials(invoc, ['bind', 'all'])
+        invoc['initiatorIdentifier'] = self._initiator_id
+        invoc['responderPortIdentifier'] = self._responder_port
+        invoc['serviceType'] = self._service_type
+        invoc['versionNumber'] = self._version
+
+        sii = ServiceInstanceIdentifier()
+        for i, iden in enumerate(st.split('=') for st in inst_id.split('.')):
+            siae = ServiceInstanceAttributeElement()
+            siae['identifier'] = getattr(service_instance, iden[0].replace('-', '_'))
+            siae['siAttributeValue'] = iden[1]
+            sia = ServiceInstanceAttribute()
+            sia[0] = siae
+            sii[i] = sia
+        invoc['serviceInstanceIdentifier'] = sii
+
+        ait.core.log.info('Sending Bind request ...')
+        return self._invoke(pdu, 'BindReturn')
+
+    def unbind(self, reason=0):
+        ''' Unbind from the service instance
+
+        Arguments:
+            reason:
+                The unbind reason as defined in
+                :class:`ait.dsn.sle.pdu.binds.UnbindReason`.
+
+        Returns:
+            A future resolved with the unbind return PDU.
+        '''
+        pdu = self._user_pdu()
+        invoc = pdu[self._prefix + 'UnbindInvocation']
+        self._set_credentials(invoc, ['all'])
+        invoc['unbindReason'] = reason
+
+        ait.core.log.info('Sending Unbind request ...')
+        return self._invoke(pdu, 'UnbindReturn')
+
+    def stop(self):
+        ''' Request that the provider stop sending data
+
+        Returns:
+            A future resolved with the stop return PDU.
+        '''
+        pdu = self._user_pdu()
+        invoc = pdu[self._prefix + 'StopInvocation']
+        self._set_credentials(invoc, ['all'])
+        invoc['invokeId'] = self.invoke_id
+
+        ait.core.log.info('Sending data stop invocation ...')
+        return self._invoke(pdu, 'StopReturn')
+
+    def peer_abort(self, reason=127):
+        ''' Send a peer abort and close the connection
+
+        Arguments:
+            reason:
+                The reason as defined in
+                :class:`ait.dsn.sle.pdu.common.PeerAbortDiagnostic`.
+        '''
+        pdu = self._user_pdu()
+        pdu[self._prefix + 'PeerAbortInvocation'] = reason
+
+        ait.core.log.info('Sending Peer Abort')
+        self.send(self.encode_pdu(pdu))
+        self._state = 'unbound'
+        self.close()
+
+    def _set_credentials(self, invoc, levels):
+        ''' Set the invoker credentials of an invocation '''
+        if self._auth_level in levels:
+            invoc['invokerCredentials']['used'] = self.make_credentials()
+        else:
+            invoc['invokerCredentials']['unused'] = None
+
+    def _start(self, pdu):
+        ''' Send a start invocation built by a subclass '''
+        ait.core.log.info('Sending data start invocation ...')
+        return self._invoke(pdu, 'StartReturn')
+
+    def _invoke(self, pdu, return_name):
+        ''' Send an invocation and return a future for its return '''
+        return_name = self._prefix + return_name
+        if return_name in self._pending:
+            raise RuntimeError('{} is already awaiting a return'.format(return_name))
+
+        result = self._get_loop().create_future()
+        self.send(self.encode_pdu(pdu))
+        self._pending[return_name] = result
+        return result
+
+    def _send_context_message(self):
+        ''' Send the TML context message configuring the connection '''
+        context_msg = struct.pack(
+            tml.TML_CONTEXT_MSG_FORMAT,
+            tml.TML_CONTEXT_MSG_TYPE,
+            0x0000000C,
+            ord('I'), ord('S'), ord('P'), ord('1'),
+            0x00000001,
+            self._heartbeat,
+            self._deadfactor
+        )
+        ait.core.log.info('Configuring SLE connection...')
+        self.send(context_msg)
+
+    def _connection_made(self, transport):
+        self._transport = transport
+        self._writable = asyncio.Event()
+        self._writable.set()
+        self._closed = None
+        self._last_recv = self._last_send = time.time()
+        if self._heartbeat > 0:
+            self._keepalive = self._loop.call_soon(self._check_keepalive)
+
+    def _connection_lost(self, exc):
+        ''' Fail outstanding operations and end iteration '''
+        if exc is not None:
+            ait.core.log.error('SLE connection lost: {}'.format(exc))
+
+        self._transport = None
+        self._state = 'unbound'
+        self._closed = exc or True
+        if self._keepalive is not None:
+            self._keepalive.cancel()
+            self._keepalive = None
+
+        error = exc or ConnectionError('Connection to DSN closed')
+        pending, self._pending = self._pending, {}
+        for result in pending.values():
+            if not result.done():
+                result.set_exception(error)
+
+        if self._waiter is not None and not self._waiter.done():
+            if exc is None:
+                self._waiter.set_exception(StopAsyncIteration())
+            else:
+                self._waiter.set_exception(exc)
+        self._waiter = None
+
+    def _check_keepalive(self):
+        ''' Send a heartbeat if one is due and abort a dead connection '''
+        self._keepalive = None
+        if self._transport is None:
+            return
+
+        now = time.time()
+        dead_time = self._heartbeat * self._deadfactor
+        if now - self._last_recv >= dead_time:
+            ait.core.log.error('Nothing received for {} seconds'.format(dead_time))
+            self._transport.abort()
+            return
+
+        if now - self._last_send >= self._heartbeat:
+            self.send(struct.pack(tml.TML_CONTEXT_HB_FORMAT,
+                                  tml.TML_CONTEXT_HEARTBEAT_TYPE, 0))
+
+        wake = min(self._last_send + self._heartbeat, self._last_recv + dead_time)
+        self._keepalive = self._loop.call_later(max(wake - time.time(), 0),
+                                                self._check_keepalive)
+
+    def _message_received(self, msg):
+        ''' Decode a TML PDU message and dispatch it '''
+        try:
+            pdu = self.decode(msg[tml.TML_HEADER_LEN:].tobytes())[0]
+        except (pyasn1.error.PyAsn1Error, TypeError):
+            ait.core.log.error('Unable to decode PDU. Skipping ...')
+            return
+
+        name = pdu.getName()
+        result = self._pending.pop(name, None)
+        if result is not None:
+            self._complete(name, pdu.getComponent(), result)
+        else:
+            self._queue(pdu)
+
+    def _complete(self, name, ret, result):
+        ''' Resolve an operation's future from its return PDU '''
+        if result.done():
+            return
+
+        outcome = ret['result']
+        if outcome.getName() in ('positive', 'positiveResult'):
+            if name.endswith('BindReturn') and not name.endswith('UnbindReturn'):
+                if ret['responderIdentifier'] != self._responder_id:
+                    result.set_exception(OperationError(name, 'Unexpected responder id'))
+                    self.peer_abort(1)
+                    return
+
+                if (self._auth_level in ['bind', 'all'] and
+                        not self._peer_credentials.verify(ret['performerCredentials']['used'].asOctets())):
+                    result.set_exception(OperationError(name, 'Authentication failed'))
+                    return
+
+            self._state = {
+                'BindReturn': 'ready', 'UnbindReturn': 'unbound',
+                'StartReturn': 'active', 'StopReturn': 'ready'
+            }[name[len(self._prefix):]]
+            result.set_result(ret)
+        else:
+            diag = outcome.getComponent()
+            while isinstance(diag, univ.Choice):
+                diag = diag.getComponent()
+            result.set_exception(OperationError(name, diag.prettyPrint()))
+
+    def _queue(self, pdu):
+        ''' Hand a received PDU to the iterator '''
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(pdu)
+            self._waiter = None
+            return
+
+        self._received.append(pdu)
+        if len(self._received) >= self._max_queued_pdus and self._transport:
+            self._transport.pause_reading()
+
+
+class AsyncRAF(AsyncSLE):
+    ''' An asyncio Return All Frames session
+
+    Iterating over the session yields ``RafTransferBuffer`` PDUs (or
+    :class:`ait.dsn.sle.ber.TransferBuffer` objects with ``fast_decode``),
+    status reports and any other PDUs that are not operation returns.
+    '''
+    _prefix = 'raf'
+    _user_pdu = RafUsertoProviderPdu
+    _provider_pdu = RafProvidertoUserPdu
+    _has_quality = True
+
+    def __init__(self, loop=None, **kwargs):
+        self._inst_id = ait.config.get('dsn.sle.raf.inst_id',
+                                       kwargs.get('inst_id', None))
+        self._hostnames = ait.config.get('dsn.sle.raf.hostnames',
+                                         kwargs.get('hostnames', None))
+        self._port = ait.config.get('dsn.sle.raf.port',
+                                    kwargs.get('port', None))
+
+        super(AsyncRAF, self).__init__(loop, **kwargs)
+
+        self._service_type = 'rtnAllFrames'
+        self._version = kwargs.get('version', 4)
+
+    def start(self, start_time, end_time, frame_quality=2):
+        ''' Request that the provider start sending frames
+
+        See :meth:`ait.dsn.sle.raf.RAF.start` for a description of the
+        arguments.
+
+        Returns:
+            A future resolved with the start return PDU.
+        '''
+        pdu = RafUsertoProviderPdu()
+        invoc = pdu['rafStartInvocation']
+        self._set_credentials(invoc, ['all'])
+        invoc['invokeId'] = self.invoke_id
+        _set_time(invoc['startTime'], start_time)
+        _set_time(invoc['stopTime'], end_time)
+        invoc['requestedFrameQuality'] = frame_quality
+        return self._start(pdu)
+
+
+class AsyncRCF(AsyncSLE):
+    ''' An asyncio Return Channel Frames session
+
+    Iterating over the session yields ``RcfTransferBuffer`` PDUs (or
+    :class:`ait.dsn.sle.ber.TransferBuffer` objects with ``fast_decode``),
+    status reports and any other PDUs that are not operation returns.
+    '''
+    _prefix = 'rcf'
+    _user_pdu = RcfUsertoProviderPdu
+    _provider_pdu = RcfProvidertoUserPdu
+    _has_quality = False
+
+    def __init__(self, loop=None, **kwargs):
+        self._inst_id = ait.config.get('dsn.sle.rcf.inst_id',
+                                       kwargs.get('inst_id', None))
+        self._hostnames = ait.config.get('dsn.sle.rcf.hostnames',
+                                         kwargs.get('hostnames', None))
+        self._port = ait.config.get('dsn.sle.rcf.port',
+                                    kwargs.get('port', None))
+
+        super(AsyncRCF, self).__init__(loop, **kwargs)
+
+        self._service_type = 'rtnChFrames'
+        self._version = kwargs.get('version', 5)
+        self._scid = kwargs.get('spacecraft_id', None)
+        self._tfvn = kwargs.get('trans_frame_ver_num', None)
+
+    def start(self, start_time, end_time, spacecraft_id=None,
+              trans_frame_ver_num=None, master_channel=False,
+              virtual_channel=None):
+        ''' Request that the provider start sending frames
+
+        See :meth:`ait.dsn.sle.rcf.RCF.start` for a description of the
+        arguments.
+
+        Returns:
+            A future resolved with the start return PDU.
+        '''
+        if not master_channel and virtual_channel is None:
+            raise AttributeError('Transfer start invocation requires a master '
+                                 'channel or virtual channel from which to '
+                                 'receive frames.')
+
+        spacecraft_id = spacecraft_id if spacecraft_id is not None else self._scid
+        trans_frame_ver_num = trans_frame_ver_num if trans_frame_ver_num is not None else self._tfvn
+        if spacecraft_id is None or trans_frame_ver_num is None:
+            raise AttributeError('Transfer start invocation requires a spacecraft '
+                                 'id and transfer frame version number.')
+
+        pdu = RcfUsertoProviderPdu()
+        invoc = pdu['rcfStartInvocation']
+        self._set_credentials(invoc, ['all'])
+        invoc['invokeId'] = self.invoke_id
+        _set_time(invoc['startTime'], start_time)
+        _set_time(invoc['stopTime'], end_time)
+
+        gvcid = GvcId()
+        gvcid['spacecraftId'] = spacecraft_id
+        gvcid['versionNumber'] = trans_frame_ver_num
+        if master_channel:
+            gvcid['vcId']['masterChannel'] = None
+        else:
+            gvcid['vcId']['virtualChannel'] = virtual_channel
+        invoc['requestedGvcId'] = gvcid
+
+        return self._start(pdu)
+
+
+def _set_time(field, time):
+    ''' Set a ConditionalTime field of a start invocation '''
+    if time is None:
+        field['undefined'] = None
+    else:
+        field['known']['ccsdsFormat'] = timecode.encode(time)
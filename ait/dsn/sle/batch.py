@@ -0,0 +1,274 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+''' Columnar Frame Header Decoding
+
+The ait.dsn.sle.batch module decodes the headers of many transfer frames
+at once into NumPy structured arrays. Each header field is computed for
+every frame with a vectorized bit operation, so per-frame header
+statistics can be gathered without creating a frame object per frame.
+
+This module requires NumPy, which is installed with the ``numpy`` extra
+(``pip install ait-dsn[numpy]``).
+
+Attributes:
+    TM_HEADER_DTYPE: The structured dtype of the arrays returned by
+        :func:`tm_headers`. Its fields are named like the attributes of
+        :class:`ait.dsn.sle.frames.TMTransFrame`.
+
+    AOS_MPDU_HEADER_DTYPE: The structured dtype of the arrays returned by
+        :func:`aos_headers` for frames carrying M_PDUs. Its fields are
+        named like the attributes of
+        :class:`ait.dsn.sle.frames.AOSTransFrame`.
+
+    AOS_BPDU_HEADER_DTYPE: The structured dtype of the arrays returned by
+        :func:`aos_headers` for frames carrying B_PDUs.
+
+    CDS_TIME_DTYPE: The structured dtype of an 8 octet CCSDS day
+        segmented time.
+
+    CDS_PICO_TIME_DTYPE: The structured dtype of a 10 octet CCSDS day
+        segmented time.
+
+Functions:
+    header_rows: Collect the leading octets of each frame into a 2-D
+        array.
+
+    tm_headers: Decode the primary headers of TM transfer frames.
+
+    aos_headers: Decode the primary headers and data unit headers of AOS
+        transfer frames.
+
+    earth_receive_times: Decode the earth receive times of a transfer
+        buffer.
+'''
+
+import numpy
+
+from ait.dsn.sle import timecode
+from ait.dsn.sle.frames import (TM_PRIMARY_HEADER_LEN, AOS_PRIMARY_HEADER_LEN,
+                                AOS_FHEC_LEN, AOS_DATA_UNIT_HEADER_LEN,
+                                AOS_MPDU, AOS_BPDU)
+
+TM_HEADER_DTYPE = numpy.dtype([
+    ('version', numpy.uint8),
+    ('spacecraft_id', numpy.uint16),
+    ('virtual_channel_id', numpy.uint8),
+    ('ocf_flag', numpy.bool_),
+    ('master_chan_frame_count', numpy.uint8),
+    ('virtual_chan_frame_count', numpy.uint8),
+    ('sec_header_flag', numpy.bool_),
+    ('sync_flag', numpy.bool_),
+    ('pkt_order_flag', numpy.bool_),
+    ('seg_len_id', numpy.uint8),
+    ('first_hdr_ptr', numpy.uint16),
+])
+
+_AOS_PRIMARY_FIELDS = [
+    ('version', numpy.uint8),
+    ('spacecraft_id', numpy.uint8),
+    ('virtual_channel_id', numpy.uint8),
+    ('virtual_chan_frame_count', numpy.uint32),
+    ('replay_flag', numpy.bool_),
+    ('vc_frame_count_usage_flag', numpy.bool_),
+    ('vc_frame_count_cycle', numpy.uint8),
+]
+
+AOS_MPDU_HEADER_DTYPE = numpy.dtype(_AOS_PRIMARY_FIELDS + [('first_hdr_ptr', numpy.uint16)])
+AOS_BPDU_HEADER_DTYPE = numpy.dtype(_AOS_PRIMARY_FIELDS + [('bitstream_data_ptr', numpy.uint16)])
+
+CDS_TIME_DTYPE = numpy.dtype([
+    ('days', '>u2'),
+    ('millisecs', '>u4'),
+    ('microsecs', '>u2'),
+])
+
+CDS_PICO_TIME_DTYPE = numpy.dtype([
+    ('days', '>u2'),
+    ('millisecs', '>u4'),
+    ('picosecs', '>u4'),
+])
+
+
+def header_rows(frames, header_len, frame_len=None):
+    ''' Collect the first header_len octets of each frame
+
+    Arguments:
+        frames:
+            Either a bytes-like buffer of back to back frames of
+            ``frame_len`` octets, or a sequence of frames. Items of the
+            sequence are bytes-like objects or have the frame in a
+            ``data`` attribute, like the
+            :class:`ait.dsn.sle.ber.FrameRecord` objects of a fast decoded
+            transfer buffer.
+
+        header_len:
+            The number of leading octets to collect.
+
+        frame_len:
+            The length of each frame in a contiguous buffer. Must be None
+            if frames is a sequence.
+
+    Returns:
+        A (frames, header_len) array of uint8. For a contiguous buffer the
+        array is a view of the buffer and no data is copied.
+
+    Raises:
+        ValueError:
+            If the buffer is not a whole number of frames or a frame is
+            shorter than header_len.
+    '''
+    if frame_len is not None:
+        raw = _octets(frames)
+        if frame_len < header_len or len(raw) % frame_len:
+            raise ValueError('Buffer of {} octets does not hold {} octet frames'.format(
+                len(raw), frame_len))
+        return raw.reshape(-1, frame_len)[:, :header_len]
+
+    rows = numpy.empty((len(frames), header_len), dtype=numpy.uint8)
+    for i, frame in enumerate(frames):
+        frame = getattr(frame, 'data', frame)
+        if len(frame) < header_len:
+            raise ValueError('Frame {} is shorter than its {} octet header'.format(i, header_len))
+        rows[i] = _octets(frame)[:header_len]
+
+    return rows
+
+
+def tm_headers(frames, frame_len=None):
+    ''' Decode the primary headers of TM transfer frames
+
+    Arguments:
+        frames:
+            A contiguous buffer of frames with frame_len set, or a
+            sequence of frames. See :func:`header_rows`.
+
+        frame_len:
+            The length of each frame in a contiguous buffer.
+
+    Returns:
+        A structured array of :data:`TM_HEADER_DTYPE` with one element
+        per frame.
+    '''
+    raw = header_rows(frames, TM_PRIMARY_HEADER_LEN, frame_len).astype(numpy.uint16)
+    frame_id = (raw[:, 0] << 8) | raw[:, 1]
+    status = (raw[:, 4] << 8) | raw[:, 5]
+
+    headers = numpy.empty(len(raw), dtype=TM_HEADER_DTYPE)
+    headers['version'] = frame_id >> 14
+    headers['spacecraft_id'] = (frame_id >> 4) & 0x03FF
+    headers['virtual_channel_id'] = (frame_id >> 1) & 0x07
+    headers['ocf_flag'] = frame_id & 0x01
+    headers['master_chan_frame_count'] = raw[:, 2]
+    headers['virtual_chan_frame_count'] = raw[:, 3]
+    headers['sec_header_flag'] = status >> 15
+    headers['sync_flag'] = (status >> 14) & 0x01
+    headers['pkt_order_flag'] = (status >> 13) & 0x01
+    headers['seg_len_id'] = (status >> 11) & 0x03
+    headers['first_hdr_ptr'] = status & 0x07FF
+    return headers
+
+
+def aos_headers(frames, frame_len=None, has_fhec=False, insert_zone_len=0,
+                data_unit=AOS_MPDU):
+    ''' Decode the primary headers and data unit headers of AOS transfer frames
+
+    Arguments:
+        frames:
+            A contiguous buffer of frames with frame_len set, or a
+            sequence of frames. See :func:`header_rows`.
+
+        frame_len:
+            The length of each frame in a contiguous buffer.
+
+        has_fhec:
+            Whether the primary header is followed by a frame header error
+            control field.
+
+        insert_zone_len:
+            The length in octets of the insert zone.
+
+        data_unit:
+            The type of data unit in the data field, either
+            :data:`ait.dsn.sle.frames.AOS_MPDU` or
+            :data:`ait.dsn.sle.frames.AOS_BPDU`.
+
+    Returns:
+        A structured array of :data:`AOS_MPDU_HEADER_DTYPE` or
+        :data:`AOS_BPDU_HEADER_DTYPE` with one element per frame.
+    '''
+    if data_unit not in (AOS_MPDU, AOS_BPDU):
+        raise ValueError('Unknown AOS data unit {}'.format(data_unit))
+
+    pointer_at = AOS_PRIMARY_HEADER_LEN + (AOS_FHEC_LEN if has_fhec else 0) + insert_zone_len
+    raw = header_rows(frames, pointer_at + AOS_DATA_UNIT_HEADER_LEN, frame_len).astype(numpy.uint32)
+    frame_id = (raw[:, 0] << 8) | raw[:, 1]
+    pointer = (raw[:, pointer_at] << 8) | raw[:, pointer_at + 1]
+
+    if data_unit == AOS_MPDU:
+        headers = numpy.empty(len(raw), dtype=AOS_MPDU_HEADER_DTYPE)
+        headers['first_hdr_ptr'] = pointer & 0x07FF
+    else:
+        headers = numpy.empty(len(raw), dtype=AOS_BPDU_HEADER_DTYPE)
+        headers['bitstream_data_ptr'] = pointer & 0x3FFF
+
+    headers['version'] = frame_id >> 14
+    headers['spacecraft_id'] = (frame_id >> 6) & 0xFF
+    headers['virtual_channel_id'] = frame_id & 0x3F
+    headers['virtual_chan_frame_count'] = (raw[:, 2] << 16) | (raw[:, 3] << 8) | raw[:, 4]
+    headers['replay_flag'] = raw[:, 5] >> 7
+    headers['vc_frame_count_usage_flag'] = (raw[:, 5] >> 6) & 0x01
+    headers['vc_frame_count_cycle'] = raw[:, 5] & 0x0F
+    return headers
+
+
+def earth_receive_times(transfer_buffer):
+    ''' Decode the earth receive times of a transfer buffer
+
+    All times are decoded together from one joined buffer. Times in a mix
+    of the 8 and 10 octet formats are decoded one at a time instead.
+
+    Arguments:
+        transfer_buffer:
+            A sequence of :class:`ait.dsn.sle.ber.FrameRecord` objects,
+            such as a fast decoded transfer buffer, or of encoded times.
+
+    Returns:
+        An array of float64 with each frame's earth receive time in
+        seconds since the Unix epoch. See
+        :func:`ait.dsn.sle.timecode.decode_timestamp`.
+    '''
+    erts = [getattr(record, 'earth_receive_time', record) for record in transfer_buffer]
+    if not erts:
+        return numpy.empty(0)
+
+    size = len(erts[0])
+    if size not in (8, 10) or any(len(ert) != size for ert in erts):
+        return numpy.array([timecode.decode_timestamp(ert) for ert in erts])
+
+    if size == 10:
+        times = numpy.frombuffer(b''.join(erts), dtype=CDS_PICO_TIME_DTYPE)
+        subsecs = times['picosecs'] * 1e-12
+    else:
+        times = numpy.frombuffer(b''.join(erts), dtype=CDS_TIME_DTYPE)
+        subsecs = times['microsecs'] * 1e-6
+
+    days = times['days'].astype(numpy.float64) - timecode.UNIX_EPOCH_DAYS
+    return days * 86400 + times['millisecs'] * 1e-3 + subsecs
+
+
+def _octets(data):
+    ''' Return a uint8 array viewing a bytes-like object '''
+    # Python 2's numpy.frombuffer does not accept memoryviews
+    return numpy.asarray(memoryview(data))
@@ -0,0 +1,357 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+''' SLE Return Path Benchmarks
+
+The ait.dsn.sle.benchmark module measures the stages of the RAF / RCF
+receive path on synthetic transfer buffers, each stage on its own and all
+of them together through a session:
+
+    framing
+        Splitting TML messages from the byte stream with a
+        :class:`ait.dsn.sle.tml.TMLFramer`.
+
+    ber_decode
+        Scanning a transfer buffer with
+        :func:`ait.dsn.sle.ber.decode_transfer_buffer`.
+
+    pyasn1_decode
+        Decoding a transfer buffer with PyASN1.
+
+    frame_decode
+        Decoding the frames of a transfer buffer with the frame decoder.
+
+    packet_extraction
+        Extracting the space packets of a transfer buffer's frames with a
+        :class:`ait.dsn.sle.packets.PacketExtractor`.
+
+    sink_emission
+        Passing the packets of a transfer buffer to a frame sink and
+        waiting for the sink to write them.
+
+    end_to_end
+        Framing, decoding and handling each message with a RAF or RCF
+        session, as received messages are, with packets delivered to a
+        sink that discards them.
+
+The inputs are built with :class:`ait.dsn.sle.simulator.FrameGenerator`,
+so every frame carries one space packet. Each stage reports its
+throughput and the latency percentiles of a transfer buffer so results
+can be compared from release to release.
+
+Attributes:
+    STAGES: The names of the benchmark stages in pipeline order.
+
+Functions:
+    make_messages: Build TML messages of synthetic transfer buffers.
+
+    run: Run the benchmark stages and return their results.
+'''
+
+import importlib
+import sys
+import timeit
+
+from pyasn1.codec.der.decoder import decode
+
+import ait.core
+import ait.dsn.sle
+from ait.dsn.sle import ber, frames, packets, simulator, sink, tml, util
+
+STAGES = (
+    'framing', 'ber_decode', 'pyasn1_decode', 'frame_decode',
+    'packet_extraction', 'sink_emission', 'end_to_end'
+)
+
+_SERVICES = {
+    'raf': ('ait.dsn.sle.pdu.raf', 'RafProvidertoUserPdu', 'rafTransferBuffer'),
+    'rcf': ('ait.dsn.sle.pdu.rcf', 'RcfProvidertoUserPdu', 'rcfTransferBuffer'),
+}
+
+
+def make_messages(count, frames_per_buffer=10, frame_type='TMTransFrame', frame_len=1115,
+                  service='raf'):
+    ''' Build TML messages of synthetic transfer buffers
+
+    Arguments:
+        count:
+            The number of messages.
+
+        frames_per_buffer:
+            The number of frames in each transfer buffer.
+
+        frame_type:
+            ``'TMTransFrame'`` or ``'AOSTransFrame'``.
+
+        frame_len:
+            The length in octets of each frame.
+
+        service:
+            ``'raf'`` or ``'rcf'``. RCF annotated frames have no delivered
+            frame quality.
+
+    Returns:
+        A list of TML messages, each holding one transfer buffer PDU.
+    '''
+    generator = simulator.FrameGenerator(frame_type, frame_len)
+    has_quality = service == 'raf'
+    return [
+        tml.pack_sle_pdu(simulator.encode_transfer_buffer(
+            generator.frames(frames_per_buffer), has_quality=has_quality
+        ))
+        for i in range(count)
+    ]
+
+
+class _Inputs(object):
+    ''' The messages of a run and each stage's input derived from them '''
+
+    def __init__(self, messages, frame_type, service, fast_decode=None):
+        module, pdu_cls, name = _SERVICES[service]
+        self.messages = messages
+        self.fast_decode = fast_decode
+        self.frame_type = frame_type
+        self.service = service
+        self.name = name
+        self.has_quality = service == 'raf'
+        self.pdu_cls = getattr(importlib.import_module(module), pdu_cls)
+
+        self.bodies = [m[tml.TML_HEADER_LEN:] for m in messages]
+        self.frames = [
+            [r.data.tobytes() for r in ber.decode_transfer_buffer(b, name, self.has_quality)[0]]
+            for b in self.bodies
+        ]
+
+    def frame_views(self):
+        ''' Return a decoded frame view of every frame of every buffer '''
+        views = []
+        for buff in self.frames:
+            decoded = []
+            for data in buff:
+                frame = frames.make_frame_decoder(self.frame_type)
+                frame.decode(data)
+                decoded.append(frame)
+            views.append(decoded)
+        return views
+
+    def packets(self):
+        ''' Return the packet data fields of every buffer '''
+        extractor = packets.PacketExtractor()
+        return [
+            [bytes(bytearray(p[packets.SPACE_PACKET_HEADER_LEN:]))
+             for frame in buff for p in extractor.extract(frame)]
+            for buff in self.frame_views()
+        ]
+
+
+def _framing(inputs, items):
+    ''''''
+    framer = tml.TMLFramer()
+    for msg in items:
+        framer.feed(msg)
+        for pdu in framer:
+            pass
+        yield
+
+
+def _ber_decode(inputs, items):
+    ''''''
+    for body in items:
+        ber.decode_transfer_buffer(body, inputs.name, inputs.has_quality)
+        yield
+
+
+def _pyasn1_decode(inputs, items):
+    ''''''
+    for body in items:
+        decode(body, asn1Spec=inputs.pdu_cls())
+        yield
+
+
+def _frame_decode(inputs, items):
+    ''''''
+    frame = frames.make_frame_decoder(inputs.frame_type)
+    for buff in items:
+        for data in buff:
+            frame.decode(data)
+        yield
+
+
+def _packet_extraction(inputs, items):
+    ''''''
+    extractor = packets.PacketExtractor()
+    for buff in items:
+        for frame in buff:
+            extractor.extract(frame)
+        yield
+
+
+def _sink_emission(inputs, items):
+    ''''''
+    frame_sink = sink.CallbackSink(lambda batch: None)
+    try:
+        for buff in items:
+            for packet in buff:
+                frame_sink.put(packet)
+            frame_sink.flush()
+            yield
+    finally:
+        frame_sink.close()
+
+
+def _end_to_end(inputs, items):
+    ''''''
+    service = ait.dsn.sle.RAF if inputs.service == 'raf' else ait.dsn.sle.RCF
+    session = service(hostnames=['localhost'], port=5100,
+                      sinks=[sink.CallbackSink(lambda batch: None)])
+    session._frame_decoder = frames.make_frame_decoder(inputs.frame_type)
+    if inputs.fast_decode is not None:
+        session._fast_decode = inputs.fast_decode
+    framer = tml.TMLFramer()
+    try:
+        for msg in items:
+            framer.feed(msg)
+            for pdu in framer:
+                session._process_message(pdu.tobytes())
+            session._sinks[0].flush()
+            yield
+    finally:
+        session.disconnect()
+
+
+def _stage_inputs(stage, inputs):
+    ''' Return the per buffer inputs of a stage '''
+    if stage in ('framing', 'end_to_end'):
+        return inputs.messages
+    elif stage in ('ber_decode', 'pyasn1_decode'):
+        return inputs.bodies
+    elif stage == 'frame_decode':
+        return inputs.frames
+    elif stage == 'packet_extraction':
+        return inputs.frame_views()
+    else:
+        return inputs.packets()
+
+
+_STAGE_FUNCTIONS = {
+    'framing': _framing,
+    'ber_decode': _ber_decode,
+    'pyasn1_decode': _pyasn1_decode,
+    'frame_decode': _frame_decode,
+    'packet_extraction': _packet_extraction,
+    'sink_emission': _sink_emission,
+    'end_to_end': _end_to_end,
+}
+
+
+def _measure(stage, inputs, warmup):
+    ''' Time each buffer of a stage after the warmup buffers '''
+    items = _stage_inputs(stage, inputs)
+    runner = _STAGE_FUNCTIONS[stage](inputs, items)
+    clock = timeit.default_timer
+
+    latency = []
+    start = clock()
+    for i in range(len(items)):
+        t0 = clock()
+        next(runner)
+        t1 = clock()
+        if i == warmup - 1:
+            start = t1
+        elif i >= warmup:
+            latency.append(t1 - t0)
+    duration = clock() - start
+    runner.close()
+
+    buffers = len(latency)
+    frame_count = sum(len(b) for b in inputs.frames[warmup:])
+    octets = sum(len(m) for m in inputs.messages[warmup:])
+    return {
+        'buffers': buffers,
+        'frames': frame_count,
+        'bytes': octets,
+        'duration': duration,
+        'buffers_per_sec': buffers / duration if duration else 0.0,
+        'frames_per_sec': frame_count / duration if duration else 0.0,
+        'megabytes_per_sec': octets / duration / 1e6 if duration else 0.0,
+        'latency': util.percentiles(latency),
+    }
+
+
+def run(stages=STAGES, buffers=200, frames_per_buffer=10, frame_type='TMTransFrame',
+        frame_len=1115, service='raf', warmup=10, fast_decode=None):
+    ''' Run the benchmark stages and return their results
+
+    Arguments:
+        stages:
+            The names of the stages to run. See :data:`STAGES`.
+
+        buffers:
+            The number of transfer buffers to measure in each stage.
+
+        frames_per_buffer:
+            The number of frames in each transfer buffer.
+
+        frame_type:
+            ``'TMTransFrame'`` or ``'AOSTransFrame'``.
+
+        frame_len:
+            The length in octets of each frame.
+
+        service:
+            ``'raf'`` or ``'rcf'``.
+
+        warmup:
+            The number of transfer buffers processed by each stage before
+            measuring starts.
+
+        fast_decode:
+            The ``fast_decode`` setting of the end to end stage's session.
+            Defaults to the configured setting.
+
+    Returns:
+        A dictionary of the run's parameters and the results of each
+        stage under ``stages``. Each stage reports the number of
+        ``buffers``, ``frames`` and ``bytes`` measured, the ``duration``
+        in seconds, the ``buffers_per_sec``, ``frames_per_sec`` and
+        ``megabytes_per_sec`` rates and the ``latency`` percentiles in
+        seconds of processing one transfer buffer.
+
+    Raises:
+        ValueError:
+            If a stage, service or frame type is not supported.
+    '''
+    for stage in stages:
+        if stage not in _STAGE_FUNCTIONS:
+            raise ValueError('Unknown benchmark stage {}'.format(stage))
+    if service not in _SERVICES:
+        raise ValueError('Unsupported benchmark service {}'.format(service))
+
+    if fast_decode is None:
+        fast_decode = ait.config.get('dsn.sle.fast_decode', False)
+
+    messages = make_messages(warmup + buffers, frames_per_buffer, frame_type, frame_len, service)
+    inputs = _Inputs(messages, frame_type, service, fast_decode)
+
+    return {
+        'python': sys.version.split()[0],
+        'service': service,
+        'frame_type': frame_type,
+        'frame_len': frame_len,
+        'frames_per_buffer': frames_per_buffer,
+        'buffers': buffers,
+        'warmup': warmup,
+        'fast_decode': fast_decode,
+        'stages': dict((stage, _measure(stage, inputs, warmup)) for stage in stages),
+    }
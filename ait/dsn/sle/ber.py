@@ -0,0 +1,302 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+
+''' Fast-path BER Processing
+
+The ait.dsn.sle.ber module provides a lightweight scanner for the BER
+encoded RAF / RCF transfer buffer PDUs. A transfer buffer carries tens to
+hundreds of annotated frames, and decoding it with PyASN1 builds Python
+objects for every field of every frame. The scanner instead walks the BER
+TLVs directly and returns a :class:`TransferBuffer` of
+:class:`FrameRecord` objects referencing the frame data in place.
+
+The scanner only handles the encodings that providers use for transfer
+buffers of annotated frames. Any other PDU, a transfer buffer containing
+a sync notification or an unexpected encoding results in ``None`` being
+returned so that the caller can fall back to PyASN1.
+
+Classes:
+    FrameRecord: The fields of an annotated frame needed to process it.
+
+    TransferBuffer: A list of FrameRecords decoded from a transfer buffer.
+
+The module also provides minimal BER encoding helpers for building PDUs
+whose layout is fixed, such as CLTU transfer data invocations, without
+going through PyASN1.
+
+Functions:
+    decode_transfer_buffer: Scan a BER encoded transfer buffer PDU.
+
+    encode_length: Encode a BER definite length.
+
+    encode_integer: Encode a BER INTEGER.
+
+    encode_tlv: Encode a BER tag, length and contents.
+'''
+
+TRANSFER_BUFFER_TAG = 0xA8
+ANNOTATED_FRAME_TAG = 0xA0
+
+_TAG_CONTEXT_0 = 0x80
+_TAG_CONTEXT_1 = 0x81
+_TAG_INTEGER = 0x02
+_TAG_OCTET_STRING = 0x04
+
+
+class FrameRecord(object):
+    ''' An annotated frame decoded by :func:`decode_transfer_buffer`
+
+    Attributes:
+        earth_receive_time:
+            The encoded CCSDS earth receive time of the frame. This is 8
+            bytes long for the CDS format and 10 bytes long for the CDS
+            picosecond format.
+
+        data_link_continuity:
+            The number of frames missing before this frame. -1 indicates
+            that the number is unknown.
+
+        delivered_frame_quality:
+            The frame quality as defined in
+            :class:`ait.dsn.sle.pdu.raf.FrameQuality`. RCF annotated frames
+            have no quality and the attribute is None.
+
+        private_annotation:
+            The private annotation bytes or None if there is no private
+            annotation.
+
+        data:
+            A memoryview of the frame data in the transfer buffer.
+    '''
+    __slots__ = [
+        'earth_receive_time', 'data_link_continuity',
+        'delivered_frame_quality', 'private_annotation', 'data'
+    ]
+
+    def __init__(self, earth_receive_time, data_link_continuity,
+                 delivered_frame_quality, private_annotation, data):
+        self.earth_receive_time = earth_receive_time
+        self.data_link_continuity = data_link_continuity
+        self.delivered_frame_quality = delivered_frame_quality
+        self.private_annotation = private_annotation
+        self.data = data
+
+    def getName(self):
+        ''' Return the PDU name used to dispatch the record to handlers '''
+        return 'annotatedFrame'
+
+
+class TransferBuffer(list):
+    ''' A list of :class:`FrameRecord` decoded from a transfer buffer PDU '''
+
+    def __init__(self, name, records=()):
+        super(TransferBuffer, self).__init__(records)
+        self.name = name
+
+    def getName(self):
+        ''' Return the PDU name used to dispatch the buffer to handlers '''
+        return self.name
+
+
+class _Unsupported(Exception):
+    ''' Raised when the scanner cannot handle the encoding it finds '''
+    pass
+
+
+def _read_header(buf, offset, end):
+    ''' Read a BER identifier and definite length
+
+    Returns:
+        A tuple of the tag byte, the offset of the contents and the
+        length of the contents.
+    '''
+    if offset + 2 > end:
+        raise _Unsupported()
+
+    tag = buf[offset]
+    if tag & 0x1F == 0x1F:
+        raise _Unsupported()
+
+    length = buf[offset + 1]
+    offset += 2
+
+    if length & 0x80:
+        num_octets = length & 0x7F
+        if num_octets == 0 or num_octets > 4 or offset + num_octets > end:
+            raise _Unsupported()
+
+        length = 0
+        for i in range(offset, offset + num_octets):
+            length = (length << 8) | buf[i]
+        offset += num_octets
+
+    if offset + length > end:
+        raise _Unsupported()
+
+    return tag, offset, length
+
+
+def _read_integer(buf, offset, length):
+    ''' Read the contents of a BER encoded INTEGER '''
+    if length == 0:
+        raise _Unsupported()
+
+    value = 0
+    for i in range(offset, offset + length):
+        value = (value << 8) | buf[i]
+
+    if buf[offset] & 0x80:
+        value -= 1 << (8 * length)
+
+    return value
+
+
+def _scan_annotated_frame(buf, view, offset, end, has_quality):
+    ''' Scan the contents of an annotated frame into a FrameRecord '''
+    # invokerCredentials
+    tag, offset, length = _read_header(buf, offset, end)
+    if tag not in (_TAG_CONTEXT_0, _TAG_CONTEXT_1):
+        raise _Unsupported()
+    offset += length
+
+    # earthReceiveTime
+    tag, offset, length = _read_header(buf, offset, end)
+    if tag not in (_TAG_CONTEXT_0, _TAG_CONTEXT_1):
+        raise _Unsupported()
+    ert = bytes(buf[offset:offset + length])
+    offset += length
+
+    # antennaId
+    tag, offset, length = _read_header(buf, offset, end)
+    if tag not in (_TAG_CONTEXT_0, _TAG_CONTEXT_1):
+        raise _Unsupported()
+    offset += length
+
+    # dataLinkContinuity
+    tag, offset, length = _read_header(buf, offset, end)
+    if tag != _TAG_INTEGER:
+        raise _Unsupported()
+    continuity = _read_integer(buf, offset, length)
+    offset += length
+
+    # deliveredFrameQuality
+    quality = None
+    if has_quality:
+        tag, offset, length = _read_header(buf, offset, end)
+        if tag != _TAG_INTEGER:
+            raise _Unsupported()
+        quality = _read_integer(buf, offset, length)
+        offset += length
+
+    # privateAnnotation
+    tag, offset, length = _read_header(buf, offset, end)
+    if tag == _TAG_CONTEXT_0:
+        annotation = None
+    elif tag == _TAG_CONTEXT_1:
+        annotation = bytes(buf[offset:offset + length])
+    else:
+        raise _Unsupported()
+    offset += length
+
+    # data
+    tag, offset, length = _read_header(buf, offset, end)
+    if tag != _TAG_OCTET_STRING or offset + length != end:
+        raise _Unsupported()
+
+    return FrameRecord(ert, continuity, quality, annotation,
+                       view[offset:offset + length])
+
+
+def decode_transfer_buffer(message, name, has_quality=True):
+    ''' Scan a BER encoded RAF / RCF transfer buffer PDU
+
+    Arguments:
+        message:
+            The BER encoded provider to user PDU.
+
+        name:
+            The name of the transfer buffer PDU choice (e.g.,
+            ``'rafTransferBuffer'``) returned by the result's ``getName``.
+
+        has_quality:
+            Whether annotated frames contain a delivered frame quality
+            field. This is True for RAF and False for RCF.
+
+    Returns:
+        A tuple of the decoded :class:`TransferBuffer` and the remainder of
+        the message after the PDU, mirroring PyASN1's decode. None is
+        returned if the message is not a transfer buffer of annotated
+        frames or uses an encoding the scanner does not handle.
+    '''
+    if not isinstance(message, bytearray):
+        message = bytearray(message)
+
+    if not message or message[0] != TRANSFER_BUFFER_TAG:
+        return None
+
+    view = memoryview(message)
+
+    try:
+        tag, offset, length = _read_header(message, 0, len(message))
+        end = offset + length
+
+        records = TransferBuffer(name)
+        while offset < end:
+            tag, offset, length = _read_header(message, offset, end)
+            if tag != ANNOTATED_FRAME_TAG:
+                raise _Unsupported()
+
+            records.append(_scan_annotated_frame(
+                message, view, offset, offset + length, has_quality
+            ))
+            offset += length
+    except _Unsupported:
+        return None
+
+    return records, bytes(message[end:])
+
+
+def encode_length(length):
+    ''' Encode a BER definite length using the fewest octets '''
+    if length < 0x80:
+        return bytes(bytearray([length]))
+
+    octets = bytearray()
+    while length:
+        octets.insert(0, length & 0xFF)
+        length >>= 8
+
+    return bytes(bytearray([0x80 | len(octets)]) + octets)
+
+
+def encode_integer(value, tag=_TAG_INTEGER):
+    ''' Encode a BER INTEGER as minimal two's complement contents '''
+    if value >= 0:
+        num_octets = value.bit_length() // 8 + 1
+    else:
+        num_octets = (-value - 1).bit_length() // 8 + 1
+        value += 1 << (8 * num_octets)
+
+    contents = bytearray(num_octets)
+    for i in range(num_octets - 1, -1, -1):
+        contents[i] = value & 0xFF
+        value >>= 8
+
+    return bytes(bytearray([tag, num_octets]) + contents)
+
+
+def encode_tlv(tag, contents):
+    ''' Encode a BER tag, definite length and contents '''
+    return bytes(bytearray([tag])) + encode_length(len(contents)) + bytes(contents)
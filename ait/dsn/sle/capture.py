@@ -0,0 +1,220 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+''' SLE Session Capture and Replay
+
+The ait.dsn.sle.capture module records the TML messages received by a
+session to a file and feeds a recording back through a session's framing,
+decoding and handling path. Replaying a recorded pass measures the
+throughput and per-stage latency of the receive pipeline without a
+connection to a provider.
+
+A capture file starts with the 8 octet :data:`CAPTURE_MAGIC`. Each
+received message follows as a record of its receive time (a big-endian
+double of seconds since the epoch), its length (a big-endian unsigned
+32 bit integer) and the complete TML message.
+
+Attributes:
+    CAPTURE_MAGIC: The octets that start a capture file.
+
+Classes:
+    CaptureWriter: Append received messages to a capture file.
+
+Functions:
+    read_capture: Iterate over the records of a capture file.
+
+    replay: Feed a capture file through a session and report its
+        throughput and latency.
+'''
+
+import io
+import struct
+import timeit
+
+import gevent
+
+import ait.core.log
+
+from ait.dsn.sle import tml, util
+
+CAPTURE_MAGIC = b'AITTML\x00\x01'
+
+_RECORD = struct.Struct('>dI')
+
+# Replay stages in the order they are applied to each message
+_STAGES = ('framing', 'decode', 'handle')
+
+
+class CaptureWriter(object):
+    ''' Append received TML messages to a capture file
+
+    Attributes:
+        messages: The number of messages written.
+
+        bytes_written: The number of message octets written, not counting
+            record headers.
+    '''
+
+    def __init__(self, path):
+        '''
+        Arguments:
+            path:
+                The capture file. Records are appended if it exists.
+        '''
+        self._file = io.open(path, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(CAPTURE_MAGIC)
+
+        self.messages = 0
+        self.bytes_written = 0
+
+    def write(self, msg, timestamp):
+        ''' Append a message
+
+        Arguments:
+            msg:
+                The complete TML message as a bytes-like object.
+
+            timestamp:
+                The receive time in seconds since the epoch.
+        '''
+        self._file.write(_RECORD.pack(timestamp, len(msg)))
+        self._file.write(msg)
+        self.messages += 1
+        self.bytes_written += len(msg)
+
+    def close(self):
+        ''' Flush and close the capture file '''
+        self._file.close()
+
+
+def read_capture(path):
+    ''' Iterate over the records of a capture file
+
+    A truncated final record, as left by a session that did not close its
+    capture, is logged and ignored.
+
+    Arguments:
+        path:
+            The capture file.
+
+    Yields:
+        (receive time, TML message) tuples.
+
+    Raises:
+        ValueError:
+            If the file is not a capture file.
+    '''
+    with io.open(path, 'rb') as f:
+        if f.read(len(CAPTURE_MAGIC)) != CAPTURE_MAGIC:
+            raise ValueError('{} is not a TML capture file'.format(path))
+
+        while True:
+            header = f.read(_RECORD.size)
+            if not header:
+                return
+
+            if len(header) == _RECORD.size:
+                timestamp, length = _RECORD.unpack(header)
+                msg = f.read(length)
+                if len(msg) == length:
+                    yield timestamp, msg
+                    continue
+
+            ait.core.log.warn('Ignoring truncated record at the end of {}'.format(path))
+            return
+
+
+def replay(session, path, speed=None):
+    ''' Feed a capture file through a session and measure it
+
+    Each recorded message is split from the stream by a TML framer and
+    passed to the session's ``_process_message`` with its recorded receive
+    time, exactly as received messages are. The session's decode hooks,
+    metrics and delivery latencies therefore cover the replay as they
+    would the original pass. Frames are delivered to the session's sinks.
+    The session does not need to be connected.
+
+    Arguments:
+        session:
+            The RAF or RCF session to feed.
+
+        path:
+            The capture file.
+
+        speed:
+            The replay rate as a multiple of the recorded rate. None or 0
+            replays as fast as possible.
+
+    Returns:
+        A dictionary with the number of ``messages``, ``frames``, ``bytes``
+        and ``decode_errors``, the ``duration`` in seconds, the
+        ``messages_per_sec`` and ``frames_per_sec`` rates and the
+        ``latency`` of each stage. Latencies are percentiles of the
+        seconds spent on each message. The decode and handle latencies are
+        taken from the session's metrics.
+    '''
+    framer = tml.TMLFramer()
+    clock = timeit.default_timer
+    metrics = session._metrics
+    latency = dict((stage, []) for stage in _STAGES)
+    messages = total_bytes = 0
+    frames_before = session._frames_received
+    failures_before = metrics.decode_failures
+
+    first = None
+    start = clock()
+    for timestamp, msg in read_capture(path):
+        if speed:
+            if first is None:
+                first = timestamp
+            delay = (timestamp - first) / speed - (clock() - start)
+            if delay > 0:
+                gevent.sleep(delay)
+
+        t0 = clock()
+        framer.feed(msg)
+        pdus = [pdu.tobytes() for pdu in framer]
+        t1 = clock()
+
+        decode_time = metrics.decode_time
+        handler_time = metrics.handler_time
+        for pdu in pdus:
+            session._process_message(pdu, timestamp)
+
+        latency['framing'].append(t1 - t0)
+        latency['decode'].append(metrics.decode_time - decode_time)
+        latency['handle'].append(metrics.handler_time - handler_time)
+        messages += 1
+        total_bytes += len(msg)
+
+    duration = clock() - start
+    frames = session._frames_received - frames_before
+    totals = [sum(stages) for stages in zip(*[latency[s] for s in _STAGES])]
+
+    return {
+        'messages': messages,
+        'frames': frames,
+        'bytes': total_bytes,
+        'decode_errors': metrics.decode_failures - failures_before,
+        'duration': duration,
+        'speed': speed or None,
+        'messages_per_sec': messages / duration if duration else 0.0,
+        'frames_per_sec': frames / duration if duration else 0.0,
+        'latency': dict(
+            [(stage, util.percentiles(latency[stage])) for stage in _STAGES] +
+            [('total', util.percentiles(totals))]
+        ),
+    }
+
@@ -20,12 +20,24 @@ Unit (CLTU) interface classes, methods, and attributes.
 Classes:
     CLTU: An extension of the generic :class:`ait.dsn.sle.common.SLE` which
         implements the Forward CLTU standard.
+
+    CltuTransferDataEncoder: Encodes CLTU-TRANSFER-DATA invocations
+        directly from a precomputed layout instead of with PyASN1.
+
+    CltuTransferError: The exception set on the result of a CLTU uploaded
+        with :meth:`CLTU.upload_cltus` that the provider rejected.
 '''
 import binascii
-import struct
+from collections import deque
+import itertools
+
+import gevent
+import gevent.event
+import gevent.queue
 
 import ait.core.log
-import common
+from ait.dsn.sle import ber, common, timecode
+from ait.dsn.sle.tml import pack_sle_pdu
 
 if ait.config.get('dsn.sle.version', None) == 4:
     from ait.dsn.sle.pdu.cltu.cltuv4 import *
@@ -33,6 +45,133 @@ else:
     from ait.dsn.sle.pdu.cltu.cltuv5 import *
 
 
+class CltuTransferDataEncoder(object):
+    ''' Encoder for CLTU-TRANSFER-DATA invocation PDUs
+
+    Only the invoke id, CLTU id, transmission times, delay, notification
+    flag, credentials and CLTU data change between transfer data
+    invocations. The encoder precomputes the BER encoding of everything
+    else once and produces output identical to encoding a
+    ``CltuUserToProviderPdu`` with PyASN1.
+    '''
+    # [10] IMPLICIT CltuTransferDataInvocation
+    _PDU_TAG = 0xAA
+
+    def __init__(self):
+        # Credentials and ConditionalTime are [0] NULL when unused
+        self._unused = ber.encode_tlv(0x80, b'')
+        self._notification = {
+            True: ber.encode_integer(0),
+            False: ber.encode_integer(1)
+        }
+        self._time_cache = {}
+
+    def encode(self, invoke_id, cltu_id, tc_data, earliest_time=None,
+               latest_time=None, delay=0, notify=False, credentials=None):
+        ''' Encode a CLTU-TRANSFER-DATA invocation
+
+        Arguments:
+            invoke_id:
+                The invoke id of the invocation.
+
+            cltu_id:
+                The CLTU identification of the CLTU.
+
+            tc_data:
+                The data to transfer in the CLTU.
+
+            earliest_time (optional :class:`datetime.datetime`):
+                The earliest time that the provider shall start processing
+                this CLTU.
+
+            latest_time (optional :class:`datetime.datetime`):
+                The latest time at which the provider shall start
+                processing this CLTU.
+
+            delay:
+                The minimum radiation delay, in microseconds, between this
+                CLTU and the next.
+
+            notify:
+                Whether the provider shall notify the user upon radiation
+                of the CLTU.
+
+            credentials:
+                The encoded ISP1 credentials or None if credentials are
+                unused.
+
+        Returns:
+            The BER encoded PDU.
+        '''
+        if credentials is None:
+            creds = self._unused
+        else:
+            creds = ber.encode_tlv(0x81, credentials)
+
+        contents = b''.join([
+            creds,
+            ber.encode_integer(invoke_id),
+            ber.encode_integer(cltu_id),
+            self._encode_time(earliest_time),
+            self._encode_time(latest_time),
+            ber.encode_integer(delay),
+            self._notification[bool(notify)],
+            ber.encode_tlv(0x04, tc_data)
+        ])
+
+        return ber.encode_tlv(self._PDU_TAG, contents)
+
+    def _encode_time(self, time):
+        ''' Encode a ConditionalTime, caching the encoding per value '''
+        if not time:
+            return self._unused
+
+        encoded = self._time_cache.get(time)
+        if encoded is None:
+            t = timecode.encode(time)
+            # [1] known Time choice containing [0] ccsdsFormat
+            encoded = ber.encode_tlv(0xA1, ber.encode_tlv(0x80, t))
+            if len(self._time_cache) > 64:
+                self._time_cache.clear()
+            self._time_cache[time] = encoded
+
+        return encoded
+
+
+class CltuTransferError(Exception):
+    ''' A CLTU uploaded with :meth:`CLTU.upload_cltus` was not accepted
+
+    Attributes:
+        cltu_id:
+            The CLTU identification used for the last transfer attempt.
+
+        diagnostic:
+            The diagnostic reported by the provider or a description of why
+            no return was received.
+    '''
+    def __init__(self, cltu_id, diagnostic):
+        super(CltuTransferError, self).__init__(
+            'CLTU #{} transfer failed: {}'.format(cltu_id, diagnostic)
+        )
+        self.cltu_id = cltu_id
+        self.diagnostic = diagnostic
+
+
+class _PendingCltu(object):
+    ''' A CLTU queued for or awaiting a return in the upload pipeline '''
+    __slots__ = ['index', 'data', 'options', 'invoke_id', 'cltu_id',
+                 'result', 'retries']
+
+    def __init__(self, index, data, options):
+        self.index = index
+        self.data = data
+        self.options = options
+        self.invoke_id = None
+        self.cltu_id = None
+        self.result = gevent.event.AsyncResult()
+        self.retries = 0
+
+
 class CLTU(common.SLE):
     ''' SLE Forward Communications Link Transmission Unit (CLTU) interface class
 
@@ -98,21 +237,60 @@ class CLTU(common.SLE):
         actions triggered by the event.
     '''
     # TODO: Add error checking for actions based on current state
-    _cltu_id = 0
-    event_invoc_id = 0
+
+    _diagnostics = [
+        'Unable to Process', 'Unable to Store', 'Out of Sequence',
+        'Inconsistent Time Range', 'Invalid Time', 'Late Sldu',
+        'Invalid Delay Time', 'CLTU Error'
+    ]
+
+    # Rejections caused by provider load or by an earlier rejection in
+    # the pipeline rather than by the CLTU itself
+    _retryable_diagnostics = set(['Unable to Store', 'Out of Sequence'])
 
     def __init__(self, *args, **kwargs):
+        self._cltu_id = 0
+        self.event_invoc_id = 0
+
         self._inst_id = ait.config.get('dsn.sle.fcltu.inst_id',
                                        kwargs.get('inst_id', None))
         self._hostnames = ait.config.get('dsn.sle.fcltu.hostnames',
                                          kwargs.get('hostnames', None))
         self._port = ait.config.get('dsn.sle.fcltu.port',
                                     kwargs.get('port', None))
+        self._cltu_window = ait.config.get('dsn.sle.fcltu.window',
+                                           kwargs.get('window', 8))
+        if self._cltu_window < 1:
+            raise ValueError('CLTU window must be at least 1')
 
         super(self.__class__, self).__init__(*args, **kwargs)
 
         self._service_type = 'fwdCltu'
         self._version = kwargs.get('version', 5)
+        self._fast_encode = ait.config.get('dsn.sle.fast_encode',
+                                           kwargs.get('fast_encode', True))
+        self._cltu_encoder = CltuTransferDataEncoder()
+
+        self._cltu_return_timeout = ait.config.get('dsn.sle.fcltu.return_timeout',
+                                                   kwargs.get('return_timeout', 30))
+        self._cltu_max_retries = ait.config.get('dsn.sle.fcltu.max_retries',
+                                                kwargs.get('max_retries', 3))
+        self._cltu_backoff = ait.config.get('dsn.sle.fcltu.backoff',
+                                            kwargs.get('backoff', 0.5))
+        self._cltu_max_backoff = ait.config.get('dsn.sle.fcltu.max_backoff',
+                                                kwargs.get('max_backoff', 30))
+
+        self._cltu_buffer_available = None
+        self._cltu_index = itertools.count()
+        self._cltu_pending = deque()
+        self._cltu_returns = gevent.queue.Queue()
+        self._outstanding = {}
+        self._uploader = None
+
+        self._cltus_sent = 0
+        self._cltus_accepted = 0
+        self._cltus_rejected = 0
+        self._cltus_radiated = 0
 
         self._handlers['CltuBindReturn'].append(self._bind_return_handler)
         self._handlers['CltuUnbindReturn'].append(self._unbind_return_handler)
@@ -155,6 +333,7 @@ class CLTU(common.SLE):
         the Forward CLTU service provider prepare to receive
         CLTU-TRANSFER-DATA invocations
         '''
+        self._start_args = ()
         start_invoc = CltuUserToProviderPdu()
 
         if self._auth_level == 'all':
@@ -198,10 +377,211 @@ class CLTU(common.SLE):
                 Specify whether the provider shall invoke the CLTU-ASYNCNOTIFY
                 operation upon completion of the radiation of the CLTU.
         '''
-        pdu = self._prepare_cltu_pdu(tc_data, earliest_time, latest_time, delay, notify)
+        _, msg = self._encode_cltu_pdu(tc_data, earliest_time, latest_time, delay, notify)
 
         ait.core.log.info('Sending TC Data ...')
-        self.send(self.encode_pdu(pdu))
+        self.send(msg)
+
+    def upload_cltus(self, cltus, earliest_time=None, latest_time=None, delay=0, notify=False):
+        ''' Upload a sequence of CLTUs with a window of outstanding transfers
+
+        The CLTUs are sent in order by a background greenlet which keeps up
+        to ``window`` CLTU-TRANSFER-DATA invocations outstanding at a time.
+        While any transfer is outstanding, further CLTUs are only sent if
+        they fit in the CLTU buffer space the provider last reported as
+        available.
+
+        If the provider rejects a CLTU, sending pauses until every
+        outstanding transfer has returned. CLTUs rejected as "Unable to
+        Store" or "Out of Sequence" (which the provider reports for the
+        CLTUs that followed an earlier rejection) are then resent, in
+        order and with the CLTU identification rewound, after a delay which
+        doubles with each consecutive rejection. Any other rejection, or
+        running out of retries, fails that CLTU's result with a
+        :class:`CltuTransferError`.
+
+        CLTUs sent with :meth:`upload_cltu` while this pipeline is running
+        will disrupt the CLTU identification sequence.
+
+        Arguments:
+            cltus:
+                An iterable of the data to transfer in each CLTU.
+
+            See :meth:`upload_cltu` for a description of the remaining
+            arguments. They apply to every CLTU in ``cltus``.
+
+        Returns:
+            A list with a :class:`gevent.event.AsyncResult` for each CLTU.
+            The result's value is the CLTU identification of the accepted
+            CLTU.
+        '''
+        options = (earliest_time, latest_time, delay, notify)
+        items = [
+            _PendingCltu(next(self._cltu_index), tc_data, options)
+            for tc_data in cltus
+        ]
+        self._cltu_pending.extend(items)
+
+        if self._uploader is None and self._cltu_pending:
+            self._uploader = gevent.spawn(self._run_cltu_uploads)
+
+        return [item.result for item in items]
+
+    def _run_cltu_uploads(self):
+        ''' Send pending CLTUs and resolve their results as returns arrive '''
+        pending = self._cltu_pending
+        outstanding = self._outstanding
+        returns = self._cltu_returns
+        rejected = []
+        backoff = self._cltu_backoff
+        item = None
+
+        try:
+            # Returns are removed from outstanding as they are received so
+            # any still queued must be resolved before finishing
+            while pending or outstanding or not returns.empty():
+                while (pending and not rejected and
+                       len(outstanding) < self._cltu_window and
+                       self._cltu_buffer_fits(pending[0])):
+                    item = pending.popleft()
+                    self._send_pending_cltu(item)
+
+                if not outstanding and returns.empty():
+                    continue
+
+                try:
+                    item, diag = returns.get(timeout=self._cltu_return_timeout)
+                except gevent.queue.Empty:
+                    ait.core.log.error('No CLTU transfer data return received in {} '
+                                       'seconds. Failing remaining CLTUs.'.format(
+                                           self._cltu_return_timeout))
+                    self._fail_cltus([i for i, _ in rejected],
+                                     'No transfer data return received')
+                    break
+
+                if diag is None:
+                    item.result.set(item.cltu_id)
+                    backoff = self._cltu_backoff
+                else:
+                    rejected.append((item, diag))
+
+                if rejected and not outstanding and returns.empty():
+                    if self._requeue_rejected_cltus(rejected):
+                        gevent.sleep(backoff)
+                        backoff = min(backoff * 2, self._cltu_max_backoff)
+                    rejected = []
+        except Exception as e:
+            ait.core.log.error('CLTU upload failed: {}. Failing remaining CLTUs.'.format(e))
+            while not returns.empty():
+                returned, diag = returns.get_nowait()
+                if diag is None:
+                    returned.result.set(returned.cltu_id)
+                else:
+                    rejected.append((returned, diag))
+            self._fail_cltus([i for i, _ in rejected] + [item], 'Upload failed: {}'.format(e))
+        finally:
+            self._uploader = None
+
+    def _fail_cltus(self, items, diagnostic):
+        ''' Fail the results of the given, outstanding and pending CLTUs
+
+        Arguments:
+            items:
+                Further CLTUs, such as rejected ones, to fail. Items that
+                are None or already resolved are skipped.
+
+            diagnostic:
+                The reason the CLTUs failed.
+        '''
+        failed = list(items)
+        failed.extend(self._outstanding.values())
+        failed.extend(self._cltu_pending)
+        for i in failed:
+            if i is not None and not i.result.ready():
+                i.result.set_exception(CltuTransferError(i.cltu_id, diagnostic))
+        self._outstanding.clear()
+        self._cltu_pending.clear()
+
+    def _cltu_buffer_fits(self, item):
+        ''' Check whether a CLTU fits in the provider's reported buffer space
+        alongside the CLTUs that are still outstanding.
+        '''
+        available = self._cltu_buffer_available
+        if available is None or not self._outstanding:
+            return True
+
+        in_flight = sum(len(i.data) for i in self._outstanding.values())
+        return in_flight + len(item.data) <= available
+
+    def _send_pending_cltu(self, item):
+        ''' Encode and send a pipelined CLTU, tracking it by invoke id '''
+        item.cltu_id = self._cltu_id
+        item.invoke_id, msg = self._encode_cltu_pdu(item.data, *item.options)
+
+        self._outstanding[item.invoke_id] = item
+        self.send(msg)
+        self._cltus_sent += 1
+
+    def _requeue_rejected_cltus(self, rejected):
+        ''' Resolve rejected CLTUs once no transfers are outstanding
+
+        The CLTU identification is rewound to the first rejected CLTU since
+        the provider expects that identification next. Retryable CLTUs are
+        put back at the front of the pending queue in their original order
+        and the rest have their results failed.
+
+        Returns:
+            True if any CLTUs were requeued.
+        '''
+        self._cltu_id = min(item.cltu_id for item, _ in rejected)
+
+        retry = []
+        for item, diag in rejected:
+            if diag in self._retryable_diagnostics and item.retries < self._cltu_max_retries:
+                item.retries += 1
+                retry.append(item)
+            else:
+                item.result.set_exception(CltuTransferError(item.cltu_id, diag))
+
+        retry.sort(key=lambda i: i.index)
+        self._cltu_pending.extendleft(reversed(retry))
+
+        if retry:
+            ait.core.log.warn('Resending {} rejected CLTUs starting at CLTU #{}'.format(
+                len(retry), self._cltu_id
+            ))
+
+        return bool(retry)
+
+    def _encode_cltu_pdu(self, tc_data, earliest_time=None, latest_time=None, delay=0, notify=False):
+        ''' Returns the invoke id and encoded CLTU PDU message ready for upload
+
+        The PDU is encoded with :class:`CltuTransferDataEncoder` unless
+        the ``fast_encode`` option is disabled, in which case it is built
+        with :meth:`_prepare_cltu_pdu` and encoded with PyASN1.
+
+        See :meth:`upload_cltu` for a description of the arguments.
+
+        Returns:
+            A tuple of the invoke id of the CLTU-TRANSFER-DATA invocation
+            and the TML message.
+        '''
+        if not self._fast_encode:
+            pdu = self._prepare_cltu_pdu(tc_data, earliest_time, latest_time, delay, notify)
+            invoke_id = int(pdu['cltuTransferDataInvocation']['invokeId'])
+            return invoke_id, self.encode_pdu(pdu)
+
+        credentials = None
+        if self._auth_level == 'all':
+            credentials = self.make_credentials()
+
+        invoke_id = self.invoke_id
+        en = self._cltu_encoder.encode(
+            invoke_id, self._cltu_id, tc_data,
+            earliest_time, latest_time, delay, notify, credentials
+        )
+        self._cltu_id += 1
+        return invoke_id, pack_sle_pdu(en)
 
     def _prepare_cltu_pdu(self, tc_data, earliest_time=None, latest_time=None, delay=0, notify=False):
         ''' Returns CLTU PDU prepared for upload
@@ -238,13 +618,13 @@ class CLTU(common.SLE):
         self._cltu_id += 1
 
         if earliest_time:
-            t = struct.pack('!HIH', (earliest_time - common.CCSDS_EPOCH).days, 0, 0)
+            t = timecode.encode(earliest_time)
             pdu['cltuTransferDataInvocation']['earliestTransmissionTime']['known']['ccsdsFormat'] = t
         else:
             pdu['cltuTransferDataInvocation']['earliestTransmissionTime']['undefined'] = None
 
         if latest_time:
-            t = struct.pack('!HIH', (latest_time - common.CCSDS_EPOCH).days, 0, 0)
+            t = timecode.encode(latest_time)
             pdu['cltuTransferDataInvocation']['latestTransmissionTime']['known']['ccsdsFormat'] = t
         else:
             pdu['cltuTransferDataInvocation']['latestTransmissionTime']['undefined'] = None
@@ -286,10 +666,10 @@ class CLTU(common.SLE):
                 Specify whether the provider shall invoke the CLTU-ASYNCNOTIFY
                 operation upon completion of the radiation of the CLTU.
         """
-        pdu = self._prepare_cltu_pdu(tc_data, earliest_time, latest_time, delay, notify)
+        _, msg = self._encode_cltu_pdu(tc_data, earliest_time, latest_time, delay, notify)
 
         with open(filename, "wb") as f:
-            f.write(self.encode_pdu(pdu))
+            f.write(msg)
 
         ait.core.log.info('Saved TC Data to {}.'.format(filename))
 
@@ -317,17 +697,40 @@ class CLTU(common.SLE):
         pdu['cltuScheduleStatusReportInvocation']['invokeId'] = self.invoke_id
 
         if report_type == 'immediately':
-            pdu['cltuScheduleStatusReportInvocation']['reportType'][report_type] = None
+            pdu['cltuScheduleStatusReportInvocation']['reportRequestType'][report_type] = None
         elif report_type == 'periodically':
-            pdu['cltuScheduleStatusReportInvocation']['reportType'][report_type] = cycle
+            pdu['cltuScheduleStatusReportInvocation']['reportRequestType'][report_type] = cycle
         elif report_type == 'stop':
-            pdu['cltuScheduleStatusReportInvocation']['reportType'][report_type] = None
+            pdu['cltuScheduleStatusReportInvocation']['reportRequestType'][report_type] = None
         else:
             raise ValueError('Unknown report type: {}'.format(report_type))
 
         ait.core.log.info('Scheduling Status Report')
         self.send(self.encode_pdu(pdu))
 
+    def stats(self):
+        ''' Return the runtime statistics of the session
+
+        Returns:
+            The statistics of :meth:`ait.dsn.sle.common.SLE.stats` along
+            with the number of CLTUs sent (``cltus_sent``), accepted and
+            rejected by the provider (``cltus_accepted`` and
+            ``cltus_rejected``), still awaiting a transfer data return
+            (``cltus_outstanding``), waiting to be sent (``cltus_pending``)
+            and reported radiated by CLTU radiated notifications
+            (``cltus_radiated``) and the last reported
+            ``cltu_buffer_available``.
+        '''
+        stats = super(self.__class__, self).stats()
+        stats['cltus_sent'] = self._cltus_sent
+        stats['cltus_accepted'] = self._cltus_accepted
+        stats['cltus_rejected'] = self._cltus_rejected
+        stats['cltus_outstanding'] = len(self._outstanding)
+        stats['cltus_pending'] = len(self._cltu_pending)
+        stats['cltus_radiated'] = self._cltus_radiated
+        stats['cltu_buffer_available'] = self._cltu_buffer_available
+        return stats
+
     def get_parameter(self):
         ''''''
         #TODO: Implement
@@ -440,31 +843,39 @@ class CLTU(common.SLE):
 
     def _trans_data_return_handler(self, pdu):
         ''''''
-        result = pdu['cltuTransferDataReturn']['result']
-        cltu_id = pdu['cltuTransferDataReturn']['cltuIdentification']
-        buffer_avail = pdu['cltuTransferDataReturn']['cltuBufferAvailable']
+        pdu = pdu['cltuTransferDataReturn']
+        result = pdu['result']
+        cltu_id = pdu['cltuIdentification']
+        buffer_avail = pdu['cltuBufferAvailable']
+        self._cltu_buffer_available = int(buffer_avail)
 
         if 'positiveResult' in result:
+            diag = None
+            self._cltus_accepted += 1
             ait.core.log.info('CLTU #{} trans. passed. Buffer avail.: {}'.format(
                 cltu_id,
                 buffer_avail
             ))
         else:
             result = result['negativeResult']
-            if 'commmon' in result:
-                opts = ['Duplicate Invoke Id', 'Other Reason']
-                diag = opts[result['common']]
+            if 'common' in result:
+                if int(result['common']) == 100:
+                    diag = 'Duplicate Invoke Id'
+                else:
+                    diag = 'Other Reason'
             else:
-                opts = ['Unable to Process', 'Unable to Store', 'Out of Sequence',
-                        'Inconsistent Time Range', 'Invalid Time', 'Late Sldu',
-                        'Invalid Delay Time', 'CLTU Error']
-                diag = opts[result['specific']]
+                diag = self._diagnostics[int(result['specific'])]
+            self._cltus_rejected += 1
             ait.core.log.info('CLTU #{} trans. failed. Diag: {}. Buffer avail: {}'.format(
                 cltu_id,
                 diag,
                 buffer_avail
             ))
 
+        item = self._outstanding.pop(int(pdu['invokeId']), None)
+        if item is not None:
+            self._cltu_returns.put((item, diag))
+
     def _start_return_handler(self, pdu):
         ''''''
         result = pdu['cltuStartReturn']['result']
@@ -496,8 +907,11 @@ class CLTU(common.SLE):
         pdu = pdu['cltuAsyncNotifyInvocation']
 
         msg = '\n'
-        if 'cltuNoficiation' in pdu:
-            msg += 'CLTU Notification: {}\n'.format(pdu['cltuNotification'].getName())
+        if 'cltuNotification' in pdu:
+            notification = pdu['cltuNotification'].getName()
+            if notification == 'cltuRadiated':
+                self._cltus_radiated += 1
+            msg += 'CLTU Notification: {}\n'.format(notification)
 
         if 'cltuLastProcessed' in pdu:
             if pdu['cltuLastProcessed'].getName() == 'noCltuProcessed':
@@ -548,32 +962,22 @@ class CLTU(common.SLE):
                 diag_options = ['notSupportedInThisDeliveryMode', 'alreadyStopped', 'invalidReportingCycle']
 
             reason = diag_options[int(diag.getComponent())]
-            ait.core.log.warning('Status Report Scheduling Failed. Reason: {}'.format(reason))
+            ait.core.log.warn('Status Report Scheduling Failed. Reason: {}'.format(reason))
 
     def _status_report_invoc_handler(self, pdu):
         ''''''
         pdu = pdu['cltuStatusReportInvocation']
+        self._metrics.record_status_report(pdu)
 
         report = 'Status Report\n'
-        report += 'Number of Error Free Frames: {}\n'.format(pdu['errorFreeFrameNumber'])
-        report += 'Number of Delivered Frames: {}\n'.format(pdu['deliveredFrameNumber'])
-
-        frame_lock_status = ['In Lock', 'Out of Lock', 'Unknown']
-        report += 'Frame Sync Lock Status: {}\n'.format(frame_lock_status[pdu['frameSyncLockStatus']])
+        report += 'Number of CLTUs Received: {}\n'.format(pdu['numberOfCltusReceived'])
+        report += 'Number of CLTUs Processed: {}\n'.format(pdu['numberOfCltusProcessed'])
+        report += 'Number of CLTUs Radiated: {}\n'.format(pdu['numberOfCltusRadiated'])
+        report += 'CLTU Buffer Available: {}\n'.format(pdu['cltuBufferAvailable'])
+        report += 'Production Status: {}\n'.format(pdu['cltuProductionStatus'].prettyPrint())
+        report += 'Uplink Status: {}'.format(pdu['uplinkStatus'].prettyPrint())
 
-        symbol_lock_status = ['In Lock', 'Out of Lock', 'Unknown']
-        report += 'Symbol Sync Lock Status: {}\n'.format(symbol_lock_status[pdu['symbolSyncLockStatus']])
-
-        lock_status = ['In Lock', 'Out of Lock', 'Not In Use', 'Unknown']
-        report += 'Subcarrier Lock Status: {}\n'.format(lock_status[pdu['subcarrierLockStatus']])
-
-        carrier_lock_status = ['In Lock', 'Out of Lock', 'Unknown']
-        report += 'Carrier Lock Status: {}\n'.format(lock_status[pdu['carrierLockStatus']])
-
-        production_status = ['Running', 'Interrupted', 'Halted']
-        report += 'Production Status: {}'.format(production_status[pdu['productionStatus']])
-
-        ait.core.log.warning(report)
+        ait.core.log.warn(report)
 
     def _get_param_return_handler(self, pdu):
         ''''''
@@ -582,12 +986,7 @@ class CLTU(common.SLE):
     def _peer_abort_handler(self, pdu):
         ''''''
         pdu = pdu['cltuPeerAbortInvocation']
-        opts = [
-            'accessDenied', 'unexpectedResponderId', 'operationalRequirement',
-            'protocolError', 'communicationsFailure', 'encodingError', 'returnTimeout',
-            'endOfServiceProvisionPeriod', 'unsolicitedInvokeId', 'otherReason'
-        ]
-        ait.core.log.error('Peer Abort Received. {}'.format(opts[pdu]))
+        ait.core.log.error('Peer Abort Received. {}'.format(pdu.prettyPrint()))
         self._state = 'unbound'
         self.disconnect()
 
@@ -36,52 +36,61 @@ Attributes:
     TML_CONTEXT_HEARTBEAT_TYPE: The first 4 bytes of an SLE Heartbeat
         message PDU header for use when struct.pack-ing.
 
+    The TML attributes are defined in :mod:`ait.dsn.sle.tml` and are
+    re-exported here for backwards compatibility.
+
     CCSDS_EPOCH: A datetime object pointing to the CCSDS Epoch.
 
 Classes:
     SLE: An SLE interface "base" class that provides interface-agnostic
         methods and attributes for interfacing with SLE.
+
+Functions:
+    conn_handler: Receive data from the DSN and queue the SLE PDUs.
+
+    keepalive: Send TML heartbeats and detect a dead peer.
+
+    metrics_reporter: Periodically pass a snapshot of the session
+        statistics to a handler.
+
+    data_processor: Decode and handle queued SLE PDUs.
 '''
 
-import binascii
 from collections import defaultdict
 import datetime as dt
 import errno
 import fcntl
-import hashlib
 import random
 import socket
 import struct
 import time
 
 import gevent
+import gevent.event
 import gevent.queue
 import gevent.socket
-import gevent.monkey; gevent.monkey.patch_all()
+import gevent.monkey
 
 import pyasn1.error
 from pyasn1.codec.ber.encoder import encode
-from pyasn1.codec.der.encoder import encode as der_encode
 from pyasn1.codec.der.decoder import decode
 
 import ait.core
 import ait.core.log
 
+if ait.config.get('dsn.sle.monkey_patch', False):
+    gevent.monkey.patch_all()
+
 from ait.dsn.sle.pdu import service_instance
 from ait.dsn.sle.pdu.service_instance import *
-from ait.dsn.sle.pdu.common import HashInput, ISP1Credentials
-import util
+from ait.dsn.sle import (ber, capture, credentials, demux, frames, hooks,
+                         latency, metrics, packets, sequence, sink, timecode,
+                         tml)
+from ait.dsn.sle.tml import (TML_SLE_FORMAT, TML_SLE_TYPE,
+                             TML_CONTEXT_MSG_FORMAT, TML_CONTEXT_MSG_TYPE,
+                             TML_CONTEXT_HB_FORMAT, TML_CONTEXT_HEARTBEAT_TYPE)
 
-TML_SLE_FORMAT = '!ii'
-TML_SLE_TYPE = 0x01000000
-
-TML_CONTEXT_MSG_FORMAT = '!IIbbbbIHH'
-TML_CONTEXT_MSG_TYPE = 0x02000000
-
-TML_CONTEXT_HB_FORMAT = '!ii'
-TML_CONTEXT_HEARTBEAT_TYPE = 0x03000000
-
-CCSDS_EPOCH = dt.datetime(1958, 1, 1)
+CCSDS_EPOCH = timecode.CCSDS_EPOCH
 
 
 class SLE(object):
@@ -90,22 +99,63 @@ class SLE(object):
     The SLE class provides SLE interface-agnostic methods and attributes
     for interfacing with SLE.
 
+    Each instance owns its handler table, data queue and invoke id counter
+    so any number of service instances can run in one process. By default
+    every instance spawns its own greenlet for decoding received PDUs. If a
+    :class:`ait.dsn.sle.manager.SessionManager` is passed as the
+    ``session_manager`` keyword argument the instance's PDUs are decoded
+    by the manager's shared workers instead.
+
+    A keepalive greenlet sends TML heartbeats and treats the connection as
+    lost if nothing is received from the provider for ``heartbeat`` x
+    ``deadfactor`` seconds. Unless ``auto_resume`` is disabled, the lost
+    connection of a bound session is re-established, the session is bound
+    again and, if it was started, restarted. A connection that is lost
+    while the session is unbound is not re-established. Return services started with a start
+    time restart from the earth receive time of the last delivered frame.
+
+    Runtime counters and gauges are available from :meth:`stats`. If
+    ``metrics_interval`` is set, a snapshot of the statistics is passed to
+    the ``metrics_handler`` keyword argument, or logged, every
+    ``metrics_interval`` seconds.
+
+    Profilers, timers and tracers can be attached to the framing, decode,
+    dispatch and handler stages of the receive path with :meth:`add_hook`.
+
+    Unless ``latency_window`` is 0, the delay of every received frame from
+    its earth receive time to its delivery by the provider and to its
+    emission to the frame sinks is measured. See :meth:`latency_stats`.
     '''
-    _state = 'unbound'
-    _handlers = defaultdict(list)
-    _data_queue = gevent.queue.Queue()
-    _invoke_id = 0
 
     def __init__(self, *args, **kwargs):
         ''''''
+        self._state = 'unbound'
+        self._handlers = defaultdict(list)
+        self._data_queue = gevent.queue.Queue()
+        self._invoke_id = 0
+
+        self._socket = None
+        self._connected = gevent.event.Event()
+        self._last_recv = self._last_send = time.time()
+        self._bound_inst_id = None
+        self._start_args = None
+        self._last_ert = None
+        self._resumer = None
+
         self._downlink_frame_type = ait.config.get('dsn.sle.downlink_frame_type',
                                                    kwargs.get('downlink_frame_type', 'TMTransFrame'))
+        self._downlink_frame_options = ait.config.get('dsn.sle.downlink_frame_options',
+                                                      kwargs.get('downlink_frame_options', {}))
+        self._frame_decoder = frames.make_frame_decoder(self._downlink_frame_type,
+                                                        self._downlink_frame_options)
         self._heartbeat = ait.config.get('dsn.sle.heartbeat',
                                          kwargs.get('heartbeat', 25))
         self._deadfactor = ait.config.get('dsn.sle.deadfactor',
                                           kwargs.get('deadfactor', 5))
         self._buffer_size = ait.config.get('dsn.sle.buffer_size',
                                            kwargs.get('buffer_size', 256000))
+        self._max_batch_size = ait.config.get('dsn.sle.max_batch_size',
+                                              kwargs.get('max_batch_size', 64))
         self._initiator_id = ait.config.get('dsn.sle.initiator_id',
                                             kwargs.get('initiator_id', 'LSE'))
         self._responder_id = ait.config.get('dsn.sle.responder_id',
@@ -115,9 +165,45 @@ class SLE(object):
                                              kwargs.get('peer_password', None))
         self._responder_port = ait.config.get('dsn.sle.responder_port',
                                               kwargs.get('responder_port', 'default'))
-        self._telem_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self._auth_level = ait.config.get('dsn.sle.auth_level',
                                           kwargs.get('auth_level', 'none'))
+        self._fast_decode = ait.config.get('dsn.sle.fast_decode',
+                                           kwargs.get('fast_decode', False))
+        self._auto_resume = ait.config.get('dsn.sle.auto_resume',
+                                           kwargs.get('auto_resume', True))
+        self._reconnect_delay = ait.config.get('dsn.sle.reconnect_delay',
+                                               kwargs.get('reconnect_delay', 5))
+        self._resume_timeout = ait.config.get('dsn.sle.resume_timeout',
+                                              kwargs.get('resume_timeout', 10))
+        # Sinks given to a session, such as callbacks, take precedence
+        # over the configured sinks
+        sinks = kwargs.get('sinks')
+        if sinks is None:
+            sinks = ait.config.get('dsn.sle.sinks',
+                                   [{'type': 'udp', 'host': 'localhost', 'port': 3076}])
+        self._sinks = [s if isinstance(s, sink.FrameSink) else sink.make_sink(s)
+                       for s in sinks]
+        routes = ait.config.get('dsn.sle.vc_routes', kwargs.get('vc_routes', None))
+        self._demux = demux.VirtualChannelDemux(routes) if routes else None
+        # Sinks write asynchronously so packets stitched from several
+        # frames are copied out of the reassembly buffer
+        self._packet_extractor = packets.PacketExtractor(copy_stitched=True)
+        self._frame_counts = sequence.FrameCountTracker()
+        self._frames_received = 0
+        latency_window = ait.config.get('dsn.sle.latency_window',
+                                        kwargs.get('latency_window', 1000))
+        self._latency = latency.LatencyTracker(latency_window) if latency_window > 0 else None
+        self._recv_time = None
+        self._metrics = metrics.SessionMetrics()
+        self._metrics_interval = ait.config.get('dsn.sle.metrics_interval',
+                                                kwargs.get('metrics_interval', 0))
+        self._queue_warning = ait.config.get('dsn.sle.queue_warning',
+                                             kwargs.get('queue_warning', 0))
+        self._metrics_handler = kwargs.get('metrics_handler', self._log_stats)
+        self._hooks = hooks.HookSet()
+
+        capture_path = ait.config.get('dsn.sle.capture_path', kwargs.get('capture_path', None))
+        self._capture = capture.CaptureWriter(capture_path) if capture_path else None
 
         if not self._hostnames or not self._port:
             msg = 'Connection configuration missing hostnames ({}) or port ({})'
@@ -128,21 +214,40 @@ class SLE(object):
         if self._auth_level not in ['none', 'bind', 'all']:
             raise ValueError('Authentication level must be one of: "none", "bind", "all"')
 
+        if self._fast_decode not in [False, True, 'verify']:
+            raise ValueError('Fast decode must be one of: False, True, "verify"')
+
         self._local_entity_auth = {
             'local_entity_id': self._initiator_id,
             'auth_level': self._auth_level,
             'time': None,
             'random_number': None
         }
+        self._local_credentials = credentials.ISP1Encoder(self._initiator_id,
+                                                          self._password)
+        self._peer_credentials = credentials.ISP1Encoder(self._responder_id,
+                                                         self._peer_password)
+
+        self._framer = tml.TMLFramer(self._buffer_size)
 
         self._conn_monitor = gevent.spawn(conn_handler, self)
-        self._data_processor = gevent.spawn(data_processor, self)
+        self._keepalive = gevent.spawn(keepalive, self)
+        self._metrics_reporter = None
+        if self._metrics_interval > 0:
+            self._metrics_reporter = gevent.spawn(metrics_reporter, self)
+
+        self._session_manager = kwargs.get('session_manager', None)
+        if self._session_manager is not None:
+            self._data_processor = None
+            self._session_manager.add(self)
+        else:
+            self._data_processor = gevent.spawn(data_processor, self)
 
     @property
     def invoke_id(self):
         ''''''
         iid = self._invoke_id
-        self._invoke_id += 1
+        self._invoke_id = (self._invoke_id + 1) % 65536
         return iid
 
     def add_handler(self, event, handler):
@@ -160,18 +265,171 @@ class SLE(object):
         '''
         self._handlers[event].append(handler)
 
+    def add_hook(self, stage, before=None, after=None, every=1, names=None):
+        ''' Attach instrumentation callbacks to a stage of the receive path
+
+        See :mod:`ait.dsn.sle.hooks` for the stages and the arguments the
+        callbacks are called with.
+
+        Arguments:
+            stage:
+                One of ``'framing'``, ``'decode'``, ``'dispatch'`` or
+                ``'handler'``.
+
+            before:
+                The function called before the stage. Its return value is
+                passed to after.
+
+            after:
+                The function called after the stage.
+
+            every:
+                Only every Nth event of the stage is passed to the hook.
+
+            names:
+                An optional list of PDU names to limit a dispatch or
+                handler hook to.
+
+        Returns:
+            The :class:`ait.dsn.sle.hooks.Hook`, for :meth:`remove_hook`.
+        '''
+        return self._hooks.add(stage, before, after, every, names)
+
+    def remove_hook(self, hook):
+        ''' Detach a hook added with :meth:`add_hook` '''
+        self._hooks.remove(hook)
+
     def send(self, data):
         ''' Send supplied data to DSN '''
         try:
             self._socket.send(data)
+            self._last_send = time.time()
         except socket.error as e:
-            if e.errno == errno.ECONNRESET:
-                ait.core.log.error('Socket connection lost to DSN')
-                self._socket.close()
+            if e.errno in (errno.ECONNRESET, errno.EPIPE):
+                self._connection_lost('Socket connection lost to DSN')
             else:
                 ait.core.log.error('Unexpected error encountered when sending data. Aborting ...')
                 raise e
 
+    def emit_frame(self, frame):
+        ''' Pass a received telemetry frame to each of the frame sinks
+
+        Arguments:
+            frame:
+                The frame data as a byte string.
+        '''
+        for frame_sink in self._sinks:
+            frame_sink.put(frame)
+
+    def frame_count_stats(self):
+        ''' Return the frame count statistics of the received frames
+
+        See :meth:`ait.dsn.sle.sequence.FrameCountTracker.stats`.
+        '''
+        return self._frame_counts.stats()
+
+    def latency_stats(self):
+        ''' Return the earth receive time latencies of the received frames
+
+        See :meth:`ait.dsn.sle.latency.LatencyTracker.stats`. An empty
+        dictionary is returned if latencies are not measured.
+        '''
+        if self._latency is None:
+            return {}
+        return self._latency.stats()
+
+    def stats(self):
+        ''' Return the runtime statistics of the session
+
+        A consumer that is falling behind shows as a growing
+        ``queue_depth`` and ``handler_time`` taking up most of the elapsed
+        time, usually well before the provider reports an excessive data
+        backlog.
+
+        Returns:
+            The counters of :meth:`ait.dsn.sle.metrics.SessionMetrics.stats`
+            along with the session ``state``, the ``frames_decoded``, the
+            current ``queue_depth`` of received PDU messages waiting to be
+            decoded and the ``time`` of the snapshot.
+        '''
+        stats = self._metrics.stats(self._framer)
+        stats['state'] = self._state
+        stats['frames_decoded'] = self._frames_received
+        stats['queue_depth'] = self._data_queue.qsize()
+        stats['time'] = time.time()
+        return stats
+
+    def _log_stats(self, stats):
+        ''' Log a snapshot of the session statistics
+
+        The default ``metrics_handler``.
+        '''
+        ait.core.log.info(
+            'SLE session stats: {} bytes, {} PDUs, {} transfer buffers, '
+            '{} frames, {} decode failures, queue depth {} (high water {}), '
+            'handler time {:.3f} s'.format(
+                stats['bytes_received'], stats['pdus_received'],
+                stats['transfer_buffers'], stats['frames_decoded'],
+                stats['decode_failures'], stats['queue_depth'],
+                stats['queue_high_water'], stats['handler_time']))
+
+    def _handle_frame(self, frame):
+        ''' Track the frame counts of a received frame and pass its packets
+        to the frame sinks
+
+        Arguments:
+            frame:
+                The decoded transfer frame.
+        '''
+        self._frames_received += 1
+        self._frame_counts.update(frame)
+        self._emit_packets(frame)
+        if self._latency is not None and self._last_ert is not None:
+            self._latency.update(frame, self._last_ert, self._recv_time)
+
+    def _status_report(self, pdu):
+        ''' Format the frame counts of a return service status report
+        and the session's own frame count statistics
+        '''
+        report = 'Status Report\n'
+        report += 'Number of Error Free Frames: {}\n'.format(pdu['errorFreeFrameNumber'])
+        report += 'Number of Delivered Frames: {}\n'.format(pdu['deliveredFrameNumber'])
+        counts = self._frame_counts.report()
+        if counts:
+            report += counts + '\n'
+        return report
+
+    def _emit_packets(self, frame):
+        ''' Pass the packets completed by a received frame to the frame sinks
+
+        Each packet's data field, without its primary header, is queued on
+        the virtual channel route for the frame or, if no route matches,
+        passed to :meth:`emit_frame`. The user data of frames that do not
+        carry packets, such as AOS B_PDUs, is passed on as is.
+
+        Arguments:
+            frame:
+                The decoded transfer frame.
+        '''
+        emit = self.emit_frame
+        if self._demux is not None:
+            route = self._demux.route(frame.spacecraft_id, frame.virtual_channel_id)
+            if route is not None:
+                emit = route.put
+
+        if not frame.carries_packets:
+            data = frame.user_data
+            if data is not None:
+                emit(data)
+            return
+
+        completed = self._packet_extractor.extract(frame)
+        if not completed:
+            return
+
+        for packet in completed:
+            emit(packet[packets.SPACE_PACKET_HEADER_LEN:])
+
     def decode(self, message, asn1Spec):
         ''' Decode a chunk of ASN.1 data
 
@@ -193,6 +451,77 @@ class SLE(object):
         '''
         return decode(message, asn1Spec=asn1Spec)
 
+    def _decode_transfer_buffer(self, message, asn1Spec, name, has_quality):
+        ''' Decode a transfer buffer PDU with the fast-path BER scanner
+
+        If fast decoding is set to ``'verify'`` the message is also decoded
+        with PyASN1 and the PyASN1 result is used whenever the two disagree.
+
+        Arguments:
+            message:
+                A bytestring of data that contains an encoded ASN.1 PDU to
+                be decoded.
+
+            asn1Spec:
+                An instance of the PyASN1 class for the service's provider
+                to user PDUs. Only used when verifying.
+
+            name:
+                The name of the transfer buffer PDU choice.
+
+            has_quality:
+                Whether annotated frames contain a delivered frame quality.
+
+        Returns:
+            A tuple of the decoded PDU and the remainder of the message or
+            None if the message must be decoded with PyASN1 instead. See
+            :func:`ait.dsn.sle.ber.decode_transfer_buffer`.
+        '''
+        result = ber.decode_transfer_buffer(message, name, has_quality)
+        if result is None or self._fast_decode != 'verify':
+            return result
+
+        expected = decode(message, asn1Spec=asn1Spec)
+        if not self._transfer_buffer_matches(result[0], expected[0][name], has_quality):
+            ait.core.log.error(
+                'Fast decode of {} does not match PyASN1. '
+                'Using the PyASN1 decoded PDU.'.format(name)
+            )
+            return expected
+
+        return result
+
+    def _transfer_buffer_matches(self, records, pdu, has_quality):
+        ''' Check that fast decoded frame records match a PyASN1 decoded
+        transfer buffer
+        '''
+        if len(records) != len(pdu):
+            return False
+
+        for record, element in zip(records, pdu):
+            if element.getName() != 'annotatedFrame':
+                return False
+
+            frame = element.getComponent()
+            annotation = frame['privateAnnotation']
+            if annotation.getName() == 'null':
+                annotation = None
+            else:
+                annotation = annotation.getComponent().asOctets()
+
+            quality = None
+            if has_quality:
+                quality = int(frame['deliveredFrameQuality'])
+
+            if (record.earth_receive_time != frame['earthReceiveTime'].getComponent().asOctets() or
+                record.data_link_continuity != int(frame['dataLinkContinuity']) or
+                record.delivered_frame_quality != quality or
+                record.private_annotation != annotation or
+                record.data.tobytes() != frame['data'].asOctets()):
+                return False
+
+        return True
+
     def encode_pdu(self, pdu):
         ''' Encode a SLE PDU
 
@@ -203,12 +532,7 @@ class SLE(object):
             The ASN.1 encoded PDU struct.pack-ed into the SLE PDU packet
             structure.
         '''
-        en = encode(pdu)
-        return struct.pack(
-                TML_SLE_FORMAT,
-                TML_SLE_TYPE,
-                len(en),
-        ) + en
+        return tml.pack_sle_pdu(encode(pdu))
 
     def bind(self, pdu, **kwargs):
         ''' Bind to an SLE Interface
@@ -231,6 +555,7 @@ class SLE(object):
         inst_id = kwargs['inst_id'] if kwargs.get('inst_id') else self._inst_id
         if not inst_id:
             raise AttributeError('No instance id provided. Unable to bind.')
+        self._bound_inst_id = inst_id
 
         inst_ids = [
             st.split('=')
@@ -267,6 +592,8 @@ class SLE(object):
             pdu['invokerCredentials']['unused'] = None
 
         pdu['unbindReason'] = reason
+        self._bound_inst_id = None
+        self._start_args = None
 
         ait.core.log.info('Sending Unbind request ...')
         self.send(self.encode_pdu(pdu))
@@ -278,6 +605,8 @@ class SLE(object):
         to configure communication.
         '''
         self._socket = gevent.socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._metrics.add_framer(self._framer)
+        self._framer = tml.TMLFramer(self._buffer_size)
 
         connected = False
         for hostname in self._hostnames:
@@ -312,16 +641,38 @@ class SLE(object):
             ait.core.log.error('SLE connection configuration failed. Aborting ...')
             raise e
 
+        self._last_recv = self._last_send = time.time()
+        self._connected.set()
+
     def disconnect(self):
         ''' Disconnect from SLE
 
-        Disconnect the SLE and telemetry output sockets and kill the
-        greenlets for monitoring and processing data.
+        Disconnect the SLE socket, flush and close the frame sinks and
+        virtual channel routes and kill the greenlets for monitoring and
+        processing data.
         '''
-        self._socket.close()
-        self._telem_sock.close()
+        self._connected.clear()
+        if self._resumer is not None:
+            self._resumer.kill()
+
+        if self._socket is not None:
+            self._socket.close()
+        for frame_sink in self._sinks:
+            frame_sink.close()
+        if self._demux is not None:
+            self._demux.close()
+        if self._capture is not None:
+            self._capture.close()
+            self._capture = None
         self._conn_monitor.kill()
-        self._data_processor.kill()
+        self._keepalive.kill()
+        if self._metrics_reporter is not None:
+            self._metrics_reporter.kill()
+
+        if self._session_manager is not None:
+            self._session_manager.remove(self)
+        else:
+            self._data_processor.kill()
 
     def stop(self, pdu):
         ''' Send a SLE Stop PDU.
@@ -337,6 +688,7 @@ class SLE(object):
             pdu['invokerCredentials']['unused'] = None
 
         pdu['invokeId'] = self.invoke_id
+        self._start_args = None
 
         ait.core.log.info('Sending data stop invocation ...')
         self.send(self.encode_pdu(pdu))
@@ -353,6 +705,146 @@ class SLE(object):
                 0
         )
         self.send(hb)
+        self._metrics.heartbeats_sent += 1
+
+    def _connection_lost(self, reason):
+        ''' Close a failed connection and start resuming the session
+
+        Arguments:
+            reason:
+                A description of the failure for the log.
+        '''
+        if not self._connected.is_set():
+            return
+
+        self._connected.clear()
+        self._socket.close()
+        self._state = 'unbound'
+        ait.core.log.error('SLE connection lost: {}'.format(reason))
+
+        # Only sessions that were bound or active are resumed. The
+        # provider may close the connection after a normal unbind.
+        if self._auto_resume and self._resumer is None and self._bound_inst_id is not None:
+            self._resumer = gevent.spawn(self._resume)
+
+    def _resume(self):
+        ''' Retry restoring the session every ``reconnect_delay`` seconds
+        until it succeeds.
+        '''
+        try:
+            while True:
+                gevent.sleep(self._reconnect_delay)
+                try:
+                    self._restore_session()
+                except Exception as e:
+                    ait.core.log.error('Unable to resume SLE session: {}'.format(e))
+                    self._connected.clear()
+                    if self._socket is not None:
+                        self._socket.close()
+                    continue
+
+                ait.core.log.info('SLE session resumed')
+                return
+        finally:
+            self._resumer = None
+
+    def _restore_session(self):
+        ''' Reconnect and return the session to its state before the
+        connection was lost.
+        '''
+        self.connect()
+        if self._bound_inst_id is None:
+            return
+
+        self.bind(inst_id=self._bound_inst_id)
+        self._wait_for_state('ready')
+
+        if self._start_args is not None:
+            self._resume_start()
+            self._wait_for_state('active')
+
+    def _resume_start(self):
+        ''' Restart a resumed session with the arguments of the last start
+
+        A start time in the first argument is replaced with the earth
+        receive time of the last delivered frame.
+        '''
+        args = list(self._start_args)
+        if args and args[0] is not None and self._last_ert is not None:
+            args[0] = timecode.decode(self._last_ert)
+
+        self.start(*args)
+
+    def _wait_for_state(self, state):
+        ''' Wait up to ``resume_timeout`` seconds for the session state '''
+        deadline = time.time() + self._resume_timeout
+        while self._state != state:
+            if not self._connected.is_set():
+                raise Exception('Connection lost while waiting for {} state'.format(state))
+            if time.time() > deadline:
+                raise Exception('Timed out waiting for {} state'.format(state))
+            gevent.sleep(0.1)
+
+    def _process_message(self, msg, received=None):
+        ''' Decode a received TML PDU message and dispatch it to handlers
+
+        Arguments:
+            msg:
+                A TML PDU message (8 byte header plus encoded PDU body).
+
+            received:
+                The time the message was received or None if unknown.
+        '''
+        body = msg[tml.TML_HEADER_LEN:]
+        self._recv_time = received
+        stats = self._metrics
+        hook_set = self._hooks
+        calls = hook_set.enter('decode', None) if hook_set.decode else None
+        start = time.time()
+
+        try:
+            decoded_pdu, remainder = self.decode(body)
+        except pyasn1.error.PyAsn1Error as e:
+            stats.decode_failures += 1
+            ait.core.log.error('Unable to decode PDU. Skipping ...')
+            if calls:
+                hook_set.exit('decode', None, calls)
+            return
+        except TypeError as e:
+            stats.decode_failures += 1
+            ait.core.log.error('Unable to decode PDU due to type error ...')
+            if calls:
+                hook_set.exit('decode', None, calls)
+            return
+
+        decoded = time.time()
+        if calls:
+            name = decoded_pdu.getName()
+            hook_set.exit('decode', name[:1].upper() + name[1:], calls)
+        self._handle_pdu(decoded_pdu)
+        stats.pdus_handled += 1
+        stats.decode_time += decoded - start
+        stats.handler_time += time.time() - decoded
+
+    def _drain_queue(self, max_count):
+        ''' Process queued PDU messages without blocking
+
+        Arguments:
+            max_count:
+                The maximum number of messages to process.
+
+        Returns:
+            The number of messages processed.
+        '''
+        for i in range(max_count):
+            try:
+                msg, received = self._data_queue.get_nowait()
+            except gevent.queue.Empty:
+                return i
+
+            self._process_message(msg, received)
+
+        return max_count
 
     def _handle_pdu(self, pdu):
         ''''''
@@ -360,8 +852,20 @@ class SLE(object):
         pdu_key = pdu_key[:1].upper() + pdu_key[1:]
         if pdu_key in self._handlers:
             pdu_handlers = self._handlers[pdu_key]
+            hook_set = self._hooks
+            if not (hook_set.dispatch or hook_set.handler):
+                for h in pdu_handlers:
+                    h(pdu)
+                return
+
+            calls = hook_set.enter('dispatch', pdu_key) if hook_set.dispatch else None
             for h in pdu_handlers:
+                handler_calls = hook_set.enter('handler', pdu_key, h) if hook_set.handler else None
                 h(pdu)
+                if handler_calls:
+                    hook_set.exit('handler', pdu_key, handler_calls, h)
+            if calls:
+                hook_set.exit('dispatch', pdu_key, calls)
         else:
             err = (
                 'PDU of type {} has no associated handlers. '
@@ -377,119 +881,145 @@ class SLE(object):
 
         # This random number for generic
         # Taken from https://public.ccsds.org/Pubs/913x1b2.pdf 3.2.3
-        random_number = random.randint(0, 2147483647)
+        random_number = random.getrandbits(31)
         self._local_entity_auth['time'] = now
         self._local_entity_auth['random_number'] = random_number
-        return self._generate_encoded_credentials(now, random_number, self._initiator_id, self._password)
+        return self._local_credentials.encode(now, random_number)
 
     def _check_return_credentials(self, responder_performer_credentials, username, password):
-        decoded_credentials = decode(responder_performer_credentials.asOctets(), ISP1Credentials())[0]
-        days, ms, us = struct.unpack('!HIH', str(bytearray(decoded_credentials['time'].asNumbers())))
-        time_delta = dt.timedelta(days=days, milliseconds=ms, microseconds=us)
-        cred_time = time_delta + dt.datetime(1958, 1, 1)
-        random_number = decoded_credentials['randomNumber']
-        performer_credentials = self._generate_encoded_credentials(cred_time,
-                                                                   random_number,
-                                                                   self._responder_id,
-                                                                   self._peer_password)
-        return performer_credentials == responder_performer_credentials
-
-    def _generate_encoded_credentials(self, current_time, random_number, username, password):
-        '''Generates encoded ISP1 credentials
+        '''Checks the performer credentials of a return from the responder
 
-        Arguments:
-            current_time:
-                The datetime object representing the time to use to create the credentials.
-            random_number:
-                The random number to use to create the credentials.
-            username:
-                The username to use to create the credentials.
-            password:
-                The password to use to create the credentials.
+        The credentials are always verified against the configured
+        responder id and peer password.
         '''
-        hash_input = HashInput()
-        days = (current_time - dt.datetime(1958, 1, 1)).days
-        millisecs = (current_time - current_time.replace(hour=0, minute=0, second=0, microsecond=0)).total_seconds() * 1000
-        microsecs = int(round(millisecs % 1 * 1000))
-        millisecs = int(millisecs)
-        credential_time = struct.pack('!HIH', days, millisecs, microsecs)
-
-        hash_input['time'] = credential_time
-        hash_input['randomNumber'] = random_number
-        hash_input['username'] = username
-        hash_input['password'] = password
-        der_encoded_hash_input = der_encode(hash_input)
-        the_protected = bytearray.fromhex(hashlib.sha1(der_encoded_hash_input).hexdigest())
-
-        isp1_creds = ISP1Credentials()
-        isp1_creds['time'] = credential_time
-        isp1_creds['randomNumber'] = random_number
-        isp1_creds['theProtected'] = the_protected
-
-        return encode(isp1_creds)
+        return self._peer_credentials.verify(responder_performer_credentials.asOctets())
 
-def conn_handler(handler):
-    ''' Handler for processing data received from the DSN into PDUs'''
-    hb_time = int(time.time())
-    msg = ''
 
+def conn_handler(handler):
+    ''' Handler for processing data received from the DSN into PDUs
+
+    Data is received directly into the handler's
+    :class:`ait.dsn.sle.tml.TMLFramer`. Each complete SLE PDU message is
+    copied once out of the framer's buffer and queued on the data queue
+    as a tuple of the message and the time it was received. If the handler
+    is capturing, the message is also appended to its capture file.
+    Heartbeats are consumed by the framer and corrupt headers are skipped.
+
+    Receiving waits while the handler is not connected. A receive error or
+    the provider closing the connection is reported to the handler as a
+    lost connection.
+    '''
     while True:
+        handler._connected.wait()
         gevent.sleep(0)
 
-        now = int(time.time())
-        if handler._need_heartbeat(now - hb_time):
-            hb_time = now
-            handler._send_heartbeat()
-
+        framer = handler._framer
         try:
-            msg = msg + handler._socket.recv(handler._buffer_size)
-        except:
-            gevent.sleep(1)
-
-        while len(msg) >= 8:
-            hdr, rem = msg[:8], msg[8:]
-
-            # PDU Received
-            if binascii.hexlify(hdr[:4]) == '01000000':
-                # Get length of body and check if the entirety of the
-                # body has been received. If we can, process the message(s)
-                body_len = util.hexint(hdr[4:])
-                if len(rem) < body_len:
-                    break
-                else:
-                    body = rem[:body_len]
-                    handler._data_queue.put(hdr + body)
-                    msg = msg[len(hdr) + len(body):]
-            # Heartbeat Received
-            elif binascii.hexlify(hdr[:8]) == '0300000000000000':
-                msg = rem
-            else:
-                err = (
-                    'Received PDU with unexpected header. '
-                    'Unable to parse data further.\n'
-                )
-                ait.core.log.error(err)
-                ait.core.log.error('\n'.join([msg[i:i+16] for i in range(0, len(msg), 16)]))
-                raise ValueError(err)
+            received = framer.fill(handler._socket)
+        except Exception as e:
+            handler._connection_lost('Error receiving data: {}'.format(e))
+            continue
 
+        if not received:
+            handler._connection_lost('Connection closed by DSN')
+            continue
+
+        handler._last_recv = time.time()
+
+        hook_set = handler._hooks
+        calls = hook_set.enter('framing', None) if hook_set.framing else None
+
+        queued = False
+        received = handler._last_recv
+        for msg in framer:
+            data = msg.tobytes()
+            if handler._capture is not None:
+                handler._capture.write(data, received)
+            handler._data_queue.put((data, received))
+            queued = True
+
+        if calls:
+            hook_set.exit('framing', None, calls)
+
+        if not queued:
+            continue
+
+        depth = handler._data_queue.qsize()
+        if depth > handler._metrics.queue_high_water:
+            handler._metrics.queue_high_water = depth
+
+        if handler._session_manager is not None:
+            handler._session_manager.schedule(handler)
+
+
+def keepalive(handler):
+    ''' Handler for sending heartbeats and detecting a dead peer
+
+    While the handler is connected a TML heartbeat is sent whenever nothing
+    has been sent for ``heartbeat`` seconds. If nothing, including the
+    provider's heartbeats, has been received for ``heartbeat`` x
+    ``deadfactor`` seconds the connection is treated as lost. A heartbeat
+    interval of 0 disables both.
+    '''
+    if handler._heartbeat <= 0:
+        return
 
-def data_processor(handler):
-    ''' Handler for decoding ASN.1 encoded PDUs '''
     while True:
-        gevent.sleep(0)
-        if handler._data_queue.empty():
+        handler._connected.wait()
+
+        now = time.time()
+        dead_time = handler._heartbeat * handler._deadfactor
+        if now - handler._last_recv >= dead_time:
+            handler._connection_lost('Nothing received for {} seconds'.format(dead_time))
             continue
 
-        msg = handler._data_queue.get()
-        hdr, body = msg[:8], msg[8:]
+        if handler._need_heartbeat(now - handler._last_send):
+            try:
+                handler._send_heartbeat()
+            except socket.error as e:
+                handler._connection_lost('Unable to send heartbeat: {}'.format(e))
+                continue
+
+        wake = min(handler._last_send + handler._heartbeat,
+                   handler._last_recv + dead_time)
+        gevent.sleep(max(wake - time.time(), 0))
+
+
+def metrics_reporter(handler):
+    ''' Handler for periodic snapshots of the session statistics
+
+    Every ``metrics_interval`` seconds the handler's statistics are passed
+    to its ``metrics_handler``. If ``queue_warning`` is set, a warning is
+    logged whenever at least that many received PDU messages are waiting
+    to be decoded.
+    '''
+    while True:
+        gevent.sleep(handler._metrics_interval)
+        stats = handler.stats()
+
+        if 0 < handler._queue_warning <= stats['queue_depth']:
+            ait.core.log.warn(
+                'SLE data queue depth is {} (high water {}). '
+                'PDUs are received faster than they are processed.'.format(
+                    stats['queue_depth'], stats['queue_high_water']))
 
         try:
-            decoded_pdu, remainder = handler.decode(body)
-        except pyasn1.error.PyAsn1Error as e:
-            ait.core.log.error('Unable to decode PDU. Skipping ...')
-            continue
-        except TypeError as e:
-            ait.core.log.error('Unable to decode PDU due to type error ...')
-            continue
+            handler._metrics_handler(stats)
+        except Exception as e:
+            ait.core.log.error('Unable to report SLE session stats: {}'.format(e))
+
+
+def data_processor(handler):
+    ''' Handler for decoding ASN.1 encoded PDUs
+
+    Blocks on the data queue until a PDU message arrives. Each wake-up
+    processes all queued messages, up to the handler's configured
+    ``max_batch_size``, before yielding to other greenlets.
+    '''
+    data_queue = handler._data_queue
 
-        handler._handle_pdu(decoded_pdu)
+    while True:
+        msg, received = data_queue.get()
+        handler._process_message(msg, received)
+        handler._drain_queue(handler._max_batch_size - 1)
+        gevent.sleep(0)
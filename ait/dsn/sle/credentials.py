@@ -0,0 +1,170 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+''' ISP1 Credentials
+
+The ait.dsn.sle.credentials module generates and verifies the ISP1
+credentials used when the SLE authentication level is ``'all'``. The
+encoding of the username and password is computed once per identity and
+the HashInput and ISP1Credentials structures are built directly with
+:mod:`ait.dsn.sle.ber` helpers instead of PyASN1. The output is identical
+to encoding those structures with PyASN1.
+
+Classes:
+    ISP1Encoder: Generates and verifies the ISP1 credentials of a single
+        identity.
+'''
+
+import datetime as dt
+import hashlib
+
+from pyasn1.codec.der.decoder import decode
+import pyasn1.error
+
+from ait.dsn.sle import ber, timecode
+from ait.dsn.sle.pdu.common import ISP1Credentials
+
+# OCTET STRING (SIZE (8)) header of the credentials time
+_TIME_HEADER = b'\x04\x08'
+# OCTET STRING (SIZE (20)) header of the protected hash
+_PROTECTED_HEADER = b'\x04\x14'
+_VISIBLE_STRING_TAG = 0x1A
+_SEQUENCE_TAG = 0x30
+
+
+class ISP1Encoder(object):
+    ''' Generate and verify ISP1 credentials for a username and password
+
+    Verification results are cached by credential time and random number
+    so that a peer repeating its credentials is checked without hashing.
+    '''
+
+    def __init__(self, username, password, cache_size=256):
+        '''
+        Arguments:
+            username:
+                The username (initiator or responder identifier) the
+                credentials are made for.
+
+            password:
+                The password of the username. Credentials cannot be made
+                or verified if this is None.
+
+            cache_size:
+                The number of verified (time, random number) pairs to
+                remember.
+        '''
+        self._username = username
+        self._cache_size = cache_size
+        self._cache = {}
+
+        if password is None:
+            self._secret = None
+        else:
+            self._secret = (ber.encode_tlv(_VISIBLE_STRING_TAG, _to_bytes(username)) +
+                            ber.encode_tlv(0x04, _to_bytes(password)))
+
+    def encode(self, time, random_number):
+        ''' Encode ISP1 credentials
+
+        Arguments:
+            time:
+                The :class:`datetime.datetime` the credentials are made at
+                or its 8 octet encoding from
+                :func:`ait.dsn.sle.timecode.encode`.
+
+            random_number:
+                The random number of the credentials.
+
+        Returns:
+            The BER encoded ISP1Credentials.
+        '''
+        if isinstance(time, dt.datetime):
+            time = timecode.encode(time)
+
+        random_number = ber.encode_integer(random_number)
+        return ber.encode_tlv(_SEQUENCE_TAG, b''.join([
+            _TIME_HEADER, time,
+            random_number,
+            _PROTECTED_HEADER, self._protect(time, random_number)
+        ]))
+
+    def verify(self, encoded):
+        ''' Check encoded ISP1 credentials against this identity
+
+        Arguments:
+            encoded:
+                The BER encoded ISP1Credentials received from the peer.
+
+        Returns:
+            True if the credentials were made with this identity's
+            username and password.
+        '''
+        fields = self._parse(bytes(encoded))
+        if fields is None:
+            return False
+
+        key = fields[:2]
+        expected = self._cache.get(key)
+        if expected is None:
+            expected = self._protect(*key)
+            if len(self._cache) >= self._cache_size:
+                self._cache.clear()
+            self._cache[key] = expected
+
+        return expected == fields[2]
+
+    def _protect(self, time, random_number):
+        ''' SHA-1 the DER encoded HashInput for an encoded time and an
+        encoded random number.
+        '''
+        if self._secret is None:
+            raise ValueError('ISP1 credentials for {} require a password'.format(self._username))
+
+        hash_input = ber.encode_tlv(_SEQUENCE_TAG, b''.join([
+            _TIME_HEADER, time, random_number, self._secret
+        ]))
+        return hashlib.sha1(hash_input).digest()
+
+    def _parse(self, encoded):
+        ''' Split encoded ISP1Credentials into the encoded time, the
+        encoded random number and the protected hash.
+
+        The common definite length encoding is read in place and anything
+        else is decoded with PyASN1. Returns None if the credentials cannot
+        be decoded.
+        '''
+        buf = bytearray(encoded)
+        # SEQUENCE, time (2 + 8), random number (2 + n) and hash (2 + 20)
+        if (len(buf) > 14 and buf[0] == _SEQUENCE_TAG and buf[1] == len(buf) - 2 and
+                encoded[2:4] == _TIME_HEADER and buf[12] == 0x02):
+            end = 14 + buf[13]
+            if encoded[end:end + 2] == _PROTECTED_HEADER and end + 22 == len(buf):
+                return encoded[4:12], encoded[12:end], encoded[end + 2:]
+
+        try:
+            creds = decode(encoded, ISP1Credentials())[0]
+        except pyasn1.error.PyAsn1Error:
+            return None
+
+        return (creds['time'].asOctets(),
+                ber.encode_integer(int(creds['randomNumber'])),
+                creds['theProtected'].asOctets())
+
+
+def _to_bytes(value):
+    ''' Return a username or password as bytes '''
+    if isinstance(value, bytes):
+        return value
+    return str(value).encode('utf-8')
@@ -0,0 +1,290 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+''' SLE Virtual Channel Demultiplexing
+
+The ait.dsn.sle.demux module routes the data received on each virtual
+channel of a RAF or RCF session to its own sinks. Every route queues data
+in its own bounded buffer, so a virtual channel with a slow consumer or a
+burst of data does not hold up the others. A single dispatcher greenlet
+serves the routes with queued data in order of priority, so data on
+high-priority channels such as real-time housekeeping is always delivered
+before bulk data on lower-priority channels.
+
+When a route's buffer is full, the ``'drop'`` policy discards the new
+data, ``'drop_oldest'`` discards the oldest queued data, and ``'block'``
+makes the session wait for space.
+
+Classes:
+    VirtualChannelRoute: A bounded queue and the sinks for the data of one
+        or more virtual channels.
+
+    VirtualChannelDemux: Route data to routes by spacecraft and virtual
+        channel id and dispatch queued data in priority order.
+
+Functions:
+    make_route: Create a route from a configuration dictionary.
+'''
+
+import collections
+
+import gevent
+import gevent.event
+
+import ait.core.log
+
+from ait.dsn.sle import sink
+
+
+class VirtualChannelRoute(object):
+    ''' A bounded queue and the sinks for one or more virtual channels
+
+    A route matches data by spacecraft id and virtual channel id. Either
+    can be None to match any value.
+
+    Attributes:
+        items_queued: The number of items accepted into the queue.
+
+        items_dropped: The number of items discarded by the overflow
+            policy.
+
+        items_delivered: The number of items passed to the sinks.
+    '''
+
+    def __init__(self, spacecraft_id=None, virtual_channel_id=None, priority=0,
+                 max_queued=1024, policy='drop', sinks=None):
+        '''
+        Arguments:
+            spacecraft_id:
+                The spacecraft id to match or None to match any.
+
+            virtual_channel_id:
+                The virtual channel id to match or None to match any.
+
+            priority:
+                Routes with a higher priority are served first.
+
+            max_queued:
+                The number of items the route's queue holds.
+
+            policy:
+                What to do with new data when the queue is full. One of
+                ``'drop'``, ``'drop_oldest'`` or ``'block'``.
+
+            sinks:
+                The :class:`ait.dsn.sle.sink.FrameSink` objects, or their
+                configuration dictionaries, that the route's data is passed
+                to.
+        '''
+        if policy not in ['drop', 'drop_oldest', 'block']:
+            raise ValueError('Route policy must be one of: "drop", "drop_oldest", "block"')
+
+        self.spacecraft_id = spacecraft_id
+        self.virtual_channel_id = virtual_channel_id
+        self.priority = priority
+        self.sinks = [s if isinstance(s, sink.FrameSink) else sink.make_sink(s)
+                      for s in (sinks or [])]
+
+        self._queue = collections.deque()
+        self._max_queued = max_queued
+        self._policy = policy
+        self._space = gevent.event.Event()
+        self._space.set()
+        # Replaced by the demux's event when the route is added to one
+        self._ready = gevent.event.Event()
+
+        self.items_queued = 0
+        self.items_dropped = 0
+        self.items_delivered = 0
+
+    def __len__(self):
+        return len(self._queue)
+
+    def matches(self, spacecraft_id, virtual_channel_id):
+        ''' Whether the route takes data of a virtual channel '''
+        return ((self.spacecraft_id is None or self.spacecraft_id == spacecraft_id) and
+                (self.virtual_channel_id is None or self.virtual_channel_id == virtual_channel_id))
+
+    def put(self, item):
+        ''' Queue an item for the route's sinks
+
+        Returns:
+            False if the item was dropped because the queue is full.
+            True otherwise.
+        '''
+        queue = self._queue
+        while len(queue) >= self._max_queued:
+            if self._policy == 'drop':
+                self.items_dropped += 1
+                return False
+            elif self._policy == 'drop_oldest':
+                queue.popleft()
+                self.items_dropped += 1
+            else:
+                self._space.clear()
+                self._space.wait()
+
+        queue.append(item)
+        self.items_queued += 1
+        self._ready.set()
+        return True
+
+    def _take(self, max_items):
+        ''' Remove and return up to max_items queued items '''
+        queue = self._queue
+        batch = [queue.popleft() for i in range(min(len(queue), max_items))]
+        self._space.set()
+        return batch
+
+    def _deliver(self, batch):
+        ''' Pass a batch of items to the route's sinks '''
+        for frame_sink in self.sinks:
+            for item in batch:
+                frame_sink.put(item)
+        self.items_delivered += len(batch)
+
+
+class VirtualChannelDemux(object):
+    ''' Route data by virtual channel and dispatch it in priority order
+
+    Each item is put on the first route, in the order given, that matches
+    its spacecraft and virtual channel ids. The route chosen for each
+    virtual channel is remembered. A dispatcher greenlet, started with the
+    first item, takes up to ``max_batch`` items at a time from the
+    highest-priority route with queued data and passes them to the route's
+    sinks. Routes of equal priority are served in turn.
+    '''
+
+    def __init__(self, routes, max_batch=64):
+        '''
+        Arguments:
+            routes:
+                The :class:`VirtualChannelRoute` objects, or their
+                configuration dictionaries.
+
+            max_batch:
+                The largest number of items dispatched from a route at
+                once.
+        '''
+        self._ready = gevent.event.Event()
+        self.routes = [r if isinstance(r, VirtualChannelRoute) else make_route(r)
+                       for r in routes]
+        for route in self.routes:
+            route._ready = self._ready
+
+        levels = collections.OrderedDict()
+        for route in sorted(self.routes, key=lambda r: -r.priority):
+            levels.setdefault(route.priority, collections.deque()).append(route)
+        self._levels = list(levels.values())
+
+        self._max_batch = max_batch
+        self._lookup = {}
+        self._dispatcher = None
+
+    def route(self, spacecraft_id, virtual_channel_id):
+        ''' Return the route for a virtual channel or None if no route matches '''
+        key = (spacecraft_id, virtual_channel_id)
+        try:
+            return self._lookup[key]
+        except KeyError:
+            pass
+
+        match = None
+        for route in self.routes:
+            if route.matches(spacecraft_id, virtual_channel_id):
+                match = route
+                break
+
+        self._lookup[key] = match
+        if self._dispatcher is None and match is not None:
+            self._dispatcher = gevent.spawn(self._run)
+        return match
+
+    def put(self, spacecraft_id, virtual_channel_id, item):
+        ''' Queue an item on the route for its virtual channel
+
+        Returns:
+            False if no route matches or the item was dropped. True
+            otherwise.
+        '''
+        route = self.route(spacecraft_id, virtual_channel_id)
+        if route is None:
+            return False
+        return route.put(item)
+
+    def flush(self, timeout=None):
+        ''' Wait until every queued item has been passed to the sinks and
+        the sinks have written them
+
+        Returns:
+            True if everything was written before the timeout.
+        '''
+        with gevent.Timeout(timeout, False):
+            while any(len(route) for route in self.routes):
+                gevent.sleep(0.01)
+            return all(s.flush(timeout) for route in self.routes for s in route.sinks)
+        return False
+
+    def close(self, timeout=1):
+        ''' Dispatch queued items for up to timeout seconds and close the
+        sinks of every route
+        '''
+        self.flush(timeout)
+        if self._dispatcher is not None:
+            self._dispatcher.kill()
+            self._dispatcher = None
+        for route in self.routes:
+            for frame_sink in route.sinks:
+                frame_sink.close(0)
+
+    def _next_route(self):
+        ''' Return the highest-priority route with queued items '''
+        for level in self._levels:
+            for i in range(len(level)):
+                route = level[0]
+                level.rotate(-1)
+                if route._queue:
+                    return route
+        return None
+
+    def _run(self):
+        ''' Dispatch queued items until killed '''
+        while True:
+            route = self._next_route()
+            if route is None:
+                self._ready.clear()
+                self._ready.wait()
+                continue
+
+            batch = route._take(self._max_batch)
+            try:
+                route._deliver(batch)
+            except Exception as e:
+                ait.core.log.error('Unable to deliver {} items for virtual channel {}: {}'.format(
+                    len(batch), route.virtual_channel_id, e))
+
+            gevent.sleep(0)
+
+
+def make_route(options):
+    ''' Create a route from a configuration dictionary
+
+    The dictionary holds the keyword arguments of
+    :class:`VirtualChannelRoute`, with ``sinks`` given as a list of sink
+    configuration dictionaries.
+
+    Returns:
+        A :class:`VirtualChannelRoute`.
+    '''
+    return VirtualChannelRoute(**dict(options))
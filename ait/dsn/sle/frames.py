@@ -12,111 +12,814 @@
 # or other export authority as may be required before exporting such
 # information to foreign countries or providing access to foreign persons.
 
-from util import *
+import importlib
+import struct
 
-class TMTransFrame(dict):
-    def __init__(self, data=None):
-        super(TMTransFrame, self).__init__()
+from ait.dsn.sle.util import *
 
-        self._data = []
-        self.is_idle = False
-        self.has_no_pkts = False
+TM_PRIMARY_HEADER_LEN = 6
+TM_OCF_LEN = 4
+TM_FECF_LEN = 2
+
+# First header pointer values with special meaning
+TM_FHP_NO_PACKET = 0x7FF
+TM_FHP_IDLE = 0x7FE
+
+AOS_PRIMARY_HEADER_LEN = 6
+AOS_FHEC_LEN = 2
+AOS_DATA_UNIT_HEADER_LEN = 2
+AOS_IDLE_VCID = 0x3F
+
+# AOS data field contents. M_PDU first header pointers have the same
+# special values as TM first header pointers.
+AOS_MPDU = 'mpdu'
+AOS_BPDU = 'bpdu'
+
+# Bitstream data pointer values with special meaning
+AOS_BPDU_ALL_VALID = 0x3FFF
+AOS_BPDU_IDLE = 0x3FFE
+
+USLP_VERSION = 12
+USLP_TRUNCATED_HEADER_LEN = 4
+USLP_PRIMARY_HEADER_LEN = 7
+
+# TFDZ construction rules. Only the first three have a pointer in the
+# transfer frame data field header.
+USLP_RULE_PACKETS = 0
+USLP_RULE_MAPA_SDU_START = 1
+USLP_RULE_MAPA_SDU_CONTINUED = 2
+USLP_RULE_OCTET_STREAM = 3
+USLP_RULE_SEGMENT_START = 4
+USLP_RULE_SEGMENT_CONTINUED = 5
+USLP_RULE_SEGMENT_LAST = 6
+USLP_RULE_UNSEGMENTED = 7
+
+# USLP protocol identifiers
+USLP_UPID_PACKETS = 0
+USLP_UPID_IDLE = 0x1F
+
+# First header and last valid octet pointer value for "none in this TFDZ"
+USLP_POINTER_NONE = 0xFFFF
+
+_TM_PRIMARY_HEADER = struct.Struct('>HBBH')
+_AOS_PRIMARY_HEADER = struct.Struct('>HI')
+_DATA_UNIT_HEADER = struct.Struct('>H')
+_FECF = struct.Struct('>H')
+_SPACE_PACKET_HEADER = struct.Struct('>HHH')
+_OCTET = struct.Struct('>B')
+_USLP_PRIMARY_HEADER = struct.Struct('>IHB')
+_USLP_TRUNCATED_HEADER = struct.Struct('>I')
+_USLP_TFDF_HEADER = struct.Struct('>BH')
+_USLP_VC_COUNTS = [struct.Struct('>{}B'.format(n)) for n in range(8)]
+
+
+def _extract_packets(frame, offset, end):
+    ''' Slice the complete space packets between offset and end '''
+    unpack_from = _SPACE_PACKET_HEADER.unpack_from
+    packets = []
+
+    while offset + 6 <= end:
+        pkt_end = offset + 7 + unpack_from(frame, offset)[2]
+        if pkt_end > end:
+            break
+        packets.append(frame[offset:pkt_end])
+        offset = pkt_end
+
+    return packets
+
+
+class TMTransFrame(object):
+    ''' A view of a TM Transfer Frame
+
+    The primary header is unpacked once when the frame is decoded. Header
+    fields are computed from it when accessed, and the data field, OCF and
+    packets are sliced from the frame data without copying. Frames whose
+    first header pointer marks them as containing only idle data (OID) are
+    flagged with ``is_idle`` and frames in which no packet starts are
+    flagged with ``has_no_pkts``. Neither is scanned for packets.
+
+    Fields can also be read by name with ``frame['spacecraft_id']``.
+
+    Arguments:
+        data:
+            The frame data as a byte string, bytearray or memoryview.
+
+        has_fecf:
+            Whether the frame ends with a 2 octet frame error control
+            field.
+    '''
+    __slots__ = [
+        'has_fecf', 'is_idle', 'has_no_pkts',
+        '_frame', '_id', '_mc_count', '_vc_count', '_status', '_packets'
+    ]
+
+    vc_frame_count_modulus = 256
+    carries_packets = True
+    user_data = None
+
+    FIELDS = (
+        'version', 'spacecraft_id', 'virtual_channel_id', 'ocf_flag',
+        'master_chan_frame_count', 'virtual_chan_frame_count',
+        'sec_header_flag', 'sync_flag', 'pkt_order_flag', 'seg_len_id',
+        'first_hdr_ptr'
+    )
+
+    def __init__(self, data=None, has_fecf=False):
+        self.has_fecf = has_fecf
+        self._frame = None
         if data:
             self.decode(data)
 
     def decode(self, data):
-        ''' Decode data as a TM Transfer Frame '''
-        self['version'] = hexint(data[0]) & 0xC0
-        self['spacecraft_id'] = hexint(data[0:2]) & 0x3FF0
-        self['virtual_channel_id'] = hexint(data[1]) & 0x0E
-        self['ocf_flag'] = hexint(data[1]) & 0x01
-        self['master_chan_frame_count'] = data[2]
-        self['virtual_chan_frame_count'] = data[3]
-        self['sec_header_flag'] = hexint(data[4:6]) & 0x8000
-        self['sync_flag'] = hexint(data[4:6]) & 0x4000
-        self['pkt_order_flag'] = hexint(data[4:6]) & 0x2000
-        self['seg_len_id'] = hexint(data[4:6]) & 0x1800
-        self['first_hdr_ptr'] = hexint(data[4:6]) & 0x07FF
-
-        if self['first_hdr_ptr'] == b'11111111110':
-            self.is_idle = True
-            return
-
-        if self['first_hdr_ptr'] == b'11111111111':
-            self.has_no_pkts = True
-            return
-
-        # Process the secondary header. This hasn't been tested ...
-        if self['sec_header_flag']:
-            self['sec_hdr_ver'] = hexint(data[6]) & 0xC0
-            sec_hdr_len = hexint(data[6]) & 0x3F
-            sec_hdr_data = data[7:7+sec_hdr_len]
-            pkt_data = data[8 + sec_hdr_len:]
-        else:
-            pkt_data = data[6:]
+        ''' Decode data as a TM Transfer Frame
 
-        # We're assuming that we're getting CCSDS packets w/o secondary
-        # headers here. All of this needs to be fleshed out more
-        while True:
-            if len(pkt_data) == 0:
-                break
+        The view can be reused by decoding another frame into it.
 
-            pkt_data_len = hexint(pkt_data[4:6])
+        Raises:
+            ValueError: If the data is shorter than the frame's primary
+                header and FECF.
+        '''
+        if len(data) < TM_PRIMARY_HEADER_LEN + (TM_FECF_LEN if self.has_fecf else 0):
+            raise ValueError('TM frame of {} octets is shorter than its headers'.format(len(data)))
 
-            if pkt_data_len <= len(pkt_data[6:]):
-                self._data.append(pkt_data[6:6 + pkt_data_len])
+        self._frame = data
+        self._id, self._mc_count, self._vc_count, self._status = _TM_PRIMARY_HEADER.unpack_from(data)
+        self._packets = None
 
-                try:
-                    pkt_data = pkt_data[6 + pkt_data_len:]
-                except:
-                    break
-            # We're not handling the case where packets are split
-            # across TM frames at the moment.
-            else:
-                # print 'Pkt split across TM frames. AAAHHHHH!!!'
-                break
+        fhp = self._status & 0x07FF
+        self.is_idle = fhp == TM_FHP_IDLE
+        self.has_no_pkts = fhp == TM_FHP_NO_PACKET
 
     def encode(self):
         pass
 
-class AOSTransFrame(dict):
-    def __init__(self, data=None):
-        super(AOSTransFrame, self).__init__()
+    def __getitem__(self, field):
+        if field not in self.FIELDS:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def get(self, field, default=None):
+        return getattr(self, field) if field in self.FIELDS else default
+
+    @property
+    def version(self):
+        return self._id >> 14
+
+    @property
+    def spacecraft_id(self):
+        return (self._id >> 4) & 0x03FF
+
+    @property
+    def virtual_channel_id(self):
+        return (self._id >> 1) & 0x07
+
+    @property
+    def ocf_flag(self):
+        return self._id & 0x01
+
+    @property
+    def master_chan_frame_count(self):
+        return self._mc_count
+
+    @property
+    def virtual_chan_frame_count(self):
+        return self._vc_count
+
+    @property
+    def sec_header_flag(self):
+        return self._status >> 15
+
+    @property
+    def sync_flag(self):
+        return (self._status >> 14) & 0x01
+
+    @property
+    def pkt_order_flag(self):
+        return (self._status >> 13) & 0x01
+
+    @property
+    def seg_len_id(self):
+        return (self._status >> 11) & 0x03
+
+    @property
+    def first_hdr_ptr(self):
+        return self._status & 0x07FF
+
+    @property
+    def sec_hdr_len(self):
+        ''' The length of the secondary header, including its ID octet '''
+        if not self.sec_header_flag:
+            return 0
+        return (_OCTET.unpack_from(self._frame, TM_PRIMARY_HEADER_LEN)[0] & 0x3F) + 1
+
+    @property
+    def data_field(self):
+        ''' A memoryview of the frame's data field '''
+        start = TM_PRIMARY_HEADER_LEN + self.sec_hdr_len
+        end = len(self._frame) - self._trailer_len()
+        return memoryview(self._frame)[start:end]
+
+    @property
+    def ocf(self):
+        ''' A memoryview of the operational control field or None '''
+        if not self.ocf_flag:
+            return None
+        end = len(self._frame) - (TM_FECF_LEN if self.has_fecf else 0)
+        return memoryview(self._frame)[end - TM_OCF_LEN:end]
 
-        self._data = []
-        self.is_idle = False
-        self.has_no_pkts = False
+    @property
+    def packets(self):
+        ''' The space packets that start and end in this frame
+
+        Packets are read from the first header pointer. A packet continued
+        from the previous frame and one continued in the next frame are
+        not included.
+        '''
+        if self._packets is None:
+            self._packets = self._extract_packets()
+        return self._packets
+
+    @property
+    def _data(self):
+        ''' The packet data fields of :attr:`packets` without their headers '''
+        return [pkt[_SPACE_PACKET_HEADER.size:] for pkt in self.packets]
+
+    def _trailer_len(self):
+        return ((TM_OCF_LEN if self.ocf_flag else 0) +
+                (TM_FECF_LEN if self.has_fecf else 0))
+
+    def _extract_packets(self):
+        if self.is_idle or self.has_no_pkts:
+            return []
+
+        start = TM_PRIMARY_HEADER_LEN + self.sec_hdr_len + (self._status & 0x07FF)
+        end = len(self._frame) - self._trailer_len()
+        return _extract_packets(memoryview(self._frame), start, end)
+
+
+class AOSTransFrame(object):
+    ''' A view of an AOS Transfer Frame
+
+    AOS frames do not announce which optional fields they contain, so the
+    frame header error control, insert zone, operational control field and
+    frame error control field are configured for the physical channel when
+    the view is created. The data field holds either a multiplexing
+    protocol data unit (M_PDU) carrying space packets or a bitstream
+    protocol data unit (B_PDU).
+
+    As with :class:`TMTransFrame`, the primary header is unpacked once and
+    the remaining fields are sliced from the frame data without copying.
+    Frames of the idle virtual channel (63), M_PDUs containing only idle
+    data and idle B_PDUs are flagged with ``is_idle``. M_PDUs in which no
+    packet starts are flagged with ``has_no_pkts``.
+
+    Arguments:
+        data:
+            The frame data as a byte string, bytearray or memoryview.
+
+        has_fecf:
+            Whether the frame ends with a 2 octet frame error control
+            field.
+
+        has_ocf:
+            Whether the frame contains a 4 octet operational control field.
+
+        has_fhec:
+            Whether the primary header is followed by a 2 octet frame
+            header error control field.
+
+        insert_zone_len:
+            The length in octets of the insert zone.
+
+        data_unit:
+            The type of data unit in the data field, either
+            :data:`AOS_MPDU` or :data:`AOS_BPDU`.
+    '''
+    __slots__ = [
+        'has_fecf', 'has_ocf', 'has_fhec', 'insert_zone_len', 'data_unit',
+        'is_idle', 'has_no_pkts',
+        '_frame', '_id', '_count', '_pointer', '_header_len', '_packets'
+    ]
+
+    vc_frame_count_modulus = 2 ** 24
+
+    FIELDS = (
+        'version', 'spacecraft_id', 'virtual_channel_id',
+        'virtual_chan_frame_count', 'replay_flag', 'vc_frame_count_usage_flag',
+        'vc_frame_count_cycle', 'first_hdr_ptr', 'bitstream_data_ptr'
+    )
+
+    def __init__(self, data=None, has_fecf=False, has_ocf=False, has_fhec=False,
+                 insert_zone_len=0, data_unit=AOS_MPDU):
+        if data_unit not in (AOS_MPDU, AOS_BPDU):
+            raise ValueError('Unknown AOS data unit {}'.format(data_unit))
+
+        self.has_fecf = has_fecf
+        self.has_ocf = has_ocf
+        self.has_fhec = has_fhec
+        self.insert_zone_len = insert_zone_len
+        self.data_unit = data_unit
+        self._header_len = (AOS_PRIMARY_HEADER_LEN +
+                            (AOS_FHEC_LEN if has_fhec else 0) +
+                            insert_zone_len)
+        self._frame = None
         if data:
             self.decode(data)
 
     def decode(self, data):
-        ''' Decode data as a AOS Transfer Frame '''
-        self['version'] = hexint(data[0]) & 0xC0 #bits 0:1
-        self['spacecraft_id'] = hexint(data[0:2]) & 0x3FC0 #bits 2:9
-        self['virtual_channel_id'] = hexint(data[1]) & 0x3F #bits 10:15
-        self['virtual_chan_frame_count'] = data[2:5]
-        self['signaling_field'] = data[5] #according to the AOS documentation, this is unused
-        self['first_hdr_ptr'] = data[6:8] & 0x03FF #this comes from the m_pdu_header
-
-        if self['virtual_channel_id'] == b'111111': #according to AOS documentation, 0x3F indicates idle AOS transfer frames
-            self.is_idle = True
-            return
+        ''' Decode data as an AOS Transfer Frame
+
+        The view can be reused by decoding another frame into it.
 
-        #offset to first byte of ccsds header (2047 means no data)
-        if self['first_hdr_ptr'] == b'11111111111':
+        Raises:
+            ValueError: If the data is shorter than the frame's headers
+                and FECF.
+        '''
+        if len(data) < (self._header_len + AOS_DATA_UNIT_HEADER_LEN +
+                        (TM_FECF_LEN if self.has_fecf else 0)):
+            raise ValueError('AOS frame of {} octets is shorter than its headers'.format(len(data)))
+
+        self._frame = data
+        self._id, self._count = _AOS_PRIMARY_HEADER.unpack_from(data)
+        self._pointer = _DATA_UNIT_HEADER.unpack_from(data, self._header_len)[0]
+        self._packets = None
+
+        if self.data_unit == AOS_MPDU:
+            fhp = self._pointer & 0x07FF
+            self.is_idle = fhp == TM_FHP_IDLE
+            self.has_no_pkts = fhp == TM_FHP_NO_PACKET
+        else:
+            self.is_idle = self._pointer & 0x3FFF == AOS_BPDU_IDLE
             self.has_no_pkts = True
-            return
 
-        pkt_data = data[6:(len(data)-2)]
+        if (self._id & 0x3F) == AOS_IDLE_VCID:
+            self.is_idle = True
+
+    def encode(self):
+        pass
+
+    def __getitem__(self, field):
+        if field not in self.FIELDS:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def get(self, field, default=None):
+        return getattr(self, field) if field in self.FIELDS else default
+
+    @property
+    def version(self):
+        return self._id >> 14
+
+    @property
+    def spacecraft_id(self):
+        return (self._id >> 6) & 0xFF
+
+    @property
+    def virtual_channel_id(self):
+        return self._id & 0x3F
+
+    @property
+    def virtual_chan_frame_count(self):
+        return self._count >> 8
+
+    @property
+    def signaling_field(self):
+        return self._count & 0xFF
+
+    @property
+    def replay_flag(self):
+        return (self._count >> 7) & 0x01
+
+    @property
+    def vc_frame_count_usage_flag(self):
+        return (self._count >> 6) & 0x01
+
+    @property
+    def vc_frame_count_cycle(self):
+        return self._count & 0x0F
+
+    @property
+    def first_hdr_ptr(self):
+        ''' The M_PDU first header pointer or None for B_PDUs '''
+        if self.data_unit != AOS_MPDU:
+            return None
+        return self._pointer & 0x07FF
+
+    @property
+    def bitstream_data_ptr(self):
+        ''' The B_PDU bitstream data pointer or None for M_PDUs '''
+        if self.data_unit != AOS_BPDU:
+            return None
+        return self._pointer & 0x3FFF
+
+    @property
+    def insert_zone(self):
+        ''' A memoryview of the insert zone '''
+        end = self._header_len
+        return memoryview(self._frame)[end - self.insert_zone_len:end]
 
-        self._data.append(pkt_data)
+    @property
+    def data_field(self):
+        ''' A memoryview of the M_PDU packet zone or B_PDU bitstream data zone '''
+        start = self._header_len + AOS_DATA_UNIT_HEADER_LEN
+        end = len(self._frame) - self._trailer_len()
+        return memoryview(self._frame)[start:end]
+
+    @property
+    def bitstream_data(self):
+        ''' A memoryview of the valid octets of a B_PDU's bitstream data
+
+        The bitstream data pointer gives the last valid bit. The octet
+        containing it is included.
+        '''
+        if self.data_unit != AOS_BPDU or self.is_idle:
+            return None
+
+        data = self.data_field
+        pointer = self._pointer & 0x3FFF
+        if pointer == AOS_BPDU_ALL_VALID:
+            return data
+        return data[:pointer // 8 + 1]
+
+    @property
+    def carries_packets(self):
+        ''' Whether the data field is a M_PDU to extract packets from '''
+        return self.data_unit == AOS_MPDU
+
+    user_data = bitstream_data
+
+    @property
+    def ocf(self):
+        ''' A memoryview of the operational control field or None '''
+        if not self.has_ocf:
+            return None
+        end = len(self._frame) - (TM_FECF_LEN if self.has_fecf else 0)
+        return memoryview(self._frame)[end - TM_OCF_LEN:end]
+
+    @property
+    def fecf(self):
+        ''' The frame error control field or None '''
+        if not self.has_fecf:
+            return None
+        return _FECF.unpack_from(self._frame, len(self._frame) - TM_FECF_LEN)[0]
+
+    @property
+    def packets(self):
+        ''' The space packets that start and end in this frame's M_PDU
+
+        Packets continued from the previous frame or in the next frame are
+        not included. B_PDUs contain no packets.
+        '''
+        if self._packets is None:
+            if self.is_idle or self.has_no_pkts:
+                self._packets = []
+            else:
+                start = self._header_len + AOS_DATA_UNIT_HEADER_LEN + (self._pointer & 0x07FF)
+                end = len(self._frame) - self._trailer_len()
+                self._packets = _extract_packets(memoryview(self._frame), start, end)
+        return self._packets
+
+    @property
+    def _data(self):
+        ''' The packet data fields of :attr:`packets` without their headers '''
+        return [pkt[_SPACE_PACKET_HEADER.size:] for pkt in self.packets]
+
+    def _trailer_len(self):
+        return ((TM_OCF_LEN if self.has_ocf else 0) +
+                (TM_FECF_LEN if self.has_fecf else 0))
+
+
+class USLPTransFrame(object):
+    ''' A view of a USLP Transfer Frame
+
+    Unified Space Data Link Protocol frames have a variable length given by
+    the frame length field, a variable length virtual channel frame count
+    and an OCF flagged in the header. Truncated frames, flagged by the end
+    of frame primary header flag, consist only of the 4 octet truncated
+    primary header and a transfer frame data field. The insert zone and
+    FECF are configured for the physical channel when the view is created.
+
+    The transfer frame data field header gives the construction rule of
+    the data zone (TFDZ) and the protocol of its data. Data zones of
+    packets spanning frames (construction rule 0) carrying space packets
+    are read from the first header pointer. Any other data zone is passed
+    on as :attr:`user_data`, cut at the last valid octet pointer where the
+    construction rule has one. Frames carrying only idle data are flagged
+    with ``is_idle``.
+
+    Arguments:
+        data:
+            The frame data as a byte string, bytearray or memoryview.
+
+        has_fecf:
+            Whether the frame ends with a 2 octet frame error control
+            field.
+
+        insert_zone_len:
+            The length in octets of the insert zone of non-truncated
+            frames.
+    '''
+    __slots__ = [
+        'has_fecf', 'insert_zone_len', 'is_idle', 'has_no_pkts',
+        'virtual_chan_frame_count', 'vc_frame_count_modulus',
+        '_frame', '_id', '_length', '_flags', '_tfdf_start', '_tfdf_end',
+        '_rules', '_pointer', '_packets'
+    ]
+
+    FIELDS = (
+        'version', 'spacecraft_id', 'source_dest_id', 'virtual_channel_id',
+        'map_id', 'truncated', 'frame_length', 'bypass_flag',
+        'protocol_control_flag', 'ocf_flag', 'vc_frame_count_len',
+        'virtual_chan_frame_count', 'construction_rules', 'protocol_id',
+        'first_hdr_ptr', 'last_valid_octet_ptr'
+    )
+
+    def __init__(self, data=None, has_fecf=False, insert_zone_len=0):
+        self.has_fecf = has_fecf
+        self.insert_zone_len = insert_zone_len
+        self._frame = None
+        if data:
+            self.decode(data)
+
+    def decode(self, data):
+        ''' Decode data as a USLP Transfer Frame
+
+        The view can be reused by decoding another frame into it.
+
+        Raises:
+            ValueError: If the data is shorter than the frame's headers or
+                than its frame length field says.
+        '''
+        self._frame = data
+        self._packets = None
+        size = len(data)
+        end = size - (TM_FECF_LEN if self.has_fecf else 0)
+
+        if size < USLP_TRUNCATED_HEADER_LEN:
+            raise ValueError('USLP frame of {} octets is shorter than its header'.format(size))
+
+        frame_id = _USLP_TRUNCATED_HEADER.unpack_from(data)[0]
+        if frame_id & 0x01:
+            self._id = frame_id
+            self._length = len(data) - 1
+            self._flags = 0
+            self.virtual_chan_frame_count = 0
+            self.vc_frame_count_modulus = 1
+            start = USLP_TRUNCATED_HEADER_LEN
+        else:
+            if size < USLP_PRIMARY_HEADER_LEN:
+                raise ValueError('USLP frame of {} octets is shorter than its primary '
+                                 'header'.format(size))
+
+            self._id, self._length, self._flags = _USLP_PRIMARY_HEADER.unpack_from(data)
+            if self._length + 1 > size:
+                raise ValueError('USLP frame of {} octets is shorter than its frame length '
+                                 'of {}'.format(size, self._length + 1))
+
+            count_len = self._flags & 0x07
+            if size < USLP_PRIMARY_HEADER_LEN + count_len:
+                raise ValueError('USLP frame of {} octets is shorter than its frame '
+                                 'count'.format(size))
+            count = 0
+            for octet in _USLP_VC_COUNTS[count_len].unpack_from(data, USLP_PRIMARY_HEADER_LEN):
+                count = (count << 8) | octet
+            self.virtual_chan_frame_count = count
+            self.vc_frame_count_modulus = 1 << (8 * count_len)
+
+            start = USLP_PRIMARY_HEADER_LEN + count_len + self.insert_zone_len
+            # The frame length field allows for fill after the frame
+            end = min(end, self._length + 1 - (TM_FECF_LEN if self.has_fecf else 0))
+            if self._flags & 0x08:
+                end -= TM_OCF_LEN
+
+        if start >= end:
+            raise ValueError('USLP frame of {} octets has no data field header'.format(size))
+
+        self._rules = _OCTET.unpack_from(data, start)[0]
+        if self._rules >> 5 <= USLP_RULE_MAPA_SDU_CONTINUED:
+            if start + _USLP_TFDF_HEADER.size > end:
+                raise ValueError('USLP frame of {} octets is shorter than its data field '
+                                 'header'.format(size))
+            self._pointer = _USLP_TFDF_HEADER.unpack_from(data, start)[1]
+            self._tfdf_start = start + _USLP_TFDF_HEADER.size
+        else:
+            self._pointer = None
+            self._tfdf_start = start + 1
+        self._tfdf_end = end
+
+        self.is_idle = self._rules & 0x1F == USLP_UPID_IDLE
+        self.has_no_pkts = (not self.carries_packets or
+                            self._pointer == USLP_POINTER_NONE)
 
     def encode(self):
         pass
 
+    def __getitem__(self, field):
+        if field not in self.FIELDS:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def get(self, field, default=None):
+        return getattr(self, field) if field in self.FIELDS else default
+
+    @property
+    def version(self):
+        return self._id >> 28
+
+    @property
+    def spacecraft_id(self):
+        return (self._id >> 12) & 0xFFFF
+
+    @property
+    def source_dest_id(self):
+        return (self._id >> 11) & 0x01
+
+    @property
+    def virtual_channel_id(self):
+        return (self._id >> 5) & 0x3F
+
+    @property
+    def map_id(self):
+        return (self._id >> 1) & 0x0F
+
+    @property
+    def truncated(self):
+        return self._id & 0x01
+
+    @property
+    def frame_length(self):
+        ''' The length in octets of the frame '''
+        return self._length + 1
+
+    @property
+    def bypass_flag(self):
+        return self._flags >> 7
+
+    @property
+    def protocol_control_flag(self):
+        return (self._flags >> 6) & 0x01
+
+    @property
+    def ocf_flag(self):
+        return (self._flags >> 3) & 0x01
+
+    @property
+    def vc_frame_count_len(self):
+        return self._flags & 0x07
+
+    @property
+    def construction_rules(self):
+        return self._rules >> 5
+
+    @property
+    def protocol_id(self):
+        return self._rules & 0x1F
+
+    @property
+    def first_hdr_ptr(self):
+        ''' The first header pointer of a packet data zone or None '''
+        if self._rules >> 5 != USLP_RULE_PACKETS:
+            return None
+        return self._pointer
+
+    @property
+    def last_valid_octet_ptr(self):
+        ''' The last valid octet pointer of a MAPA_SDU data zone or None '''
+        if self._rules >> 5 not in (USLP_RULE_MAPA_SDU_START, USLP_RULE_MAPA_SDU_CONTINUED):
+            return None
+        return self._pointer
+
+    @property
+    def carries_packets(self):
+        ''' Whether the data zone holds space packets spanning frames '''
+        return self._rules == (USLP_RULE_PACKETS << 5) | USLP_UPID_PACKETS
+
+    @property
+    def data_field(self):
+        ''' A memoryview of the transfer frame data zone '''
+        return memoryview(self._frame)[self._tfdf_start:self._tfdf_end]
+
+    @property
+    def user_data(self):
+        ''' A memoryview of the valid data of a data zone without packets
+
+        None for idle frames and frames carrying packets.
+        '''
+        if self.is_idle or self.carries_packets:
+            return None
+
+        data = self.data_field
+        if self._pointer is None or self._pointer == USLP_POINTER_NONE:
+            return data
+        return data[:self._pointer + 1]
+
+    @property
+    def ocf(self):
+        ''' A memoryview of the operational control field or None '''
+        if not self.ocf_flag:
+            return None
+        return memoryview(self._frame)[self._tfdf_end:self._tfdf_end + TM_OCF_LEN]
+
+    @property
+    def fecf(self):
+        ''' The frame error control field or None '''
+        if not self.has_fecf:
+            return None
+        return _FECF.unpack_from(self._frame, self._tfdf_end + (TM_OCF_LEN if self.ocf_flag else 0))[0]
+
+    @property
+    def packets(self):
+        ''' The space packets that start and end in this frame
+
+        Packets continued from the previous frame or in the next frame are
+        not included.
+        '''
+        if self._packets is None:
+            if self.is_idle or self.has_no_pkts:
+                self._packets = []
+            else:
+                self._packets = _extract_packets(memoryview(self._frame),
+                                                 self._tfdf_start + self._pointer,
+                                                 self._tfdf_end)
+        return self._packets
+
+    @property
+    def _data(self):
+        ''' The packet data fields of :attr:`packets` without their headers '''
+        return [pkt[_SPACE_PACKET_HEADER.size:] for pkt in self.packets]
+
 
 class TCTransFrame(object):
     ''''''
     # TODO: Implement
     # See C Space Data Link Protocol pg. 4-1 for further information
     pass
+
+
+FRAME_TYPES = {
+    'TMTransFrame': TMTransFrame,
+    'AOSTransFrame': AOSTransFrame,
+    'USLPTransFrame': USLPTransFrame,
+}
+
+
+def register_frame_type(name, frame_class):
+    ''' Register a frame decoder that can be selected by name
+
+    Arguments:
+        name:
+            The name used for the ``downlink_frame_type`` option.
+
+        frame_class:
+            The frame view class. It is created with the
+            ``downlink_frame_options`` as keyword arguments and must provide
+            a ``decode(data)`` method and the attributes used by
+            :class:`ait.dsn.sle.packets.PacketExtractor`, plus
+            ``carries_packets`` and ``user_data``.
+    '''
+    FRAME_TYPES[name] = frame_class
+
+
+def get_frame_type(frame_type):
+    ''' Look up a frame decoder class
+
+    Arguments:
+        frame_type:
+            A registered name, a dotted path to a class in a mission's
+            package or a class.
+
+    Returns:
+        The frame view class.
+
+    Raises:
+        ValueError:
+            If the frame type cannot be found.
+    '''
+    if isinstance(frame_type, type):
+        return frame_type
+
+    if frame_type in FRAME_TYPES:
+        return FRAME_TYPES[frame_type]
+
+    module_name, _, class_name = frame_type.rpartition('.')
+    try:
+        module = importlib.import_module(module_name)
+        return getattr(module, class_name)
+    except (ImportError, AttributeError, ValueError):
+        raise ValueError('Unknown downlink frame type {}'.format(frame_type))
+
+
+def make_frame_decoder(frame_type, options=None):
+    ''' Create a reusable frame view for decoding received frames
+
+    Arguments:
+        frame_type:
+            The frame type. See :func:`get_frame_type`.
+
+        options:
+            A dictionary of keyword arguments for the frame view class.
+
+    Returns:
+        A frame view whose ``decode`` method is called with each frame.
+    '''
+    return get_frame_type(frame_type)(**(options or {}))
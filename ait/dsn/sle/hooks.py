@@ -0,0 +1,286 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+''' SLE Instrumentation Hooks
+
+The ait.dsn.sle.hooks module lets profilers, timers and tracers observe
+the stages of an SLE session's receive path. A hook has a ``before`` and
+an ``after`` callback that are called around a stage::
+
+    token = before(stage, name, handler)
+    ... the stage runs ...
+    after(stage, name, handler, token)
+
+The stages are:
+
+    framing: Splitting received data into TML messages. The name is None.
+
+    decode: Decoding a PDU message. The name is None for ``before`` and
+        the decoded PDU's name, or None if decoding failed, for ``after``.
+
+    dispatch: Passing a decoded PDU to all of its handlers. The name is
+        the PDU name, such as ``'RafTransferBuffer'``.
+
+    handler: A single handler call. The name is the PDU name and the
+        handler is the function being called.
+
+``handler`` is None for every stage but the handler stage. The value
+returned by ``before`` is passed to ``after`` as the token. Either
+callback may be omitted. An exception raised by a callback is logged the
+first time and otherwise ignored, so a faulty hook cannot stop a session
+from processing PDUs. If ``before`` fails, ``after`` is not called for
+that event.
+
+A hook can be limited to some PDU names and to every Nth event so it can
+stay attached in production at a bounded cost. Stages without hooks only
+cost a check of an empty tuple.
+
+Attributes:
+    STAGES: The names of the stages that can be hooked.
+
+    NAMED_STAGES: The stages whose hooks can be limited to PDU names.
+
+Classes:
+    Hook: A pair of callbacks attached to one stage.
+
+    HookSet: The hooks of one session.
+
+    StageTimer: A hook that keeps the recent durations of each stage.
+'''
+
+import collections
+import time
+
+import ait.core
+from ait.dsn.sle import util
+
+STAGES = ('framing', 'decode', 'dispatch', 'handler')
+NAMED_STAGES = ('dispatch', 'handler')
+
+
+class Hook(object):
+    ''' A pair of callbacks attached to one stage
+
+    Attributes:
+        stage: The name of the hooked stage.
+
+        before: The function called before the stage or None.
+
+        after: The function called after the stage or None.
+
+        every: Only every Nth event of the stage is passed to the hook.
+
+        names: A set of the PDU names the hook is limited to or None.
+
+        errors: The number of exceptions raised by the callbacks.
+    '''
+    __slots__ = ['stage', 'before', 'after', 'every', 'names', 'errors', '_count']
+
+    def __init__(self, stage, before=None, after=None, every=1, names=None):
+        if stage not in STAGES:
+            raise ValueError('Unknown hook stage {}. Must be one of: {}'.format(
+                stage, ', '.join(STAGES)))
+
+        if every < 1:
+            raise ValueError('Hook sampling interval must be at least 1')
+
+        if names is not None and stage not in NAMED_STAGES:
+            raise ValueError('Hooks can only be limited to PDU names on the '
+                             'dispatch and handler stages')
+
+        self.stage = stage
+        self.before = before
+        self.after = after
+        self.every = int(every)
+        self.names = frozenset(names) if names is not None else None
+        self.errors = 0
+        self._count = 0
+
+    def sampled(self, name):
+        ''' Return whether the next event of the stage is passed to the hook '''
+        if self.names is not None and name not in self.names:
+            return False
+
+        self._count += 1
+        if self._count < self.every:
+            return False
+
+        self._count = 0
+        return True
+
+    def failed(self, callback, error):
+        ''' Record an exception raised by one of the hook's callbacks '''
+        self.errors += 1
+        if self.errors == 1:
+            ait.core.log.error('{} hook {} on the {} stage failed and will be ignored: {}'.format(
+                callback, getattr(getattr(self, callback), '__name__', ''), self.stage, error))
+
+
+class HookSet(object):
+    ''' The hooks of one session
+
+    Each stage is an attribute holding a tuple of its hooks, so a session
+    can check for hooks on a stage with a single attribute lookup::
+
+        calls = hooks.enter('decode', None) if hooks.decode else None
+    '''
+
+    def __init__(self):
+        for stage in STAGES:
+            setattr(self, stage, ())
+
+    def add(self, stage, before=None, after=None, every=1, names=None):
+        ''' Attach a hook to a stage
+
+        Arguments:
+            stage:
+                One of :data:`STAGES`.
+
+            before:
+                The function called before the stage.
+
+            after:
+                The function called after the stage.
+
+            every:
+                Only every Nth event of the stage is passed to the hook.
+
+            names:
+                An optional list of PDU names to limit the hook to. Only
+                applies to the dispatch and handler stages.
+
+        Returns:
+            The :class:`Hook`, for removing it later.
+
+        Raises:
+            ValueError: If the stage is unknown, every is less than 1 or
+                names are given for the framing or decode stage.
+        '''
+        hook = Hook(stage, before, after, every, names)
+        setattr(self, stage, getattr(self, stage) + (hook,))
+        return hook
+
+    def remove(self, hook):
+        ''' Detach a hook added with :meth:`add` '''
+        setattr(self, hook.stage,
+                tuple(h for h in getattr(self, hook.stage) if h is not hook))
+
+    def enter(self, stage, name, handler=None):
+        ''' Call the ``before`` callbacks of the stage's sampled hooks
+
+        Returns:
+            A list of (hook, token) pairs to pass to :meth:`exit` or None
+            if no hook sampled the event.
+        '''
+        calls = None
+        for hook in getattr(self, stage):
+            if hook.sampled(name):
+                token = None
+                if hook.before is not None:
+                    try:
+                        token = hook.before(stage, name, handler)
+                    except Exception as e:
+                        hook.failed('before', e)
+                        continue
+                if calls is None:
+                    calls = []
+                calls.append((hook, token))
+        return calls
+
+    def exit(self, stage, name, calls, handler=None):
+        ''' Call the ``after`` callbacks of the hooks returned by
+        :meth:`enter`, in reverse order
+        '''
+        for hook, token in reversed(calls):
+            if hook.after is not None:
+                try:
+                    hook.after(stage, name, handler, token)
+                except Exception as e:
+                    hook.failed('after', e)
+
+
+class StageTimer(object):
+    ''' A hook that keeps the recent durations of each stage
+
+    The durations are kept per stage and PDU name, and per handler for
+    the handler stage.
+
+    .. code-block:: python
+
+        timer = StageTimer()
+        timer.attach(raf_mngr, every=100)
+        ...
+        print(timer.stats())
+    '''
+
+    def __init__(self, max_samples=1000):
+        '''
+        Arguments:
+            max_samples:
+                The number of recent durations kept for each key.
+        '''
+        self._max_samples = max_samples
+        self._samples = {}
+
+    def attach(self, session, stages=STAGES, every=1, names=None):
+        ''' Add the timer to stages of a session
+
+        Arguments:
+            session:
+                The session whose stages are timed.
+
+            stages:
+                The names of the timed stages.
+
+            every:
+                Only every Nth event of each stage is timed.
+
+            names:
+                The PDU names the timer is limited to or None. Names only
+                apply to the dispatch and handler stages, so other stages
+                are skipped when names are given.
+
+        Returns:
+            The list of added :class:`Hook` objects.
+        '''
+        if names is not None:
+            stages = [stage for stage in stages if stage in NAMED_STAGES]
+        return [session.add_hook(stage, self.before, self.after, every, names)
+                for stage in stages]
+
+    def before(self, stage, name, handler):
+        ''''''
+        return time.time()
+
+    def after(self, stage, name, handler, token):
+        ''''''
+        key = (stage, name)
+        if handler is not None:
+            key += (getattr(handler, '__name__', repr(handler)),)
+
+        samples = self._samples.get(key)
+        if samples is None:
+            samples = self._samples[key] = collections.deque(maxlen=self._max_samples)
+        samples.append(time.time() - token)
+
+    def stats(self):
+        ''' Return the duration percentiles of each key
+
+        Returns:
+            A dictionary keyed by (stage, name) or, for the handler stage,
+            (stage, name, handler name). See
+            :func:`ait.dsn.sle.util.percentiles` for the values.
+        '''
+        return dict((key, util.percentiles(list(samples)))
+                    for key, samples in self._samples.items())
@@ -0,0 +1,123 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+''' Earth Receive Time Latency
+
+The ait.dsn.sle.latency module measures how long after their earth
+receive time (ERT) received frames are delivered by the provider and
+passed on to the frame sinks.
+
+Classes:
+    LatencyTracker: Keep the recent latencies of a session and each of its
+        virtual channels.
+'''
+
+import collections
+import time
+
+from ait.dsn.sle import timecode, util
+
+
+class _Latencies(object):
+    ''' The recent latencies of one session or virtual channel '''
+    __slots__ = ['delivery', 'emission']
+
+    def __init__(self, window):
+        self.delivery = collections.deque(maxlen=window)
+        self.emission = collections.deque(maxlen=window)
+
+    def stats(self):
+        return {
+            'delivery': util.percentiles(list(self.delivery)),
+            'emission': util.percentiles(list(self.emission)),
+        }
+
+
+class LatencyTracker(object):
+    ''' Keep the recent latencies of a session and each of its virtual
+    channels
+
+    For every frame two latencies are measured from the frame's ERT:
+
+        delivery: Until the TML message carrying the frame was received
+            from the provider. This is the delay of the ground station and
+            the provider.
+
+        emission: Until the frame's data was passed to the frame sinks.
+            The difference to the delivery latency is the time the frame
+            spent in the session's queue, decoding and handling.
+
+    The most recent ``window`` latencies of each kind are kept for the
+    session and for each (spacecraft id, virtual channel id).
+    '''
+
+    def __init__(self, window=1000):
+        '''
+        Arguments:
+            window:
+                The number of recent latencies kept for the session and
+                for each virtual channel.
+        '''
+        self._window = window
+        self._session = _Latencies(window)
+        self._virtual = {}
+
+    def reset(self):
+        ''' Forget all latencies '''
+        self._session = _Latencies(self._window)
+        self._virtual = {}
+
+    def update(self, frame, ert, received=None):
+        ''' Record the latencies of a frame that was passed to the sinks
+
+        Arguments:
+            frame:
+                The decoded transfer frame.
+
+            ert:
+                The frame's encoded CCSDS earth receive time.
+
+            received:
+                The time the message carrying the frame was received from
+                the provider or None if it is not known.
+        '''
+        now = time.time()
+        ert = timecode.decode_timestamp(ert)
+
+        key = (frame.spacecraft_id, frame.virtual_channel_id)
+        channel = self._virtual.get(key)
+        if channel is None:
+            channel = self._virtual[key] = _Latencies(self._window)
+
+        session = self._session
+        if received is not None:
+            session.delivery.append(received - ert)
+            channel.delivery.append(received - ert)
+        session.emission.append(now - ert)
+        channel.emission.append(now - ert)
+
+    def stats(self):
+        ''' Return the latency percentiles of the session and each virtual
+        channel
+
+        Returns:
+            A dictionary with the session's ``delivery`` and ``emission``
+            latencies and ``virtual_channels`` keyed by (spacecraft id,
+            virtual channel id), each with its own ``delivery`` and
+            ``emission`` latencies. Latencies are in seconds. See
+            :func:`ait.dsn.sle.util.percentiles` for the values.
+        '''
+        stats = self._session.stats()
+        stats['virtual_channels'] = dict((k, c.stats()) for k, c in self._virtual.items())
+        return stats
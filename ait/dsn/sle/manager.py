@@ -0,0 +1,136 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+
+''' SLE Session Manager
+
+The ait.dsn.sle.manager module provides a manager for running many SLE
+service instances (e.g., RAF, RCF and CLTU sessions to several stations)
+in a single process.
+
+Classes:
+    SessionManager: Decodes and dispatches the received PDUs of any
+        number of SLE service instances on a shared set of workers.
+'''
+
+import gevent
+import gevent.queue
+
+import ait.core.log
+
+
+class SessionManager(object):
+    ''' Run SLE service instances on a shared set of decode workers
+
+    Each managed service instance keeps its own data queue, handler table
+    and invoke id counter. Instead of every instance spawning a greenlet to
+    decode its received PDUs, instances with queued PDUs are scheduled on
+    the manager's ready queue. A worker takes the next ready instance,
+    processes up to that instance's ``max_batch_size`` PDUs and puts it
+    back at the end of the ready queue if it still has PDUs queued. Busy
+    instances therefore share the workers round-robin and an idle
+    instance costs nothing.
+
+    Service instances are added to a manager by passing it as the
+    ``session_manager`` keyword argument on creation::
+
+        manager = ait.dsn.sle.SessionManager(workers=2)
+        raf_mngr = ait.dsn.sle.RAF(session_manager=manager, ...)
+        rcf_mngr = ait.dsn.sle.RCF(session_manager=manager, ...)
+    '''
+
+    def __init__(self, workers=1):
+        '''
+        Arguments:
+            workers:
+                The number of worker greenlets used to decode and dispatch
+                received PDUs.
+        '''
+        self._sessions = []
+        self._scheduled = set()
+        self._ready = gevent.queue.Queue()
+        self._workers = [gevent.spawn(self._worker) for i in range(workers)]
+
+    @property
+    def sessions(self):
+        ''' A list of the service instances being managed '''
+        return list(self._sessions)
+
+    def add(self, session):
+        ''' Add a service instance to the manager
+
+        Arguments:
+            session:
+                The :class:`ait.dsn.sle.common.SLE` instance to manage.
+        '''
+        session._session_manager = self
+        if session not in self._sessions:
+            self._sessions.append(session)
+
+        if not session._data_queue.empty():
+            self.schedule(session)
+
+    def remove(self, session):
+        ''' Stop managing a service instance
+
+        Any PDUs still queued for the instance are not processed.
+
+        Arguments:
+            session:
+                The :class:`ait.dsn.sle.common.SLE` instance to remove.
+        '''
+        if session in self._sessions:
+            self._sessions.remove(session)
+        self._scheduled.discard(session)
+
+    def schedule(self, session):
+        ''' Mark a service instance as having PDUs ready for processing
+
+        Arguments:
+            session:
+                The :class:`ait.dsn.sle.common.SLE` instance with queued
+                PDUs.
+        '''
+        if session in self._scheduled or session not in self._sessions:
+            return
+
+        self._scheduled.add(session)
+        self._ready.put(session)
+
+    def shutdown(self):
+        ''' Kill the manager's workers '''
+        gevent.killall(self._workers)
+
+    def _worker(self):
+        ''''''
+        while True:
+            session = self._ready.get()
+            if session not in self._scheduled:
+                continue
+
+            try:
+                session._drain_queue(session._max_batch_size)
+            except Exception as e:
+                ait.core.log.error(
+                    'Error processing PDUs for service instance {}: {}'.format(
+                        getattr(session, '_inst_id', None), e
+                    )
+                )
+
+            if session in self._scheduled and not session._data_queue.empty():
+                self._ready.put(session)
+            else:
+                self._scheduled.discard(session)
+
+            gevent.sleep(0)
@@ -0,0 +1,170 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+''' SLE Session Metrics
+
+The ait.dsn.sle.metrics module provides the runtime counters and gauges
+kept by SLE sessions. Updating a counter is a plain attribute increment so
+the metrics can stay enabled on the receive path. See
+:meth:`ait.dsn.sle.common.SLE.stats` for the statistics of a session.
+
+Classes:
+    SessionMetrics: The counters and gauges of one SLE session.
+
+Functions:
+    status_values: Convert a status report PDU into a dictionary.
+'''
+
+import time
+
+
+def status_values(pdu):
+    ''' Convert a status report PDU into a dictionary
+
+    Integer components with named values, such as lock and production
+    statuses, are converted to their names. Other integers are converted
+    to ints and any other component to its pretty printed value. The
+    invoker credentials and components without a value are left out.
+
+    Arguments:
+        pdu:
+            The PyASN1 status report invocation.
+
+    Returns:
+        A dictionary of the report's values keyed by component name.
+    '''
+    values = {}
+    for named_type in pdu.componentType.namedTypes:
+        name = named_type.getName()
+        if name == 'invokerCredentials':
+            continue
+
+        value = pdu[name]
+        if not value.isValue:
+            continue
+
+        if getattr(value, 'namedValues', None):
+            values[name] = value.prettyPrint()
+        else:
+            try:
+                values[name] = int(value)
+            except (TypeError, ValueError):
+                values[name] = value.prettyPrint()
+
+    return values
+
+
+class SessionMetrics(object):
+    ''' The counters and gauges of one SLE session
+
+    The TML counters (bytes, PDUs and heartbeats received and framer
+    resyncs) are kept by the session's
+    :class:`ait.dsn.sle.tml.TMLFramer`. A session gets a new framer for
+    every connection, so the counts of a framer are added to the totals
+    here with :meth:`add_framer` before it is replaced.
+
+    Attributes:
+        pdus_handled: The number of PDUs decoded and passed to handlers.
+
+        transfer_buffers: The number of transfer buffers received.
+
+        decode_failures: The number of PDUs that could not be decoded.
+
+        decode_time: The total seconds spent decoding PDUs.
+
+        handler_time: The total seconds spent in PDU handlers, including
+            the handling of each frame of a transfer buffer.
+
+        heartbeats_sent: The number of TML heartbeats sent.
+
+        queue_high_water: The largest number of PDU messages seen waiting
+            on the session's data queue.
+
+        status_report: The values of the last status report received. See
+            :func:`status_values`.
+
+        status_report_time: The time the last status report was received.
+    '''
+
+    def __init__(self):
+        self.bytes_received = 0
+        self.pdus_received = 0
+        self.heartbeats_received = 0
+        self.resyncs = 0
+
+        self.pdus_handled = 0
+        self.transfer_buffers = 0
+        self.decode_failures = 0
+        self.decode_time = 0.0
+        self.handler_time = 0.0
+        self.heartbeats_sent = 0
+        self.queue_high_water = 0
+        self.status_report = {}
+        self.status_report_time = None
+
+    def add_framer(self, framer):
+        ''' Add the TML counters of a framer that is being replaced '''
+        self.bytes_received += framer.bytes_received
+        self.pdus_received += framer.pdus_received
+        self.heartbeats_received += framer.heartbeats_received
+        self.resyncs += framer.resyncs
+
+    def record_status_report(self, pdu):
+        ''' Keep the values of a received status report
+
+        Arguments:
+            pdu:
+                The PyASN1 status report invocation.
+        '''
+        self.status_report = status_values(pdu)
+        self.status_report_time = time.time()
+
+    def stats(self, framer=None):
+        ''' Return the counters and gauges as a dictionary
+
+        Arguments:
+            framer:
+                The session's current framer, whose TML counters are added
+                to the totals of the framers it replaced.
+
+        Returns:
+            A dictionary of ``bytes_received``, ``pdus_received``,
+            ``heartbeats_received``, ``resyncs``, ``pdus_handled``,
+            ``transfer_buffers``, ``decode_failures``, ``decode_time``,
+            ``handler_time``, ``heartbeats_sent``, ``queue_high_water``,
+            ``status_report`` and ``status_report_time``.
+        '''
+        stats = {
+            'bytes_received': self.bytes_received,
+            'pdus_received': self.pdus_received,
+            'heartbeats_received': self.heartbeats_received,
+            'resyncs': self.resyncs,
+            'pdus_handled': self.pdus_handled,
+            'transfer_buffers': self.transfer_buffers,
+            'decode_failures': self.decode_failures,
+            'decode_time': self.decode_time,
+            'handler_time': self.handler_time,
+            'heartbeats_sent': self.heartbeats_sent,
+            'queue_high_water': self.queue_high_water,
+            'status_report': dict(self.status_report),
+            'status_report_time': self.status_report_time,
+        }
+
+        if framer is not None:
+            stats['bytes_received'] += framer.bytes_received
+            stats['pdus_received'] += framer.pdus_received
+            stats['heartbeats_received'] += framer.heartbeats_received
+            stats['resyncs'] += framer.resyncs
+
+        return stats
@@ -0,0 +1,244 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+''' CCSDS Space Packet Extraction
+
+The ait.dsn.sle.packets module reassembles CCSDS space packets from the
+data fields of a stream of transfer frames. Packets may start in one frame
+and end in a later frame of the same virtual channel.
+
+Attributes:
+    SPACE_PACKET_HEADER_LEN: The length in octets of a space packet
+        primary header.
+
+    MAX_SPACE_PACKET_LEN: The length of the longest possible space packet.
+
+    IDLE_APID: The application process identifier of idle packets.
+
+Classes:
+    PacketExtractor: Extract the packets of each virtual channel from a
+        stream of decoded frames.
+'''
+
+import struct
+
+SPACE_PACKET_HEADER_LEN = 6
+MAX_SPACE_PACKET_LEN = SPACE_PACKET_HEADER_LEN + 65536
+IDLE_APID = 0x7FF
+
+# First header pointer values with special meaning. These are the same
+# for TM frames and AOS M_PDUs.
+_FHP_NO_PACKET = 0x7FF
+_FHP_IDLE = 0x7FE
+
+_SPACE_PACKET_HEADER = struct.Struct('>HHH')
+
+
+class _Channel(object):
+    ''' The reassembly state of one virtual channel or MAP '''
+    __slots__ = ['buf', 'view', 'spare', 'filled', 'length']
+
+    def __init__(self, max_packet_len):
+        self.buf = bytearray(max_packet_len)
+        self.view = memoryview(self.buf)
+        self.spare = None
+        self.filled = 0
+        self.length = None
+
+    def complete(self):
+        ''' Return the collected packet and switch to the spare buffer so
+        that packets started later in the same frame do not overwrite it.
+        '''
+        packet = self.view[:self.length]
+        if self.spare is None:
+            self.spare = bytearray(len(self.buf))
+        self.buf, self.spare = self.spare, self.buf
+        self.view = memoryview(self.buf)
+        self.filled = 0
+        self.length = None
+        return packet
+
+
+class PacketExtractor(object):
+    ''' Extract space packets from the frames of each virtual channel
+
+    Frames are passed to :meth:`extract` in the order they were received.
+    They must provide ``spacecraft_id``, ``virtual_channel_id``,
+    ``virtual_chan_frame_count``, ``first_hdr_ptr``, ``data_field`` and
+    ``is_idle`` like :class:`ait.dsn.sle.frames.TMTransFrame`. Frames with
+    a ``map_id``, such as USLP frames, are reassembled separately for each
+    MAP of a virtual channel.
+
+    A packet that starts and ends in one frame is returned as a memoryview
+    of that frame's data. A packet that continues into later frames is
+    collected in a buffer kept for its virtual channel. The complete packet
+    is returned as a memoryview of that buffer, which is only valid until
+    the channel's next frame is extracted, unless ``copy_stitched`` is set.
+    Each channel alternates between two buffers so that a packet starting
+    in the same frame does not overwrite the one just completed.
+
+    When a virtual channel's frame count skips, or the first header pointer
+    disagrees with the length of the packet being collected, the partial
+    packet is discarded and extraction resumes at the first header pointer.
+
+    Attributes:
+        packets: The number of packets returned.
+
+        frames_lost: The number of frame count discontinuities seen.
+
+        packets_discarded: The number of partial packets discarded.
+
+        idle_packets: The number of idle packets dropped.
+    '''
+
+    def __init__(self, max_packet_len=MAX_SPACE_PACKET_LEN, drop_idle=True,
+                 copy_stitched=False):
+        '''
+        Arguments:
+            max_packet_len:
+                The longest packet that can be reassembled. Longer packets
+                are discarded.
+
+            drop_idle:
+                Whether idle packets (APID 0x7FF) are dropped.
+
+            copy_stitched:
+                Whether packets collected from several frames are returned
+                as independent copies.
+        '''
+        self._max_packet_len = max_packet_len
+        self._drop_idle = drop_idle
+        self._copy_stitched = copy_stitched
+        self._channels = {}
+        self._vc_channels = {}
+        self._next_counts = {}
+
+        self.packets = 0
+        self.frames_lost = 0
+        self.packets_discarded = 0
+        self.idle_packets = 0
+
+    def reset(self):
+        ''' Discard the partial packets of every virtual channel '''
+        self._channels.clear()
+        self._vc_channels.clear()
+        self._next_counts.clear()
+
+    def extract(self, frame):
+        ''' Extract the packets completed by a frame
+
+        Arguments:
+            frame:
+                The decoded frame.
+
+        Returns:
+            A list of memoryviews of the complete packets, including their
+            primary headers.
+        '''
+        vc = (frame.spacecraft_id, frame.virtual_channel_id)
+        key = vc + (getattr(frame, 'map_id', 0),)
+        channel = self._channels.get(key)
+        if channel is None:
+            channel = self._channels[key] = _Channel(self._max_packet_len)
+            self._vc_channels.setdefault(vc, []).append(channel)
+
+        # Sequence controlled and expedited frames are counted separately
+        count_key = vc + (getattr(frame, 'bypass_flag', 0),)
+        count = frame.virtual_chan_frame_count
+        next_count = self._next_counts.get(count_key)
+        if next_count is not None and count != next_count:
+            self.frames_lost += 1
+            for vc_channel in self._vc_channels[vc]:
+                self._discard(vc_channel)
+        self._next_counts[count_key] = (count + 1) % frame.vc_frame_count_modulus
+
+        if frame.is_idle:
+            self._discard(channel)
+            return []
+
+        data = frame.data_field
+        fhp = frame.first_hdr_ptr
+        end = len(data)
+        packets = []
+
+        if fhp == _FHP_NO_PACKET or fhp > end:
+            fhp = end
+
+        # Finish the packet continued from the previous frame
+        if channel.filled:
+            self._collect(channel, data[:fhp])
+            if channel.length is not None and channel.filled == channel.length:
+                self._add(packets, channel.complete(), True)
+            elif fhp < end:
+                self._discard(channel)
+
+        # Packets starting in this frame
+        offset = fhp
+        unpack_from = _SPACE_PACKET_HEADER.unpack_from
+        while offset < end:
+            if offset + SPACE_PACKET_HEADER_LEN > end:
+                self._collect(channel, data[offset:])
+                break
+
+            pkt_end = offset + SPACE_PACKET_HEADER_LEN + 1 + unpack_from(data, offset)[2]
+            if pkt_end > end:
+                self._collect(channel, data[offset:])
+                break
+
+            self._add(packets, data[offset:pkt_end], False)
+            offset = pkt_end
+
+        self.packets += len(packets)
+        return packets
+
+    def _add(self, packets, packet, stitched):
+        ''' Append a complete packet unless it is a dropped idle packet '''
+        if self._drop_idle and _SPACE_PACKET_HEADER.unpack_from(packet)[0] & 0x07FF == IDLE_APID:
+            self.idle_packets += 1
+            return
+
+        if stitched and self._copy_stitched:
+            packet = memoryview(packet.tobytes())
+        packets.append(packet)
+
+    def _collect(self, channel, data):
+        ''' Add data to the channel's partial packet '''
+        n = len(data)
+        if not n:
+            return
+
+        start = channel.filled
+        if start + n > self._max_packet_len:
+            self._discard(channel)
+            return
+
+        channel.view[start:start + n] = data
+        channel.filled = start + n
+
+        if channel.length is None and channel.filled >= SPACE_PACKET_HEADER_LEN:
+            length = SPACE_PACKET_HEADER_LEN + 1 + _SPACE_PACKET_HEADER.unpack_from(channel.buf)[2]
+            if length > self._max_packet_len:
+                self._discard(channel)
+                return
+            channel.length = length
+
+        if channel.length is not None and channel.filled > channel.length:
+            self._discard(channel)
+
+    def _discard(self, channel):
+        ''' Drop the channel's partial packet '''
+        if channel.filled:
+            self.packets_discarded += 1
+        channel.filled = 0
+        channel.length = None
@@ -21,12 +21,10 @@ Classes:
     RAF: An extension of the generic ait.dsn.sle.common.SLE class which
         implements the RAF standard.
 '''
-import struct
 
 import ait.core.log
 
-import common
-import frames
+from ait.dsn.sle import ber, common, timecode
 from ait.dsn.sle.pdu.raf import *
 from ait.dsn.sle.pdu import raf
 
@@ -70,6 +68,8 @@ class RAF(common.SLE):
         A potential component of the PDU received by the RafTransferBuffer
         handler. If the provider is sending data to the user this is the handler
         that will fire to process the PDU.
+        If the ``fast_decode`` option is enabled this handler receives a
+        :class:`ait.dsn.sle.ber.FrameRecord` instead of a PyASN1 object.
 
     SyncNotification
         A potential component of the PDU received by the RafTransferBuffer
@@ -162,6 +162,7 @@ class RAF(common.SLE):
                 :class:`ait.dsn.sle.pdu.raf.RequestedFrameQuality`
         
         '''
+        self._start_args = (start_time, end_time, frame_quality)
         start_invoc = RafUsertoProviderPdu()
 
         if self._auth_level == 'all':
@@ -174,13 +175,13 @@ class RAF(common.SLE):
         if start_time is None:
             start_invoc['rafStartInvocation']['startTime']['undefined'] = None
         else:
-            start_time = struct.pack('!HIH', (start_time - common.CCSDS_EPOCH).days, 0, 0)
+            start_time = timecode.encode(start_time)
             start_invoc['rafStartInvocation']['startTime']['known']['ccsdsFormat'] = start_time
 
         if end_time is None:
             start_invoc['rafStartInvocation']['stopTime']['undefined'] = None
         else:
-            stop_time = struct.pack('!HIH', (end_time - common.CCSDS_EPOCH).days, 0, 0)
+            stop_time = timecode.encode(end_time)
             start_invoc['rafStartInvocation']['stopTime']['known']['ccsdsFormat'] = stop_time
 
         start_invoc['rafStartInvocation']['requestedFrameQuality'] = frame_quality
@@ -217,11 +218,11 @@ class RAF(common.SLE):
         pdu['rafScheduleStatusReportInvocation']['invokeId'] = self.invoke_id
 
         if report_type == 'immediately':
-            pdu['rafScheduleStatusReportInvocation']['reportType'][report_type] = None
+            pdu['rafScheduleStatusReportInvocation']['reportRequestType'][report_type] = None
         elif report_type == 'periodically':
-            pdu['rafScheduleStatusReportInvocation']['reportType'][report_type] = cycle
+            pdu['rafScheduleStatusReportInvocation']['reportRequestType'][report_type] = cycle
         elif report_type == 'stop':
-            pdu['rafScheduleStatusReportInvocation']['reportType'][report_type] = None
+            pdu['rafScheduleStatusReportInvocation']['reportRequestType'][report_type] = None
         else:
             raise ValueError('Unknown report type: {}'.format(report_type))
 
@@ -255,6 +256,13 @@ class RAF(common.SLE):
             The decoded RAF PDU as an instance of the
             :class:`ait.dsn.sle.pdu.raf.RafProvidertoUserPdu` class.
         '''
+        if self._fast_decode:
+            result = self._decode_transfer_buffer(
+                message, RafProvidertoUserPdu(), 'rafTransferBuffer', True
+            )
+            if result is not None:
+                return result
+
         return super(self.__class__, self).decode(message, RafProvidertoUserPdu())
 
     def _bind_return_handler(self, pdu):
@@ -325,27 +333,42 @@ class RAF(common.SLE):
 
     def _data_transfer_handler(self, pdu):
         ''''''
-        for data in pdu['rafTransferBuffer']:
+        if isinstance(pdu, ber.TransferBuffer):
+            transfer_buffer = pdu
+        else:
+            transfer_buffer = pdu['rafTransferBuffer']
+
+        self._metrics.transfer_buffers += 1
+        for data in transfer_buffer:
             self._handle_pdu(data)
 
     def _transfer_data_invoc_handler(self, pdu):
         ''''''
-        frame = pdu.getComponent()
-        if 'data' in frame and frame['data'].isValue:
-            tm_data = frame['data'].asOctets()
+        if isinstance(pdu, ber.FrameRecord):
+            tm_data = pdu.data
+            self._last_ert = pdu.earth_receive_time
         else:
-            err = (
-                'RafTransferBuffer received but data cannot be located. '
-                'Skipping further processing of this PDU ...'
-            )
-            ait.core.log.info(err)
-            return
+            frame = pdu.getComponent()
+            if 'data' in frame and frame['data'].isValue:
+                tm_data = frame['data'].asOctets()
+                self._last_ert = frame['earthReceiveTime'].getComponent().asOctets()
+            else:
+                err = (
+                    'RafTransferBuffer received but data cannot be located. '
+                    'Skipping further processing of this PDU ...'
+                )
+                ait.core.log.info(err)
+                return
         
-        tm_frame_class = getattr(frames, self._downlink_frame_type)
-        tmf = tm_frame_class(tm_data)
-           
-        ait.core.log.info('Sending {} bytes to telemetry port'.format(len(tmf._data[0])))
-        self._telem_sock.sendto(tmf._data[0], ('localhost', 3076))
+        tmf = self._frame_decoder
+        try:
+            tmf.decode(tm_data)
+        except ValueError as e:
+            self._metrics.decode_failures += 1
+            ait.core.log.error('Skipping undecodable transfer frame: {}'.format(e))
+            return
+
+        self._handle_frame(tmf)
 
     def _sync_notify_handler(self, pdu):
         ''''''
@@ -364,7 +387,7 @@ class RAF(common.SLE):
                 notification['time'],
                 notification['carrierLockStatus'],
                 notification['subcarrierLockStatus'],
-                notification['symbolSynclockStatus']
+                notification['symbolSyncLockStatus']
             )
         elif notification_name == 'productionStatusChange':
             prod_status_labels = ['running', 'interrupted', 'halted']
@@ -394,14 +417,13 @@ class RAF(common.SLE):
                 diag_options = ['notSupportedInThisDeliveryMode', 'alreadyStopped', 'invalidReportingCycle']
 
             reason = diag_options[int(diag.getComponent())]
-            ait.core.log.warning('Status Report Scheduling Failed. Reason: {}'.format(reason))
+            ait.core.log.warn('Status Report Scheduling Failed. Reason: {}'.format(reason))
 
     def _status_report_invoc_handler(self, pdu):
         ''''''
         pdu = pdu['rafStatusReportInvocation']
-        report = 'Status Report\n'
-        report += 'Number of Error Free Frames: {}\n'.format(pdu['errorFreeFrameNumber'])
-        report += 'Number of Delivered Frames: {}\n'.format(pdu['deliveredFrameNumber'])
+        self._metrics.record_status_report(pdu)
+        report = self._status_report(pdu)
 
         frame_lock_status = ['In Lock', 'Out of Lock', 'Unknown']
         report += 'Frame Sync Lock Status: {}\n'.format(frame_lock_status[pdu['frameSyncLockStatus']])
@@ -418,7 +440,7 @@ class RAF(common.SLE):
         production_status = ['Running', 'Interrupted', 'Halted']
         report += 'Production Status: {}'.format(production_status[pdu['productionStatus']])
 
-        ait.core.log.warning(report)
+        ait.core.log.warn(report)
 
     def _get_param_return_handler(self, pdu):
         ''''''
@@ -428,11 +450,6 @@ class RAF(common.SLE):
     def _peer_abort_handler(self, pdu):
         ''''''
         pdu = pdu['rafPeerAbortInvocation']
-        opts = [
-            'accessDenied', 'unexpectedResponderId', 'operationalRequirement',
-            'protocolError', 'communicationsFailure', 'encodingError', 'returnTimeout',
-            'endOfServiceProvisionPeriod', 'unsolicitedInvokeId', 'otherReason'
-        ]
-        ait.core.log.error('Peer Abort Received. {}'.format(opts[pdu]))
+        ait.core.log.error('Peer Abort Received. {}'.format(pdu.prettyPrint()))
         self._state = 'unbound'
         self.disconnect()
@@ -23,12 +23,10 @@ Classes:
     RCF: An extension of the generic ait.dsn.sle.common.SLE class which
         implements the RCF standard.
 '''
-import struct
 
 import ait.core.log
 
-import common
-import frames
+from ait.dsn.sle import ber, common, timecode
 from ait.dsn.sle.pdu.rcf import *
 from ait.dsn.sle.pdu import rcf
 
@@ -72,6 +70,8 @@ class RCF(common.SLE):
         A potential component of the PDU received by the RcfTransferBuffer
         handler. If the provider is sending data to the user this is the handler
         that will fire to process the PDU.
+        If the ``fast_decode`` option is enabled this handler receives a
+        :class:`ait.dsn.sle.ber.FrameRecord` instead of a PyASN1 object.
 
     SyncNotification
         A potential component of the PDU received by the RcfTransferBuffer
@@ -211,6 +211,9 @@ class RCF(common.SLE):
             )
             raise AttributeError(err)
 
+        self._start_args = (start_time, end_time, spacecraft_id,
+                            trans_frame_ver_num, master_channel,
+                            virtual_channel)
         start_invoc = RcfUsertoProviderPdu()
 
         if self._auth_level == 'all':
@@ -223,13 +226,13 @@ class RCF(common.SLE):
         if start_time is None:
             start_invoc['rcfStartInvocation']['startTime']['undefined'] = None
         else:
-            start_time = struct.pack('!HIH', (start_time - common.CCSDS_EPOCH).days, 0, 0)
+            start_time = timecode.encode(start_time)
             start_invoc['rcfStartInvocation']['startTime']['known']['ccsdsFormat'] = start_time
 
         if end_time is None:
             start_invoc['rcfStartInvocation']['stopTime']['undefined'] = None
         else:
-            stop_time = struct.pack('!HIH', (end_time - common.CCSDS_EPOCH).days, 0, 0)
+            stop_time = timecode.encode(end_time)
             start_invoc['rcfStartInvocation']['stopTime']['known']['ccsdsFormat'] = stop_time
 
         req_gvcid = GvcId()
@@ -275,11 +278,11 @@ class RCF(common.SLE):
         pdu['rcfScheduleStatusReportInvocation']['invokeId'] = self.invoke_id
 
         if report_type == 'immediately':
-            pdu['rcfScheduleStatusReportInvocation']['reportType'][report_type] = None
+            pdu['rcfScheduleStatusReportInvocation']['reportRequestType'][report_type] = None
         elif report_type == 'periodically':
-            pdu['rcfScheduleStatusReportInvocation']['reportType'][report_type] = cycle
+            pdu['rcfScheduleStatusReportInvocation']['reportRequestType'][report_type] = cycle
         elif report_type == 'stop':
-            pdu['rcfScheduleStatusReportInvocation']['reportType'][report_type] = None
+            pdu['rcfScheduleStatusReportInvocation']['reportRequestType'][report_type] = None
         else:
             raise ValueError('Unknown report type: {}'.format(report_type))
 
@@ -313,22 +316,14 @@ class RCF(common.SLE):
             The decoded RCF PDU as an instance of the
             :class:`ait.dsn.sle.pdu.rcf.RcfProvidertoUserPdu` class.
         '''
-        return super(self.__class__, self).decode(message, RcfProvidertoUserPdu())
-
-    def _handle_pdu(self, pdu):
-        ''''''
-        pdu_key = pdu.getName()
-        pdu_key = pdu_key[:1].upper() + pdu_key[1:]
-        if pdu_key in self._handlers:
-            pdu_handlerss = self._handlers[pdu_key]
-            for h in pdu_handlerss:
-                h(pdu)
-        else:
-            err = (
-                'PDU of type {} has no associated handlers. '
-                'Unable to process further and skipping ...'
+        if self._fast_decode:
+            result = self._decode_transfer_buffer(
+                message, RcfProvidertoUserPdu(), 'rcfTransferBuffer', False
             )
-            ait.core.log.error(err.format(pdu_key))
+            if result is not None:
+                return result
+
+        return super(self.__class__, self).decode(message, RcfProvidertoUserPdu())
 
     def _bind_return_handler(self, pdu):
         ''''''
@@ -399,28 +394,43 @@ class RCF(common.SLE):
 
     def _data_transfer_handler(self, pdu):
         ''''''
-        for data in pdu['rcfTransferBuffer']:
+        if isinstance(pdu, ber.TransferBuffer):
+            transfer_buffer = pdu
+        else:
+            transfer_buffer = pdu['rcfTransferBuffer']
+
+        self._metrics.transfer_buffers += 1
+        for data in transfer_buffer:
             self._handle_pdu(data)
 
     def _transfer_data_invoc_handler(self, pdu):
         ''''''
-        frame = pdu.getComponent()
-        if 'data' in frame and frame['data'].isValue:
-            tm_data = frame['data'].asOctets()
-
+        if isinstance(pdu, ber.FrameRecord):
+            tm_data = pdu.data
+            self._last_ert = pdu.earth_receive_time
         else:
-            err = (
-                'RcfTransferBuffer received but data cannot be located. '
-                'Skipping further processing of this PDU ...'
-            )
-            ait.core.log.info(err)
-            return
+            frame = pdu.getComponent()
+            if 'data' in frame and frame['data'].isValue:
+                tm_data = frame['data'].asOctets()
+                self._last_ert = frame['earthReceiveTime'].getComponent().asOctets()
+
+            else:
+                err = (
+                    'RcfTransferBuffer received but data cannot be located. '
+                    'Skipping further processing of this PDU ...'
+                )
+                ait.core.log.info(err)
+                return
             
-        tm_frame_class = getattr(frames, self._downlink_frame_type)
-        tmf = tm_frame_class(tm_data)
-        
-        ait.core.log.info('Sending {} bytes to telemetry port'.format(len(tmf._data[0])))
-        self._telem_sock.sendto(tmf._data[0], ('localhost', 3076))
+        tmf = self._frame_decoder
+        try:
+            tmf.decode(tm_data)
+        except ValueError as e:
+            self._metrics.decode_failures += 1
+            ait.core.log.error('Skipping undecodable transfer frame: {}'.format(e))
+            return
+
+        self._handle_frame(tmf)
 
     def _sync_notify_handler(self, pdu):
         ''''''
@@ -439,7 +449,7 @@ class RCF(common.SLE):
                 notification['time'],
                 notification['carrierLockStatus'],
                 notification['subcarrierLockStatus'],
-                notification['symbolSynclockStatus']
+                notification['symbolSyncLockStatus']
             )
         elif notification_name == 'productionStatusChange':
             prod_status_labels = ['running', 'interrupted', 'halted']
@@ -469,14 +479,13 @@ class RCF(common.SLE):
                 diag_options = ['notSupportedInThisDeliveryMode', 'alreadyStopped', 'invalidReportingCycle']
 
             reason = diag_options[int(diag.getComponent())]
-            ait.core.log.warning('Status Report Scheduling Failed. Reason: {}'.format(reason))
+            ait.core.log.warn('Status Report Scheduling Failed. Reason: {}'.format(reason))
 
     def _status_report_invoc_handler(self, pdu):
         ''''''
         pdu = pdu['rcfStatusReportInvocation']
-        report = 'Status Report\n'
-        report += 'Number of Error Free Frames: {}\n'.format(pdu['errorFreeFrameNumber'])
-        report += 'Number of Delivered Frames: {}\n'.format(pdu['deliveredFrameNumber'])
+        self._metrics.record_status_report(pdu)
+        report = self._status_report(pdu)
 
         frame_lock_status = ['In Lock', 'Out of Lock', 'Unknown']
         report += 'Frame Sync Lock Status: {}\n'.format(frame_lock_status[pdu['frameSyncLockStatus']])
@@ -493,7 +502,7 @@ class RCF(common.SLE):
         production_status = ['Running', 'Interrupted', 'Halted']
         report += 'Production Status: {}'.format(production_status[pdu['productionStatus']])
 
-        ait.core.log.warning(report)
+        ait.core.log.warn(report)
 
     def _get_param_return_handler(self, pdu):
         ''''''
@@ -503,11 +512,6 @@ class RCF(common.SLE):
     def _peer_abort_handler(self, pdu):
         ''''''
         pdu = pdu['rcfPeerAbortInvocation']
-        opts = [
-            'accessDenied', 'unexpectedResponderId', 'operationalRequirement',
-            'protocolError', 'communicationsFailure', 'encodingError', 'returnTimeout',
-            'endOfServiceProvisionPeriod', 'unsolicitedInvokeId', 'otherReason'
-        ]
-        ait.core.log.error('Peer Abort Received. {}'.format(opts[pdu]))
+        ait.core.log.error('Peer Abort Received. {}'.format(pdu.prettyPrint()))
         self._state = 'unbound'
         self.disconnect()
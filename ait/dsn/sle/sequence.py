@@ -0,0 +1,215 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+''' Transfer Frame Count Tracking
+
+The ait.dsn.sle.sequence module follows the master channel and virtual
+channel frame counts of received transfer frames to account for lost,
+duplicated and reordered frames while a pass is in progress.
+
+Classes:
+    FrameCountTracker: Track the frame counts of every master channel and
+        virtual channel.
+'''
+
+import collections
+import time
+
+
+class _Counter(object):
+    ''' The state and statistics of one frame counter '''
+    __slots__ = ['last', 'frames', 'gaps', 'lost', 'duplicates', 'reorders', 'recent_gaps',
+                 '_reorder_window', '_resync_after', '_late', '_late_first', '_late_last']
+
+    def __init__(self, max_gaps, reorder_window, resync_after):
+        self.last = None
+        self.frames = 0
+        self.gaps = 0
+        self.lost = 0
+        self.duplicates = 0
+        self.reorders = 0
+        self.recent_gaps = collections.deque(maxlen=max_gaps)
+        self._reorder_window = reorder_window
+        self._resync_after = resync_after
+        self._late = 0
+        self._late_first = None
+        self._late_last = None
+
+    def update(self, count, modulus):
+        ''' Account for a received count and return how many frames were lost '''
+        self.frames += 1
+        if self.last is None:
+            self.last = count
+            return 0
+
+        delta = (count - self.last) % modulus
+        if delta == 1:
+            self.last = count
+            self._late = 0
+            return 0
+        elif delta == 0:
+            self.duplicates += 1
+            return 0
+        elif modulus - delta <= min(self._reorder_window, modulus // 2):
+            # A late frame from before the last count. Keep the last count
+            # unless the late counts keep running on, in which case the
+            # counter moved on after a gap of nearly the counter's range.
+            if self._late and count == (self._late_last + 1) % modulus:
+                self._late += 1
+            else:
+                self._late = 1
+                self._late_first = count
+            self._late_last = count
+            self.reorders += 1
+
+            if self._late < self._resync_after:
+                return 0
+
+            self.reorders -= self._late
+            self._late = 0
+            lost = self._gap((self._late_first - self.last - 1) % modulus, modulus)
+            self.last = count
+            return lost
+
+        self._late = 0
+        lost = self._gap(delta - 1, modulus)
+        self.last = count
+        return lost
+
+    def _gap(self, lost, modulus):
+        ''' Record a gap of lost frames after the last count '''
+        if lost:
+            self.gaps += 1
+            self.lost += lost
+            self.recent_gaps.append(((self.last + 1) % modulus, lost, time.time()))
+        return lost
+
+    def stats(self):
+        return {
+            'last_count': self.last,
+            'frames': self.frames,
+            'gaps': self.gaps,
+            'frames_lost': self.lost,
+            'duplicates': self.duplicates,
+            'reorders': self.reorders,
+            'recent_gaps': list(self.recent_gaps),
+        }
+
+
+class FrameCountTracker(object):
+    ''' Track the frame counts of received transfer frames
+
+    Each frame's master channel frame count, if it has one, and virtual
+    channel frame count are compared with the last count received on the
+    same channel. Counts wrap at the frame's ``vc_frame_count_modulus``
+    (256 for TM frames and 2 ** 24 for AOS frames) and at 256 for TM
+    master channel counts. A repeated count is a duplicate. A count that
+    moves back by up to ``reorder_window`` counts, or half of the
+    counter's range if that is smaller, is a reordered (late) frame, and
+    does not change the last count. Any other count that does not follow
+    the last count is a gap, so an outage of most of the counter's range
+    is still counted as lost frames. If ``resync_after`` consecutive
+    counts in a row fall into the reorder window, the counter is taken to
+    have moved on after a gap and the tracker resynchronizes to it. Gaps
+    are not reduced by frames that arrive late. Each update takes
+    constant time.
+
+    The most recent ``max_gaps`` gaps of each channel are kept as
+    ``(first missing count, frames lost, time)`` tuples.
+    '''
+
+    def __init__(self, max_gaps=32, reorder_window=16, resync_after=4):
+        '''
+        Arguments:
+            max_gaps:
+                The number of recent gaps kept for each channel.
+
+            reorder_window:
+                The largest backward step of a count that is taken as a
+                late frame rather than a gap.
+
+            resync_after:
+                The number of consecutive late counts after which the
+                tracker resynchronizes to them.
+        '''
+        self._max_gaps = max_gaps
+        self._reorder_window = reorder_window
+        self._resync_after = resync_after
+        self._master = {}
+        self._virtual = {}
+
+    def reset(self):
+        ''' Forget every channel's counts and statistics '''
+        self._master.clear()
+        self._virtual.clear()
+
+    def update(self, frame):
+        ''' Account for the frame counts of a received frame
+
+        Arguments:
+            frame:
+                The decoded frame. It must provide ``spacecraft_id``,
+                ``virtual_channel_id``, ``virtual_chan_frame_count`` and
+                ``vc_frame_count_modulus`` and may provide
+                ``master_chan_frame_count``.
+
+        Returns:
+            The number of frames found missing on the virtual channel.
+        '''
+        scid = frame.spacecraft_id
+        mc_count = getattr(frame, 'master_chan_frame_count', None)
+        if mc_count is not None:
+            counter = self._master.get(scid)
+            if counter is None:
+                counter = self._master[scid] = _Counter(self._max_gaps, self._reorder_window, self._resync_after)
+            counter.update(mc_count, 256)
+
+        modulus = frame.vc_frame_count_modulus
+        if modulus <= 1:
+            return 0
+
+        key = (scid, frame.virtual_channel_id)
+        counter = self._virtual.get(key)
+        if counter is None:
+            counter = self._virtual[key] = _Counter(self._max_gaps, self._reorder_window, self._resync_after)
+        return counter.update(frame.virtual_chan_frame_count, modulus)
+
+    def stats(self):
+        ''' Return the statistics of every channel
+
+        Returns:
+            A dictionary with ``master_channels`` keyed by spacecraft id
+            and ``virtual_channels`` keyed by (spacecraft id, virtual
+            channel id). Each channel's statistics are a dictionary of
+            ``last_count``, ``frames``, ``gaps``, ``frames_lost``,
+            ``duplicates``, ``reorders`` and ``recent_gaps``.
+        '''
+        return {
+            'master_channels': dict((k, c.stats()) for k, c in self._master.items()),
+            'virtual_channels': dict((k, c.stats()) for k, c in self._virtual.items()),
+        }
+
+    def report(self):
+        ''' Return a summary of every channel's statistics as text '''
+        lines = []
+        for name, channels in (('Master Channel', self._master),
+                               ('Virtual Channel', self._virtual)):
+            for key in sorted(channels):
+                counter = channels[key]
+                label = '/'.join(str(k) for k in key) if isinstance(key, tuple) else key
+                lines.append(
+                    '{} {}: {} frames, {} gaps, {} lost, {} duplicates, {} reordered'.format(
+                        name, label, counter.frames, counter.gaps, counter.lost,
+                        counter.duplicates, counter.reorders))
+        return '\n'.join(lines)
@@ -0,0 +1,731 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+''' Local SLE Provider Simulator
+
+The ait.dsn.sle.simulator module provides a local SLE provider for load
+and stress testing RAF, RCF and CLTU sessions without a connection to a
+ground station. The simulator accepts TML connections, answers bind,
+start, stop, unbind, schedule status report and CLTU transfer data
+invocations using the PyASN1 PDU specifications and, once a return
+service is started, sends transfer buffers of synthetic TM or AOS frames
+at a configured rate.
+
+Provider events that are hard to reproduce against a real provider can be
+injected into the active connections at any time: sync notifications
+such as a loss of frame sync, a data backlog delivered as fast as the
+connection allows, gaps in the frame counts and peer aborts.
+
+Attributes:
+    SYNC_NOTIFICATIONS: The RAF / RCF sync notifications that can be
+        injected with :meth:`ProviderSimulator.notify`.
+
+    CLTU_NOTIFICATIONS: The CLTU async notifications that can be injected
+        with :meth:`ProviderSimulator.notify`.
+
+Classes:
+    FrameGenerator: Build synthetic transfer frames carrying space packets.
+
+    ProviderSimulator: A local SLE provider serving RAF, RCF or CLTU
+        sessions.
+
+Functions:
+    encode_transfer_buffer: Encode frames as a RAF / RCF transfer buffer
+        PDU.
+'''
+
+import datetime as dt
+import importlib
+import socket
+import struct
+import time
+
+import gevent
+import gevent.lock
+import gevent.server
+import pyasn1.error
+from pyasn1.codec.ber.encoder import encode
+from pyasn1.codec.der.decoder import decode
+
+import ait.core
+import ait.core.log
+
+from ait.dsn.sle import ber, timecode, tml
+
+SYNC_NOTIFICATIONS = (
+    'lossFrameSync', 'productionStatusChange', 'excessiveDataBacklog', 'endOfData'
+)
+
+CLTU_NOTIFICATIONS = (
+    'cltuRadiated', 'slduExpired', 'productionInterrupted', 'productionHalted',
+    'productionOperational', 'bufferEmpty'
+)
+
+_CONTEXT_MSG_LEN = struct.calcsize(tml.TML_CONTEXT_MSG_FORMAT)
+
+# Annotated frame fields that do not change from frame to frame
+_CREDENTIALS_UNUSED = b'\x80\x00'
+_ANTENNA_ID = ber.encode_tlv(0x81, b'SIM')
+_CONTINUITY = ber.encode_integer(0)
+_QUALITY_GOOD = ber.encode_integer(0)
+_ANNOTATION_NULL = b'\x80\x00'
+
+
+def encode_transfer_buffer(frames, ert=None, has_quality=True):
+    ''' Encode frames as a RAF / RCF transfer buffer PDU
+
+    The PDU is built directly from BER TLVs instead of through PyASN1 so
+    that the simulator can sustain high frame rates. The encoding matches
+    PyASN1's encoding of the equivalent ``rafTransferBuffer`` or
+    ``rcfTransferBuffer`` PDU.
+
+    Arguments:
+        frames:
+            The frame data, one bytes object per annotated frame.
+
+        ert:
+            The 8 octet CCSDS earth receive time of the frames. Defaults to
+            the current time.
+
+        has_quality:
+            Whether to include a delivered frame quality in the annotated
+            frames. This is True for RAF and False for RCF.
+
+    Returns:
+        The BER encoded transfer buffer PDU.
+    '''
+    if ert is None:
+        ert = timecode.encode(dt.datetime.utcnow())
+
+    prefix = _CREDENTIALS_UNUSED + ber.encode_tlv(0x80, ert) + _ANTENNA_ID + _CONTINUITY
+    if has_quality:
+        prefix += _QUALITY_GOOD
+    prefix += _ANNOTATION_NULL
+
+    records = b''.join(
+        ber.encode_tlv(ber.ANNOTATED_FRAME_TAG, prefix + ber.encode_tlv(0x04, frame))
+        for frame in frames
+    )
+    return ber.encode_tlv(ber.TRANSFER_BUFFER_TAG, records)
+
+
+class FrameGenerator(object):
+    ''' Build synthetic transfer frames carrying space packets
+
+    Each frame's data field holds exactly one space packet, so every frame
+    has a first header pointer of 0 and yields one packet when decoded.
+    The master and virtual channel frame counts and the packet sequence
+    count increase with each frame.
+
+    Attributes:
+        frames_generated: The number of frames built.
+
+        frames_skipped: The number of frame counts skipped with
+            :meth:`skip`.
+    '''
+
+    _HEADER_LENS = {
+        'TMTransFrame': 6,
+        'AOSTransFrame': 8,
+    }
+
+    def __init__(self, frame_type='TMTransFrame', frame_len=1115, spacecraft_id=250,
+                 virtual_channel_id=0, apid=100):
+        '''
+        Arguments:
+            frame_type:
+                Either ``'TMTransFrame'`` or ``'AOSTransFrame'``. AOS frames
+                carry an M_PDU.
+
+            frame_len:
+                The length in octets of each frame. Frames have no
+                operational or frame error control field.
+
+            spacecraft_id:
+                The spacecraft ID of the frames.
+
+            virtual_channel_id:
+                The virtual channel ID of the frames.
+
+            apid:
+                The APID of the packets.
+
+        Raises:
+            ValueError:
+                If the frame type is not supported or the frames are too
+                short to hold a packet.
+        '''
+        if frame_type not in self._HEADER_LENS:
+            raise ValueError('Unsupported simulator frame type {}'.format(frame_type))
+
+        header_len = self._HEADER_LENS[frame_type]
+        packet_len = frame_len - header_len
+        if packet_len < 7:
+            raise ValueError('Frame length {} is too short to hold a packet'.format(frame_len))
+
+        self.frame_type = frame_type
+        self.spacecraft_id = spacecraft_id
+        self.virtual_channel_id = virtual_channel_id
+
+        self._frame = bytearray(frame_len)
+        self._packet_offset = header_len
+        self._count = 0
+        struct.pack_into('>HHH', self._frame, header_len, apid & 0x7FF, 0xC000, packet_len - 7)
+
+        self.frames_generated = 0
+        self.frames_skipped = 0
+
+    def frame(self):
+        ''' Return the next frame '''
+        frame = self._frame
+        count = self._count
+        if self.frame_type == 'TMTransFrame':
+            frame_id = ((self.spacecraft_id & 0x3FF) << 4) | ((self.virtual_channel_id & 0x7) << 1)
+            struct.pack_into('>HBBH', frame, 0, frame_id, count & 0xFF, count & 0xFF, 0)
+        else:
+            frame_id = (1 << 14) | ((self.spacecraft_id & 0xFF) << 6) | (self.virtual_channel_id & 0x3F)
+            struct.pack_into('>HIH', frame, 0, frame_id, (count & 0xFFFFFF) << 8, 0)
+
+        struct.pack_into('>H', frame, self._packet_offset + 2, 0xC000 | (count & 0x3FFF))
+        self._count += 1
+        self.frames_generated += 1
+        return bytes(frame)
+
+    def frames(self, count):
+        ''' Return a list of the next count frames '''
+        return [self.frame() for i in range(count)]
+
+    def skip(self, count):
+        ''' Skip count frames, leaving a gap in the frame counts '''
+        self._count += count
+        self.frames_skipped += count
+
+
+class _Connection(object):
+    ''' The state of a user connection to the simulator '''
+
+    def __init__(self, sock, address, generator):
+        self.sock = sock
+        self.address = address
+        self.generator = generator
+        self.lock = gevent.lock.Semaphore()
+        self.state = 'unbound'
+        self.closed = False
+        self.transfer = None
+        self.reporter = None
+        self.backlog = 0
+
+
+class ProviderSimulator(object):
+    ''' A local SLE provider serving RAF, RCF or CLTU sessions
+
+    The simulator listens for TML connections with a gevent StreamServer.
+    Each connection is answered independently and, once started, a RAF or
+    RCF connection receives transfer buffers of ``buffer_size`` frames from
+    its own :class:`FrameGenerator` at ``frame_rate`` frames per second.
+    CLTU transfer data invocations are acknowledged with a constant
+    available buffer size.
+
+    Usage::
+
+        sim = ProviderSimulator('raf', frame_rate=5000, buffer_size=50)
+        sim.start()
+
+        raf = ait.dsn.sle.RAF(hostnames=['127.0.0.1'], port=sim.port, ...)
+        ...
+        sim.notify('lossFrameSync')
+        sim.backlog(10000)
+        sim.abort()
+        sim.stop()
+
+    Attributes:
+        port: The port the simulator is listening on once started.
+
+        invocations: The number of invocations received of each type.
+
+        frames_sent: The number of frames sent in transfer buffers.
+
+        buffers_sent: The number of transfer buffers sent.
+
+        notifications_sent: The number of notifications sent.
+
+        aborts_sent: The number of peer aborts sent.
+
+        cltus_received: The number of CLTUs received.
+    '''
+
+    _PDU_SPECS = {
+        'raf': ('ait.dsn.sle.pdu.raf', 'RafUsertoProviderPdu', 'RafProvidertoUserPdu'),
+        'rcf': ('ait.dsn.sle.pdu.rcf', 'RcfUsertoProviderPdu', 'RcfProvidertoUserPdu'),
+        'cltu': (None, 'CltuUserToProviderPdu', 'CltuProviderToUserPdu'),
+    }
+
+    def __init__(self, service='raf', host='127.0.0.1', port=0, frame_type='TMTransFrame',
+                 frame_len=1115, frame_rate=100.0, buffer_size=10, spacecraft_id=250,
+                 virtual_channel_id=0, cltu_buffer=100000, responder_id='SSE'):
+        '''
+        Arguments:
+            service:
+                The service to provide. One of ``'raf'``, ``'rcf'`` or
+                ``'cltu'``.
+
+            host:
+                The address to listen on.
+
+            port:
+                The port to listen on. A free port is chosen if 0.
+
+            frame_type:
+                The type of frames to send. See :class:`FrameGenerator`.
+
+            frame_len:
+                The length in octets of each frame.
+
+            frame_rate:
+                The number of frames per second to send to each started
+                connection, or 0 to send as fast as the connection allows.
+
+            buffer_size:
+                The number of frames in each transfer buffer.
+
+            spacecraft_id:
+                The spacecraft ID of the frames.
+
+            virtual_channel_id:
+                The virtual channel ID of the frames.
+
+            cltu_buffer:
+                The available CLTU buffer size in octets reported in CLTU
+                transfer data returns and status reports.
+
+            responder_id:
+                The responder identifier returned in bind returns.
+
+        Raises:
+            ValueError:
+                If the service or frame type is not supported.
+        '''
+        if service not in self._PDU_SPECS:
+            raise ValueError('Unsupported simulator service {}'.format(service))
+
+        module, user_pdu, provider_pdu = self._PDU_SPECS[service]
+        if module is None:
+            if ait.config.get('dsn.sle.version', None) == 4:
+                module = 'ait.dsn.sle.pdu.cltu.cltuv4'
+            else:
+                module = 'ait.dsn.sle.pdu.cltu.cltuv5'
+        module = importlib.import_module(module)
+
+        self.service = service
+        self.frame_type = frame_type
+        self.frame_len = frame_len
+        self.frame_rate = frame_rate
+        self.buffer_size = buffer_size
+        self.spacecraft_id = spacecraft_id
+        self.virtual_channel_id = virtual_channel_id
+        self.cltu_buffer = cltu_buffer
+        self.responder_id = responder_id
+
+        # Fail on a bad frame configuration now rather than on start
+        self._make_generator()
+
+        self._user_pdu = getattr(module, user_pdu)
+        self._provider_pdu = getattr(module, provider_pdu)
+        self._prefix = service
+        self._has_quality = service == 'raf'
+        self._frame_sync_lock = True
+
+        self._server = gevent.server.StreamServer((host, port), self._handle)
+        self._connections = set()
+        self._responders = {
+            'BindInvocation': self._bind,
+            'UnbindInvocation': self._unbind,
+            'StartInvocation': self._start,
+            'StopInvocation': self._stop,
+            'ScheduleStatusReportInvocation': self._schedule_status_report,
+            'TransferDataInvocation': self._transfer_data,
+            'PeerAbortInvocation': self._peer_abort,
+        }
+
+        self.port = None
+        self.invocations = {}
+        self.frames_sent = 0
+        self.buffers_sent = 0
+        self.notifications_sent = 0
+        self.aborts_sent = 0
+        self.cltus_received = 0
+
+    @property
+    def connections(self):
+        ''' The number of open user connections '''
+        return len(self._connections)
+
+    def start(self):
+        ''' Start listening for connections '''
+        self._server.start()
+        self.port = self._server.server_port
+        ait.core.log.info('SLE provider simulator serving {} on port {}'.format(
+            self.service.upper(), self.port
+        ))
+
+    def stop(self):
+        ''' Close all connections and stop listening '''
+        for conn in list(self._connections):
+            self._close(conn)
+        self._server.stop()
+
+    def notify(self, notification, production_status='interrupted'):
+        ''' Send a notification to every bound connection
+
+        RAF and RCF connections receive a transfer buffer containing a sync
+        notification. A loss of frame sync is reported in status reports
+        until the next transfer buffer is sent, and an end of data
+        notification stops the connection's frame transfer. CLTU
+        connections receive an async notification.
+
+        Arguments:
+            notification:
+                One of :data:`SYNC_NOTIFICATIONS` for RAF and RCF or
+                :data:`CLTU_NOTIFICATIONS` for CLTU.
+
+            production_status:
+                The new production status for a ``productionStatusChange``
+                notification.
+
+        Raises:
+            ValueError:
+                If the notification is not supported by the service.
+        '''
+        names = CLTU_NOTIFICATIONS if self.service == 'cltu' else SYNC_NOTIFICATIONS
+        if notification not in names:
+            raise ValueError('Unsupported {} notification {}'.format(
+                self.service.upper(), notification
+            ))
+
+        if self.service == 'cltu':
+            pdu = self._cltu_notification(notification)
+        else:
+            pdu = self._sync_notification(notification, production_status)
+
+        if notification == 'lossFrameSync':
+            self._frame_sync_lock = False
+
+        for conn in self._bound_connections():
+            if notification == 'endOfData' and conn.transfer is not None:
+                conn.transfer.kill()
+                conn.transfer = None
+            self._send(conn, pdu)
+            self.notifications_sent += 1
+
+    def backlog(self, count):
+        ''' Send a backlog of frames to every started connection
+
+        An excessive data backlog notification is sent and count frames are
+        then sent as fast as the connection allows, ahead of the frames due
+        at the configured rate.
+
+        Arguments:
+            count:
+                The number of backlogged frames.
+        '''
+        pdu = self._sync_notification('excessiveDataBacklog')
+        for conn in self._bound_connections():
+            if conn.transfer is not None:
+                self._send(conn, pdu)
+                self.notifications_sent += 1
+                conn.backlog += count
+
+    def skip(self, count):
+        ''' Leave a gap of count frames in every connection's frame counts '''
+        for conn in self._connections:
+            conn.generator.skip(count)
+
+    def abort(self, reason='operationalRequirement'):
+        ''' Send a peer abort to every connection and close it
+
+        Arguments:
+            reason:
+                The peer abort diagnostic. See
+                :class:`ait.dsn.sle.pdu.binds.PeerAbortDiagnostic`.
+        '''
+        pdu = self._provider_pdu()
+        pdu[self._prefix + 'PeerAbortInvocation'] = reason
+        pdu = encode(pdu)
+
+        for conn in list(self._connections):
+            self._send(conn, pdu)
+            self.aborts_sent += 1
+            self._close(conn)
+
+    def _make_generator(self):
+        ''''''
+        return FrameGenerator(self.frame_type, self.frame_len, self.spacecraft_id,
+                              self.virtual_channel_id)
+
+    def _bound_connections(self):
+        ''''''
+        return [c for c in list(self._connections) if c.state != 'unbound']
+
+    def _handle(self, sock, address):
+        ''' Answer the invocations received on a connection '''
+        conn = _Connection(sock, address, self._make_generator())
+        self._connections.add(conn)
+        framer = tml.TMLFramer()
+        context = _CONTEXT_MSG_LEN
+
+        try:
+            while not conn.closed:
+                try:
+                    data = sock.recv(65536)
+                except socket.error:
+                    break
+
+                if not data:
+                    break
+
+                # Each connection starts with a TML context message
+                if context:
+                    skip = min(context, len(data))
+                    data, context = data[skip:], context - skip
+
+                framer.feed(data)
+                for msg in framer:
+                    try:
+                        invoc = decode(msg[tml.TML_HEADER_LEN:].tobytes(),
+                                       asn1Spec=self._user_pdu())[0]
+                    except pyasn1.error.PyAsn1Error as e:
+                        ait.core.log.error('Simulator unable to decode invocation: {}'.format(e))
+                        continue
+
+                    self._respond(conn, invoc.getName(), invoc.getComponent())
+        finally:
+            self._close(conn)
+
+    def _respond(self, conn, name, invoc):
+        ''' Dispatch a received invocation to its responder '''
+        self.invocations[name] = self.invocations.get(name, 0) + 1
+        responder = self._responders.get(name[len(self._prefix):])
+        if responder is None:
+            ait.core.log.info('Simulator ignoring {}'.format(name))
+            return
+
+        responder(conn, invoc)
+
+    def _return(self, name):
+        ''' Create a provider to user PDU and return the named component '''
+        pdu = self._provider_pdu()
+        return pdu, pdu[self._prefix + name]
+
+    def _send(self, conn, pdu):
+        ''' Send a PDU, encoding it first if necessary, on a connection '''
+        if not isinstance(pdu, bytes):
+            pdu = encode(pdu)
+
+        with conn.lock:
+            if conn.closed:
+                return
+            try:
+                conn.sock.sendall(tml.pack_sle_pdu(pdu))
+            except socket.error:
+                conn.closed = True
+
+    def _close(self, conn):
+        ''' Stop a connection's greenlets and close its socket '''
+        conn.closed = True
+        current = gevent.getcurrent()
+        for greenlet in (conn.transfer, conn.reporter):
+            if greenlet is not None and greenlet is not current:
+                greenlet.kill()
+        conn.transfer = conn.reporter = None
+
+        try:
+            conn.sock.close()
+        except socket.error:
+            pass
+        self._connections.discard(conn)
+
+    def _bind(self, conn, invoc):
+        ''''''
+        pdu, ret = self._return('BindReturn')
+        ret['performerCredentials']['unused'] = None
+        ret['responderIdentifier'] = self.responder_id
+        ret['result']['positive'] = int(invoc['versionNumber'])
+        conn.state = 'ready'
+        self._send(conn, pdu)
+
+    def _unbind(self, conn, invoc):
+        ''''''
+        for greenlet in (conn.transfer, conn.reporter):
+            if greenlet is not None:
+                greenlet.kill()
+        conn.transfer = conn.reporter = None
+
+        pdu, ret = self._return('UnbindReturn')
+        ret['responderCredentials']['unused'] = None
+        ret['result']['positive'] = None
+        conn.state = 'unbound'
+        self._send(conn, pdu)
+
+    def _start(self, conn, invoc):
+        ''''''
+        pdu, ret = self._return('StartReturn')
+        ret['performerCredentials']['unused'] = None
+        ret['invokeId'] = int(invoc['invokeId'])
+        if self.service == 'cltu':
+            result = ret['result']['positiveResult']
+            now = timecode.encode(dt.datetime.utcnow())
+            result['startRadiationTime']['ccsdsFormat'] = now
+            result['stopRadiationTime']['undefined'] = None
+        else:
+            ret['result']['positiveResult'] = None
+        conn.state = 'active'
+        self._send(conn, pdu)
+
+        if self.service != 'cltu' and conn.transfer is None:
+            conn.transfer = gevent.spawn(self._transfer, conn)
+
+    def _stop(self, conn, invoc):
+        ''''''
+        if conn.transfer is not None:
+            conn.transfer.kill()
+            conn.transfer = None
+
+        pdu, ret = self._return('StopReturn')
+        ret['credentials']['unused'] = None
+        ret['invokeId'] = int(invoc['invokeId'])
+        ret['result']['positiveResult'] = None
+        conn.state = 'ready'
+        self._send(conn, pdu)
+
+    def _schedule_status_report(self, conn, invoc):
+        ''''''
+        pdu, ret = self._return('ScheduleStatusReportReturn')
+        ret['performerCredentials']['unused'] = None
+        ret['invokeId'] = int(invoc['invokeId'])
+        ret['result']['positiveResult'] = None
+        self._send(conn, pdu)
+
+        if conn.reporter is not None:
+            conn.reporter.kill()
+            conn.reporter = None
+
+        report_type = invoc['reportRequestType'].getName()
+        if report_type == 'immediately':
+            self._send(conn, self._status_report())
+        elif report_type == 'periodically':
+            cycle = int(invoc['reportRequestType']['periodically'])
+            conn.reporter = gevent.spawn(self._report_periodically, conn, cycle)
+
+    def _transfer_data(self, conn, invoc):
+        ''''''
+        self.cltus_received += 1
+        pdu, ret = self._return('TransferDataReturn')
+        ret['performerCredentials']['unused'] = None
+        ret['invokeId'] = int(invoc['invokeId'])
+        ret['cltuIdentification'] = int(invoc['cltuIdentification']) + 1
+        ret['cltuBufferAvailable'] = self.cltu_buffer
+        ret['result']['positiveResult'] = None
+        self._send(conn, pdu)
+
+    def _peer_abort(self, conn, invoc):
+        ''''''
+        ait.core.log.info('Simulator received peer abort from {}'.format(conn.address))
+        self._close(conn)
+
+    def _transfer(self, conn):
+        ''' Send transfer buffers to a started connection at the frame rate '''
+        interval = float(self.buffer_size) / self.frame_rate if self.frame_rate else 0
+        next_send = time.time()
+
+        while not conn.closed:
+            if conn.backlog:
+                count = min(conn.backlog, self.buffer_size)
+                conn.backlog -= count
+            else:
+                count = self.buffer_size
+                delay = next_send - time.time()
+                if delay > 0:
+                    gevent.sleep(delay)
+                # Don't try to catch up after falling more than a buffer behind
+                next_send = max(next_send + interval, time.time() - interval)
+
+            buff = encode_transfer_buffer(conn.generator.frames(count),
+                                          has_quality=self._has_quality)
+            self._frame_sync_lock = True
+            self._send(conn, buff)
+            self.frames_sent += count
+            self.buffers_sent += 1
+            gevent.sleep(0)
+
+    def _report_periodically(self, conn, cycle):
+        ''' Send a status report to a connection every cycle seconds '''
+        while not conn.closed:
+            gevent.sleep(cycle)
+            self._send(conn, self._status_report())
+
+    def _status_report(self):
+        ''' Build a status report invocation from the simulator's counters '''
+        pdu, report = self._return('StatusReportInvocation')
+        report['invokerCredentials']['unused'] = None
+
+        if self.service == 'cltu':
+            report['cltuLastProcessed']['noCltuProcessed'] = None
+            report['cltuLastOk']['noCltuOk'] = None
+            report['cltuProductionStatus'] = 'operational'
+            report['uplinkStatus'] = 'nominal'
+            report['numberOfCltusReceived'] = self.cltus_received
+            report['numberOfCltusProcessed'] = self.cltus_received
+            report['numberOfCltusRadiated'] = self.cltus_received
+            report['cltuBufferAvailable'] = self.cltu_buffer
+            return pdu
+
+        if self._has_quality:
+            report['errorFreeFrameNumber'] = self.frames_sent
+        report['deliveredFrameNumber'] = self.frames_sent
+        report['frameSyncLockStatus'] = 'inLock' if self._frame_sync_lock else 'outOfLock'
+        report['symbolSyncLockStatus'] = 'inLock'
+        report['subcarrierLockStatus'] = 'inLock'
+        report['carrierLockStatus'] = 'inLock'
+        report['productionStatus'] = 'running'
+        return pdu
+
+    def _sync_notification(self, notification, production_status='interrupted'):
+        ''' Encode a transfer buffer holding a sync notification '''
+        pdu, buff = self._return('TransferBuffer')
+        note = buff[0]['syncNotification']
+        note['invokerCredentials']['unused'] = None
+
+        if notification == 'lossFrameSync':
+            report = note['notification']['lossFrameSync']
+            report['time']['ccsdsFormat'] = timecode.encode(dt.datetime.utcnow())
+            report['carrierLockStatus'] = 'inLock'
+            report['subcarrierLockStatus'] = 'inLock'
+            report['symbolSyncLockStatus'] = 'inLock'
+        elif notification == 'productionStatusChange':
+            note['notification']['productionStatusChange'] = production_status
+        else:
+            note['notification'][notification] = None
+
+        return encode(pdu)
+
+    def _cltu_notification(self, notification):
+        ''' Encode a CLTU async notification '''
+        pdu, note = self._return('AsyncNotifyInvocation')
+        note['invokerCredentials']['unused'] = None
+        note['cltuNotification'][notification] = None
+        note['cltuLastProcessed']['noCltuProcessed'] = None
+        note['cltuLastOk']['noCltuOk'] = None
+        note['productionStatus'] = 'operational'
+        note['uplinkStatus'] = 'nominal'
+        return encode(pdu)
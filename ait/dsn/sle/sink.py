@@ -0,0 +1,349 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+''' SLE Frame Sinks
+
+The ait.dsn.sle.sink module provides the targets that RAF and RCF
+sessions deliver received telemetry frames to. Each sink queues frames
+in a bounded buffer and writes them in batches from its own greenlet so a
+slow or absent consumer does not stall PDU decoding.
+
+When a sink's buffer is full, the ``'drop'`` policy discards the new
+frame and counts it, while the ``'block'`` policy makes the session wait
+for space.
+
+The data passed to sinks, such as space packet data fields, varies in
+length. Sinks that write several items into one byte stream or datagram
+(:class:`TcpSink`, :class:`FileSink` and :class:`UdpSink` with
+``coalesce`` set) therefore write each item as a 4 octet big-endian
+length followed by the item. :func:`split_frames` splits such data back
+into items. A :class:`UdpSink` without ``coalesce`` sends each item as a
+datagram without a prefix.
+
+Attributes:
+    SINK_TYPES: The sink classes by the ``type`` name used in the
+        configuration.
+
+    LENGTH_PREFIX_LEN: The length in octets of the prefix written before
+        each item in a stream.
+
+Classes:
+    FrameSink: A "base" class providing the bounded buffer and batched
+        writer greenlet.
+
+    UdpSink: Send frames as UDP datagrams.
+
+    TcpSink: Write frames to a TCP connection.
+
+    FileSink: Append frames to a file.
+
+    CallbackSink: Pass batches of frames to a function.
+
+Functions:
+    make_sink: Create a sink from a configuration dictionary.
+
+    split_frames: Split length prefixed data into items.
+'''
+
+import socket
+import struct
+
+import gevent
+import gevent.queue
+import gevent.socket
+
+import ait.core.log
+
+_LENGTH_PREFIX = struct.Struct('>I')
+LENGTH_PREFIX_LEN = _LENGTH_PREFIX.size
+
+
+class FrameSink(object):
+    ''' A frame sink "base" class
+
+    Frames are queued with :meth:`put` and written by a greenlet that is
+    started with the first frame. Each wake-up of the writer takes every
+    queued frame, up to ``max_batch``, and passes the list to
+    :meth:`_write`, which subclasses implement. A batch that cannot be
+    written is logged and counted as dropped.
+
+    Attributes:
+        frames_sent: The number of frames written.
+
+        frames_dropped: The number of frames discarded because the buffer
+            was full or the write failed.
+
+        batches_sent: The number of successful writes.
+
+        errors: The number of failed writes.
+    '''
+
+    def __init__(self, max_queued=4096, policy='drop', max_batch=64):
+        '''
+        Arguments:
+            max_queued:
+                The number of frames the buffer holds.
+
+            policy:
+                What to do with a frame when the buffer is full. One of
+                ``'drop'`` or ``'block'``.
+
+            max_batch:
+                The largest number of frames written at once.
+        '''
+        if policy not in ['drop', 'block']:
+            raise ValueError('Sink policy must be one of: "drop", "block"')
+
+        self._queue = gevent.queue.JoinableQueue(max_queued)
+        self._policy = policy
+        self._max_batch = max_batch
+        self._writer = None
+
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.batches_sent = 0
+        self.errors = 0
+
+    def put(self, frame):
+        ''' Queue a frame for writing
+
+        Returns:
+            False if the frame was dropped because the buffer is full.
+            True otherwise.
+        '''
+        if self._writer is None:
+            self._writer = gevent.spawn(self._run)
+
+        if self._policy == 'block':
+            self._queue.put(frame)
+            return True
+
+        try:
+            self._queue.put_nowait(frame)
+        except gevent.queue.Full:
+            self.frames_dropped += 1
+            return False
+
+        return True
+
+    def flush(self, timeout=None):
+        ''' Wait until every queued frame has been written
+
+        Returns:
+            True if the buffer was emptied before the timeout.
+        '''
+        if self._writer is None:
+            return True
+
+        return self._queue.join(timeout)
+
+    def close(self, timeout=1):
+        ''' Write queued frames for up to timeout seconds and close the sink '''
+        self.flush(timeout)
+        if self._writer is not None:
+            self._writer.kill()
+            self._writer = None
+        self._close()
+
+    def _run(self):
+        ''' Write batches of queued frames until killed '''
+        queue = self._queue
+
+        while True:
+            batch = [queue.get()]
+            while len(batch) < self._max_batch:
+                try:
+                    batch.append(queue.get_nowait())
+                except gevent.queue.Empty:
+                    break
+
+            try:
+                self._write(batch)
+                self.frames_sent += len(batch)
+                self.batches_sent += 1
+            except Exception as e:
+                self.errors += 1
+                self.frames_dropped += len(batch)
+                ait.core.log.error('{} unable to write {} frames: {}'.format(
+                    self.__class__.__name__, len(batch), e))
+            finally:
+                for i in range(len(batch)):
+                    queue.task_done()
+
+            gevent.sleep(0)
+
+    def _write(self, frames):
+        ''' Write a list of frames '''
+        raise NotImplementedError
+
+    def _close(self):
+        ''' Release the sink's resources '''
+        pass
+
+
+class UdpSink(FrameSink):
+    ''' Send frames as UDP datagrams
+
+    By default each frame is sent as its own datagram. With ``coalesce``
+    set, consecutive length prefixed frames are packed into datagrams of up
+    to ``max_datagram`` bytes. Consumers split them with
+    :func:`split_frames`.
+    '''
+
+    def __init__(self, host='localhost', port=3076, coalesce=False,
+                 max_datagram=65507, **kwargs):
+        super(UdpSink, self).__init__(**kwargs)
+        self._address = (host, port)
+        self._coalesce = coalesce
+        self._max_datagram = max_datagram
+        self._sock = gevent.socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def _write(self, frames):
+        if not self._coalesce:
+            for frame in frames:
+                self._sock.sendto(frame, self._address)
+            return
+
+        datagram = bytearray()
+        for frame in frames:
+            if datagram and len(datagram) + LENGTH_PREFIX_LEN + len(frame) > self._max_datagram:
+                self._sock.sendto(datagram, self._address)
+                datagram = bytearray()
+            datagram += _LENGTH_PREFIX.pack(len(frame))
+            datagram += frame
+
+        self._sock.sendto(datagram, self._address)
+
+    def _close(self):
+        self._sock.close()
+
+
+class TcpSink(FrameSink):
+    ''' Write frames to a TCP connection
+
+    Each batch of length prefixed frames is written with a single
+    ``sendall``. The connection is opened with the first batch and reopened with the next batch after a
+    failed write.
+    '''
+
+    def __init__(self, host='localhost', port=3076, connect_timeout=5, **kwargs):
+        super(TcpSink, self).__init__(**kwargs)
+        self._address = (host, port)
+        self._connect_timeout = connect_timeout
+        self._sock = None
+
+    def _write(self, frames):
+        if self._sock is None:
+            self._sock = gevent.socket.create_connection(self._address,
+                                                         self._connect_timeout)
+        try:
+            self._sock.sendall(_join(frames))
+        except socket.error:
+            self._close()
+            raise
+
+    def _close(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+
+class FileSink(FrameSink):
+    ''' Append length prefixed frames to a file '''
+
+    def __init__(self, path, **kwargs):
+        super(FileSink, self).__init__(**kwargs)
+        self._file = open(path, 'ab')
+
+    def _write(self, frames):
+        self._file.write(_join(frames))
+        self._file.flush()
+
+    def _close(self):
+        self._file.close()
+
+
+class CallbackSink(FrameSink):
+    ''' Pass batches of frames to a function
+
+    The callback is called from the sink's greenlet with a list of frames.
+    '''
+
+    def __init__(self, callback, **kwargs):
+        super(CallbackSink, self).__init__(**kwargs)
+        self._callback = callback
+
+    def _write(self, frames):
+        self._callback(frames)
+
+
+def _join(frames):
+    ''' Concatenate length prefixed frames given as bytes or memoryviews '''
+    data = bytearray()
+    for frame in frames:
+        data += _LENGTH_PREFIX.pack(len(frame))
+        data += frame
+    return data
+
+
+def split_frames(data):
+    ''' Split data written by a stream sink or a coalescing UDP sink
+
+    Arguments:
+        data:
+            Length prefixed frames as bytes, a bytearray or a memoryview.
+
+    Returns:
+        A tuple of the list of complete frames, as memoryviews of data,
+        and a memoryview of the remaining data of an incomplete frame.
+    '''
+    view = memoryview(data)
+    frames = []
+    start = 0
+    while len(view) - start >= LENGTH_PREFIX_LEN:
+        end = start + LENGTH_PREFIX_LEN + _LENGTH_PREFIX.unpack_from(view, start)[0]
+        if end > len(view):
+            break
+        frames.append(view[start + LENGTH_PREFIX_LEN:end])
+        start = end
+    return frames, view[start:]
+
+
+SINK_TYPES = {
+    'udp': UdpSink,
+    'tcp': TcpSink,
+    'file': FileSink,
+    'callback': CallbackSink,
+}
+
+
+def make_sink(options):
+    ''' Create a sink from a configuration dictionary
+
+    Arguments:
+        options:
+            A dictionary with a ``type`` key naming one of
+            :data:`SINK_TYPES` and the keyword arguments of that sink
+            (e.g., ``{'type': 'udp', 'host': 'localhost', 'port': 3076}``).
+
+    Returns:
+        The configured :class:`FrameSink`.
+    '''
+    options = dict(options)
+    kind = options.pop('type', None)
+    if kind not in SINK_TYPES:
+        raise ValueError('Sink type must be one of: {}'.format(
+            ', '.join('"{}"'.format(k) for k in sorted(SINK_TYPES))))
+
+    return SINK_TYPES[kind](**options)
@@ -0,0 +1,234 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+import sys
+import unittest
+
+from pyasn1.codec.ber.encoder import encode
+from pyasn1.codec.der.decoder import decode
+
+from ait.dsn.sle import tml
+from ait.dsn.sle.pdu.raf import RafProvidertoUserPdu, RafUsertoProviderPdu
+from ait.dsn.sle.test.ber_test import make_transfer_buffer
+
+if sys.version_info >= (3, 7):
+    import asyncio
+    from ait.dsn.sle import aio
+
+
+class MockProvider(object):
+    ''' A RAF provider that answers each invocation and sends a transfer
+    buffer after a successful start
+    '''
+    def __init__(self, frames, start_result='positiveResult', drop_on=None):
+        self.frames = frames
+        self.drop_on = drop_on
+        self.start_result = start_result
+        self.invocations = []
+        self.context = None
+
+    def __call__(self):
+        return MockProviderProtocol(self)
+
+    def respond(self, transport, invoc_name, invoc):
+        self.invocations.append(invoc_name)
+        if invoc_name == self.drop_on:
+            transport.close()
+            return
+
+        pdu = RafProvidertoUserPdu()
+        if invoc_name == 'rafBindInvocation':
+            ret = pdu['rafBindReturn']
+            ret['performerCredentials']['unused'] = None
+            ret['responderIdentifier'] = 'SSE'
+            ret['result']['positive'] = 4
+        elif invoc_name == 'rafStartInvocation':
+            ret = pdu['rafStartReturn']
+            ret['performerCredentials']['unused'] = None
+            ret['invokeId'] = invoc['invokeId']
+            if self.start_result == 'positiveResult':
+                ret['result']['positiveResult'] = None
+            else:
+                ret['result']['negativeResult']['specific'] = 'invalidStartTime'
+        elif invoc_name == 'rafStopInvocation':
+            ret = pdu['rafStopReturn']
+            ret['credentials']['unused'] = None
+            ret['invokeId'] = invoc['invokeId']
+            ret['result']['positiveResult'] = None
+        elif invoc_name == 'rafUnbindInvocation':
+            ret = pdu['rafUnbindReturn']
+            ret['responderCredentials']['unused'] = None
+            ret['result']['positive'] = None
+
+        transport.write(tml.pack_sle_pdu(encode(pdu)))
+
+        if invoc_name == 'rafStartInvocation' and self.start_result == 'positiveResult':
+            transport.write(tml.pack_sle_pdu(make_transfer_buffer(
+                RafProvidertoUserPdu, 'rafTransferBuffer', self.frames
+            )))
+        elif invoc_name == 'rafUnbindInvocation':
+            transport.close()
+
+
+if sys.version_info >= (3, 7):
+    class MockProviderProtocol(asyncio.Protocol):
+        def __init__(self, provider):
+            self.provider = provider
+            self.framer = tml.TMLFramer(1024)
+
+        def connection_made(self, transport):
+            self.transport = transport
+
+        def data_received(self, data):
+            if self.provider.context is None:
+                self.provider.context = data[:20]
+                data = data[20:]
+
+            self.framer.feed(data)
+            for msg in self.framer:
+                pdu = decode(msg[tml.TML_HEADER_LEN:].tobytes(),
+                             asn1Spec=RafUsertoProviderPdu())[0]
+                self.provider.respond(self.transport, pdu.getName(), pdu.getComponent())
+
+
+@unittest.skipIf(sys.version_info < (3, 7), 'asyncio SLE requires Python 3.7+')
+class AsyncRAFTest(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.frames = [bytes(bytearray([i]) * 64) for i in range(3)]
+        self.server = None
+        self.raf = None
+
+    def tearDown(self):
+        if self.raf is not None:
+            self.raf.close()
+        if self.server is not None:
+            self.server.close()
+            self.wait(self.server.wait_closed())
+        self.loop.close()
+
+    def wait(self, future):
+        return self.loop.run_until_complete(asyncio.wait_for(future, 5))
+
+    def connect(self, provider, **kwargs):
+        self.server = self.wait(self.loop.create_server(provider, '127.0.0.1', 0))
+        self.raf = aio.AsyncRAF(loop=self.loop, **kwargs)
+        self.raf._inst_id = 'sagr=1.spack=2.rsl-fg=3.raf=onlt1'
+        self.raf._hostnames = ['127.0.0.1']
+        self.raf._port = self.server.sockets[0].getsockname()[1]
+        return self.raf
+
+    def test_session_lifecycle(self):
+        """Bind, start, receive, stop and unbind resolve in order"""
+        provider = MockProvider(self.frames)
+        raf = self.connect(provider)
+
+        self.wait(raf.connect())
+        self.wait(raf.bind())
+        self.assertEqual(raf._state, 'ready')
+        self.wait(raf.start(None, None))
+        self.assertEqual(raf._state, 'active')
+
+        pdu = self.wait(raf.__anext__())
+        self.wait(raf.stop())
+        self.wait(raf.unbind())
+        self.assertEqual(raf._state, 'unbound')
+
+        with self.assertRaises(StopAsyncIteration):
+            self.wait(raf.__anext__())
+
+        self.assertEqual(provider.context[:8], b'\x02\x00\x00\x00\x00\x00\x00\x0c')
+        self.assertEqual(provider.invocations, [
+            'rafBindInvocation', 'rafStartInvocation',
+            'rafStopInvocation', 'rafUnbindInvocation'
+        ])
+        self.assertEqual(pdu.getName(), 'rafTransferBuffer')
+        frames = [f['annotatedFrame']['data'].asOctets() for f in pdu.getComponent()]
+        self.assertEqual(frames, self.frames)
+
+    def test_fast_decode(self):
+        """Transfer buffers are scanned into FrameRecords with fast_decode"""
+        raf = self.connect(MockProvider(self.frames), fast_decode=True)
+
+        self.wait(raf.connect())
+        self.wait(raf.bind())
+        self.wait(raf.start(None, None))
+        pdu = self.wait(raf.__anext__())
+
+        self.assertEqual(pdu.getName(), 'rafTransferBuffer')
+        self.assertEqual([bytes(f.data) for f in pdu], self.frames)
+
+    def test_rejected_start(self):
+        """A negative start return raises OperationError"""
+        raf = self.connect(MockProvider(self.frames, start_result='negativeResult'))
+
+        self.wait(raf.connect())
+        self.wait(raf.bind())
+        with self.assertRaises(aio.OperationError) as cm:
+            self.wait(raf.start(None, None))
+
+        self.assertEqual(raf._state, 'ready')
+        self.assertEqual(cm.exception.operation, 'rafStartReturn')
+        self.assertEqual(cm.exception.diagnostic, 'invalidStartTime')
+
+    def test_connect_tries_each_hostname(self):
+        """Connection falls through to the next hostname on failure"""
+        provider = MockProvider(self.frames)
+        raf = self.connect(provider)
+        raf._hostnames = ['127.0.0.2', '127.0.0.1']
+
+        self.wait(raf.connect())
+        self.wait(raf.bind())
+        self.assertEqual(provider.invocations, ['rafBindInvocation'])
+
+    def test_connection_lost_fails_pending_operations(self):
+        """Outstanding operations and iteration fail when the connection drops"""
+        raf = self.connect(MockProvider(self.frames, drop_on='rafBindInvocation'))
+
+        self.wait(raf.connect())
+        with self.assertRaises(ConnectionError):
+            self.wait(raf.bind())
+        with self.assertRaises(StopAsyncIteration):
+            self.wait(raf.__anext__())
+        self.assertEqual(raf._state, 'unbound')
+
+    def test_session_bound_to_running_loop(self):
+        """A session created outside a loop runs on the loop it is used from"""
+        provider = MockProvider(self.frames)
+        self.server = self.wait(self.loop.create_server(provider, '127.0.0.1', 0))
+        self.raf = aio.AsyncRAF()
+        self.raf._inst_id = 'sagr=1.spack=2.rsl-fg=3.raf=onlt1'
+        self.raf._hostnames = ['127.0.0.1']
+        self.raf._port = self.server.sockets[0].getsockname()[1]
+        self.assertIsNone(self.raf._loop)
+
+        result = self.loop.create_future()
+
+        def connected(future):
+            if future.exception() is None:
+                result.set_result(None)
+            else:
+                result.set_exception(future.exception())
+
+        self.loop.call_soon(lambda: self.raf.connect().add_done_callback(connected))
+        self.wait(result)
+        self.wait(self.raf.bind())
+        self.assertIs(self.raf._loop, self.loop)
+        self.assertEqual(provider.invocations, ['rafBindInvocation'])
+
+    def test_verify_fast_decode_rejected(self):
+        """Verified fast decoding is not supported by asyncio sessions"""
+        with self.assertRaises(ValueError):
+            aio.AsyncRAF(fast_decode='verify')
@@ -0,0 +1,142 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+import datetime as dt
+import random
+import unittest
+
+from ait.dsn.sle import ber, frames, timecode
+from ait.dsn.sle.test.frames_test import make_aos_frame, make_tm_frame
+
+try:
+    import numpy
+    from ait.dsn.sle import batch
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, 'NumPy is not installed')
+class TMHeadersTest(unittest.TestCase):
+
+    def setUp(self):
+        rand = random.Random(4)
+        self.frames = [
+            make_tm_frame(
+                b'\x00' * 100,
+                scid=rand.randint(0, 1023), vcid=rand.randint(0, 7),
+                mc_count=rand.randint(0, 255), vc_count=rand.randint(0, 255),
+                fhp=rand.choice([0, 17, frames.TM_FHP_IDLE, frames.TM_FHP_NO_PACKET]),
+                ocf=rand.choice([None, b'OCF!'])
+            )[:106]
+            for i in range(50)
+        ]
+
+    def assert_matches_frames(self, headers):
+        self.assertEqual(len(headers), len(self.frames))
+        for row, data in zip(headers, self.frames):
+            tmf = frames.TMTransFrame(data)
+            for field in batch.TM_HEADER_DTYPE.names:
+                self.assertEqual(int(row[field]), int(tmf[field]), field)
+
+    def test_contiguous_buffer(self):
+        """Headers of a contiguous buffer match the TM frame view"""
+        headers = batch.tm_headers(b''.join(self.frames), frame_len=106)
+        self.assertEqual(headers.dtype, batch.TM_HEADER_DTYPE)
+        self.assert_matches_frames(headers)
+
+    def test_frame_records(self):
+        """Headers of fast decoded frame records match the TM frame view"""
+        records = ber.TransferBuffer('rafTransferBuffer', [
+            ber.FrameRecord(b'\x00' * 8, 0, 0, None, memoryview(data))
+            for data in self.frames
+        ])
+        self.assert_matches_frames(batch.tm_headers(records))
+
+    def test_invalid_buffers(self):
+        """Partial frames are rejected"""
+        with self.assertRaises(ValueError):
+            batch.tm_headers(b''.join(self.frames)[:-1], frame_len=106)
+        with self.assertRaises(ValueError):
+            batch.tm_headers([b'\x00' * 4])
+
+    def test_empty(self):
+        """No frames decode to an empty array"""
+        self.assertEqual(len(batch.tm_headers(b'', frame_len=106)), 0)
+        self.assertEqual(len(batch.tm_headers([])), 0)
+
+
+@unittest.skipIf(numpy is None, 'NumPy is not installed')
+class AOSHeadersTest(unittest.TestCase):
+
+    def make_frames(self, pointers):
+        rand = random.Random(5)
+        return [
+            make_aos_frame(
+                b'\x00' * 100,
+                scid=rand.randint(0, 255), vcid=rand.randint(0, 63),
+                vc_count=rand.randint(0, 2 ** 24 - 1), signaling=rand.randint(0, 255),
+                pointer=rand.choice(pointers), fhec=b'\xff\xff', insert_zone=b'IZ'
+            )
+            for i in range(50)
+        ]
+
+    def assert_matches_frames(self, headers, aos_frames, data_unit):
+        self.assertEqual(len(headers), len(aos_frames))
+        for row, data in zip(headers, aos_frames):
+            aos = frames.AOSTransFrame(data, has_fhec=True, insert_zone_len=2, data_unit=data_unit)
+            for field in headers.dtype.names:
+                self.assertEqual(int(row[field]), int(aos[field]), field)
+
+    def test_mpdu_headers(self):
+        """M_PDU headers match the AOS frame view"""
+        aos_frames = self.make_frames([0, 17, frames.TM_FHP_IDLE, frames.TM_FHP_NO_PACKET])
+        headers = batch.aos_headers(b''.join(aos_frames), frame_len=len(aos_frames[0]),
+                                    has_fhec=True, insert_zone_len=2)
+        self.assertEqual(headers.dtype, batch.AOS_MPDU_HEADER_DTYPE)
+        self.assert_matches_frames(headers, aos_frames, frames.AOS_MPDU)
+
+    def test_bpdu_headers(self):
+        """B_PDU headers match the AOS frame view"""
+        aos_frames = self.make_frames([0, 500, frames.AOS_BPDU_IDLE, frames.AOS_BPDU_ALL_VALID])
+        headers = batch.aos_headers(aos_frames, has_fhec=True, insert_zone_len=2,
+                                    data_unit=frames.AOS_BPDU)
+        self.assertEqual(headers.dtype, batch.AOS_BPDU_HEADER_DTYPE)
+        self.assert_matches_frames(headers, aos_frames, frames.AOS_BPDU)
+
+
+@unittest.skipIf(numpy is None, 'NumPy is not installed')
+class EarthReceiveTimesTest(unittest.TestCase):
+
+    def setUp(self):
+        start = dt.datetime(2019, 3, 4, 23, 59, 59)
+        self.times = [start + dt.timedelta(microseconds=137 * i) for i in range(50)]
+
+    def assert_decoded(self, erts, decoded):
+        self.assertEqual(len(decoded), len(erts))
+        for ert, seconds in zip(erts, decoded):
+            self.assertAlmostEqual(seconds, timecode.decode_timestamp(ert), places=6)
+
+    def test_transfer_buffer(self):
+        """Times of fast decoded frame records match the scalar decode"""
+        for pico in (False, True):
+            records = [ber.FrameRecord(timecode.encode(t, pico), 0, 0, None, b'')
+                       for t in self.times]
+            self.assert_decoded([r.earth_receive_time for r in records],
+                                batch.earth_receive_times(records))
+
+    def test_mixed_formats(self):
+        """Times in both formats are decoded one at a time"""
+        erts = [timecode.encode(t, i % 2) for i, t in enumerate(self.times)]
+        self.assert_decoded(erts, batch.earth_receive_times(erts))
+        self.assertEqual(len(batch.earth_receive_times([])), 0)
@@ -0,0 +1,59 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+import unittest
+
+from ait.dsn.sle import benchmark, ber, tml
+
+
+class MakeMessagesTest(unittest.TestCase):
+
+    def test_messages(self):
+        """Messages are TML wrapped transfer buffers of synthetic frames"""
+        messages = benchmark.make_messages(3, frames_per_buffer=4, frame_len=300, service='rcf')
+        self.assertEqual(len(messages), 3)
+
+        framer = tml.TMLFramer()
+        framer.feed(messages[1])
+        body = [m.tobytes() for m in framer][0][tml.TML_HEADER_LEN:]
+        records, remainder = ber.decode_transfer_buffer(body, 'rcfTransferBuffer', has_quality=False)
+        self.assertEqual([len(r.data) for r in records], [300] * 4)
+
+
+class RunTest(unittest.TestCase):
+
+    def test_all_stages(self):
+        """Every stage measures the buffers after the warmup"""
+        results = benchmark.run(buffers=4, frames_per_buffer=3, frame_len=200, warmup=2)
+
+        self.assertEqual(sorted(results['stages']), sorted(benchmark.STAGES))
+        for stage, stats in results['stages'].items():
+            self.assertEqual(stats['buffers'], 4, stage)
+            self.assertEqual(stats['frames'], 12, stage)
+            self.assertGreater(stats['frames_per_sec'], 0, stage)
+            self.assertEqual(sorted(stats['latency']), ['max', 'mean', 'p50', 'p90', 'p99'])
+
+    def test_aos_end_to_end(self):
+        """AOS frames are decoded by the end to end session"""
+        results = benchmark.run(stages=['frame_decode', 'end_to_end'], buffers=2,
+                                frame_type='AOSTransFrame', service='rcf', fast_decode=True)
+        self.assertEqual(sorted(results['stages']), ['end_to_end', 'frame_decode'])
+        self.assertTrue(results['fast_decode'])
+
+    def test_invalid_arguments(self):
+        """Unknown stages and services are refused"""
+        with self.assertRaises(ValueError):
+            benchmark.run(stages=['checksum'])
+        with self.assertRaises(ValueError):
+            benchmark.run(service='cltu')
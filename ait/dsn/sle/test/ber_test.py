@@ -0,0 +1,153 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+
+import struct
+import unittest
+
+from pyasn1.codec.ber.encoder import encode
+
+import ait.dsn.sle
+from ait.dsn.sle import ber
+from ait.dsn.sle.pdu.raf import RafProvidertoUserPdu
+from ait.dsn.sle.pdu.rcf import RcfProvidertoUserPdu
+
+
+def make_transfer_buffer(pdu_cls, name, frames, quality=True, notify=False,
+                         ert=None, antenna=b'DSS-24', varied=True):
+    ''' Encode a transfer buffer PDU containing the given frame data
+
+    Unless ``ert`` is given, each frame has its own earth receive time.
+    Frames are annotated with varying continuity, quality and private
+    annotations unless ``varied`` is False, in which case every frame is
+    continuous, of good quality and without a private annotation.
+    '''
+    pdu = pdu_cls()
+    buff = pdu[name]
+
+    for i, data in enumerate(frames):
+        frame = buff[i]['annotatedFrame']
+        frame['invokerCredentials']['unused'] = None
+        frame['earthReceiveTime']['ccsdsFormat'] = (
+            ert if ert is not None else struct.pack('!HIH', 22000 + i, 1000 * i, i))
+        frame['antennaId']['localForm'] = antenna
+        frame['dataLinkContinuity'] = i - 1 if varied else 0
+        if quality:
+            frame['deliveredFrameQuality'] = i % 3 if varied else 0
+        if varied and i % 2:
+            frame['privateAnnotation']['notNull'] = b'note'
+        else:
+            frame['privateAnnotation']['null'] = None
+        frame['data'] = data
+
+    if notify:
+        note = buff[len(frames)]['syncNotification']
+        note['invokerCredentials']['unused'] = None
+        note['notification']['excessiveDataBacklog'] = None
+
+    return encode(pdu)
+
+
+class DecodeTransferBufferTest(unittest.TestCase):
+
+    def setUp(self):
+        self.frames = [bytes(bytearray([i]) * (100 + 50 * i)) for i in range(5)]
+
+    def test_raf_transfer_buffer(self):
+        """Frame records match the encoded RAF annotated frames"""
+        msg = make_transfer_buffer(RafProvidertoUserPdu, 'rafTransferBuffer', self.frames)
+        records, remainder = ber.decode_transfer_buffer(msg, 'rafTransferBuffer')
+
+        self.assertEqual(records.getName(), 'rafTransferBuffer')
+        self.assertEqual(remainder, b'')
+        self.assertEqual(len(records), len(self.frames))
+
+        for i, record in enumerate(records):
+            self.assertEqual(record.getName(), 'annotatedFrame')
+            self.assertEqual(record.earth_receive_time, struct.pack('!HIH', 22000 + i, 1000 * i, i))
+            self.assertEqual(record.data_link_continuity, i - 1)
+            self.assertEqual(record.delivered_frame_quality, i % 3)
+            self.assertEqual(record.private_annotation, b'note' if i % 2 else None)
+            self.assertIsInstance(record.data, memoryview)
+            self.assertEqual(record.data.tobytes(), self.frames[i])
+
+    def test_rcf_transfer_buffer(self):
+        """RCF annotated frames have no delivered frame quality"""
+        msg = make_transfer_buffer(RcfProvidertoUserPdu, 'rcfTransferBuffer', self.frames, quality=False)
+        records, remainder = ber.decode_transfer_buffer(msg, 'rcfTransferBuffer', has_quality=False)
+
+        self.assertEqual([r.data.tobytes() for r in records], self.frames)
+        self.assertEqual([r.delivered_frame_quality for r in records], [None] * len(self.frames))
+
+    def test_unsupported_pdus_fall_back(self):
+        """Anything other than a buffer of annotated frames is not scanned"""
+        msg = make_transfer_buffer(RafProvidertoUserPdu, 'rafTransferBuffer', self.frames, notify=True)
+        self.assertIsNone(ber.decode_transfer_buffer(msg, 'rafTransferBuffer'))
+
+        pdu = RafProvidertoUserPdu()
+        pdu['rafPeerAbortInvocation'] = 127
+        self.assertIsNone(ber.decode_transfer_buffer(encode(pdu), 'rafTransferBuffer'))
+
+    def test_truncated_buffer_falls_back(self):
+        """A truncated transfer buffer is left for PyASN1 to reject"""
+        msg = make_transfer_buffer(RafProvidertoUserPdu, 'rafTransferBuffer', self.frames)
+        self.assertIsNone(ber.decode_transfer_buffer(msg[:-10], 'rafTransferBuffer'))
+
+
+class RafFastDecodeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.raf = ait.dsn.sle.RAF(hostnames=['localhost'], port=5100, fast_decode='verify')
+        self.raf._conn_monitor.kill()
+        self.raf._data_processor.kill()
+
+    def tearDown(self):
+        for frame_sink in self.raf._sinks:
+            frame_sink.close()
+
+    def test_verified_fast_decode(self):
+        """Fast decoded transfer buffers are cross-checked with PyASN1"""
+        frames = [b'\x01' * 200, b'\x02' * 300]
+        msg = make_transfer_buffer(RafProvidertoUserPdu, 'rafTransferBuffer', frames)
+
+        pdu, remainder = self.raf.decode(msg)
+        self.assertIsInstance(pdu, ber.TransferBuffer)
+        self.assertEqual([r.data.tobytes() for r in pdu], frames)
+
+    def test_mismatch_uses_pyasn1(self):
+        """The PyASN1 result is used when the scanner disagrees"""
+        frames = [b'\x01' * 200]
+        msg = make_transfer_buffer(RafProvidertoUserPdu, 'rafTransferBuffer', frames)
+
+        scan = ber.decode_transfer_buffer
+        def bad_scan(*args, **kwargs):
+            records, remainder = scan(*args, **kwargs)
+            records[0].data_link_continuity = 42
+            return records, remainder
+
+        ber.decode_transfer_buffer = bad_scan
+        try:
+            pdu, remainder = self.raf.decode(msg)
+        finally:
+            ber.decode_transfer_buffer = scan
+
+        self.assertEqual(pdu.getName(), 'rafTransferBuffer')
+        self.assertNotIsInstance(pdu, ber.TransferBuffer)
+
+    def test_other_pdus_use_pyasn1(self):
+        """PDUs other than transfer buffers are decoded by PyASN1"""
+        pdu = RafProvidertoUserPdu()
+        pdu['rafPeerAbortInvocation'] = 127
+        decoded, remainder = self.raf.decode(encode(pdu))
+        self.assertEqual(decoded.getName(), 'rafPeerAbortInvocation')
@@ -0,0 +1,149 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+import io
+import os
+import tempfile
+import unittest
+
+import gevent
+import gevent.server
+
+import ait.dsn.sle
+from ait.dsn.sle import capture, sink, tml
+from ait.dsn.sle.pdu.raf import RafProvidertoUserPdu
+from ait.dsn.sle.test.ber_test import make_transfer_buffer
+from ait.dsn.sle.test.common_test import wait_for
+from ait.dsn.sle.test.frames_test import make_space_packet, make_tm_frame
+
+
+def make_raf_message(packet_data, count=1):
+    ''' Encode a TML message of a RAF transfer buffer of TM frames '''
+    frames = [make_tm_frame(make_space_packet(1, packet_data), vc_count=i) for i in range(count)]
+    return tml.pack_sle_pdu(make_transfer_buffer(RafProvidertoUserPdu, 'rafTransferBuffer', frames))
+
+
+class CaptureFileTest(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+        os.remove(self.path)
+
+    def tearDown(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def test_round_trip(self):
+        """Messages are read back with their receive times and appended to"""
+        writer = capture.CaptureWriter(self.path)
+        writer.write(b'first', 100.5)
+        writer.close()
+
+        writer = capture.CaptureWriter(self.path)
+        writer.write(memoryview(b'second'), 101.25)
+        writer.close()
+
+        self.assertEqual(list(capture.read_capture(self.path)),
+                         [(100.5, b'first'), (101.25, b'second')])
+        self.assertEqual(writer.bytes_written, 6)
+
+    def test_truncated_and_invalid_files(self):
+        """A truncated final record is ignored and other files are refused"""
+        writer = capture.CaptureWriter(self.path)
+        writer.write(b'complete', 1.0)
+        writer.write(b'incomplete', 2.0)
+        writer.close()
+        with io.open(self.path, 'r+b') as f:
+            f.truncate(os.path.getsize(self.path) - 3)
+
+        self.assertEqual(list(capture.read_capture(self.path)), [(1.0, b'complete')])
+
+        with io.open(self.path, 'wb') as f:
+            f.write(b'not a capture')
+        with self.assertRaises(ValueError):
+            list(capture.read_capture(self.path))
+
+
+class CaptureReplayTest(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+        os.remove(self.path)
+        self.sessions = []
+
+    def tearDown(self):
+        for session in self.sessions:
+            session.disconnect()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def make_raf(self, **kwargs):
+        batches = []
+        raf = ait.dsn.sle.RAF(hostnames=['127.0.0.1'], port=5100,
+                              sinks=[sink.CallbackSink(batches.append)], **kwargs)
+        self.sessions.append(raf)
+        return raf, batches
+
+    def test_capture_received_messages(self):
+        """Received TML messages are captured as they are processed"""
+        message = make_raf_message(b'captured', count=2)
+
+        def serve(sock, address):
+            sock.recv(1024)
+            sock.sendall(message)
+            gevent.sleep(1)
+
+        server = gevent.server.StreamServer(('127.0.0.1', 0), serve)
+        server.start()
+        try:
+            raf, batches = self.make_raf(capture_path=self.path)
+            raf._hostnames = ['127.0.0.1']
+            raf._port = server.server_port
+            raf.connect()
+            self.assertTrue(wait_for(lambda: raf._frames_received == 2))
+        finally:
+            server.stop()
+
+        raf._capture.close()
+        records = list(capture.read_capture(self.path))
+        self.assertEqual([msg for ts, msg in records], [message])
+
+    def test_replay(self):
+        """A capture is fed through a session's decoding and handling path"""
+        writer = capture.CaptureWriter(self.path)
+        for i in range(3):
+            writer.write(make_raf_message(b'frame %d' % i, count=4), 1000.0 + 0.1 * i)
+        writer.write(tml.pack_sle_pdu(b'\x30\x03\x02\x01'), 1000.3)
+        writer.close()
+
+        raf, batches = self.make_raf()
+        decoded = []
+        raf.add_hook('decode', after=lambda stage, name, handler, token: decoded.append(name))
+        results = capture.replay(raf, self.path, speed=2)
+        raf._sinks[0].flush(1)
+
+        self.assertEqual(results['messages'], 4)
+        self.assertEqual(results['frames'], 12)
+        self.assertEqual(results['decode_errors'], 1)
+        self.assertGreaterEqual(results['duration'], 0.15)
+        self.assertEqual(sorted(results['latency']), ['decode', 'framing', 'handle', 'total'])
+        self.assertEqual(sorted(results['latency']['total']), ['max', 'mean', 'p50', 'p90', 'p99'])
+        self.assertEqual(sum(len(b) for b in batches), 12)
+        self.assertEqual(decoded, ['RafTransferBuffer'] * 3 + [None])
+        self.assertEqual((raf.stats()['pdus_handled'], raf.stats()['decode_failures']), (3, 1))
+
+        raf, batches = self.make_raf()
+        self.assertEqual(capture.replay(raf, self.path)['frames'], 12)
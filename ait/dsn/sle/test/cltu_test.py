@@ -0,0 +1,227 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+
+import datetime as dt
+import errno
+import socket
+import unittest
+
+import gevent
+from pyasn1.codec.ber.decoder import decode
+
+import ait.dsn.sle
+from ait.dsn.sle import timecode
+from ait.dsn.sle.cltu import CltuTransferError
+from ait.dsn.sle.pdu.cltu.cltuv5 import CltuProviderToUserPdu, CltuUserToProviderPdu
+
+
+def make_transfer_return(invoke_id, cltu_id, buffer_available, specific=None):
+    ''' Build a CLTU-TRANSFER-DATA return, negative if specific is set '''
+    pdu = CltuProviderToUserPdu()
+    ret = pdu['cltuTransferDataReturn']
+    ret['performerCredentials']['unused'] = None
+    ret['invokeId'] = invoke_id
+    ret['cltuIdentification'] = cltu_id
+    ret['cltuBufferAvailable'] = buffer_available
+    if specific is None:
+        ret['result']['positiveResult'] = None
+    else:
+        ret['result']['negativeResult']['specific'] = specific
+    return pdu
+
+
+class CltuEncodeTest(unittest.TestCase):
+
+    def setUp(self):
+        kwargs = {'hostnames': ['localhost'], 'port': 5100}
+        self.fast = ait.dsn.sle.CLTU(fast_encode=True, **kwargs)
+        self.slow = ait.dsn.sle.CLTU(fast_encode=False, **kwargs)
+
+    def tearDown(self):
+        for cltu in (self.fast, self.slow):
+            cltu._conn_monitor.kill()
+            cltu._data_processor.kill()
+            for frame_sink in cltu._sinks:
+                frame_sink.close()
+
+    def assert_identical(self, *args, **kwargs):
+        fast = self.fast._encode_cltu_pdu(*args, **kwargs)
+        slow = self.slow._encode_cltu_pdu(*args, **kwargs)
+        self.assertEqual(fast, slow)
+
+    def test_matches_pyasn1_encoding(self):
+        """Fast encoded transfer data invocations are identical to PyASN1's"""
+        times = [None, dt.datetime(2019, 1, 1), dt.datetime(2058, 12, 31, 12)]
+        sizes = [1, 127, 128, 255, 256, 65535, 65536]
+
+        for i, size in enumerate(sizes):
+            for time in times:
+                self.assert_identical(
+                    b'\xeb\x90' * (size // 2) + b'\x01' * (size % 2),
+                    earliest_time=time,
+                    latest_time=times[i % len(times)],
+                    delay=[0, 127, 128, 4294967295][i % 4],
+                    notify=bool(i % 2)
+                )
+
+    def test_time_of_day_encoded(self):
+        """Transmission times keep their time of day"""
+        earliest = dt.datetime(2019, 1, 1, 13, 14, 15, 161718)
+        latest = dt.datetime(2019, 1, 1, 23, 59, 59, 999999)
+        for cltu in (self.fast, self.slow):
+            _, msg = cltu._encode_cltu_pdu(b'\x01', earliest, latest)
+            pdu = decode(msg[8:], asn1Spec=CltuUserToProviderPdu())[0]
+            invoc = pdu['cltuTransferDataInvocation']
+            for field, time in (('earliestTransmissionTime', earliest),
+                                ('latestTransmissionTime', latest)):
+                encoded = invoc[field]['known'].getComponent().asOctets()
+                self.assertEqual(timecode.decode(encoded), time)
+
+    def test_matches_pyasn1_across_id_boundaries(self):
+        """Invoke and CLTU ids of every encoded length are identical"""
+        for iid in [0, 127, 128, 255, 256, 32767, 32768, 65535]:
+            for cltu_id in [0, 128, 8388608, 2147483648, 4294967295]:
+                for cltu in (self.fast, self.slow):
+                    cltu._invoke_id = iid
+                    cltu._cltu_id = cltu_id
+                self.assert_identical(b'\x01\x02\x03')
+                for cltu in (self.fast, self.slow):
+                    cltu._invoke_id = iid
+                    cltu._cltu_id = cltu_id
+                    self.assertEqual(cltu._encode_cltu_pdu(b'\x01')[0], iid)
+
+    def test_matches_pyasn1_with_credentials(self):
+        """Credentials are encoded identically when auth level is 'all'"""
+        creds = b'\x30\x23' + b'\x5a' * 35
+        for cltu in (self.fast, self.slow):
+            cltu._auth_level = 'all'
+            cltu.make_credentials = lambda: creds
+
+        self.assert_identical(b'\x01' * 300, notify=True)
+
+
+class CltuPipelineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cltu = ait.dsn.sle.CLTU(hostnames=['localhost'], port=5100,
+                                     window=3, backoff=0, return_timeout=1)
+        self.sent = []
+        self.cltu.send = self.sent.append
+
+    def tearDown(self):
+        self.cltu._conn_monitor.kill()
+        self.cltu._data_processor.kill()
+        for frame_sink in self.cltu._sinks:
+            frame_sink.close()
+        if self.cltu._uploader is not None:
+            self.cltu._uploader.kill()
+
+    def outstanding(self):
+        return sorted(self.cltu._outstanding.values(), key=lambda i: i.index)
+
+    def respond(self, item, buffer_available=100000, specific=None):
+        self.cltu._trans_data_return_handler(make_transfer_return(
+            item.invoke_id, item.cltu_id + 1, buffer_available, specific
+        ))
+
+    def test_invalid_window(self):
+        """Windows of less than one transfer are rejected"""
+        for window in (0, -1):
+            with self.assertRaises(ValueError):
+                ait.dsn.sle.CLTU(hostnames=['localhost'], port=5100, window=window)
+
+    def test_window_limits_outstanding_transfers(self):
+        """No more than window transfers are outstanding at once"""
+        results = self.cltu.upload_cltus([b'\x01' * 10] * 5)
+        gevent.sleep(0)
+        self.assertEqual(len(self.sent), 3)
+
+        for item in self.outstanding():
+            self.respond(item)
+        gevent.sleep(0)
+        self.assertEqual(len(self.sent), 5)
+
+        for item in self.outstanding():
+            self.respond(item)
+        gevent.sleep(0)
+        self.assertEqual([r.get(timeout=1) for r in results], [0, 1, 2, 3, 4])
+        self.assertIsNone(self.cltu._uploader)
+
+    def test_buffer_available_gates_sending(self):
+        """CLTUs are held back until they fit in the reported buffer"""
+        self.cltu._cltu_buffer_available = 25
+        self.cltu.upload_cltus([b'\x01' * 10] * 3)
+        gevent.sleep(0)
+        self.assertEqual(len(self.sent), 2)
+
+        self.respond(self.outstanding()[0], buffer_available=25)
+        gevent.sleep(0)
+        self.assertEqual(len(self.sent), 3)
+
+    def test_rejected_cltus_are_resent_in_sequence(self):
+        """Unable to Store rejections rewind the CLTU id and resend"""
+        results = self.cltu.upload_cltus([b'\x01', b'\x02', b'\x03'])
+        gevent.sleep(0)
+        first, second, third = self.outstanding()
+
+        self.respond(first)
+        self.respond(second, specific=1)
+        self.respond(third, specific=2)
+        gevent.sleep(0.01)
+
+        self.assertEqual(len(self.sent), 5)
+        self.assertEqual([i.cltu_id for i in self.outstanding()], [1, 2])
+
+        for item in self.outstanding():
+            self.respond(item)
+        self.assertEqual([r.get(timeout=1) for r in results], [0, 1, 2])
+
+    def test_non_retryable_rejection_fails_result(self):
+        """Other rejections raise CltuTransferError through the result"""
+        result, = self.cltu.upload_cltus([b'\x01'])
+        gevent.sleep(0)
+        self.respond(self.outstanding()[0], specific=4)
+
+        with self.assertRaises(CltuTransferError) as cm:
+            result.get(timeout=1)
+        self.assertEqual(cm.exception.diagnostic, 'Invalid Time')
+        self.assertEqual(self.cltu._cltu_id, 0)
+
+    def test_missing_return_times_out(self):
+        """Results fail if the provider never returns the transfers"""
+        self.cltu._cltu_return_timeout = 0.01
+        results = self.cltu.upload_cltus([b'\x01'] * 4)
+
+        for result in results:
+            with self.assertRaises(CltuTransferError):
+                result.get(timeout=1)
+
+    def test_send_failure_fails_results(self):
+        """Results fail if a CLTU cannot be sent"""
+        def send(msg):
+            if len(self.sent) == 2:
+                raise socket.error(errno.EHOSTUNREACH, 'No route to host')
+            self.sent.append(msg)
+
+        self.cltu.send = send
+        results = self.cltu.upload_cltus([b'\x01'] * 5)
+        gevent.sleep(0)
+
+        for result in results:
+            with self.assertRaises(CltuTransferError) as cm:
+                result.get(timeout=1)
+            self.assertIn('No route to host', cm.exception.diagnostic)
+        self.assertIsNone(self.cltu._uploader)
+        self.assertEqual((self.cltu._outstanding, len(self.cltu._cltu_pending)), ({}, 0))
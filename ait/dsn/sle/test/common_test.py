@@ -0,0 +1,320 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+
+import datetime as dt
+import socket
+import struct
+import time
+import unittest
+
+import gevent
+import gevent.server
+
+from ait.dsn.sle import common, timecode
+from ait.dsn.sle.manager import SessionManager
+
+
+def make_pdu(body):
+    return struct.pack(common.TML_SLE_FORMAT, common.TML_SLE_TYPE, len(body)) + body
+
+
+def queue_pdu(sle, body, received=None):
+    ''' Queue a PDU message as if it was received by the connection handler '''
+    sle._data_queue.put((make_pdu(body), received))
+
+
+class MockPdu(object):
+    def __init__(self, name, body):
+        self.name = name
+        self.body = body
+
+    def getName(self):
+        return self.name
+
+
+class MockSLE(common.SLE):
+    ''' SLE interface with no network connection that "decodes" PDUs
+    by wrapping their body in a :class:`MockPdu`
+    '''
+    def __init__(self, *args, **kwargs):
+        self._hostnames = ['localhost']
+        self._port = 5100
+        super(MockSLE, self).__init__(*args, **kwargs)
+        self.batches = []
+        self._handlers['MockPdu'].append(self._mock_handler)
+
+    def decode(self, message):
+        return MockPdu('mockPdu', message), b''
+
+    def _mock_handler(self, pdu):
+        self.batches[-1].append(pdu.body)
+
+
+class DataProcessorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.sle = MockSLE(max_batch_size=3)
+        self.sle._conn_monitor.kill()
+
+    def tearDown(self):
+        self.sle._data_processor.kill()
+        for frame_sink in self.sle._sinks:
+            frame_sink.close()
+
+    def test_queued_pdus_processed_in_batches(self):
+        """Queued PDUs are drained in batches of at most max_batch_size"""
+        processor = self.sle._data_processor
+        for i in range(5):
+            queue_pdu(self.sle, str(i).encode())
+
+        self.sle.batches.append([])
+        gevent.sleep(0)
+        self.assertEqual(self.sle.batches[0], [b'0', b'1', b'2'])
+
+        self.sle.batches.append([])
+        gevent.sleep(0)
+        self.assertEqual(self.sle.batches[1], [b'3', b'4'])
+        self.assertFalse(processor.dead)
+
+    def test_idle_processor_blocks(self):
+        """An idle processor waits on the queue instead of polling it"""
+        gevent.sleep(0)
+        self.assertFalse(self.sle._data_processor.dead)
+        self.assertTrue(self.sle._data_queue.getters)
+
+
+class SessionIsolationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.sessions = [MockSLE(), MockSLE()]
+        for sle in self.sessions:
+            sle._conn_monitor.kill()
+            sle.batches.append([])
+
+    def tearDown(self):
+        for sle in self.sessions:
+            sle._data_processor.kill()
+            for frame_sink in sle._sinks:
+                frame_sink.close()
+
+    def test_instances_do_not_share_state(self):
+        """Queues, handlers and invoke ids belong to each instance"""
+        first, second = self.sessions
+        self.assertIsNot(first._data_queue, second._data_queue)
+        self.assertIsNot(first._handlers, second._handlers)
+        self.assertEqual(len(first._handlers['MockPdu']), 1)
+
+        self.assertEqual([first.invoke_id, first.invoke_id], [0, 1])
+        self.assertEqual(second.invoke_id, 0)
+
+    def test_pdus_only_reach_own_handlers(self):
+        """A PDU received by one instance is not handled by another"""
+        first, second = self.sessions
+        queue_pdu(first, b'first')
+        gevent.sleep(0)
+
+        self.assertEqual(first.batches, [[b'first']])
+        self.assertEqual(second.batches, [[]])
+
+
+class SessionManagerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = SessionManager(workers=1)
+        self.sessions = [
+            MockSLE(session_manager=self.manager, max_batch_size=2)
+            for i in range(3)
+        ]
+        for sle in self.sessions:
+            sle._conn_monitor.kill()
+            sle.batches.append([])
+
+    def tearDown(self):
+        self.manager.shutdown()
+        for sle in self.sessions:
+            for frame_sink in sle._sinks:
+                frame_sink.close()
+
+    def test_managed_sessions_have_no_processor(self):
+        """Managed instances do not spawn their own decode greenlet"""
+        self.assertEqual(self.manager.sessions, self.sessions)
+        for sle in self.sessions:
+            self.assertIsNone(sle._data_processor)
+
+    def test_sessions_share_workers_round_robin(self):
+        """Ready sessions are processed in turn by the shared workers"""
+        for i, sle in enumerate(self.sessions):
+            for j in range(3):
+                queue_pdu(sle, '{}{}'.format(i, j).encode())
+            self.manager.schedule(sle)
+
+        gevent.sleep(0)
+        self.assertEqual(self.sessions[0].batches, [[b'00', b'01']])
+        self.assertEqual(self.sessions[1].batches, [[]])
+
+        for i in range(10):
+            gevent.sleep(0)
+
+        for i, sle in enumerate(self.sessions):
+            self.assertEqual(
+                sle.batches[0],
+                ['{}{}'.format(i, j).encode() for j in range(3)]
+            )
+            self.assertTrue(sle._data_queue.empty())
+
+    def test_removed_session_not_processed(self):
+        """Removed sessions are no longer scheduled"""
+        sle = self.sessions[0]
+        self.manager.remove(sle)
+        queue_pdu(sle, b'x')
+        self.manager.schedule(sle)
+        gevent.sleep(0)
+        self.assertEqual(sle.batches, [[]])
+
+
+def wait_for(condition, timeout=5):
+    ''' Wait for a condition to become true, returning whether it did '''
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            return False
+        gevent.sleep(0.01)
+    return True
+
+
+class ResumableSLE(MockSLE):
+    ''' MockSLE whose bind and start succeed immediately '''
+    def __init__(self, *args, **kwargs):
+        super(ResumableSLE, self).__init__(*args, **kwargs)
+        self.calls = []
+
+    def bind(self, inst_id=None):
+        self._bound_inst_id = inst_id
+        self.calls.append(('bind', inst_id))
+        self._state = 'ready'
+
+    def start(self, start_time, end_time):
+        self._start_args = (start_time, end_time)
+        self.calls.append(('start', start_time, end_time))
+        self._state = 'active'
+
+
+class KeepaliveTest(unittest.TestCase):
+
+    def setUp(self):
+        self.connections = []
+        self.received = []
+        self.server = gevent.server.StreamServer(('127.0.0.1', 0), self.serve)
+        self.server.start()
+
+        self.sle = ResumableSLE(reconnect_delay=0)
+        self.sle._heartbeat = 1
+        self.sle._deadfactor = 2
+        self.sle._hostnames = ['127.0.0.1']
+        self.sle._port = self.server.server_port
+
+    def tearDown(self):
+        self.sle.disconnect()
+        self.server.stop()
+
+    def serve(self, sock, address):
+        self.connections.append(sock)
+        while True:
+            try:
+                data = sock.recv(1024)
+            except socket.error:
+                return
+            if not data:
+                return
+            self.received.append(data)
+
+    def test_heartbeat_and_dead_peer(self):
+        """Heartbeats are sent and a silent peer is detected as dead"""
+        self.sle._auto_resume = False
+        self.sle.connect()
+        connected = time.time()
+
+        heartbeat = struct.pack(common.TML_CONTEXT_HB_FORMAT,
+                                common.TML_CONTEXT_HEARTBEAT_TYPE, 0)
+        self.assertTrue(wait_for(lambda: b''.join(self.received).endswith(heartbeat)))
+        self.assertTrue(self.sle._connected.is_set())
+
+        self.assertTrue(wait_for(lambda: not self.sle._connected.is_set()))
+        self.assertGreaterEqual(time.time() - connected, 2)
+        self.assertEqual(self.sle._state, 'unbound')
+
+    def test_reconnect_after_peer_closes(self):
+        """A session closed by the peer is reconnected and bound again"""
+        self.sle.connect()
+        self.sle.bind('inst')
+        self.assertTrue(wait_for(lambda: self.connections))
+        self.connections[0].shutdown(socket.SHUT_RDWR)
+
+        self.assertTrue(wait_for(lambda: len(self.sle.calls) == 2))
+        self.assertTrue(wait_for(lambda: len(self.connections) == 2))
+        self.assertEqual(self.sle.calls, [('bind', 'inst'), ('bind', 'inst')])
+
+    def test_unbound_session_not_reconnected(self):
+        """A connection closed after unbinding is not re-established"""
+        self.sle.connect()
+        self.assertTrue(wait_for(lambda: self.connections))
+        self.connections[0].shutdown(socket.SHUT_RDWR)
+
+        self.assertTrue(wait_for(lambda: not self.sle._connected.is_set()))
+        gevent.sleep(0.1)
+        self.assertIsNone(self.sle._resumer)
+        self.assertEqual(len(self.connections), 1)
+
+
+class ResumeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.sle = ResumableSLE(reconnect_delay=0)
+        self.sle._conn_monitor.kill()
+        self.sle.connect = self.sle._connected.set
+
+    def tearDown(self):
+        self.sle.disconnect()
+
+    def test_restart_from_last_ert(self):
+        """Started sessions restart from the last delivered frame's ERT"""
+        start = dt.datetime(2019, 1, 1)
+        end = dt.datetime(2019, 1, 2)
+        ert = dt.datetime(2019, 1, 1, 12, 30, 15, 250125)
+
+        self.sle.bind('inst')
+        self.sle.start(start, end)
+        self.sle._last_ert = timecode.encode(ert)
+
+        self.sle._socket = gevent.socket.socket()
+        self.sle._connected.set()
+        self.sle._connection_lost('test')
+        self.sle._resumer.join(timeout=1)
+
+        self.assertEqual(self.sle.calls[2:], [('bind', 'inst'), ('start', ert, end)])
+        self.assertEqual(self.sle._state, 'active')
+
+    def test_online_session_restarts_without_start_time(self):
+        """Sessions started without a start time restart without one"""
+        self.sle.bind('inst')
+        self.sle.start(None, None)
+        self.sle._last_ert = timecode.encode(dt.datetime(2019, 1, 1))
+
+        self.sle._socket = gevent.socket.socket()
+        self.sle._connected.set()
+        self.sle._connection_lost('test')
+        self.sle._resumer.join(timeout=1)
+
+        self.assertEqual(self.sle.calls[-1], ('start', None, None))
@@ -0,0 +1,113 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+
+import datetime as dt
+import hashlib
+import unittest
+
+from pyasn1.codec.ber.encoder import encode
+from pyasn1.codec.der.encoder import encode as der_encode
+from pyasn1.type import univ
+
+import ait.dsn.sle
+from ait.dsn.sle import timecode
+from ait.dsn.sle.credentials import ISP1Encoder
+from ait.dsn.sle.pdu.common import HashInput, ISP1Credentials
+
+
+def make_pyasn1_credentials(time, random_number, username, password):
+    ''' Encode ISP1 credentials with PyASN1 '''
+    hash_input = HashInput()
+    hash_input['time'] = timecode.encode(time)
+    hash_input['randomNumber'] = random_number
+    hash_input['username'] = username
+    hash_input['password'] = password
+
+    creds = ISP1Credentials()
+    creds['time'] = timecode.encode(time)
+    creds['randomNumber'] = random_number
+    creds['theProtected'] = hashlib.sha1(der_encode(hash_input)).digest()
+    return encode(creds)
+
+
+class ISP1EncoderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.encoder = ISP1Encoder('LSE', 'secret')
+
+    def test_matches_pyasn1_encoding(self):
+        """Encoded credentials are identical to PyASN1's"""
+        times = [dt.datetime(2019, 3, 4, 5, 6, 7, 891011), dt.datetime(2058, 1, 1)]
+        for time in times:
+            for random_number in [0, 127, 128, 65535, 2147483647, 42949667295]:
+                self.assertEqual(
+                    self.encoder.encode(time, random_number),
+                    make_pyasn1_credentials(time, random_number, 'LSE', 'secret')
+                )
+
+    def test_verify(self):
+        """Only credentials made with the same username and password verify"""
+        time = dt.datetime(2019, 3, 4, 5, 6, 7)
+        self.assertTrue(self.encoder.verify(self.encoder.encode(time, 42)))
+        self.assertFalse(self.encoder.verify(ISP1Encoder('LSE', 'wrong').encode(time, 42)))
+        self.assertFalse(self.encoder.verify(ISP1Encoder('SSE', 'secret').encode(time, 42)))
+        self.assertFalse(self.encoder.verify(b'\x30\x00'))
+
+    def test_verify_caches_peer_credentials(self):
+        """Repeated credentials are verified from the cache"""
+        creds = self.encoder.encode(dt.datetime(2019, 3, 4), 42)
+        self.assertTrue(self.encoder.verify(creds))
+        self.assertEqual(len(self.encoder._cache), 1)
+
+        self.encoder._secret = None
+        self.assertTrue(self.encoder.verify(creds))
+
+    def test_verify_long_form_length(self):
+        """Credentials with a non-minimal length encoding still verify"""
+        creds = self.encoder.encode(dt.datetime(2019, 3, 4), 42)
+        long_form = b'\x30\x81' + creds[1:]
+        self.assertTrue(self.encoder.verify(long_form))
+
+    def test_missing_password(self):
+        """Credentials cannot be made without a password"""
+        with self.assertRaises(ValueError):
+            ISP1Encoder('LSE', None).encode(dt.datetime(2019, 3, 4), 42)
+
+
+class SLECredentialsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.raf = ait.dsn.sle.RAF(hostnames=['localhost'], port=5100,
+                                   initiator_id='LSE', responder_id='LSE',
+                                   peer_password=None)
+        self.raf._local_credentials = ISP1Encoder('LSE', 'secret')
+        self.raf._peer_credentials = ISP1Encoder('LSE', 'secret')
+
+    def tearDown(self):
+        self.raf._conn_monitor.kill()
+        self.raf._data_processor.kill()
+        for frame_sink in self.raf._sinks:
+            frame_sink.close()
+
+    def test_check_return_credentials(self):
+        """Credentials made by a peer with the same secret are accepted"""
+        creds = univ.OctetString(self.raf.make_credentials())
+        self.assertTrue(self.raf._check_return_credentials(creds, 'LSE', 'secret'))
+        self.assertEqual(
+            creds.asOctets(),
+            make_pyasn1_credentials(self.raf._local_entity_auth['time'],
+                                    self.raf._local_entity_auth['random_number'],
+                                    'LSE', 'secret')
+        )
@@ -0,0 +1,132 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+import unittest
+
+import ait.dsn.sle
+from ait.dsn.sle import ber, demux, sink
+from ait.dsn.sle.test.frames_test import make_space_packet, make_tm_frame
+
+
+class RecordingSink(sink.FrameSink):
+    ''' A sink that records the order frames are put on it '''
+
+    def __init__(self, log, name):
+        super(RecordingSink, self).__init__()
+        self._log = log
+        self._name = name
+
+    def put(self, frame):
+        self._log.append((self._name, frame))
+        return True
+
+
+class VirtualChannelDemuxTest(unittest.TestCase):
+
+    def setUp(self):
+        self.log = []
+
+    def make_route(self, name, **kwargs):
+        return demux.VirtualChannelRoute(sinks=[RecordingSink(self.log, name)], **kwargs)
+
+    def test_routing(self):
+        """Items go to the first matching route and unmatched items are refused"""
+        vc_demux = demux.VirtualChannelDemux([
+            self.make_route('hk', spacecraft_id=250, virtual_channel_id=0),
+            self.make_route('other', spacecraft_id=250),
+        ])
+
+        self.assertTrue(vc_demux.put(250, 0, b'a'))
+        self.assertTrue(vc_demux.put(250, 5, b'b'))
+        self.assertFalse(vc_demux.put(251, 0, b'c'))
+        self.assertIs(vc_demux.route(250, 0), vc_demux.routes[0])
+        self.assertIsNone(vc_demux.route(251, 0))
+
+        self.assertTrue(vc_demux.flush(1))
+        self.assertEqual(sorted(self.log), [('hk', b'a'), ('other', b'b')])
+        vc_demux.close()
+
+    def test_priority(self):
+        """Queued items of higher priority routes are dispatched first"""
+        vc_demux = demux.VirtualChannelDemux([
+            self.make_route('science', virtual_channel_id=1, priority=0),
+            self.make_route('hk', virtual_channel_id=0, priority=10),
+        ], max_batch=2)
+
+        for i in range(4):
+            vc_demux.put(250, 1, i)
+        for i in range(4):
+            vc_demux.put(250, 0, i)
+
+        self.assertTrue(vc_demux.flush(1))
+        self.assertEqual([name for name, item in self.log], ['hk'] * 4 + ['science'] * 4)
+        vc_demux.close()
+
+    def test_equal_priority_served_in_turn(self):
+        """Routes of equal priority are served one batch at a time in turn"""
+        vc_demux = demux.VirtualChannelDemux([
+            self.make_route('a', virtual_channel_id=1),
+            self.make_route('b', virtual_channel_id=2),
+        ], max_batch=2)
+
+        for i in range(4):
+            vc_demux.put(250, 1, i)
+            vc_demux.put(250, 2, i)
+
+        self.assertTrue(vc_demux.flush(1))
+        self.assertEqual([name for name, item in self.log], ['a', 'a', 'b', 'b'] * 2)
+        vc_demux.close()
+
+    def test_overflow_policies(self):
+        """Full routes drop new items, drop old items or block"""
+        drop = self.make_route('drop', max_queued=2)
+        self.assertEqual([drop.put(i) for i in range(3)], [True, True, False])
+        self.assertEqual(list(drop._queue), [0, 1])
+
+        drop_oldest = self.make_route('drop_oldest', max_queued=2, policy='drop_oldest')
+        self.assertEqual([drop_oldest.put(i) for i in range(3)], [True, True, True])
+        self.assertEqual(list(drop_oldest._queue), [1, 2])
+        self.assertEqual(drop_oldest.items_dropped, 1)
+
+        vc_demux = demux.VirtualChannelDemux([self.make_route('block', max_queued=2, policy='block')])
+        for i in range(5):
+            self.assertTrue(vc_demux.put(250, 0, i))
+        self.assertTrue(vc_demux.flush(1))
+        self.assertEqual([item for name, item in self.log], list(range(5)))
+        vc_demux.close()
+
+        with self.assertRaises(ValueError):
+            demux.VirtualChannelRoute(policy='spill')
+
+
+class RafDemuxTest(unittest.TestCase):
+
+    def test_routes_by_virtual_channel(self):
+        """RAF queues packets on the route of their virtual channel"""
+        hk, default = [], []
+        raf = ait.dsn.sle.RAF(hostnames=['localhost'], port=5100,
+                              sinks=[sink.CallbackSink(default.append)],
+                              vc_routes=[{'virtual_channel_id': 0, 'priority': 1,
+                                          'sinks': [sink.CallbackSink(hk.append)]}])
+        raf._conn_monitor.kill()
+        raf._data_processor.kill()
+
+        for vcid in (0, 3):
+            data = make_tm_frame(make_space_packet(1, b'vc%d' % vcid), vcid=vcid)
+            raf._transfer_data_invoc_handler(ber.FrameRecord(b'\x00' * 8, 0, 1, None, data))
+
+        raf._demux.close()
+        raf._sinks[0].close()
+        self.assertEqual([bytes(bytearray(p)) for b in hk for p in b], [b'vc0'])
+        self.assertEqual([bytes(bytearray(p)) for b in default for p in b], [b'vc3'])
@@ -0,0 +1,340 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+import struct
+import unittest
+
+from ait.dsn.sle import frames
+
+
+def make_space_packet(apid, data, seq=0):
+    ''' Encode a space packet with the given APID and data field '''
+    return struct.pack('>HHH', 0x0800 | apid, 0xC000 | seq, len(data) - 1) + data
+
+
+def make_tm_frame(data_field, scid=250, vcid=3, mc_count=7, vc_count=9,
+                  fhp=0, ocf=None, sec_header=None, fecf=False):
+    ''' Encode a TM transfer frame around a data field '''
+    frame_id = (scid << 4) | (vcid << 1) | (ocf is not None)
+    status = ((sec_header is not None) << 15) | fhp
+    frame = struct.pack('>HBBH', frame_id, mc_count, vc_count, status)
+    if sec_header is not None:
+        frame += struct.pack('>B', len(sec_header)) + sec_header
+    frame += data_field
+    if ocf is not None:
+        frame += ocf
+    if fecf:
+        frame += b'\xff\xff'
+    return frame
+
+
+def make_aos_frame(data_field, scid=171, vcid=5, vc_count=1000, signaling=0,
+                   pointer=0, fhec=None, insert_zone=b'', ocf=None, fecf=None):
+    ''' Encode an AOS transfer frame around a M_PDU or B_PDU data field '''
+    frame = struct.pack('>HI', (1 << 14) | (scid << 6) | vcid, (vc_count << 8) | signaling)
+    if fhec is not None:
+        frame += fhec
+    frame += insert_zone + struct.pack('>H', pointer) + data_field
+    if ocf is not None:
+        frame += ocf
+    if fecf is not None:
+        frame += struct.pack('>H', fecf)
+    return frame
+
+
+def make_uslp_frame(tfdz, scid=0xABCD, vcid=9, map_id=2, vc_count=0x1234, count_len=2,
+                    rules=0, upid=0, pointer=0, insert_zone=b'', ocf=None, fecf=None,
+                    bypass=0, truncated=False, fill=b''):
+    ''' Encode a USLP transfer frame around a transfer frame data zone '''
+    frame_id = (12 << 28) | (scid << 12) | (vcid << 5) | (map_id << 1) | truncated
+    tfdf = struct.pack('>B', (rules << 5) | upid)
+    if rules <= 2:
+        tfdf += struct.pack('>H', pointer)
+    tfdf += tfdz
+
+    if truncated:
+        frame = struct.pack('>I', frame_id) + tfdf
+    else:
+        count = struct.pack('>Q', vc_count)[8 - count_len:] if count_len else b''
+        body = count + insert_zone + tfdf + (ocf or b'')
+        length = 7 + len(body) + (2 if fecf is not None else 0)
+        flags = (bypass << 7) | ((ocf is not None) << 3) | count_len
+        frame = struct.pack('>IHB', frame_id, length - 1, flags) + body
+
+    if fecf is not None:
+        frame += struct.pack('>H', fecf)
+    return frame + fill
+
+
+class TMTransFrameTest(unittest.TestCase):
+
+    def setUp(self):
+        self.packets = [make_space_packet(100, b'a' * 10), make_space_packet(101, b'bb' * 20)]
+
+    def test_primary_header(self):
+        """Primary header fields are decoded from the frame"""
+        tmf = frames.TMTransFrame(make_tm_frame(b''.join(self.packets), ocf=b'OCF!'))
+
+        self.assertEqual(tmf.version, 0)
+        self.assertEqual(tmf.spacecraft_id, 250)
+        self.assertEqual(tmf.virtual_channel_id, 3)
+        self.assertEqual(tmf.ocf_flag, 1)
+        self.assertEqual(tmf.master_chan_frame_count, 7)
+        self.assertEqual(tmf.virtual_chan_frame_count, 9)
+        self.assertEqual(tmf.first_hdr_ptr, 0)
+        self.assertEqual(tmf['spacecraft_id'], 250)
+        self.assertEqual(tmf.ocf.tobytes(), b'OCF!')
+        self.assertFalse(tmf.is_idle)
+        with self.assertRaises(KeyError):
+            tmf['no_such_field']
+
+    def test_packets_from_first_header_pointer(self):
+        """Packets are read from the first header pointer up to the OCF and FECF"""
+        data_field = b'tail' + b''.join(self.packets) + b'head'
+        tmf = frames.TMTransFrame(make_tm_frame(data_field, fhp=4, ocf=b'OCF!', fecf=True),
+                                  has_fecf=True)
+
+        self.assertEqual([p.tobytes() for p in tmf.packets], self.packets)
+        self.assertEqual([d.tobytes() for d in tmf._data], [p[6:] for p in self.packets])
+        self.assertEqual(tmf.data_field.tobytes(), data_field)
+
+    def test_secondary_header(self):
+        """The secondary header is skipped before the data field"""
+        tmf = frames.TMTransFrame(make_tm_frame(self.packets[0], sec_header=b'xyz'))
+
+        self.assertEqual(tmf.sec_header_flag, 1)
+        self.assertEqual(tmf.sec_hdr_len, 4)
+        self.assertEqual([p.tobytes() for p in tmf.packets], self.packets[:1])
+
+    def test_idle_and_no_packet_frames(self):
+        """OID frames and frames without a packet start are not scanned"""
+        idle = frames.TMTransFrame(make_tm_frame(b'\x55' * 20, fhp=frames.TM_FHP_IDLE))
+        self.assertTrue(idle.is_idle)
+        self.assertEqual(idle.packets, [])
+
+        continued = frames.TMTransFrame(make_tm_frame(b'\x55' * 20, fhp=frames.TM_FHP_NO_PACKET))
+        self.assertTrue(continued.has_no_pkts)
+        self.assertEqual(continued.packets, [])
+
+    def test_decode_reuses_view(self):
+        """A view decodes another frame in place"""
+        tmf = frames.TMTransFrame(make_tm_frame(self.packets[0], vcid=1))
+        tmf.packets
+        tmf.decode(memoryview(make_tm_frame(self.packets[1], vcid=2)))
+
+        self.assertEqual(tmf.virtual_channel_id, 2)
+        self.assertEqual([p.tobytes() for p in tmf.packets], self.packets[1:])
+
+    def test_short_frames(self):
+        """Frames shorter than their headers are rejected"""
+        with self.assertRaises(ValueError):
+            frames.TMTransFrame(b'\x0f\xa6\x07')
+        with self.assertRaises(ValueError):
+            frames.TMTransFrame(make_tm_frame(b''), has_fecf=True)
+
+
+class AOSTransFrameTest(unittest.TestCase):
+
+    def setUp(self):
+        self.packets = [make_space_packet(100, b'a' * 10), make_space_packet(101, b'bb' * 20)]
+
+    def test_primary_header(self):
+        """Primary header fields are decoded from the frame"""
+        aos = frames.AOSTransFrame(make_aos_frame(b''.join(self.packets), vc_count=0xABCDEF,
+                                                  signaling=0xC5))
+
+        self.assertEqual(aos.version, 1)
+        self.assertEqual(aos.spacecraft_id, 171)
+        self.assertEqual(aos.virtual_channel_id, 5)
+        self.assertEqual(aos.virtual_chan_frame_count, 0xABCDEF)
+        self.assertEqual(aos.replay_flag, 1)
+        self.assertEqual(aos.vc_frame_count_usage_flag, 1)
+        self.assertEqual(aos.vc_frame_count_cycle, 5)
+        self.assertEqual(aos.first_hdr_ptr, 0)
+        self.assertIsNone(aos.bitstream_data_ptr)
+        self.assertEqual(aos['spacecraft_id'], 171)
+        self.assertIsNone(aos.ocf)
+        self.assertIsNone(aos.fecf)
+        self.assertFalse(aos.is_idle)
+
+    def test_optional_fields(self):
+        """The FHEC, insert zone, OCF and FECF are located around the M_PDU"""
+        data_field = b'tail' + b''.join(self.packets)
+        aos = frames.AOSTransFrame(
+            make_aos_frame(data_field, pointer=4, fhec=b'\x12\x34', insert_zone=b'INSERT',
+                           ocf=b'OCF!', fecf=0xBEEF),
+            has_fecf=True, has_ocf=True, has_fhec=True, insert_zone_len=6
+        )
+
+        self.assertEqual(aos.insert_zone.tobytes(), b'INSERT')
+        self.assertEqual(aos.ocf.tobytes(), b'OCF!')
+        self.assertEqual(aos.fecf, 0xBEEF)
+        self.assertEqual(aos.data_field.tobytes(), data_field)
+        self.assertEqual([p.tobytes() for p in aos.packets], self.packets)
+        self.assertEqual([d.tobytes() for d in aos._data], [p[6:] for p in self.packets])
+
+    def test_idle_frames(self):
+        """Idle virtual channel frames and idle M_PDUs are flagged"""
+        idle_vc = frames.AOSTransFrame(make_aos_frame(b''.join(self.packets), vcid=frames.AOS_IDLE_VCID))
+        self.assertTrue(idle_vc.is_idle)
+        self.assertEqual(idle_vc.packets, [])
+
+        idle_mpdu = frames.AOSTransFrame(make_aos_frame(b'\x55' * 20, pointer=frames.TM_FHP_IDLE))
+        self.assertTrue(idle_mpdu.is_idle)
+
+        continued = frames.AOSTransFrame(make_aos_frame(b'\x55' * 20, pointer=frames.TM_FHP_NO_PACKET))
+        self.assertTrue(continued.has_no_pkts)
+        self.assertEqual(continued.packets, [])
+
+    def test_bpdu(self):
+        """B_PDU bitstream data is cut at the bitstream data pointer"""
+        data_field = b'0123456789'
+        bpdu = frames.AOSTransFrame(make_aos_frame(data_field, pointer=8 * 4 + 3),
+                                    data_unit=frames.AOS_BPDU)
+        self.assertEqual(bpdu.bitstream_data_ptr, 35)
+        self.assertIsNone(bpdu.first_hdr_ptr)
+        self.assertEqual(bpdu.bitstream_data.tobytes(), b'01234')
+        self.assertEqual(bpdu.packets, [])
+
+        full = frames.AOSTransFrame(make_aos_frame(data_field, pointer=frames.AOS_BPDU_ALL_VALID),
+                                    data_unit=frames.AOS_BPDU)
+        self.assertEqual(full.bitstream_data.tobytes(), data_field)
+
+        idle = frames.AOSTransFrame(make_aos_frame(data_field, pointer=frames.AOS_BPDU_IDLE),
+                                    data_unit=frames.AOS_BPDU)
+        self.assertTrue(idle.is_idle)
+        self.assertIsNone(idle.bitstream_data)
+
+        with self.assertRaises(ValueError):
+            frames.AOSTransFrame(data_unit='cpdu')
+
+    def test_short_frames(self):
+        """Frames shorter than their headers are rejected"""
+        with self.assertRaises(ValueError):
+            frames.AOSTransFrame(make_aos_frame(b'')[:7])
+        with self.assertRaises(ValueError):
+            frames.AOSTransFrame(make_aos_frame(b'', insert_zone=b'IZ'), insert_zone_len=4)
+
+
+class USLPTransFrameTest(unittest.TestCase):
+
+    def setUp(self):
+        self.packets = [make_space_packet(100, b'a' * 10), make_space_packet(101, b'bb' * 20)]
+
+    def test_primary_header(self):
+        """Primary header fields are decoded from the frame"""
+        uslp = frames.USLPTransFrame(make_uslp_frame(b''.join(self.packets), bypass=1))
+
+        self.assertEqual(uslp.version, 12)
+        self.assertEqual(uslp.spacecraft_id, 0xABCD)
+        self.assertEqual(uslp.virtual_channel_id, 9)
+        self.assertEqual(uslp.map_id, 2)
+        self.assertEqual(uslp.truncated, 0)
+        self.assertEqual(uslp.bypass_flag, 1)
+        self.assertEqual(uslp.vc_frame_count_len, 2)
+        self.assertEqual(uslp.virtual_chan_frame_count, 0x1234)
+        self.assertEqual(uslp.vc_frame_count_modulus, 2 ** 16)
+        self.assertEqual(uslp.frame_length, 9 + 3 + 62)
+        self.assertEqual(uslp.construction_rules, frames.USLP_RULE_PACKETS)
+        self.assertEqual(uslp.first_hdr_ptr, 0)
+        self.assertIsNone(uslp.last_valid_octet_ptr)
+        self.assertTrue(uslp.carries_packets)
+        self.assertEqual(uslp['map_id'], 2)
+        self.assertEqual([p.tobytes() for p in uslp.packets], self.packets)
+
+    def test_optional_fields(self):
+        """The insert zone, OCF, FECF and fill after the frame are located"""
+        tfdz = b'tail' + b''.join(self.packets)
+        uslp = frames.USLPTransFrame(
+            make_uslp_frame(tfdz, pointer=4, count_len=0, insert_zone=b'IZ', ocf=b'OCF!',
+                            fecf=0xBEEF, fill=b'\x00' * 9),
+            has_fecf=True, insert_zone_len=2
+        )
+
+        self.assertEqual(uslp.virtual_chan_frame_count, 0)
+        self.assertEqual(uslp.data_field.tobytes(), tfdz)
+        self.assertEqual(uslp.ocf.tobytes(), b'OCF!')
+        self.assertEqual(uslp.fecf, 0xBEEF)
+        self.assertEqual([p.tobytes() for p in uslp.packets], self.packets)
+
+    def test_truncated_frame(self):
+        """Truncated frames have a four octet header and no OCF"""
+        uslp = frames.USLPTransFrame(make_uslp_frame(b'octets', rules=frames.USLP_RULE_OCTET_STREAM,
+                                                     upid=4, truncated=True))
+
+        self.assertEqual(uslp.truncated, 1)
+        self.assertEqual(uslp.map_id, 2)
+        self.assertEqual(uslp.frame_length, 11)
+        self.assertIsNone(uslp.ocf)
+        self.assertFalse(uslp.carries_packets)
+        self.assertEqual(uslp.user_data.tobytes(), b'octets')
+
+    def test_construction_rules(self):
+        """Data zones without packets are cut at the last valid octet pointer"""
+        sdu = frames.USLPTransFrame(make_uslp_frame(b'mapa-sdu\x00\x00', pointer=7,
+                                                    rules=frames.USLP_RULE_MAPA_SDU_START, upid=4))
+        self.assertEqual(sdu.last_valid_octet_ptr, 7)
+        self.assertIsNone(sdu.first_hdr_ptr)
+        self.assertEqual(sdu.user_data.tobytes(), b'mapa-sdu')
+
+        segment = frames.USLPTransFrame(make_uslp_frame(b'segment', upid=4,
+                                                        rules=frames.USLP_RULE_SEGMENT_LAST))
+        self.assertEqual(segment.user_data.tobytes(), b'segment')
+
+        continued = frames.USLPTransFrame(make_uslp_frame(b'\x55' * 20, pointer=frames.USLP_POINTER_NONE))
+        self.assertTrue(continued.has_no_pkts)
+        self.assertIsNone(continued.user_data)
+        self.assertEqual(continued.packets, [])
+
+        idle = frames.USLPTransFrame(make_uslp_frame(b'\x55' * 20, upid=frames.USLP_UPID_IDLE,
+                                                     rules=frames.USLP_RULE_OCTET_STREAM))
+        self.assertTrue(idle.is_idle)
+        self.assertIsNone(idle.user_data)
+
+    def test_inconsistent_frames(self):
+        """Frames shorter than their headers or frame length are rejected"""
+        frame = make_uslp_frame(b''.join(self.packets))
+        for data in (frame[:3], frame[:6], frame[:-1], b'\x00' * 8,
+                     b'\xc0\x00\x00\x00\x00\x07\x07\x00',
+                     make_uslp_frame(b'', count_len=7)[:9],
+                     make_uslp_frame(b'', truncated=True)[:6]):
+            with self.assertRaises(ValueError):
+                frames.USLPTransFrame(data)
+
+
+class FrameTypeTest(unittest.TestCase):
+
+    def tearDown(self):
+        frames.FRAME_TYPES.pop('MissionFrame', None)
+
+    def test_registered_types(self):
+        """Frame decoders are looked up by name, dotted path or class"""
+        self.assertIs(frames.get_frame_type('AOSTransFrame'), frames.AOSTransFrame)
+        self.assertIs(frames.get_frame_type('ait.dsn.sle.frames.USLPTransFrame'),
+                      frames.USLPTransFrame)
+        self.assertIs(frames.get_frame_type(frames.TMTransFrame), frames.TMTransFrame)
+
+        for name in ('NoSuchFrame', 'ait.dsn.sle.frames.NoSuchFrame', 'no.such.Module'):
+            with self.assertRaises(ValueError):
+                frames.get_frame_type(name)
+
+    def test_register_frame_type(self):
+        """Registered decoders are created with the frame options"""
+        class MissionFrame(frames.TMTransFrame):
+            __slots__ = []
+
+        frames.register_frame_type('MissionFrame', MissionFrame)
+        decoder = frames.make_frame_decoder('MissionFrame', {'has_fecf': True})
+        self.assertIsInstance(decoder, MissionFrame)
+        self.assertTrue(decoder.has_fecf)
@@ -0,0 +1,211 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+import unittest
+
+import gevent
+
+import ait.dsn.sle
+from ait.dsn.sle import hooks, simulator
+from ait.dsn.sle.pdu.raf import RafProvidertoUserPdu
+from ait.dsn.sle.pdu.rcf import RcfProvidertoUserPdu
+from ait.dsn.sle.test.ber_test import make_transfer_buffer
+from ait.dsn.sle.test.common_test import MockSLE, queue_pdu, wait_for
+from ait.dsn.sle.test.frames_test import make_space_packet, make_tm_frame
+
+INST_ID = 'sagr=1.spack=2.rsl-fg=3.raf=onlt1'
+
+
+class HookSetTest(unittest.TestCase):
+
+    def setUp(self):
+        self.hooks = hooks.HookSet()
+        self.calls = []
+
+    def before(self, stage, name, handler):
+        self.calls.append(('before', stage, name))
+        return len(self.calls)
+
+    def after(self, stage, name, handler, token):
+        self.calls.append(('after', stage, name, token))
+
+    def test_invalid_hooks(self):
+        """Unknown stages, intervals below 1 and misplaced names are rejected"""
+        with self.assertRaises(ValueError):
+            self.hooks.add('unknown', self.before)
+        with self.assertRaises(ValueError):
+            self.hooks.add('decode', self.before, every=0)
+        with self.assertRaises(ValueError):
+            self.hooks.add('decode', self.before, names=['RafTransferBuffer'])
+        self.assertEqual(self.hooks.decode, ())
+
+    def test_sampling(self):
+        """Only every Nth event of the hook's PDU names is passed on"""
+        self.hooks.add('dispatch', self.before, self.after, every=2, names=['A'])
+        for name in ('A', 'B', 'A', 'A', 'A'):
+            calls = self.hooks.enter('dispatch', name)
+            if calls:
+                self.hooks.exit('dispatch', name, calls)
+
+        self.assertEqual(self.calls, [
+            ('before', 'dispatch', 'A'), ('after', 'dispatch', 'A', 1),
+            ('before', 'dispatch', 'A'), ('after', 'dispatch', 'A', 3),
+        ])
+
+    def test_remove(self):
+        """Removed hooks are no longer called"""
+        hook = self.hooks.add('framing', self.before)
+        other = self.hooks.add('framing', after=self.after)
+        self.hooks.remove(hook)
+        self.assertEqual(self.hooks.framing, (other,))
+
+        self.hooks.exit('framing', None, self.hooks.enter('framing', None))
+        self.assertEqual(self.calls, [('after', 'framing', None, None)])
+
+
+class SessionHooksTest(unittest.TestCase):
+
+    def setUp(self):
+        self.sle = MockSLE()
+        self.sle._conn_monitor.kill()
+        self.sle.batches.append([])
+        self.calls = []
+
+    def tearDown(self):
+        self.sle.disconnect()
+
+    def before(self, stage, name, handler):
+        self.calls.append(('before', stage, name, handler))
+
+    def after(self, stage, name, handler, token):
+        self.calls.append(('after', stage, name, handler))
+
+    def test_stage_order(self):
+        """Hooks are called around decode, dispatch and each handler"""
+        for stage in ('decode', 'dispatch', 'handler'):
+            self.sle.add_hook(stage, self.before, self.after)
+
+        queue_pdu(self.sle, b'data')
+        gevent.sleep(0)
+
+        handler = self.sle._handlers['MockPdu'][0]
+        self.assertEqual(self.sle.batches, [[b'data']])
+        self.assertEqual(self.calls, [
+            ('before', 'decode', None, None),
+            ('after', 'decode', 'MockPdu', None),
+            ('before', 'dispatch', 'MockPdu', None),
+            ('before', 'handler', 'MockPdu', handler),
+            ('after', 'handler', 'MockPdu', handler),
+            ('after', 'dispatch', 'MockPdu', None),
+        ])
+
+    def test_removed_hook(self):
+        """A removed hook is not called"""
+        hook = self.sle.add_hook('dispatch', self.before, self.after)
+        self.sle.remove_hook(hook)
+
+        queue_pdu(self.sle, b'data')
+        gevent.sleep(0)
+        self.assertEqual(self.sle.batches, [[b'data']])
+        self.assertEqual(self.calls, [])
+
+    def test_failing_hooks_ignored(self):
+        """Exceptions raised by hooks do not stop PDU processing"""
+        def fail(*args):
+            raise RuntimeError('faulty hook')
+
+        failing = [self.sle.add_hook(stage, fail, fail) for stage in ('decode', 'dispatch')]
+        failing.append(self.sle.add_hook('handler', after=fail))
+        self.sle.add_hook('dispatch', self.before, self.after)
+
+        for body in (b'one', b'two'):
+            queue_pdu(self.sle, body)
+        gevent.sleep(0)
+
+        self.assertEqual(self.sle.batches, [[b'one', b'two']])
+        self.assertEqual([h.errors for h in failing], [2, 2, 2])
+        self.assertEqual(len(self.calls), 4)
+        self.assertFalse(self.sle._data_processor.dead)
+
+
+class ReturnServiceHooksTest(unittest.TestCase):
+
+    def test_dispatch_hooks(self):
+        """RAF and RCF sessions call hooks around their PDU dispatch"""
+        frame = make_tm_frame(make_space_packet(1, b'data'))
+        for service, pdu_cls, name in (
+                (ait.dsn.sle.RAF, RafProvidertoUserPdu, 'rafTransferBuffer'),
+                (ait.dsn.sle.RCF, RcfProvidertoUserPdu, 'rcfTransferBuffer')):
+            names = []
+            session = service(sinks=[])
+            try:
+                session.add_hook('dispatch', lambda stage, name, handler: names.append(name))
+                queue_pdu(session, make_transfer_buffer(pdu_cls, name, [frame],
+                                                        quality=service is ait.dsn.sle.RAF))
+                self.assertTrue(wait_for(lambda: session._frames_received == 1))
+            finally:
+                session.disconnect()
+
+            self.assertEqual(names, [name[:1].upper() + name[1:], 'AnnotatedFrame'])
+
+
+class StageTimerTest(unittest.TestCase):
+
+    def test_raf_stages_timed(self):
+        """A stage timer records durations of every stage of a RAF session"""
+        sim = simulator.ProviderSimulator('raf', frame_len=200, frame_rate=1000)
+        sim.start()
+        raf = ait.dsn.sle.RAF(sinks=[])
+        raf._hostnames = ['127.0.0.1']
+        raf._port = sim.port
+        raf._inst_id = INST_ID
+
+        timer = hooks.StageTimer()
+        added = timer.attach(raf)
+        self.assertEqual([h.stage for h in added], list(hooks.STAGES))
+
+        try:
+            raf.connect()
+            raf.bind()
+            self.assertTrue(wait_for(lambda: raf._state == 'ready'))
+            raf.start(None, None)
+            self.assertTrue(wait_for(lambda: raf._frames_received >= 20))
+        finally:
+            raf.disconnect()
+            sim.stop()
+
+        stats = timer.stats()
+        self.assertIn(('framing', None), stats)
+        self.assertIn(('decode', 'RafTransferBuffer'), stats)
+        self.assertIn(('dispatch', 'AnnotatedFrame'), stats)
+        self.assertIn(('handler', 'AnnotatedFrame', '_transfer_data_invoc_handler'), stats)
+        self.assertGreaterEqual(stats[('decode', 'RafBindReturn')]['max'], 0)
+
+    def test_attach_limited_to_names(self):
+        """A timer limited to PDU names is only added to the named stages"""
+        sle = MockSLE()
+        sle._conn_monitor.kill()
+        sle.batches.append([])
+        try:
+            timer = hooks.StageTimer()
+            added = timer.attach(sle, names=['MockPdu'])
+            self.assertEqual([h.stage for h in added], list(hooks.NAMED_STAGES))
+
+            queue_pdu(sle, b'data')
+            gevent.sleep(0)
+        finally:
+            sle.disconnect()
+
+        self.assertEqual(sorted(timer.stats()), [
+            ('dispatch', 'MockPdu'), ('handler', 'MockPdu', '_mock_handler')])
@@ -0,0 +1,103 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+import datetime as dt
+import time
+import unittest
+
+import ait.dsn.sle
+from ait.dsn.sle import latency, simulator, timecode
+from ait.dsn.sle.test.common_test import wait_for
+
+INST_ID = 'sagr=1.spack=2.rsl-fg=3.raf=onlt1'
+
+
+class MockFrame(object):
+    def __init__(self, spacecraft_id, virtual_channel_id):
+        self.spacecraft_id = spacecraft_id
+        self.virtual_channel_id = virtual_channel_id
+
+
+def ert_ago(seconds):
+    ''' Return an encoded earth receive time the given seconds ago '''
+    return timecode.encode(dt.datetime.utcnow() - dt.timedelta(seconds=seconds))
+
+
+class LatencyTrackerTest(unittest.TestCase):
+
+    def test_session_and_channel_latencies(self):
+        """Delivery and emission latencies are kept per session and channel"""
+        tracker = latency.LatencyTracker()
+        tracker.update(MockFrame(250, 0), ert_ago(2), time.time() - 1)
+        tracker.update(MockFrame(250, 1), ert_ago(4), None)
+
+        stats = tracker.stats()
+        self.assertEqual(sorted(stats['virtual_channels']), [(250, 0), (250, 1)])
+
+        vc0 = stats['virtual_channels'][(250, 0)]
+        self.assertAlmostEqual(vc0['delivery']['max'], 1, places=1)
+        self.assertAlmostEqual(vc0['emission']['max'], 2, places=1)
+        self.assertEqual(stats['virtual_channels'][(250, 1)]['delivery'], {})
+
+        self.assertAlmostEqual(stats['emission']['max'], 4, places=1)
+        self.assertAlmostEqual(stats['emission']['mean'], 3, places=1)
+
+    def test_window(self):
+        """Only the most recent latencies are kept"""
+        tracker = latency.LatencyTracker(window=2)
+        for seconds in (10, 1, 1):
+            tracker.update(MockFrame(250, 0), ert_ago(seconds))
+        self.assertLess(tracker.stats()['emission']['max'], 5)
+
+        tracker.reset()
+        self.assertEqual(tracker.stats(), {'delivery': {}, 'emission': {}, 'virtual_channels': {}})
+
+
+class SessionLatencyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.sim = simulator.ProviderSimulator('raf', frame_len=200, frame_rate=1000)
+        self.sim.start()
+        self.raf = None
+
+    def tearDown(self):
+        if self.raf is not None:
+            self.raf.disconnect()
+        self.sim.stop()
+
+    def receive(self, **kwargs):
+        self.raf = ait.dsn.sle.RAF(sinks=[], **kwargs)
+        self.raf._hostnames = ['127.0.0.1']
+        self.raf._port = self.sim.port
+        self.raf._inst_id = INST_ID
+        self.raf.connect()
+        self.raf.bind()
+        self.assertTrue(wait_for(lambda: self.raf._state == 'ready'))
+        self.raf.start(None, None)
+        self.assertTrue(wait_for(lambda: self.raf._frames_received >= 50))
+
+    def test_raf_latencies(self):
+        """Frames are delivered and emitted shortly after their ERT"""
+        self.receive()
+        stats = self.raf.latency_stats()
+        vc = stats['virtual_channels'][(250, 0)]
+
+        self.assertLess(stats['delivery']['max'], 1)
+        self.assertGreaterEqual(vc['emission']['p50'], vc['delivery']['p50'])
+        self.assertGreaterEqual(vc['emission']['max'], vc['delivery']['max'])
+
+    def test_disabled(self):
+        """No latencies are measured with a window of 0"""
+        self.receive(latency_window=0)
+        self.assertEqual(self.raf.latency_stats(), {})
@@ -0,0 +1,201 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+import unittest
+
+import gevent
+import pyasn1.error
+
+import ait.dsn.sle
+from ait.dsn.sle import metrics, simulator, sink, tml
+from ait.dsn.sle.pdu.raf import RafProvidertoUserPdu
+from ait.dsn.sle.test.ber_test import make_transfer_buffer
+from ait.dsn.sle.test.common_test import MockSLE, make_pdu, queue_pdu, wait_for
+from ait.dsn.sle.test.frames_test import make_space_packet, make_tm_frame
+
+INST_ID = 'sagr=1.spack=2.rsl-fg=3.raf=onlt1'
+
+
+class FailingSLE(MockSLE):
+    ''' MockSLE that is unable to decode PDUs with a body of b'bad' '''
+    def decode(self, message):
+        if message == b'bad':
+            raise pyasn1.error.PyAsn1Error('bad PDU')
+        return super(FailingSLE, self).decode(message)
+
+
+class StatusValuesTest(unittest.TestCase):
+
+    def test_status_report(self):
+        """Named values are converted to names and counts to ints"""
+        pdu = RafProvidertoUserPdu()['rafStatusReportInvocation']
+        pdu['invokerCredentials']['unused'] = None
+        pdu['errorFreeFrameNumber'] = 90
+        pdu['deliveredFrameNumber'] = 100
+        pdu['frameSyncLockStatus'] = 0
+        pdu['symbolSyncLockStatus'] = 1
+        pdu['subcarrierLockStatus'] = 2
+        pdu['carrierLockStatus'] = 0
+        pdu['productionStatus'] = 0
+
+        self.assertEqual(metrics.status_values(pdu), {
+            'errorFreeFrameNumber': 90,
+            'deliveredFrameNumber': 100,
+            'frameSyncLockStatus': 'inLock',
+            'symbolSyncLockStatus': 'outOfLock',
+            'subcarrierLockStatus': 'notInUse',
+            'carrierLockStatus': 'inLock',
+            'productionStatus': 'running',
+        })
+
+
+class SessionMetricsTest(unittest.TestCase):
+
+    def test_framer_counts_kept_across_framers(self):
+        """Counts of replaced framers are added to the current framer's"""
+        stats = metrics.SessionMetrics()
+        framer = tml.TMLFramer(64)
+        framer.feed(make_pdu(b'abc'))
+        list(framer)
+        stats.add_framer(framer)
+
+        framer = tml.TMLFramer(64)
+        framer.feed(make_pdu(b'de'))
+        list(framer)
+
+        snapshot = stats.stats(framer)
+        self.assertEqual(snapshot['bytes_received'], 21)
+        self.assertEqual(snapshot['pdus_received'], 2)
+        self.assertEqual(stats.stats()['pdus_received'], 1)
+
+
+class SessionStatsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.sle = FailingSLE()
+        self.sle._conn_monitor.kill()
+        self.sle.batches.append([])
+
+    def tearDown(self):
+        self.sle.disconnect()
+
+    def test_processed_pdus_counted(self):
+        """Handled PDUs, decode failures and the queue depth are reported"""
+        for body in (b'one', b'bad', b'two'):
+            queue_pdu(self.sle, body)
+        self.assertEqual(self.sle.stats()['queue_depth'], 3)
+
+        gevent.sleep(0)
+        stats = self.sle.stats()
+        self.assertEqual(self.sle.batches, [[b'one', b'two']])
+        self.assertEqual(stats['pdus_handled'], 2)
+        self.assertEqual(stats['decode_failures'], 1)
+        self.assertEqual(stats['queue_depth'], 0)
+        self.assertGreaterEqual(stats['handler_time'], 0)
+        self.assertEqual(stats['state'], 'unbound')
+
+    def test_periodic_snapshots(self):
+        """Snapshots are passed to the metrics handler every interval"""
+        snapshots = []
+        sle = MockSLE(metrics_interval=0.01, metrics_handler=snapshots.append)
+        try:
+            self.assertTrue(wait_for(lambda: len(snapshots) >= 2))
+            self.assertLess(snapshots[0]['time'], snapshots[1]['time'])
+        finally:
+            sle.disconnect()
+        self.assertTrue(sle._metrics_reporter.dead)
+
+    def test_undecodable_frames_skipped(self):
+        """Frames too short to decode are counted and later frames processed"""
+        batches = []
+        raf = ait.dsn.sle.RAF(hostnames=['127.0.0.1'], port=5100,
+                              sinks=[sink.CallbackSink(batches.append)])
+        try:
+            frame = make_tm_frame(make_space_packet(1, b'data'))
+            for frames in ([b'\x00\x01\x02', frame], [frame]):
+                queue_pdu(raf, make_transfer_buffer(
+                    RafProvidertoUserPdu, 'rafTransferBuffer', frames))
+
+            self.assertTrue(wait_for(lambda: raf._frames_received == 2))
+            raf._sinks[0].flush(1)
+            stats = raf.stats()
+            self.assertEqual(stats['decode_failures'], 1)
+            self.assertEqual(stats['transfer_buffers'], 2)
+            self.assertEqual(sum(len(b) for b in batches), 2)
+            self.assertFalse(raf._data_processor.dead)
+        finally:
+            raf.disconnect()
+
+
+class SimulatedSessionStatsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.sim = None
+        self.session = None
+
+    def tearDown(self):
+        if self.session is not None:
+            self.session.disconnect()
+        if self.sim is not None:
+            self.sim.stop()
+
+    def connect(self, cls, service, **kwargs):
+        self.sim = simulator.ProviderSimulator(service, **kwargs)
+        self.sim.start()
+        self.session = cls(sinks=[])
+        self.session._hostnames = ['127.0.0.1']
+        self.session._port = self.sim.port
+        self.session._inst_id = INST_ID
+        self.session.connect()
+        self.session.bind()
+        self.assertTrue(wait_for(lambda: self.session._state == 'ready'))
+        return self.session
+
+    def test_raf_stats(self):
+        """Received bytes, transfer buffers, frames and reports are counted"""
+        raf = self.connect(ait.dsn.sle.RAF, 'raf', frame_len=200,
+                           frame_rate=1000, buffer_size=10)
+        raf.start(None, None)
+        self.assertTrue(wait_for(lambda: raf._frames_received >= 50))
+        raf.schedule_status_report()
+        self.assertTrue(wait_for(lambda: raf.stats()['status_report']))
+
+        raf.stop()
+        self.assertTrue(wait_for(lambda: raf._state == 'ready'))
+        sent = self.sim.frames_sent
+        self.assertTrue(wait_for(lambda: raf._frames_received == sent))
+
+        stats = raf.stats()
+        self.assertEqual(stats['frames_decoded'], sent)
+        self.assertEqual(stats['transfer_buffers'], self.sim.buffers_sent)
+        self.assertGreater(stats['bytes_received'], sent * 200)
+        self.assertGreaterEqual(stats['queue_high_water'], 1)
+        self.assertIn('deliveredFrameNumber', stats['status_report'])
+
+    def test_cltu_stats(self):
+        """Sent, acknowledged and radiated CLTUs are counted"""
+        cltu = self.connect(ait.dsn.sle.CLTU, 'cltu')
+        cltu.start()
+        self.assertTrue(wait_for(lambda: cltu._state == 'active'))
+
+        results = cltu.upload_cltus([b'\x01' * 10] * 5)
+        [r.get(timeout=5) for r in results]
+        self.sim.notify('cltuRadiated')
+        self.assertTrue(wait_for(lambda: cltu.stats()['cltus_radiated'] == 1))
+
+        stats = cltu.stats()
+        self.assertEqual(stats['cltus_sent'], 5)
+        self.assertEqual(stats['cltus_accepted'], 5)
+        self.assertEqual(stats['cltus_outstanding'], 0)
+        self.assertEqual(stats['cltus_pending'], 0)
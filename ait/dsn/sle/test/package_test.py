@@ -0,0 +1,41 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+import subprocess
+import sys
+import unittest
+
+import ait.dsn.sle
+
+
+class LazyImportTest(unittest.TestCase):
+
+    def test_import_is_side_effect_free(self):
+        """Importing ait.dsn.sle loads neither gevent nor PDU specs"""
+        output = subprocess.check_output([sys.executable, '-c', (
+            'import sys; import ait.dsn.sle; '
+            'print(sorted(m for m in sys.modules '
+            'if m.startswith(("gevent", "pyasn1", "ait.dsn.sle.")) and sys.modules[m]))'
+        )])
+        self.assertEqual(output.decode().strip().splitlines()[-1], '[]')
+
+    def test_session_classes_load_on_access(self):
+        """Session classes are imported from their modules on first access"""
+        from ait.dsn.sle import raf, manager
+        self.assertIs(ait.dsn.sle.RAF, raf.RAF)
+        self.assertIs(ait.dsn.sle.SessionManager, manager.SessionManager)
+        self.assertIn('CLTU', dir(ait.dsn.sle))
+
+        with self.assertRaises(AttributeError):
+            ait.dsn.sle.NotAService
@@ -0,0 +1,204 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+import unittest
+
+import ait.dsn.sle
+from ait.dsn.sle import ber, frames, packets, sink
+from ait.dsn.sle.test.frames_test import (make_aos_frame, make_space_packet, make_tm_frame,
+                                           make_uslp_frame)
+
+
+def make_frames(pkts, data_len, vcid=0, first_count=0):
+    ''' Pack packets into the data fields of consecutive TM frames
+
+    The stream is padded with idle packets to fill the last frame.
+    '''
+    pkts = list(pkts)
+    while sum(len(p) for p in pkts) % data_len:
+        remaining = data_len - sum(len(p) for p in pkts) % data_len
+        if remaining < 7:
+            remaining += data_len
+        pkts.append(make_space_packet(packets.IDLE_APID, b'\x00' * (remaining - 6)))
+
+    starts = []
+    offset = 0
+    for p in pkts:
+        starts.append(offset)
+        offset += len(p)
+    stream = b''.join(pkts)
+
+    result = []
+    for i, start in enumerate(range(0, len(stream), data_len)):
+        in_frame = [s - start for s in starts if start <= s < start + data_len]
+        fhp = in_frame[0] if in_frame else frames.TM_FHP_NO_PACKET
+        result.append(make_tm_frame(stream[start:start + data_len], vcid=vcid,
+                                    vc_count=(first_count + i) % 256, fhp=fhp))
+    return result
+
+
+class PacketExtractorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.extractor = packets.PacketExtractor()
+        self.packets = [make_space_packet(100 + i, bytes(bytearray([i])) * (30 + 45 * i))
+                        for i in range(6)]
+
+    def extract_all(self, tm_frames):
+        result = []
+        for data in tm_frames:
+            result.extend(p.tobytes() for p in self.extractor.extract(frames.TMTransFrame(data)))
+        return result
+
+    def test_packets_within_frame(self):
+        """Packets contained in a frame are returned in order"""
+        tm_frames = make_frames(self.packets[:2], 200)
+        self.assertEqual(len(tm_frames), 1)
+        self.assertEqual(self.extract_all(tm_frames), self.packets[:2])
+
+    def test_packets_across_frames(self):
+        """Packets spanning several frames are stitched together"""
+        tm_frames = make_frames(self.packets, 64)
+        self.assertEqual(self.extract_all(tm_frames), self.packets)
+        self.assertEqual(self.extractor.packets, len(self.packets))
+        self.assertEqual(self.extractor.packets_discarded, 0)
+
+    def test_header_split_across_frames(self):
+        """A packet header split between frames is reassembled"""
+        tm_frames = make_frames([make_space_packet(1, b'a' * 17)] + self.packets[:2], 20)
+        self.assertEqual(self.extract_all(tm_frames),
+                         [make_space_packet(1, b'a' * 17)] + self.packets[:2])
+
+    def test_frame_loss_resyncs(self):
+        """A frame count gap discards the partial packet and resumes at the first header pointer"""
+        tm_frames = make_frames(self.packets, 64)
+        # Packet 2 starts in frame 1 and ends in frame 3, packet 3 starts in frame 3
+        del tm_frames[2]
+
+        result = self.extract_all(tm_frames)
+        self.assertEqual(result, self.packets[:2] + self.packets[3:])
+        self.assertEqual(self.extractor.frames_lost, 1)
+        self.assertEqual(self.extractor.packets_discarded, 1)
+
+    def test_frame_count_wraps(self):
+        """The virtual channel frame count wraps at 256"""
+        tm_frames = make_frames(self.packets, 64, first_count=250)
+        self.assertEqual(self.extract_all(tm_frames), self.packets)
+        self.assertEqual(self.extractor.frames_lost, 0)
+
+    def test_virtual_channels_independent(self):
+        """Interleaved virtual channels are reassembled separately"""
+        vc1 = make_frames(self.packets[:3], 64, vcid=1)
+        vc2 = make_frames(self.packets[3:], 64, vcid=2)
+        interleaved = []
+        for i in range(max(len(vc1), len(vc2))):
+            interleaved.extend(vc1[i:i + 1] + vc2[i:i + 1])
+
+        result = self.extract_all(interleaved)
+        self.assertEqual([p for p in result if p in self.packets[:3]], self.packets[:3])
+        self.assertEqual([p for p in result if p in self.packets[3:]], self.packets[3:])
+
+    def test_idle_packets_and_frames(self):
+        """Idle packets are dropped unless requested and idle frames are skipped"""
+        tm_frames = make_frames(self.packets[:1], 100)
+        self.assertEqual(self.extract_all(tm_frames), self.packets[:1])
+        self.assertEqual(self.extractor.idle_packets, 1)
+
+        keep_idle = packets.PacketExtractor(drop_idle=False)
+        self.assertEqual(len(keep_idle.extract(frames.TMTransFrame(tm_frames[0]))), 2)
+
+        idle = make_tm_frame(b'\x55' * 64, fhp=frames.TM_FHP_IDLE)
+        self.assertEqual(self.extractor.extract(frames.TMTransFrame(idle)), [])
+
+    def test_copy_stitched(self):
+        """Stitched packets are copied out of the reassembly buffer when requested"""
+        extractor = packets.PacketExtractor(copy_stitched=True)
+        tm_frames = make_frames(self.packets[2:4], 64)
+
+        result = []
+        for data in tm_frames:
+            result.extend(extractor.extract(frames.TMTransFrame(data)))
+        self.assertEqual([p.tobytes() for p in result], self.packets[2:4])
+
+    def test_aos_frames(self):
+        """Packets are reassembled from AOS M_PDUs with 24 bit frame counts"""
+        aos_frames = [
+            make_aos_frame(memoryview(frame)[6:].tobytes(), vc_count=(2 ** 24 - 2 + i) % 2 ** 24,
+                           pointer=frames.TMTransFrame(frame).first_hdr_ptr)
+            for i, frame in enumerate(make_frames(self.packets, 64))
+        ]
+
+        result = []
+        for data in aos_frames:
+            result.extend(p.tobytes() for p in self.extractor.extract(frames.AOSTransFrame(data)))
+        self.assertEqual(result, self.packets)
+        self.assertEqual(self.extractor.frames_lost, 0)
+
+    def test_uslp_maps(self):
+        """Packets of each MAP of a USLP virtual channel are reassembled separately"""
+        uslp_frames = []
+        for map_id, pkts in ((1, self.packets[:3]), (2, self.packets[3:])):
+            uslp_frames.append([
+                (memoryview(frame)[6:].tobytes(), frames.TMTransFrame(frame).first_hdr_ptr, map_id)
+                for frame in make_frames(pkts, 64)
+            ])
+
+        interleaved = []
+        for i in range(max(len(f) for f in uslp_frames)):
+            for map_frames in uslp_frames:
+                interleaved.extend(map_frames[i:i + 1])
+
+        result = []
+        for count, (tfdz, fhp, map_id) in enumerate(interleaved):
+            fhp = frames.USLP_POINTER_NONE if fhp == frames.TM_FHP_NO_PACKET else fhp
+            data = make_uslp_frame(tfdz, map_id=map_id, vc_count=count, count_len=1, pointer=fhp)
+            result.extend(p.tobytes() for p in self.extractor.extract(frames.USLPTransFrame(data)))
+
+        self.assertEqual([p for p in result if p in self.packets[:3]], self.packets[:3])
+        self.assertEqual([p for p in result if p in self.packets[3:]], self.packets[3:])
+        self.assertEqual(self.extractor.frames_lost, 0)
+
+
+class RafPacketTest(unittest.TestCase):
+
+    def test_packets_emitted_to_sinks(self):
+        """RAF sends the data field of every complete packet to its sinks"""
+        batches = []
+        raf = ait.dsn.sle.RAF(hostnames=['localhost'], port=5100,
+                              sinks=[sink.CallbackSink(batches.append)])
+        raf._conn_monitor.kill()
+        raf._data_processor.kill()
+
+        pkts = [make_space_packet(5, b'x' * 50), make_space_packet(6, b'y' * 90)]
+        for data in make_frames(pkts, 64):
+            raf._transfer_data_invoc_handler(ber.FrameRecord(b'\x00' * 8, 0, 1, None, data))
+        raf._sinks[0].close()
+
+        self.assertEqual([bytes(bytearray(p)) for b in batches for p in b], [b'x' * 50, b'y' * 90])
+
+    def test_bitstream_emitted_to_sinks(self):
+        """RAF sends the valid bitstream data of AOS B_PDUs to its sinks"""
+        batches = []
+        raf = ait.dsn.sle.RAF(hostnames=['localhost'], port=5100,
+                              sinks=[sink.CallbackSink(batches.append)])
+        raf._conn_monitor.kill()
+        raf._data_processor.kill()
+        raf._frame_decoder = frames.AOSTransFrame(data_unit=frames.AOS_BPDU)
+
+        for pointer in (19, frames.AOS_BPDU_IDLE):
+            data = make_aos_frame(b'bitstream', pointer=pointer)
+            raf._transfer_data_invoc_handler(ber.FrameRecord(b'\x00' * 8, 0, 1, None, data))
+        raf._sinks[0].close()
+
+        self.assertEqual([bytes(bytearray(p)) for b in batches for p in b], [b'bit'])
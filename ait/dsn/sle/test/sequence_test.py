@@ -0,0 +1,137 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+import unittest
+
+import ait.dsn.sle
+from ait.dsn.sle import ber, frames, sequence, sink
+from ait.dsn.sle.test.frames_test import make_aos_frame, make_tm_frame, make_uslp_frame
+
+
+def tm_frames(counts, vcid=3, mc_counts=None):
+    if mc_counts is None:
+        mc_counts = counts
+    return [frames.TMTransFrame(make_tm_frame(b'\x00' * 10, vcid=vcid, mc_count=mc, vc_count=vc))
+            for mc, vc in zip(mc_counts, counts)]
+
+
+class FrameCountTrackerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tracker = sequence.FrameCountTracker(max_gaps=2)
+
+    def track(self, tracked):
+        return [self.tracker.update(frame) for frame in tracked]
+
+    def vc_stats(self, key=(250, 3)):
+        return self.tracker.stats()['virtual_channels'][key]
+
+    def test_in_order_with_wrap(self):
+        """Consecutive counts that wrap at 256 are neither gaps nor reorders"""
+        self.track(tm_frames([254, 255, 0, 1]))
+
+        stats = self.vc_stats()
+        self.assertEqual(stats['frames'], 4)
+        self.assertEqual(stats['last_count'], 1)
+        self.assertEqual((stats['gaps'], stats['duplicates'], stats['reorders']), (0, 0, 0))
+        self.assertEqual(self.tracker.stats()['master_channels'][250]['gaps'], 0)
+
+    def test_gaps(self):
+        """Skipped counts are counted as lost and the recent gaps are kept"""
+        lost = self.track(tm_frames([250, 253, 2, 3, 10, 20]))
+
+        self.assertEqual(lost, [0, 2, 4, 0, 6, 9])
+        stats = self.vc_stats()
+        self.assertEqual(stats['gaps'], 4)
+        self.assertEqual(stats['frames_lost'], 21)
+        self.assertEqual([g[:2] for g in stats['recent_gaps']], [(4, 6), (11, 9)])
+
+    def test_duplicates_and_reorders(self):
+        """Repeated counts are duplicates and late counts are reorders"""
+        self.track(tm_frames([1, 2, 2, 4, 3, 5]))
+
+        stats = self.vc_stats()
+        self.assertEqual(stats['duplicates'], 1)
+        self.assertEqual(stats['reorders'], 1)
+        self.assertEqual(stats['gaps'], 1)
+        self.assertEqual(stats['last_count'], 5)
+
+    def test_long_outages(self):
+        """Jumps beyond the reorder window are gaps and running late counts resync"""
+        lost = self.track(tm_frames([10, 210, 211]))
+        self.assertEqual(lost, [0, 199, 0])
+
+        stats = self.vc_stats()
+        self.assertEqual((stats['gaps'], stats['frames_lost'], stats['reorders']), (1, 199, 0))
+        self.assertEqual(stats['last_count'], 211)
+
+        lost = self.track(tm_frames([205, 206, 207, 208, 209]))
+        self.assertEqual(lost, [0, 0, 0, 249, 0])
+
+        stats = self.vc_stats()
+        self.assertEqual((stats['gaps'], stats['frames_lost'], stats['reorders']), (2, 448, 0))
+        self.assertEqual(stats['last_count'], 209)
+
+    def test_channels_tracked_separately(self):
+        """Master and virtual channel counts are tracked independently"""
+        vc1 = tm_frames([0, 1, 2], vcid=1, mc_counts=[0, 2, 4])
+        vc2 = tm_frames([7, 8, 9], vcid=2, mc_counts=[1, 3, 5])
+        self.track([frame for pair in zip(vc1, vc2) for frame in pair])
+
+        stats = self.tracker.stats()
+        self.assertEqual(stats['master_channels'][250]['gaps'], 0)
+        self.assertEqual(stats['virtual_channels'][(250, 1)]['gaps'], 0)
+        self.assertEqual(stats['virtual_channels'][(250, 2)]['gaps'], 0)
+
+    def test_aos_and_uslp_counters(self):
+        """AOS counts wrap at 2 ** 24 and USLP frames without a count are skipped"""
+        for count in (2 ** 24 - 1, 0, 5):
+            self.tracker.update(frames.AOSTransFrame(make_aos_frame(b'\x00' * 10, vc_count=count)))
+        for i in range(3):
+            self.tracker.update(frames.USLPTransFrame(make_uslp_frame(b'\x00' * 10, count_len=0)))
+
+        stats = self.tracker.stats()
+        self.assertEqual(stats['virtual_channels'][(171, 5)]['frames_lost'], 4)
+        self.assertNotIn((0xABCD, 9), stats['virtual_channels'])
+        self.assertEqual(stats['master_channels'], {})
+
+    def test_report(self):
+        """The report summarizes each channel"""
+        self.track(tm_frames([1, 3]))
+        self.assertEqual(self.tracker.report().split('\n'), [
+            'Master Channel 250: 2 frames, 1 gaps, 1 lost, 0 duplicates, 0 reordered',
+            'Virtual Channel 250/3: 2 frames, 1 gaps, 1 lost, 0 duplicates, 0 reordered',
+        ])
+
+        self.tracker.reset()
+        self.assertEqual(self.tracker.report(), '')
+
+
+class RafFrameCountTest(unittest.TestCase):
+
+    def test_status_report(self):
+        """RAF tracks frame counts and includes them in status reports"""
+        raf = ait.dsn.sle.RAF(hostnames=['localhost'], port=5100,
+                              sinks=[sink.CallbackSink(lambda batch: None)])
+        raf._conn_monitor.kill()
+        raf._data_processor.kill()
+
+        for count in (5, 6, 9):
+            data = make_tm_frame(b'\x00' * 10, mc_count=count, vc_count=count, fhp=frames.TM_FHP_IDLE)
+            raf._transfer_data_invoc_handler(ber.FrameRecord(b'\x00' * 8, 0, 1, None, data))
+        raf._sinks[0].close()
+
+        self.assertEqual(raf.frame_count_stats()['virtual_channels'][(250, 3)]['frames_lost'], 2)
+        report = raf._status_report({'errorFreeFrameNumber': 3, 'deliveredFrameNumber': 3})
+        self.assertIn('Virtual Channel 250/3: 3 frames, 1 gaps, 2 lost', report)
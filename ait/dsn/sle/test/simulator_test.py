@@ -0,0 +1,203 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+import struct
+import unittest
+
+import ait.dsn.sle
+from ait.dsn.sle import ber, frames, simulator, sink
+from ait.dsn.sle.pdu.raf import RafProvidertoUserPdu
+from ait.dsn.sle.pdu.rcf import RcfProvidertoUserPdu
+from ait.dsn.sle.test.ber_test import make_transfer_buffer
+from ait.dsn.sle.test.common_test import wait_for
+
+INST_ID = 'sagr=1.spack=2.rsl-fg=3.raf=onlt1'
+
+
+def frames_lost(session):
+    ''' Return the frames lost on the simulator's virtual channel '''
+    channels = session.frame_count_stats()['virtual_channels']
+    return channels.get((250, 0), {}).get('frames_lost')
+
+
+class EncodeTransferBufferTest(unittest.TestCase):
+
+    def setUp(self):
+        self.ert = struct.pack('>HIH', 22000, 1000, 5)
+        self.data = [b'\x01' * 100, b'\x02' * 300]
+
+    def test_matches_pyasn1_encoding(self):
+        """RAF and RCF transfer buffers match PyASN1's encoding"""
+        self.assertEqual(
+            simulator.encode_transfer_buffer(self.data, self.ert),
+            make_transfer_buffer(RafProvidertoUserPdu, 'rafTransferBuffer', self.data,
+                                 ert=self.ert, antenna=b'SIM', varied=False)
+        )
+        self.assertEqual(
+            simulator.encode_transfer_buffer(self.data, self.ert, has_quality=False),
+            make_transfer_buffer(RcfProvidertoUserPdu, 'rcfTransferBuffer', self.data,
+                                 quality=False, ert=self.ert, antenna=b'SIM', varied=False)
+        )
+
+    def test_scanned_by_fast_path(self):
+        """Transfer buffers are decoded by the BER scanner"""
+        msg = simulator.encode_transfer_buffer(self.data, self.ert)
+        records, remainder = ber.decode_transfer_buffer(msg, 'rafTransferBuffer')
+        self.assertEqual([r.data.tobytes() for r in records], self.data)
+        self.assertEqual(records[0].earth_receive_time, self.ert)
+
+
+class FrameGeneratorTest(unittest.TestCase):
+
+    def test_tm_frames(self):
+        """TM frames carry one packet and count up across skips"""
+        gen = simulator.FrameGenerator('TMTransFrame', 200, spacecraft_id=250,
+                                       virtual_channel_id=3, apid=42)
+        first = frames.TMTransFrame(gen.frame())
+        gen.skip(2)
+        second = frames.TMTransFrame(gen.frame())
+
+        self.assertEqual((first.spacecraft_id, first.virtual_channel_id), (250, 3))
+        self.assertEqual([f.virtual_chan_frame_count for f in (first, second)], [0, 3])
+        packets = [bytes(bytearray(p)) for p in second.packets]
+        self.assertEqual(len(packets), 1)
+        self.assertEqual(len(packets[0]), 194)
+        self.assertEqual(struct.unpack('>HH', packets[0][:4]), (42, 0xC003))
+        self.assertEqual((gen.frames_generated, gen.frames_skipped), (2, 2))
+
+    def test_aos_frames(self):
+        """AOS frames carry an M_PDU with a 24 bit frame count"""
+        gen = simulator.FrameGenerator('AOSTransFrame', 200, spacecraft_id=171,
+                                       virtual_channel_id=5)
+        gen.skip(0x1000000 - 1)
+        last, wrapped = [frames.AOSTransFrame(f) for f in gen.frames(2)]
+
+        self.assertEqual((last.spacecraft_id, last.virtual_channel_id), (171, 5))
+        self.assertEqual(last.virtual_chan_frame_count, 0xFFFFFF)
+        self.assertEqual(wrapped.virtual_chan_frame_count, 0)
+        self.assertEqual([len(bytes(bytearray(p))) for p in wrapped.packets], [192])
+
+    def test_invalid_configuration(self):
+        """Unsupported frame types and short frames are refused"""
+        with self.assertRaises(ValueError):
+            simulator.FrameGenerator('USLPTransFrame')
+        with self.assertRaises(ValueError):
+            simulator.FrameGenerator('TMTransFrame', 12)
+        with self.assertRaises(ValueError):
+            simulator.ProviderSimulator('fcltu')
+
+
+class ProviderSimulatorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.sim = None
+        self.sessions = []
+
+    def tearDown(self):
+        for session in self.sessions:
+            session.disconnect()
+        if self.sim is not None:
+            self.sim.stop()
+
+    def serve(self, service, **kwargs):
+        self.sim = simulator.ProviderSimulator(service, **kwargs)
+        self.sim.start()
+        return self.sim
+
+    def connect(self, cls, **kwargs):
+        session = cls(hostnames=['127.0.0.1'], port=self.sim.port, **kwargs)
+        self.sessions.append(session)
+        session._hostnames = ['127.0.0.1']
+        session._port = self.sim.port
+        session._inst_id = INST_ID
+        session.connect()
+        session.bind()
+        self.assertTrue(wait_for(lambda: session._state == 'ready'))
+        return session
+
+    def test_raf_session(self):
+        """A RAF session binds, receives frames, stops and unbinds"""
+        sim = self.serve('raf', frame_len=200, frame_rate=1000, buffer_size=10)
+        batches = []
+        raf = self.connect(ait.dsn.sle.RAF, sinks=[sink.CallbackSink(batches.append)])
+
+        raf.start(None, None)
+        self.assertTrue(wait_for(lambda: raf._state == 'active'))
+        self.assertTrue(wait_for(lambda: raf._frames_received >= 50))
+
+        raf.schedule_status_report()
+        self.assertTrue(wait_for(
+            lambda: sim.invocations.get('rafScheduleStatusReportInvocation') == 1
+        ))
+
+        raf.stop()
+        self.assertTrue(wait_for(lambda: raf._state == 'ready'))
+        sent = sim.frames_sent
+        self.assertTrue(wait_for(lambda: raf._frames_received == sent))
+        raf._sinks[0].flush(1)
+        self.assertEqual(sum(len(b) for b in batches), sent)
+        self.assertEqual(frames_lost(raf), 0)
+
+        raf.unbind()
+        self.assertTrue(wait_for(lambda: raf._state == 'unbound'))
+        self.assertEqual(sim.buffers_sent * 10, sent)
+
+    def test_injected_events(self):
+        """Notifications, backlogs, gaps and aborts reach the session"""
+        sim = self.serve('raf', frame_len=200, frame_rate=100, buffer_size=5)
+        raf = self.connect(ait.dsn.sle.RAF)
+        notifications = []
+        raf.add_handler('SyncNotification', notifications.append)
+
+        raf.start(None, None)
+        self.assertTrue(wait_for(lambda: raf._frames_received >= 5))
+
+        sim.notify('lossFrameSync')
+        sim.backlog(500)
+        self.assertTrue(wait_for(lambda: raf._frames_received >= 500))
+        self.assertEqual([n.getComponent()['notification'].getName() for n in notifications],
+                         ['lossFrameSync', 'excessiveDataBacklog'])
+
+        sim.skip(7)
+        self.assertTrue(wait_for(lambda: frames_lost(raf) == 7))
+
+        with self.assertRaises(ValueError):
+            sim.notify('bufferEmpty')
+
+        sim.abort()
+        self.assertTrue(wait_for(lambda: raf._state == 'unbound'))
+        self.assertEqual(sim.aborts_sent, 1)
+        self.assertTrue(wait_for(lambda: sim.connections == 0))
+
+    def test_cltu_session(self):
+        """CLTU transfer data invocations are acknowledged"""
+        sim = self.serve('cltu', cltu_buffer=50000)
+        cltu = self.connect(ait.dsn.sle.CLTU)
+        cltu.start()
+        self.assertTrue(wait_for(lambda: cltu._state == 'active'))
+
+        results = cltu.upload_cltus([b'\x01' * 10] * 20)
+        self.assertEqual([r.get(timeout=5) for r in results], list(range(20)))
+        self.assertEqual(sim.cltus_received, 20)
+
+        cltu.schedule_status_report()
+        self.assertTrue(wait_for(
+            lambda: sim.invocations.get('cltuScheduleStatusReportInvocation') == 1
+        ))
+        sim.notify('bufferEmpty')
+        self.assertEqual(sim.notifications_sent, 1)
+
+        # The session is still processing PDUs after the report and notification
+        sim.abort('otherReason')
+        self.assertTrue(wait_for(lambda: cltu._state == 'unbound'))
@@ -0,0 +1,247 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+import os
+import socket
+import tempfile
+import unittest
+
+import gevent
+import gevent.event
+import gevent.server
+import gevent.socket
+
+import ait.dsn.sle
+from ait.dsn.sle import ber, sink
+
+
+class CallbackSinkTest(unittest.TestCase):
+
+    def setUp(self):
+        self.batches = []
+
+    def test_frames_written_in_batches(self):
+        """Queued frames are passed to the callback in batches of max_batch"""
+        frame_sink = sink.CallbackSink(self.batches.append, max_batch=4)
+        for i in range(10):
+            frame_sink.put(str(i).encode())
+
+        self.assertTrue(frame_sink.flush(1))
+        self.assertEqual([len(b) for b in self.batches], [4, 4, 2])
+        self.assertEqual(frame_sink.frames_sent, 10)
+        self.assertEqual(frame_sink.batches_sent, 3)
+        frame_sink.close()
+
+    def test_drop_policy(self):
+        """Frames are dropped and counted while the buffer is full"""
+        frame_sink = sink.CallbackSink(self.batches.append, max_queued=2)
+        results = [frame_sink.put(b'x') for i in range(3)]
+
+        self.assertEqual(results, [True, True, False])
+        self.assertEqual(frame_sink.frames_dropped, 1)
+        frame_sink.close()
+        self.assertEqual(sum(len(b) for b in self.batches), 2)
+
+    def test_block_policy(self):
+        """Frames wait for buffer space with the block policy"""
+        frame_sink = sink.CallbackSink(self.batches.append, max_queued=2, policy='block')
+        for i in range(5):
+            self.assertTrue(frame_sink.put(b'x'))
+
+        frame_sink.close()
+        self.assertEqual(sum(len(b) for b in self.batches), 5)
+        self.assertEqual(frame_sink.frames_dropped, 0)
+
+    def test_failed_write_counted(self):
+        """A batch that cannot be written is counted as dropped"""
+        def fail(frames):
+            raise IOError('consumer gone')
+
+        frame_sink = sink.CallbackSink(fail)
+        frame_sink.put(b'x')
+        frame_sink.put(b'y')
+        frame_sink.close()
+
+        self.assertEqual(frame_sink.errors, 1)
+        self.assertEqual(frame_sink.frames_dropped, 2)
+
+
+class SocketSinkTest(unittest.TestCase):
+
+    def setUp(self):
+        self.frames = [bytes(bytearray([i]) * 100) for i in range(5)]
+
+    def test_udp_datagram_per_frame(self):
+        """Each frame is sent as its own datagram"""
+        receiver = gevent.socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        receiver.bind(('127.0.0.1', 0))
+        frame_sink = sink.UdpSink('127.0.0.1', receiver.getsockname()[1])
+
+        for frame in self.frames:
+            frame_sink.put(memoryview(frame))
+        frame_sink.flush(1)
+
+        received = [receiver.recv(1024) for frame in self.frames]
+        self.assertEqual(received, self.frames)
+        frame_sink.close()
+        receiver.close()
+
+    def test_udp_coalesce(self):
+        """Coalesced frames are packed into datagrams of max_datagram bytes"""
+        receiver = gevent.socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        receiver.bind(('127.0.0.1', 0))
+        frame_sink = sink.UdpSink('127.0.0.1', receiver.getsockname()[1],
+                                  coalesce=True, max_datagram=250)
+
+        for frame in self.frames:
+            frame_sink.put(frame)
+        frame_sink.flush(1)
+
+        received = [receiver.recv(1024) for i in range(3)]
+        self.assertEqual([len(d) for d in received], [208, 208, 104])
+        split = [sink.split_frames(d) for d in received]
+        self.assertEqual([f.tobytes() for frames, rest in split for f in frames], self.frames)
+        self.assertEqual([len(rest) for frames, rest in split], [0, 0, 0])
+        frame_sink.close()
+        receiver.close()
+
+    def test_tcp_batched_write(self):
+        """Frames are written to the TCP connection in order"""
+        received = []
+        done = gevent.event.Event()
+
+        def handle(sock, address):
+            while True:
+                data = sock.recv(4096)
+                if not data:
+                    break
+                received.append(data)
+            done.set()
+
+        server = gevent.server.StreamServer(('127.0.0.1', 0), handle)
+        server.start()
+        frame_sink = sink.TcpSink('127.0.0.1', server.server_port)
+
+        for frame in self.frames:
+            frame_sink.put(frame)
+        frame_sink.close()
+
+        done.wait(1)
+        server.stop()
+        frames, rest = sink.split_frames(b''.join(received))
+        self.assertEqual([f.tobytes() for f in frames], self.frames)
+        self.assertEqual(len(rest), 0)
+
+    def test_tcp_unavailable_consumer(self):
+        """Frames are dropped while the TCP consumer is unavailable"""
+        listener = gevent.socket.socket()
+        listener.bind(('127.0.0.1', 0))
+        port = listener.getsockname()[1]
+        listener.close()
+
+        frame_sink = sink.TcpSink('127.0.0.1', port)
+        frame_sink.put(b'x')
+        frame_sink.close()
+
+        self.assertEqual(frame_sink.errors, 1)
+        self.assertEqual(frame_sink.frames_dropped, 1)
+
+
+class FileSinkTest(unittest.TestCase):
+
+    def test_frames_appended(self):
+        """Length prefixed frames are appended to the file"""
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+
+        for data in ([b'one'], [memoryview(b'three'), b'']):
+            frame_sink = sink.FileSink(path)
+            for frame in data:
+                frame_sink.put(frame)
+            frame_sink.close()
+
+        with open(path, 'rb') as f:
+            data = f.read()
+        os.remove(path)
+
+        self.assertEqual(data, b'\x00\x00\x00\x03one\x00\x00\x00\x05three\x00\x00\x00\x00')
+        frames, rest = sink.split_frames(data)
+        self.assertEqual([f.tobytes() for f in frames], [b'one', b'three', b''])
+        self.assertEqual(len(rest), 0)
+
+
+class SplitFramesTest(unittest.TestCase):
+
+    def test_incomplete_frame(self):
+        """Data of an incomplete frame is returned as the remainder"""
+        data = b'\x00\x00\x00\x02ab\x00\x00\x00\x04cd'
+        frames, rest = sink.split_frames(data)
+        self.assertEqual([f.tobytes() for f in frames], [b'ab'])
+        self.assertEqual(rest.tobytes(), data[6:])
+
+        frames, rest = sink.split_frames(data[:3])
+        self.assertEqual((frames, rest.tobytes()), ([], data[:3]))
+
+
+class MakeSinkTest(unittest.TestCase):
+
+    def test_make_sink(self):
+        """Sinks are created from configuration dictionaries"""
+        frame_sink = sink.make_sink({'type': 'udp', 'host': 'localhost',
+                                     'port': 3076, 'policy': 'block'})
+        self.assertIsInstance(frame_sink, sink.UdpSink)
+        self.assertEqual(frame_sink._policy, 'block')
+        frame_sink.close()
+
+    def test_invalid_options(self):
+        """Unknown sink types and policies are rejected"""
+        with self.assertRaises(ValueError):
+            sink.make_sink({'type': 'carrier-pigeon'})
+        with self.assertRaises(ValueError):
+            sink.CallbackSink(None, policy='sometimes')
+
+
+class RafFrameSinkTest(unittest.TestCase):
+
+    def test_frames_emitted_to_sinks(self):
+        """Received frames are passed to each configured sink"""
+        batches = []
+        raf = ait.dsn.sle.RAF(hostnames=['localhost'], port=5100,
+                              sinks=[sink.CallbackSink(batches.append)])
+        raf._conn_monitor.kill()
+        raf._data_processor.kill()
+
+        frame = b'\x00' * 6 + b'\x00' * 4 + b'\x00\x02' + b'abc'
+        raf._transfer_data_invoc_handler(ber.FrameRecord(b'\x00' * 8, 0, 1, None, frame))
+        raf._sinks[0].close()
+
+        self.assertEqual(batches, [[b'abc']])
+
+    def test_session_sinks_override_config(self):
+        """Sinks given to a session are used instead of the configured sinks"""
+        sle_config = ait.config._config['dsn']['sle']
+        sle_config['sinks'] = [{'type': 'udp', 'host': 'localhost', 'port': 3999}]
+        sessions = []
+        try:
+            callback = sink.CallbackSink(lambda frames: None)
+            sessions.append(ait.dsn.sle.RAF(sinks=[callback]))
+            sessions.append(ait.dsn.sle.RAF())
+
+            self.assertEqual(sessions[0]._sinks, [callback])
+            self.assertIsInstance(sessions[1]._sinks[0], sink.UdpSink)
+            self.assertEqual(sessions[1]._sinks[0]._address, ('localhost', 3999))
+        finally:
+            del sle_config['sinks']
+            for session in sessions:
+                session.disconnect()
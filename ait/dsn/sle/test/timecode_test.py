@@ -0,0 +1,89 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+import datetime as dt
+import struct
+import unittest
+
+from ait.dsn.sle import timecode
+
+
+class UTC(dt.tzinfo):
+    def __init__(self, hours):
+        self._offset = dt.timedelta(hours=hours)
+
+    def utcoffset(self, time):
+        return self._offset
+
+    def dst(self, time):
+        return dt.timedelta(0)
+
+
+class EncodeTest(unittest.TestCase):
+
+    def test_time_of_day(self):
+        """Days, ms of day and us or ps of ms are encoded"""
+        time = dt.datetime(2019, 3, 4, 5, 6, 7, 891011)
+        days = (time - timecode.CCSDS_EPOCH).days
+        self.assertEqual(timecode.encode(time), struct.pack('!HIH', days, 18367891, 11))
+        self.assertEqual(timecode.encode(time, pico=True),
+                         struct.pack('!HII', days, 18367891, 11000000))
+
+    def test_time_zone(self):
+        """Times with a time zone are encoded in UTC"""
+        local = dt.datetime(2019, 3, 4, 1, 6, 7, tzinfo=UTC(-4))
+        self.assertEqual(timecode.encode(local), timecode.encode(dt.datetime(2019, 3, 4, 5, 6, 7)))
+
+    def test_out_of_range(self):
+        """Times before the epoch or past the last day are rejected"""
+        with self.assertRaises(ValueError):
+            timecode.encode(dt.datetime(1957, 12, 31, 23, 59))
+        with self.assertRaises(ValueError):
+            timecode.encode(timecode.CCSDS_EPOCH + dt.timedelta(days=65536))
+
+
+class DecodeTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        """Both formats decode to the encoded datetime"""
+        for time in [dt.datetime(1958, 1, 1), dt.datetime(2019, 3, 4, 5, 6, 7, 891011),
+                     dt.datetime(2019, 3, 4, 23, 59, 59, 999999),
+                     dt.datetime(2137, 6, 6, 12)]:
+            for pico in (False, True):
+                self.assertEqual(timecode.decode(timecode.encode(time, pico)), time)
+
+    def test_buffer_types(self):
+        """Times are decoded from memoryviews and bytearrays"""
+        time = dt.datetime(2019, 3, 4, 5, 6, 7, 891011)
+        for pico in (False, True):
+            encoded = timecode.encode(time, pico)
+            for buf in (memoryview(b'xx' + encoded)[2:], bytearray(encoded)):
+                self.assertEqual(timecode.decode(buf), time)
+                self.assertAlmostEqual(timecode.decode_timestamp(buf),
+                                       timecode.decode_timestamp(encoded), places=6)
+
+    def test_day_cache(self):
+        """Cached day starts do not leak between days"""
+        for day in range(100):
+            time = dt.datetime(2020, 1, 1, 12) + dt.timedelta(days=day)
+            self.assertEqual(timecode.decode(timecode.encode(time)), time)
+        self.assertLessEqual(len(timecode._day_starts), timecode._MAX_CACHED_DAYS)
+
+    def test_timestamp(self):
+        """Times decode to seconds since the Unix epoch"""
+        time = dt.datetime(2019, 3, 4, 5, 6, 7, 891011)
+        expected = (time - dt.datetime(1970, 1, 1)).total_seconds()
+        for pico in (False, True):
+            self.assertAlmostEqual(timecode.decode_timestamp(timecode.encode(time, pico)),
+                                   expected, places=6)
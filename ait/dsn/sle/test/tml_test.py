@@ -0,0 +1,99 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+import socket
+import struct
+import unittest
+
+from ait.dsn.sle import tml
+
+
+def make_pdu(body):
+    return struct.pack(tml.TML_SLE_FORMAT, tml.TML_SLE_TYPE, len(body)) + body
+
+HEARTBEAT = struct.pack(tml.TML_CONTEXT_HB_FORMAT, tml.TML_CONTEXT_HEARTBEAT_TYPE, 0)
+
+
+class TMLFramerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.framer = tml.TMLFramer(64)
+
+    def test_complete_pdus_in_one_chunk(self):
+        """Multiple PDUs received in a single read are all returned"""
+        bodies = [b'\xa8\x03abc', b'\xa8\x01z', b'\xa8\x02xy']
+        self.framer.feed(b''.join(make_pdu(b) for b in bodies))
+
+        msgs = [m.tobytes() for m in self.framer]
+        self.assertEqual(msgs, [make_pdu(b) for b in bodies])
+        self.assertEqual(self.framer.pending, 0)
+
+    def test_pdu_split_across_reads(self):
+        """A PDU split across reads is returned once it is complete"""
+        data = make_pdu(b'0123456789')
+        self.framer.feed(data[:5])
+        self.assertEqual(list(self.framer), [])
+        self.framer.feed(data[5:12])
+        self.assertEqual(list(self.framer), [])
+        self.framer.feed(data[12:])
+        self.assertEqual([m.tobytes() for m in self.framer], [data])
+
+    def test_heartbeats_consumed_inline(self):
+        """Heartbeats are counted and never returned as PDUs"""
+        data = HEARTBEAT + make_pdu(b'abc') + HEARTBEAT
+        self.framer.feed(data)
+        self.assertEqual([m.tobytes() for m in self.framer], [make_pdu(b'abc')])
+        self.assertEqual(self.framer.heartbeats_received, 2)
+
+    def test_resync_after_corrupt_header(self):
+        """Garbage in the stream is skipped up to the next valid header"""
+        data = b'\xde\xad\xbe\xef\x00\x00\x00\x10garbage' + make_pdu(b'abc')
+        self.framer.feed(data)
+        self.assertEqual([m.tobytes() for m in self.framer], [make_pdu(b'abc')])
+        self.assertEqual(self.framer.resyncs, 1)
+
+    def test_oversized_length_is_corrupt(self):
+        """A header announcing an implausible body length triggers a resync"""
+        framer = tml.TMLFramer(64, max_pdu_size=100)
+        bad = struct.pack('!II', tml.TML_SLE_TYPE, 0x7FFFFFFF)
+        framer.feed(bad + make_pdu(b'abc'))
+        self.assertEqual([m.tobytes() for m in framer], [make_pdu(b'abc')])
+        self.assertEqual(framer.resyncs, 1)
+
+    def test_buffer_grows_for_large_pdu(self):
+        """A PDU larger than the initial capacity is still framed"""
+        data = make_pdu(b'x' * 1000)
+        for i in range(0, len(data), 50):
+            self.framer.feed(data[i:i + 50])
+        self.assertEqual([m.tobytes() for m in self.framer], [data])
+
+    def test_fill_from_socket(self):
+        """Data is received directly into the buffer with recv_into"""
+        reader, writer = socket.socketpair()
+        try:
+            data = make_pdu(b'abc') + HEARTBEAT + make_pdu(b'defg')
+            writer.sendall(data)
+
+            received = 0
+            while received < len(data):
+                received += self.framer.fill(reader)
+
+            self.assertEqual(
+                [m.tobytes() for m in self.framer],
+                [make_pdu(b'abc'), make_pdu(b'defg')]
+            )
+            self.assertEqual(self.framer.bytes_received, len(data))
+        finally:
+            reader.close()
+            writer.close()
@@ -0,0 +1,27 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+
+import unittest
+
+from ait.dsn.sle import util
+
+
+class PercentilesTest(unittest.TestCase):
+
+    def test_percentiles(self):
+        """Percentiles are taken from the sorted samples"""
+        stats = util.percentiles([float(i) for i in range(100, 0, -1)])
+        self.assertEqual(stats, {'mean': 50.5, 'p50': 50.0, 'p90': 90.0, 'p99': 99.0, 'max': 100.0})
+        self.assertEqual(util.percentiles([]), {})
@@ -0,0 +1,150 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+''' CCSDS Day Segmented Time Codes
+
+The ait.dsn.sle.timecode module encodes and decodes the CCSDS day
+segmented (CDS) times used by SLE: start and stop times, CLTU radiation
+windows, credentials and the earth receive times of annotated frames.
+Both the 8 octet format with microseconds of the millisecond and the 10
+octet format with picoseconds of the millisecond are supported.
+
+See :func:`ait.dsn.sle.batch.earth_receive_times` for decoding the earth
+receive times of a whole transfer buffer at once.
+
+Attributes:
+    CCSDS_EPOCH: A datetime object pointing to the CCSDS Epoch.
+
+    CDS_TIME: The precompiled struct of an 8 octet CDS time.
+
+    CDS_PICO_TIME: The precompiled struct of a 10 octet CDS time.
+
+    UNIX_EPOCH_DAYS: The number of days from the CCSDS epoch to the Unix
+        epoch.
+
+Functions:
+    encode: Encode a datetime as a CDS time.
+
+    decode: Decode a CDS time to a datetime.
+
+    decode_timestamp: Decode a CDS time to seconds since the Unix epoch.
+'''
+
+import datetime as dt
+import struct
+
+CCSDS_EPOCH = dt.datetime(1958, 1, 1)
+
+CDS_TIME = struct.Struct('!HIH')
+CDS_PICO_TIME = struct.Struct('!HII')
+
+UNIX_EPOCH_DAYS = (dt.datetime(1970, 1, 1) - CCSDS_EPOCH).days
+
+_EPOCH_ORDINAL = CCSDS_EPOCH.toordinal()
+_MAX_DAYS = 0xFFFF
+
+# The datetime of the start of recently decoded days. Frames of a pass
+# share a handful of days, so each day's datetime is built only once.
+_day_starts = {}
+_MAX_CACHED_DAYS = 64
+
+
+def encode(time, pico=False):
+    ''' Encode a datetime as a CDS time
+
+    Arguments:
+        time:
+            The :class:`datetime.datetime` to encode. Times with a time
+            zone are converted to UTC.
+
+        pico:
+            Encode the 10 octet format instead of the 8 octet one.
+
+    Returns:
+        2 octets of days since 1958-01-01, 4 octets of milliseconds of the
+        day and 2 octets of microseconds, or 4 octets of picoseconds, of
+        the millisecond.
+
+    Raises:
+        ValueError: If the time is outside of the range of the format.
+    '''
+    if time.tzinfo is not None:
+        time = (time - time.utcoffset()).replace(tzinfo=None)
+
+    days = time.toordinal() - _EPOCH_ORDINAL
+    if not 0 <= days <= _MAX_DAYS:
+        raise ValueError('{} cannot be encoded as a CCSDS day segmented time'.format(time))
+
+    millisecs, microsecs = divmod(
+        ((time.hour * 60 + time.minute) * 60 + time.second) * 1000000 + time.microsecond,
+        1000
+    )
+
+    if pico:
+        return CDS_PICO_TIME.pack(days, millisecs, microsecs * 1000000)
+    return CDS_TIME.pack(days, millisecs, microsecs)
+
+
+def decode(encoded):
+    ''' Decode a CDS time to a datetime
+
+    Arguments:
+        encoded:
+            An 8 octet time with microseconds of the millisecond or a 10
+            octet time with picoseconds of the millisecond, as bytes, a
+            bytearray or a memoryview.
+
+    Returns:
+        The :class:`datetime.datetime`. Picoseconds are truncated to
+        microseconds.
+    '''
+    if len(encoded) == 10:
+        days, millisecs, picosecs = CDS_PICO_TIME.unpack_from(encoded)
+        microsecs = picosecs // 1000000
+    else:
+        days, millisecs, microsecs = CDS_TIME.unpack_from(encoded)
+
+    start = _day_starts.get(days)
+    if start is None:
+        if len(_day_starts) >= _MAX_CACHED_DAYS:
+            _day_starts.clear()
+        start = _day_starts[days] = CCSDS_EPOCH + dt.timedelta(days=days)
+
+    return start + dt.timedelta(milliseconds=millisecs, microseconds=microsecs)
+
+
+def decode_timestamp(encoded):
+    ''' Decode a CDS time to seconds since the Unix epoch
+
+    This skips creating a datetime, so it is cheap enough to apply to the
+    earth receive time of every received frame. Like :func:`time.time`,
+    leap seconds are not counted.
+
+    Arguments:
+        encoded:
+            An 8 octet time with microseconds of the millisecond or a 10
+            octet time with picoseconds of the millisecond, as bytes, a
+            bytearray or a memoryview.
+
+    Returns:
+        The time as a float for comparing with :func:`time.time`.
+    '''
+    if len(encoded) == 10:
+        days, millisecs, picosecs = CDS_PICO_TIME.unpack_from(encoded)
+        subsecs = picosecs * 1e-12
+    else:
+        days, millisecs, microsecs = CDS_TIME.unpack_from(encoded)
+        subsecs = microsecs * 1e-6
+
+    return (days - UNIX_EPOCH_DAYS) * 86400 + millisecs * 1e-3 + subsecs
@@ -0,0 +1,271 @@
+# Advanced Multi-Mission Operations System (AMMOS) Instrument Toolkit (AIT)
+# Bespoke Link to Instruments and Small Satellites (BLISS)
+#
+# Copyright 2017, by the California Institute of Technology. ALL RIGHTS
+# RESERVED. United States Government Sponsorship acknowledged. Any
+# commercial use must be negotiated with the Office of Technology Transfer
+# at the California Institute of Technology.
+#
+# This software may be subject to U.S. export control laws. By accepting
+# this software, the user agrees to comply with all applicable U.S. export
+# laws and regulations. User has the responsibility to obtain export licenses,
+# or other export authority as may be required before exporting such
+# information to foreign countries or providing access to foreign persons.
+
+''' SLE Transport Mapping Layer (TML)
+
+The ait.dsn.sle.tml module provides the TML message constants and a
+stream framer for splitting the TCP byte stream received from an SLE
+provider into individual TML messages.
+
+Attributes:
+    TML_SLE_FORMAT: The struct format string for pack-ing a SLE PDU
+        packet header.
+
+    TML_SLE_TYPE: The first 4 bytes of an SLE PDU packet header for
+        use when struct.pack-ing.
+
+    TML_CONTEXT_MSG_FORMAT: The struct format string for pack-ing a
+        SLE Context Message PDU.
+
+    TML_CONTEXT_MSG_TYPE: The first 4 bytes of an SLE Context Message
+        PDU header for use when struct.pack-ing.
+
+    TML_CONTEXT_HB_FORMAT: The struct format string for pack-ing a
+        SLE Heartbeat message PDU.
+
+    TML_CONTEXT_HEARTBEAT_TYPE: The first 4 bytes of an SLE Heartbeat
+        message PDU header for use when struct.pack-ing.
+
+    TML_HEADER_LEN: The length in bytes of a TML message header.
+
+    TML_MAX_PDU_SIZE: The largest SLE PDU body length the framer will
+        accept before treating a header as corrupt.
+
+Classes:
+    TMLFramer: A preallocated receive buffer that yields complete TML
+        messages without copying them.
+
+Functions:
+    pack_sle_pdu: Wrap an encoded SLE PDU in a TML PDU message.
+'''
+
+import struct
+
+import ait.core.log
+
+TML_SLE_FORMAT = '!ii'
+TML_SLE_TYPE = 0x01000000
+
+TML_CONTEXT_MSG_FORMAT = '!IIbbbbIHH'
+TML_CONTEXT_MSG_TYPE = 0x02000000
+
+TML_CONTEXT_HB_FORMAT = '!ii'
+TML_CONTEXT_HEARTBEAT_TYPE = 0x03000000
+
+TML_HEADER_LEN = 8
+TML_MAX_PDU_SIZE = 16 * 1024 * 1024
+
+_TML_HEADER = struct.Struct('!II')
+_TML_SLE_SIG = b'\x01\x00\x00\x00'
+_TML_HEARTBEAT_SIG = b'\x03\x00\x00\x00'
+
+
+def pack_sle_pdu(encoded):
+    ''' Wrap an encoded SLE PDU in a TML PDU message
+
+    Arguments:
+        encoded:
+            The ASN.1 encoded SLE PDU.
+
+    Returns:
+        The TML PDU message header followed by the encoded PDU.
+    '''
+    return struct.pack(TML_SLE_FORMAT, TML_SLE_TYPE, len(encoded)) + encoded
+
+
+class TMLFramer(object):
+    ''' Split a TML byte stream into SLE PDU messages
+
+    The framer owns a single preallocated bytearray that is filled directly
+    from a socket with ``recv_into`` (or from a chunk of data via
+    :meth:`feed`). Iterating over the framer yields each complete TML PDU
+    message (header and body) as a memoryview into that buffer. Heartbeat
+    messages are consumed inline and counted.
+
+    If a header with an unexpected type or an implausible length is
+    encountered, the framer logs the problem, skips forward to the next
+    SLE PDU or heartbeat signature and continues instead of giving up on
+    the stream.
+
+    The yielded memoryviews are only valid until the next call to
+    :meth:`fill` or :meth:`feed`. Consumers that hold on to a message past
+    that point must copy it (e.g., with ``tobytes()``).
+    '''
+
+    def __init__(self, capacity=256000, max_pdu_size=TML_MAX_PDU_SIZE):
+        '''
+        Arguments:
+            capacity:
+                The initial size in bytes of the receive buffer. The buffer
+                is grown if a single TML message does not fit.
+
+            max_pdu_size:
+                The largest PDU body length that will be accepted. Headers
+                announcing a larger body are treated as corrupt.
+        '''
+        self._max_pdu_size = max_pdu_size
+        self._buf = bytearray(max(capacity, TML_HEADER_LEN))
+        self._view = memoryview(self._buf)
+        self._read = 0
+        self._write = 0
+        self._needed = TML_HEADER_LEN
+
+        self.bytes_received = 0
+        self.pdus_received = 0
+        self.heartbeats_received = 0
+        self.resyncs = 0
+
+    def __iter__(self):
+        return self.pdus()
+
+    @property
+    def pending(self):
+        ''' The number of received bytes not yet returned as a message '''
+        return self._write - self._read
+
+    def fill(self, sock, nbytes=0):
+        ''' Receive data from a socket directly into the framer's buffer
+
+        Arguments:
+            sock:
+                The socket object to read from with ``recv_into``.
+
+            nbytes:
+                An optional limit on the number of bytes to read. Defaults
+                to all of the free space in the buffer.
+
+        Returns:
+            The number of bytes received. A return of 0 indicates that the
+            peer closed the connection.
+        '''
+        buf = self.get_buffer(nbytes)
+        n = sock.recv_into(buf, len(buf))
+        self.buffer_updated(n)
+        return n
+
+    def get_buffer(self, nbytes=0):
+        ''' Return the free space of the buffer for receiving data into
+
+        This and :meth:`buffer_updated` follow the
+        ``asyncio.BufferedProtocol`` interface.
+
+        Arguments:
+            nbytes:
+                An optional limit on the size of the returned buffer.
+
+        Returns:
+            A writable memoryview of the free space in the buffer.
+        '''
+        self._make_room()
+        free = len(self._buf) - self._write
+        if nbytes > 0:
+            free = min(free, nbytes)
+
+        return self._view[self._write:self._write + free]
+
+    def buffer_updated(self, nbytes):
+        ''' Record that nbytes were written to the buffer returned by
+        :meth:`get_buffer`.
+        '''
+        self._write += nbytes
+        self.bytes_received += nbytes
+
+    def feed(self, data):
+        ''' Copy a chunk of received data into the framer's buffer
+
+        Arguments:
+            data:
+                A bytes-like object of stream data.
+        '''
+        data = memoryview(data)
+        n = len(data)
+        self._make_room(n)
+        self._view[self._write:self._write + n] = data
+        self._write += n
+        self.bytes_received += n
+
+    def pdus(self):
+        ''' Yield each complete TML PDU message currently in the buffer
+
+        Yields:
+            A memoryview of a complete TML message (8 byte header plus
+            the encoded PDU body).
+        '''
+        buf = self._buf
+        view = self._view
+        unpack_from = _TML_HEADER.unpack_from
+
+        while self._write - self._read >= TML_HEADER_LEN:
+            start = self._read
+            msg_type, body_len = unpack_from(buf, start)
+
+            if msg_type == TML_SLE_TYPE and body_len <= self._max_pdu_size:
+                end = start + TML_HEADER_LEN + body_len
+                if end > self._write:
+                    self._needed = end - start
+                    return
+
+                self._read = end
+                self._needed = TML_HEADER_LEN
+                self.pdus_received += 1
+                yield view[start:end]
+            elif msg_type == TML_CONTEXT_HEARTBEAT_TYPE and body_len == 0:
+                self._read = start + TML_HEADER_LEN
+                self.heartbeats_received += 1
+            else:
+                self._resync()
+
+        self._needed = TML_HEADER_LEN
+
+    def _resync(self):
+        ''' Skip to the next plausible TML header after a corrupt one '''
+        start = self._read
+        buf = self._buf
+        candidates = [
+            i for i in (
+                buf.find(_TML_SLE_SIG, start + 1, self._write),
+                buf.find(_TML_HEARTBEAT_SIG, start + 1, self._write)
+            )
+            if i != -1
+        ]
+
+        if candidates:
+            self._read = min(candidates)
+        else:
+            # Keep a possible partial signature at the end of the buffer
+            self._read = max(start + 1, self._write - (len(_TML_SLE_SIG) - 1))
+
+        self.resyncs += 1
+        ait.core.log.error(
+            'Received PDU with unexpected header. Skipped {} bytes to '
+            'resynchronize with the TML stream.'.format(self._read - start)
+        )
+
+    def _make_room(self, nbytes=0):
+        ''' Compact unread data to the front of the buffer and grow it if
+        the buffer cannot hold the next message or nbytes more data.
+        '''
+        pending = self._write - self._read
+        if self._read:
+            if pending:
+                self._buf[:pending] = self._buf[self._read:self._write]
+            self._read = 0
+            self._write = pending
+
+        required = max(self._needed, pending + nbytes, pending + 1)
+        if required > len(self._buf):
+            buf = bytearray(max(required, 2 * len(self._buf)))
+            buf[:pending] = self._buf[:pending]
+            self._buf = buf
+            self._view = memoryview(buf)
@@ -14,8 +14,27 @@
 
 import binascii
 
+
 def hexint(b):
     if not b:
         return int()
     else:
         return int(binascii.hexlify(b), 16)
+
+
+def percentiles(samples):
+    ''' Return the mean, median, 90th and 99th percentile and maximum of
+    a list of samples
+    '''
+    if not samples:
+        return {}
+
+    samples = sorted(samples)
+    last = len(samples) - 1
+    return {
+        'mean': sum(samples) / len(samples),
+        'p50': samples[last // 2],
+        'p90': samples[int(round(last * 0.9))],
+        'p99': samples[int(round(last * 0.99))],
+        'max': samples[last],
+    }
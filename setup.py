@@ -49,6 +49,9 @@ setup(
             'sphinx_rtd_theme',
             'sphinxcontrib-httpdomain'
         ],
+        'numpy': [
+            'numpy'
+        ],
         'tests': [
             'nose',
             'coverage',